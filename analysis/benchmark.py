@@ -0,0 +1,466 @@
+"""Benchmark agct liftover performance against synthetic chainfiles.
+
+Chainfiles are generated locally at roughly hg19 -> hg38 scale (24 contigs of hg19
+length, hundreds of thousands of alignment blocks, with inverted and overlapping
+secondary chains), so no network access is needed. Covered:
+
+* chainfile load time, for each way of loading a converter
+* single-interval ``convert_coordinate()`` latency
+* batch ``convert_coordinates()`` throughput at several batch sizes
+* sorted vs. random access
+* panel table lookups vs. ``convert_positions()`` for a fixed set of positions
+* memory footprint of a loaded converter
+
+Results are written as JSON. Compare a run against an earlier one with ``--baseline``
+to exit non-zero if any metric has regressed beyond ``--tolerance``:
+
+.. code-block:: shell
+
+   python analysis/benchmark.py --output baseline.json
+   # ...upgrade or rebuild agct...
+   python analysis/benchmark.py --output current.json --baseline baseline.json
+
+Build the extension in release mode first (``maturin develop --release``).
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from importlib.metadata import version
+from pathlib import Path
+from typing import Literal, NamedTuple, TextIO
+from unittest import mock
+
+from agct import Converter, compile_index
+from agct.panels import build_panel
+
+# hg19 contig lengths
+CONTIG_SIZES = {
+    "chr1": 249250621,
+    "chr2": 243199373,
+    "chr3": 198022430,
+    "chr4": 191154276,
+    "chr5": 180915260,
+    "chr6": 171115067,
+    "chr7": 159138663,
+    "chr8": 146364022,
+    "chr9": 141213431,
+    "chr10": 135534747,
+    "chr11": 135006516,
+    "chr12": 133851895,
+    "chr13": 115169878,
+    "chr14": 107349540,
+    "chr15": 102531392,
+    "chr16": 90354753,
+    "chr17": 81195210,
+    "chr18": 78077248,
+    "chr19": 59128983,
+    "chr20": 63025520,
+    "chr21": 48129895,
+    "chr22": 51304566,
+    "chrX": 155270560,
+    "chrY": 59373566,
+}
+
+# fraction of primary chains that lift onto the reverse strand
+INVERTED_FRACTION = 0.1
+
+LOAD_MODES = {
+    "parse": {},
+    "index": {"use_index": True},
+    "lazy": {"lazy": True},
+}
+
+
+class Metric(NamedTuple):
+    """Declare structure of a single benchmark measurement"""
+
+    name: str
+    value: float
+    unit: str
+    better: Literal["lower", "higher"]
+
+
+def generate_chainfile(
+    path: Path, scale: float = 1.0, seed: int = 0
+) -> tuple[int, int]:
+    """Write a synthetic chainfile.
+
+    Each contig is covered by a series of primary chains that lift it onto a
+    slightly larger contig of the same name, about one in ten of them onto the
+    reverse strand. Short secondary chains overlapping the primary ones are
+    scattered on top, so that some intervals lift to several segments.
+
+    :param path: location to write chainfile to
+    :param scale: fraction of hg19 -> hg38 size to generate, in alignment blocks
+    :param seed: random seed
+    :return: number of chains and alignment blocks written
+    """
+    rng = random.Random(seed)
+    # hg19 -> hg38 has ~6kb of reference sequence per block, including gaps
+    mean_step = 6000 / scale
+    n_chains, n_blocks = 0, 0
+    score = 10**12
+
+    def write_chain(
+        f: TextIO,
+        contig: str,
+        query: str,
+        start: int,
+        max_end: int,
+        query_positive: bool,
+    ) -> int:
+        nonlocal n_chains, n_blocks, score
+        blocks = []
+        position, query_span = start, 0
+        while True:
+            size = rng.randint(1, int(mean_step * 1.6))
+            if position + size > max_end:
+                break
+            gap = rng.randint(0, int(mean_step * 0.4))
+            query_gap = rng.randint(0 if gap else 1, int(mean_step * 0.4))
+            blocks.append((size, gap, query_gap))
+            position += size + gap
+            query_span += size + query_gap
+        if not blocks:
+            return start
+        # the final block has no trailing gap
+        size, gap, query_gap = blocks[-1]
+        end = position - gap
+        query_span -= query_gap
+        query_size = int(CONTIG_SIZES[query] * 1.1)
+        query_start = rng.randint(0, query_size - query_span)
+        n_chains += 1
+        n_blocks += len(blocks)
+        score = max(score - rng.randint(1, 10**6), 1)
+        f.write(
+            f"chain {score} {contig} {CONTIG_SIZES[contig]} + {start} {end} "
+            f"{query} {query_size} {'+' if query_positive else '-'} "
+            f"{query_start} {query_start + query_span} {n_chains}\n"
+        )
+        for size, gap, query_gap in blocks[:-1]:
+            f.write(f"{size}\t{gap}\t{query_gap}\n")
+        f.write(f"{blocks[-1][0]}\n\n")
+        return end
+
+    with path.open("w") as f:
+        for contig, contig_size in CONTIG_SIZES.items():
+            position = rng.randint(0, 10000)
+            while position < contig_size - mean_step * 4:
+                chain_end = min(
+                    contig_size, position + rng.randint(1_000_000, 20_000_000)
+                )
+                position = write_chain(
+                    f,
+                    contig,
+                    contig,
+                    position,
+                    chain_end,
+                    rng.random() >= INVERTED_FRACTION,
+                )
+                position += rng.randint(1, 50_000)
+        for _ in range(int(2000 * scale) or 1):
+            contig = rng.choice(list(CONTIG_SIZES))
+            start = rng.randint(0, CONTIG_SIZES[contig] - 100_000)
+            write_chain(
+                f,
+                contig,
+                rng.choice(list(CONTIG_SIZES)),
+                start,
+                start + rng.randint(100, 100_000),
+                rng.choice((True, False)),
+            )
+    return n_chains, n_blocks
+
+
+def generate_queries(n: int, seed: int = 1) -> tuple[list[str], list[int], list[int]]:
+    """Generate random intervals, in random order.
+
+    :param n: number of intervals
+    :param seed: random seed
+    :return: columns of chromosomes, starts, and ends
+    """
+    rng = random.Random(seed)
+    contigs = list(CONTIG_SIZES)
+    weights = list(CONTIG_SIZES.values())
+    chroms = rng.choices(contigs, weights, k=n)
+    starts = [rng.randrange(CONTIG_SIZES[chrom] - 1000) for chrom in chroms]
+    ends = [start + rng.choice((0, 1, 1, 1, 10, 1000)) for start in starts]
+    return chroms, starts, ends
+
+
+def sort_queries(
+    chroms: list[str], starts: list[int], ends: list[int]
+) -> tuple[list[str], list[int], list[int]]:
+    """Sort intervals by chromosome and position."""
+    rows = sorted(zip(chroms, starts, ends, strict=True))
+    return [row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows]
+
+
+def _time(function: Callable[[], object], repeat: int) -> float:
+    """Get the best wall time of several calls, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _load_memory(chainfile: str, mode: str) -> float:
+    """Load a converter and report the increase in peak RSS, in MiB.
+
+    Run in a fresh process so that measurements don't include each other.
+    """
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    converter = Converter(chainfile=chainfile, **LOAD_MODES[mode])
+    converter.convert_coordinate("chr1", 1_000_000, 1_000_001)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return (after - before) / divisor
+
+
+def bench_load(chainfile: Path, repeat: int) -> list[Metric]:
+    """Measure converter load time for each load mode, and index compile time."""
+    metrics = [
+        Metric(
+            "load/compile_index",
+            _time(lambda: compile_index(chainfile), repeat),
+            "s",
+            "lower",
+        )
+    ]
+    for mode, kwargs in LOAD_MODES.items():
+        load_time = _time(
+            lambda kwargs=kwargs: Converter(chainfile=str(chainfile), **kwargs), repeat
+        )
+        metrics.append(Metric(f"load/{mode}", load_time, "s", "lower"))
+    return metrics
+
+
+def bench_memory(chainfile: Path) -> list[Metric]:
+    """Measure peak memory added by loading a converter, for each load mode."""
+    context = multiprocessing.get_context("spawn")
+    metrics = []
+    for mode in LOAD_MODES:
+        with context.Pool(1) as pool:
+            memory = pool.apply(_load_memory, (str(chainfile), mode))
+        metrics.append(Metric(f"memory/{mode}", memory, "MiB", "lower"))
+    return metrics
+
+
+def bench_single(converter: Converter, n: int) -> list[Metric]:
+    """Measure ``convert_coordinate()`` latency over random intervals."""
+    chroms, starts, ends = generate_queries(n)
+    latencies = []
+    for chrom, start, end in zip(chroms, starts, ends, strict=True):
+        t0 = time.perf_counter_ns()
+        converter.convert_coordinate(chrom, start, end)
+        latencies.append(time.perf_counter_ns() - t0)
+    latencies.sort()
+    return [
+        Metric("single/median", statistics.median(latencies) / 1000, "us", "lower"),
+        Metric(
+            "single/p99", latencies[int(len(latencies) * 0.99)] / 1000, "us", "lower"
+        ),
+    ]
+
+
+def bench_batch(converter: Converter, sizes: list[int], repeat: int) -> list[Metric]:
+    """Measure ``convert_coordinates()`` throughput at several batch sizes."""
+    metrics = []
+    for size in sizes:
+        chroms, starts, ends = generate_queries(size)
+        elapsed = _time(
+            lambda chroms=chroms,
+            starts=starts,
+            ends=ends: converter.convert_coordinates(chroms, starts, ends),
+            repeat,
+        )
+        metrics.append(Metric(f"batch/{size}", size / elapsed, "intervals/s", "higher"))
+    return metrics
+
+
+def bench_access_order(
+    converter: Converter, size: int, repeat: int, prefix: str
+) -> list[Metric]:
+    """Compare throughput for randomly ordered and sorted batches."""
+    random_order = generate_queries(size)
+    sorted_order = sort_queries(*random_order)
+    cases = {
+        "random": (random_order, False),
+        "sorted": (sorted_order, False),
+        "sorted_cursor": (sorted_order, True),
+    }
+    metrics = []
+    for name, (columns, sorted_input) in cases.items():
+        elapsed = _time(
+            lambda columns=columns,
+            sorted_input=sorted_input: converter.convert_coordinates(
+                *columns, sorted_input=sorted_input
+            ),
+            repeat,
+        )
+        metrics.append(
+            Metric(f"{prefix}/{name}", size / elapsed, "intervals/s", "higher")
+        )
+    return metrics
+
+
+def bench_panel(
+    converter: Converter, workdir: Path, size: int, repeat: int
+) -> list[Metric]:
+    """Compare panel table lookups with lifting the same positions directly."""
+    chroms, positions, _ = generate_queries(size)
+    with mock.patch.dict(os.environ, {"WAGS_TAILS_DIR": str(workdir / "data")}):
+        panel = build_panel(converter, "benchmark", chroms, positions)
+    cases = {
+        "lift_many": lambda: panel.lift_many(chroms, positions),
+        "convert_positions": lambda: converter.convert_positions(chroms, positions),
+    }
+    return [
+        Metric(f"panel/{name}", size / _time(function, repeat), "positions/s", "higher")
+        for name, function in cases.items()
+    ]
+
+
+def run(
+    workdir: Path, scale: float, batch_sizes: list[int], n_single: int, repeat: int
+) -> list[Metric]:
+    """Generate a chainfile and run all benchmarks against it."""
+    chainfile = workdir / "synthetic.chain"
+    n_chains, n_blocks = generate_chainfile(chainfile, scale)
+    print(f"Generated {n_chains} chains, {n_blocks} blocks", file=sys.stderr)
+
+    metrics = bench_load(chainfile, repeat)
+    metrics += bench_memory(chainfile)
+    for mode in ("parse", "index"):
+        converter = Converter(chainfile=str(chainfile), **LOAD_MODES[mode])
+        metrics += [
+            metric._replace(name=f"{mode}/{metric.name}")
+            for metric in bench_single(converter, n_single)
+            + bench_batch(converter, batch_sizes, repeat)
+        ]
+        metrics += bench_access_order(
+            converter, max(batch_sizes), repeat, f"{mode}/access"
+        )
+    metrics += bench_panel(
+        Converter(chainfile=str(chainfile)), workdir, max(batch_sizes), repeat
+    )
+    return metrics
+
+
+def compare(
+    metrics: list[Metric], baseline: list[Metric], tolerance: float
+) -> list[str]:
+    """Find metrics that have regressed relative to a baseline run.
+
+    :param metrics: current measurements
+    :param baseline: earlier measurements
+    :param tolerance: allowed fractional change in the worse direction
+    :return: description of each regression
+    """
+    previous = {metric.name: metric for metric in baseline}
+    regressions = []
+    for metric in metrics:
+        old = previous.get(metric.name)
+        if old is None or old.value <= 0:
+            continue
+        change = (metric.value - old.value) / old.value
+        if metric.better == "higher":
+            change = -change
+        if change > tolerance:
+            regressions.append(
+                f"{metric.name}: {old.value:.4g} -> {metric.value:.4g} {metric.unit} "
+                f"({change:.0%} worse)"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run benchmarks and report results.
+
+    :param argv: command-line args (defaults to ``sys.argv``)
+    :return: exit code (1 if any metric regressed against the baseline)
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--output", type=Path, help="file to write JSON results to (default: stdout)"
+    )
+    parser.add_argument(
+        "--baseline", type=Path, help="JSON results of an earlier run to compare with"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="fractional regression allowed before failing (default: 0.25)",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="chainfile size relative to hg19 -> hg38 (default: 1.0)",
+    )
+    parser.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000, 1_000_000],
+        help="batch sizes to measure throughput at",
+    )
+    parser.add_argument(
+        "--single",
+        type=int,
+        default=100_000,
+        help="number of single-interval lookups to time",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="repetitions per timing (best is kept)"
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        metrics = run(
+            Path(workdir), args.scale, args.batch_sizes, args.single, args.repeat
+        )
+    report = {
+        "meta": {
+            "agct_version": version("agct"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(tz=UTC).isoformat(),
+            "scale": args.scale,
+        },
+        "metrics": [metric._asdict() for metric in metrics],
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+    if not args.baseline:
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare(
+        metrics, [Metric(**metric) for metric in baseline["metrics"]], args.tolerance
+    )
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
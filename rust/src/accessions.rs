@@ -0,0 +1,53 @@
+//! Integer-keyed tables between refget sequence accessions and chainfile contigs.
+//!
+//! A converter's accession table is built once, from the accessions of its source and
+//! target assemblies. Liftover by accession then needs one hash lookup to find the
+//! source contig, and one per lifted segment to find the ID of its target accession,
+//! without any string being built or parsed.
+use std::collections::HashMap;
+
+/// Accessions of the sequences on either side of a chainfile
+pub struct AccessionTable {
+    /// Source contig name for each source accession
+    source_contigs: HashMap<String, String>,
+    /// ID of each target contig's accession in ``target_accessions``
+    target_ids: HashMap<String, u32>,
+    target_accessions: Vec<String>,
+}
+
+impl AccessionTable {
+    /// Build a table from (accession, contig name) pairs for each assembly
+    pub fn new(source: Vec<(String, String)>, target: Vec<(String, String)>) -> AccessionTable {
+        let mut target_ids = HashMap::with_capacity(target.len());
+        let mut target_accessions = Vec::with_capacity(target.len());
+        for (accession, contig) in target {
+            target_ids.insert(contig, target_accessions.len() as u32);
+            target_accessions.push(accession);
+        }
+        AccessionTable {
+            source_contigs: source.into_iter().collect(),
+            target_ids,
+            target_accessions,
+        }
+    }
+
+    /// Get the source contig name for an accession, if it's a known source sequence
+    pub fn source_contig(&self, accession: &str) -> Option<&str> {
+        self.source_contigs.get(accession).map(String::as_str)
+    }
+
+    /// Get the ID of a target contig's accession, if it has one
+    pub fn target_id(&self, contig: &str) -> Option<u32> {
+        self.target_ids.get(contig).copied()
+    }
+
+    /// Get a target accession by ID
+    pub fn target_accession(&self, id: u32) -> &str {
+        &self.target_accessions[id as usize]
+    }
+
+    /// Get all target accessions, in ID order
+    pub fn target_accessions(&self) -> &[String] {
+        &self.target_accessions
+    }
+}
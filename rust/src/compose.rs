@@ -0,0 +1,147 @@
+//! Composition of chainfiles.
+//!
+//! Given chains from assembly A to B and chains from B to C, each ungapped block of
+//! an A-to-B chain is intersected with the B-to-C blocks that its query interval
+//! overlaps. The resulting pieces are regrouped into one chain per pair of input
+//! chains, and written out as an ordinary chainfile that lifts directly from A to C.
+//! Within a pair of collinear chains the composed blocks are collinear too, so each
+//! group forms a valid chain.
+use crate::index::{ChainData, ChainIndex};
+use std::collections::BTreeMap;
+use std::fs::{self, File};
+use std::io::{self, BufWriter, Write};
+use std::path::Path;
+
+/// An ungapped block of a composed chain. ``query_start`` is given on the composed
+/// chain's query strand.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+struct ComposedBlock {
+    reference_start: u64,
+    query_start: u64,
+    size: u64,
+}
+
+/// Compose two sets of chains, where the query assembly of ``first`` is the
+/// reference assembly of ``second``, into a chainfile lifting from the reference
+/// assembly of ``first`` to the query assembly of ``second``.
+///
+/// Each composed chain is scored with the lower of its two input chain scores. The
+/// output is written to a temporary file and then moved into place.
+pub fn compose(first: &ChainData, second: &ChainIndex, output_path: &Path) -> io::Result<()> {
+    let mut composed: BTreeMap<(u32, u32), Vec<ComposedBlock>> = BTreeMap::new();
+    for block in &first.blocks {
+        let chain = &first.chains[block.chain as usize];
+        let Some(contig) = second.contig_id(&first.contigs[chain.query as usize]) else {
+            continue;
+        };
+        if block.size == 0 {
+            continue;
+        }
+        // forward-strand interval covered by the block on the intermediate assembly
+        let size = u64::from(block.size);
+        let (forward_start, forward_end) = if chain.query_positive {
+            let start = u64::from(block.query_start);
+            (start, start + size)
+        } else {
+            let end = chain.query_size - u64::from(block.query_start);
+            (end - size, end)
+        };
+        let (Ok(lower), Ok(upper)) = (u32::try_from(forward_start), u32::try_from(forward_end))
+        else {
+            continue;
+        };
+        for i in second.overlapping_blocks(contig, lower, upper) {
+            let next = second.block(i);
+            let start = forward_start.max(u64::from(next.reference_start));
+            let end = forward_end.min(u64::from(next.reference_end()));
+            if start >= end {
+                continue;
+            }
+            let size = end - start;
+            let reference_start = u64::from(block.reference_start)
+                + if chain.query_positive {
+                    start - forward_start
+                } else {
+                    forward_end - end
+                };
+            let mut query_start =
+                u64::from(next.query_start) + (start - u64::from(next.reference_start));
+            if !chain.query_positive {
+                // walking forward on the reference walks backward on the intermediate
+                // assembly, so the composed chain is on the opposite query strand
+                query_start = second.chain(next.chain).query_size - query_start - size;
+            }
+            composed
+                .entry((block.chain, next.chain))
+                .or_default()
+                .push(ComposedBlock {
+                    reference_start,
+                    query_start,
+                    size,
+                });
+        }
+    }
+
+    let mut tmp_path = output_path.as_os_str().to_owned();
+    tmp_path.push(format!(".{}.tmp", std::process::id()));
+    let tmp_path = Path::new(&tmp_path);
+    let mut writer = BufWriter::new(File::create(tmp_path)?);
+    for (id, ((first_chain, second_chain), mut blocks)) in composed.into_iter().enumerate() {
+        let chain = &first.chains[first_chain as usize];
+        let next = second.chain(second_chain);
+        blocks.sort_by_key(|block| block.reference_start);
+        let blocks = merge_adjacent(blocks);
+        let (head, tail) = (blocks[0], blocks[blocks.len() - 1]);
+        writeln!(
+            writer,
+            "chain {} {} {} + {} {} {} {} {} {} {} {}",
+            chain.score.min(next.score),
+            first.contigs[chain.reference as usize],
+            chain.reference_size,
+            head.reference_start,
+            tail.reference_start + tail.size,
+            second.contig_name(next.query),
+            next.query_size,
+            if chain.query_positive == next.query_positive {
+                "+"
+            } else {
+                "-"
+            },
+            head.query_start,
+            tail.query_start + tail.size,
+            id + 1,
+        )?;
+        for pair in blocks.windows(2) {
+            writeln!(
+                writer,
+                "{}\t{}\t{}",
+                pair[0].size,
+                pair[1].reference_start - (pair[0].reference_start + pair[0].size),
+                pair[1].query_start - (pair[0].query_start + pair[0].size),
+            )?;
+        }
+        writeln!(writer, "{}\n", tail.size)?;
+    }
+    let file = writer.into_inner().map_err(|e| e.into_error())?;
+    file.sync_all()?;
+    fs::rename(tmp_path, output_path)?;
+    Ok(())
+}
+
+/// Merge blocks that are contiguous on both the reference and the query, e.g. where
+/// a block of the first chain spans two gapless blocks of the second
+fn merge_adjacent(blocks: Vec<ComposedBlock>) -> Vec<ComposedBlock> {
+    let mut merged: Vec<ComposedBlock> = Vec::with_capacity(blocks.len());
+    for block in blocks {
+        match merged.last_mut() {
+            Some(last)
+                if last.reference_start + last.size == block.reference_start
+                    && last.query_start + last.size == block.query_start =>
+            {
+                last.size += block.size;
+            }
+            _ => merged.push(block),
+        }
+    }
+    merged
+}
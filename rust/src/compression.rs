@@ -0,0 +1,289 @@
+//! Reading of gzip- and BGZF-compressed chainfiles.
+//!
+//! Compression is detected from a file's leading bytes, so compressed chainfiles can
+//! be read wherever a text chainfile is accepted. BGZF files (blocked gzip, as
+//! written by ``bgzip``) are split into their independent blocks, which are
+//! decompressed on all available cores. Other gzip files are decompressed as a
+//! stream.
+//!
+//! For reading parts of a chainfile, BGZF blocks can be indexed from their headers
+//! alone, so that a range of the decompressed text is read by decompressing only the
+//! blocks that hold it. Other gzip files can only be read from the start.
+use flate2::read::{DeflateDecoder, MultiGzDecoder};
+use flate2::Crc;
+use std::borrow::Cow;
+use std::fs::File;
+use std::io::{self, BufRead, BufReader, Cursor, Read, Seek, SeekFrom};
+use std::num::NonZeroUsize;
+use std::ops::Range;
+use std::path::Path;
+use std::thread;
+
+const GZIP_MAGIC: [u8; 2] = [0x1f, 0x8b];
+/// Length of a BGZF block header: the gzip header plus a single ``BC`` subfield
+const BGZF_HEADER_LEN: usize = 18;
+/// Length of a gzip member trailer (CRC32 and uncompressed size)
+const GZIP_TRAILER_LEN: usize = 8;
+/// Fewest BGZF blocks worth handing to a thread of their own
+const MIN_BLOCKS_PER_THREAD: usize = 16;
+
+/// Whether bytes start with the gzip magic number
+pub fn is_gzip(bytes: &[u8]) -> bool {
+    bytes.starts_with(&GZIP_MAGIC)
+}
+
+/// Whether a file is gzip-compressed
+pub fn is_gzip_file(path: &Path) -> io::Result<bool> {
+    let mut magic = Vec::with_capacity(GZIP_MAGIC.len());
+    File::open(path)?
+        .take(GZIP_MAGIC.len() as u64)
+        .read_to_end(&mut magic)?;
+    Ok(is_gzip(&magic))
+}
+
+/// Open a chainfile for reading, decompressing it if it's gzipped.
+///
+/// BGZF files are read and decompressed up front, in parallel. Other gzip files are
+/// decompressed as they're read.
+pub fn open(path: &Path) -> io::Result<Box<dyn BufRead + Send>> {
+    let mut file = File::open(path)?;
+    let mut header = Vec::with_capacity(BGZF_HEADER_LEN);
+    (&mut file)
+        .take(BGZF_HEADER_LEN as u64)
+        .read_to_end(&mut header)?;
+    file.rewind()?;
+    if !is_gzip(&header) {
+        return Ok(Box::new(BufReader::new(file)));
+    }
+    if bgzf_block_len(&header).is_some() {
+        let mut data = Vec::new();
+        file.read_to_end(&mut data)?;
+        return Ok(Box::new(Cursor::new(decompress(&data)?.into_owned())));
+    }
+    Ok(Box::new(BufReader::new(MultiGzDecoder::new(
+        BufReader::new(file),
+    ))))
+}
+
+/// Count the lines ended in a run of text
+pub fn count_lines(text: &[u8]) -> usize {
+    text.iter().filter(|&&byte| byte == b'\n').count()
+}
+
+/// Reader that counts the lines read through it, e.g. to size the chain data parsed
+/// out of a chainfile
+pub struct LineCounter<R> {
+    inner: R,
+    lines: usize,
+}
+
+impl<R> LineCounter<R> {
+    pub fn new(inner: R) -> LineCounter<R> {
+        LineCounter { inner, lines: 0 }
+    }
+
+    /// Get the number of lines read so far
+    pub fn line_count(&self) -> usize {
+        self.lines
+    }
+}
+
+impl<R: Read> Read for LineCounter<R> {
+    fn read(&mut self, buf: &mut [u8]) -> io::Result<usize> {
+        let n = self.inner.read(buf)?;
+        self.lines += count_lines(&buf[..n]);
+        Ok(n)
+    }
+}
+
+impl<R: BufRead> BufRead for LineCounter<R> {
+    fn fill_buf(&mut self) -> io::Result<&[u8]> {
+        self.inner.fill_buf()
+    }
+
+    fn consume(&mut self, amt: usize) {
+        // the buffer is already filled, so this doesn't read anything
+        if let Ok(buf) = self.inner.fill_buf() {
+            self.lines += count_lines(&buf[..amt.min(buf.len())]);
+        }
+        self.inner.consume(amt);
+    }
+}
+
+/// Decompress chainfile contents if they're gzipped, or borrow them as-is if not
+pub fn decompress(data: &[u8]) -> io::Result<Cow<'_, [u8]>> {
+    if !is_gzip(data) {
+        return Ok(Cow::Borrowed(data));
+    }
+    if let Some(blocks) = bgzf_blocks(data) {
+        return decompress_bgzf(data, &blocks).map(Cow::Owned);
+    }
+    let mut decompressed = Vec::new();
+    MultiGzDecoder::new(data).read_to_end(&mut decompressed)?;
+    Ok(Cow::Owned(decompressed))
+}
+
+/// Get the total length of a BGZF block from its header, or None if the header
+/// isn't a BGZF block header
+fn bgzf_block_len(header: &[u8]) -> Option<usize> {
+    // deflate compression, with extra fields consisting of just the BC subfield
+    if header.len() < BGZF_HEADER_LEN
+        || !is_gzip(header)
+        || header[2] != 8
+        || header[3] & 4 == 0
+        || header[10..16] != [6, 0, b'B', b'C', 2, 0]
+    {
+        return None;
+    }
+    Some(usize::from(u16::from_le_bytes([header[16], header[17]])) + 1)
+}
+
+/// Split BGZF data into its blocks, or None if it isn't entirely made of BGZF blocks
+fn bgzf_blocks(data: &[u8]) -> Option<Vec<Range<usize>>> {
+    let mut blocks = Vec::new();
+    let mut offset = 0;
+    while offset < data.len() {
+        let len = bgzf_block_len(&data[offset..])?;
+        if len < BGZF_HEADER_LEN + GZIP_TRAILER_LEN || offset + len > data.len() {
+            return None;
+        }
+        blocks.push(offset..offset + len);
+        offset += len;
+    }
+    Some(blocks)
+}
+
+/// Decompress BGZF blocks, splitting them between threads
+fn decompress_bgzf(data: &[u8], blocks: &[Range<usize>]) -> io::Result<Vec<u8>> {
+    let threads = thread::available_parallelism()
+        .map_or(1, NonZeroUsize::get)
+        .min(blocks.len() / MIN_BLOCKS_PER_THREAD)
+        .max(1);
+    let chunk_len = blocks.len().div_ceil(threads).max(1);
+    let parts: Vec<io::Result<Vec<u8>>> = thread::scope(|scope| {
+        let handles: Vec<_> = blocks
+            .chunks(chunk_len)
+            .map(|chunk| scope.spawn(move || inflate_blocks(data, chunk)))
+            .collect();
+        handles
+            .into_iter()
+            .map(|handle| {
+                handle
+                    .join()
+                    .unwrap_or_else(|_| Err(io::Error::other("BGZF decompression failed")))
+            })
+            .collect()
+    });
+    let mut decompressed = Vec::new();
+    for part in parts {
+        let part = part?;
+        if decompressed.is_empty() {
+            decompressed = part;
+        } else {
+            decompressed.extend_from_slice(&part);
+        }
+    }
+    Ok(decompressed)
+}
+
+/// Location of a BGZF block, in the compressed file and in the decompressed text
+pub struct BgzfBlock {
+    offset: u64,
+    len: usize,
+    text_start: u64,
+    text_len: u64,
+}
+
+/// Index the blocks of a BGZF file from their headers and trailers, without
+/// decompressing them. Returns None if the file isn't entirely made of BGZF blocks.
+pub fn bgzf_index(path: &Path) -> io::Result<Option<Vec<BgzfBlock>>> {
+    let mut file = File::open(path)?;
+    let file_len = file.metadata()?.len();
+    let mut blocks = Vec::new();
+    let mut offset = 0u64;
+    let mut text_start = 0u64;
+    let mut header = [0u8; BGZF_HEADER_LEN];
+    let mut text_len = [0u8; 4];
+    while offset < file_len {
+        if file_len - offset < (BGZF_HEADER_LEN + GZIP_TRAILER_LEN) as u64 {
+            return Ok(None);
+        }
+        file.seek(SeekFrom::Start(offset))?;
+        file.read_exact(&mut header)?;
+        let Some(len) = bgzf_block_len(&header) else {
+            return Ok(None);
+        };
+        if len < BGZF_HEADER_LEN + GZIP_TRAILER_LEN || offset + len as u64 > file_len {
+            return Ok(None);
+        }
+        // the last 4 bytes of the trailer are the block's uncompressed length
+        file.seek(SeekFrom::Start(offset + len as u64 - 4))?;
+        file.read_exact(&mut text_len)?;
+        let text_len = u64::from(u32::from_le_bytes(text_len));
+        blocks.push(BgzfBlock {
+            offset,
+            len,
+            text_start,
+            text_len,
+        });
+        offset += len as u64;
+        text_start += text_len;
+    }
+    Ok(Some(blocks))
+}
+
+/// Read a range of a BGZF file's decompressed text, decompressing only the blocks
+/// that overlap it
+pub fn read_bgzf_range(
+    file: &mut File,
+    blocks: &[BgzfBlock],
+    range: Range<u64>,
+) -> io::Result<Vec<u8>> {
+    let first = blocks.partition_point(|block| block.text_start + block.text_len <= range.start);
+    let end = blocks.partition_point(|block| block.text_start < range.end);
+    if first >= end {
+        return Ok(Vec::new());
+    }
+    let span = &blocks[first..end];
+    let start = span[0].offset;
+    let last = &span[span.len() - 1];
+    let mut data = vec![0; (last.offset + last.len as u64 - start) as usize];
+    file.seek(SeekFrom::Start(start))?;
+    file.read_exact(&mut data)?;
+    let block_ranges: Vec<Range<usize>> = span
+        .iter()
+        .map(|block| {
+            let block_start = (block.offset - start) as usize;
+            block_start..block_start + block.len
+        })
+        .collect();
+    let mut text = inflate_blocks(&data, &block_ranges)?;
+    let skip = (range.start.max(span[0].text_start) - span[0].text_start) as usize;
+    text.truncate(skip + (range.end - range.start) as usize);
+    text.drain(..skip.min(text.len()));
+    Ok(text)
+}
+
+/// Decompress a run of BGZF blocks, checking each one's CRC and length
+fn inflate_blocks(data: &[u8], blocks: &[Range<usize>]) -> io::Result<Vec<u8>> {
+    let mut decompressed = Vec::new();
+    for block in blocks {
+        let block = &data[block.clone()];
+        let (payload, trailer) =
+            block[BGZF_HEADER_LEN..].split_at(block.len() - BGZF_HEADER_LEN - GZIP_TRAILER_LEN);
+        let crc = u32::from_le_bytes([trailer[0], trailer[1], trailer[2], trailer[3]]);
+        let len = u32::from_le_bytes([trailer[4], trailer[5], trailer[6], trailer[7]]) as usize;
+        let start = decompressed.len();
+        decompressed.reserve(len);
+        DeflateDecoder::new(payload).read_to_end(&mut decompressed)?;
+        let mut actual = Crc::new();
+        actual.update(&decompressed[start..]);
+        if actual.sum() != crc || decompressed.len() - start != len {
+            return Err(io::Error::new(
+                io::ErrorKind::InvalidData,
+                "BGZF block is corrupt (CRC or length mismatch)",
+            ));
+        }
+    }
+    Ok(decompressed)
+}
@@ -0,0 +1,1039 @@
+//! Compact binary index of chain alignment blocks.
+//!
+//! The index stores every ungapped alignment block from a chainfile in flat,
+//! fixed-width little-endian tables, sorted by reference contig and position. Lookups
+//! read directly out of those tables, so a compiled index can be memory-mapped and
+//! queried without any parsing step, and its pages are shared between every process
+//! on a host that opens the same file.
+//!
+//! Layout (all offsets derived from the header counts):
+//!
+//! * header (64 bytes): magic, format version, source chainfile length, mtime and
+//!   hash, and the number of contigs, chains, and blocks
+//! * contigs (32 bytes each): name offset and length, longest block, and the range
+//!   of blocks that lie on the contig
+//! * chains (48 bytes each): score, reference and query sizes, chain ID, reference
+//!   and query contig IDs, query strand
+//! * blocks (16 bytes each): reference start, query start, size, chain index
+//! * names: concatenated UTF-8 contig names
+use crate::compression;
+use memmap2::Mmap;
+use std::collections::HashMap;
+use std::fmt;
+use std::fs::{self, File};
+use std::io::{self, BufRead, Write};
+use std::ops::Range;
+use std::path::Path;
+use std::time::UNIX_EPOCH;
+
+const MAGIC: &[u8; 8] = b"AGCTIDX\0";
+const VERSION: u32 = 1;
+const HEADER_LEN: usize = 64;
+const CONTIG_LEN: usize = 32;
+const CHAIN_LEN: usize = 48;
+const BLOCK_LEN: usize = 16;
+
+const FNV_OFFSET: u64 = 0xcbf2_9ce4_8422_2325;
+const FNV_PRIME: u64 = 0x0100_0000_01b3;
+
+/// Errors raised while parsing a chainfile or reading an index
+#[derive(Debug)]
+pub enum IndexError {
+    Io(io::Error),
+    Parse { line: usize, message: String },
+    Format(String),
+}
+
+impl fmt::Display for IndexError {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        match self {
+            IndexError::Io(e) => write!(f, "{}", e),
+            IndexError::Parse { line, message } => write!(f, "line {}: {}", line, message),
+            IndexError::Format(message) => write!(f, "{}", message),
+        }
+    }
+}
+
+impl From<io::Error> for IndexError {
+    fn from(e: io::Error) -> Self {
+        IndexError::Io(e)
+    }
+}
+
+/// Describe the chainfile that an index was compiled from
+#[derive(Clone, Copy, Debug, Default, PartialEq, Eq)]
+pub struct SourceInfo {
+    pub len: u64,
+    pub mtime_ns: u64,
+    pub hash: u64,
+}
+
+impl SourceInfo {
+    /// Read length and modification time of a file on disk. The hash is left empty.
+    pub fn from_path(path: &Path) -> io::Result<SourceInfo> {
+        let metadata = fs::metadata(path)?;
+        let mtime_ns = metadata
+            .modified()
+            .ok()
+            .and_then(|mtime| mtime.duration_since(UNIX_EPOCH).ok())
+            .map_or(0, |duration| duration.as_nanos() as u64);
+        Ok(SourceInfo {
+            len: metadata.len(),
+            mtime_ns,
+            hash: 0,
+        })
+    }
+}
+
+/// A single chain header. Alignment blocks are stored separately.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub struct ChainRecord {
+    pub score: u64,
+    pub reference_size: u64,
+    pub query_size: u64,
+    pub id: u64,
+    pub reference: u32,
+    pub query: u32,
+    pub query_positive: bool,
+}
+
+/// An ungapped alignment block. ``query_start`` is given in the coordinates of the
+/// chain's query strand, as in the chainfile itself.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub struct Block {
+    pub reference_start: u32,
+    pub query_start: u32,
+    pub size: u32,
+    pub chain: u32,
+}
+
+impl Block {
+    pub fn reference_end(&self) -> u32 {
+        self.reference_start + self.size
+    }
+}
+
+/// A lifted segment. ``start`` and ``end`` are inter-residue positions on the forward
+/// strand of the query contig, ordered according to ``positive`` as in the omics
+/// crate (i.e. ``start > end`` on the negative strand).
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub struct LiftedSegment {
+    pub chain: u32,
+    pub contig: u32,
+    pub start: u64,
+    pub end: u64,
+    pub positive: bool,
+    pub score: u64,
+}
+
+/// A single base lifted through the block containing it. ``position`` is the 0-based
+/// index of the base on the forward strand of the query contig, and ``positive`` is
+/// whether the chain aligns the reference to the query's forward strand.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub struct LiftedPosition {
+    pub contig: u32,
+    pub position: u64,
+    pub positive: bool,
+    pub score: u64,
+}
+
+/// Owned, parsed chain data, with blocks kept in chainfile order
+#[derive(Clone, Debug, Default)]
+pub struct ChainData {
+    pub contigs: Vec<String>,
+    pub chains: Vec<ChainRecord>,
+    pub blocks: Vec<Block>,
+}
+
+/// Fold bytes into a running FNV-1a hash
+fn fnv1a(mut hash: u64, bytes: &[u8]) -> u64 {
+    for byte in bytes {
+        hash ^= u64::from(*byte);
+        hash = hash.wrapping_mul(FNV_PRIME);
+    }
+    hash
+}
+
+/// Parse a numeric chainfile field
+fn parse_field<T: std::str::FromStr>(
+    value: Option<&str>,
+    name: &str,
+    line: usize,
+) -> Result<T, IndexError> {
+    value
+        .and_then(|v| v.parse::<T>().ok())
+        .ok_or_else(|| IndexError::Parse {
+            line,
+            message: format!("missing or invalid {}", name),
+        })
+}
+
+/// Track state of the chain currently being parsed
+struct OpenChain {
+    reference_position: u64,
+    query_position: u64,
+    reference_end: u64,
+    query_end: u64,
+    complete: bool,
+}
+
+impl ChainData {
+    /// Parse a chainfile, returning its contents and a hash of the raw bytes
+    pub fn parse<R: BufRead>(mut reader: R) -> Result<(ChainData, u64), IndexError> {
+        let mut data = ChainData::default();
+        let mut contig_ids: HashMap<String, u32> = HashMap::new();
+        let mut hash = FNV_OFFSET;
+        let mut buffer = Vec::new();
+        let mut current: Option<OpenChain> = None;
+        let mut line_number = 0;
+        loop {
+            buffer.clear();
+            if reader.read_until(b'\n', &mut buffer)? == 0 {
+                break;
+            }
+            line_number += 1;
+            hash = fnv1a(hash, &buffer);
+            let line = std::str::from_utf8(&buffer).map_err(|_| IndexError::Parse {
+                line: line_number,
+                message: "invalid UTF-8".to_string(),
+            })?;
+            let mut fields = line.split_ascii_whitespace();
+            let Some(first) = fields.next() else {
+                continue;
+            };
+            if first == "chain" {
+                if let Some(chain) = &current {
+                    data.check_complete(chain, line_number)?;
+                }
+                let (record, chain) = data.parse_header(fields, &mut contig_ids, line_number)?;
+                data.chains.push(record);
+                current = Some(chain);
+                continue;
+            }
+            let Some(chain) = current.as_mut() else {
+                return Err(IndexError::Parse {
+                    line: line_number,
+                    message: "alignment data found before chain header".to_string(),
+                });
+            };
+            if chain.complete {
+                return Err(IndexError::Parse {
+                    line: line_number,
+                    message: "alignment data found after final block of chain".to_string(),
+                });
+            }
+            let size: u32 = parse_field(Some(first), "block size", line_number)?;
+            let gaps = match (fields.next(), fields.next()) {
+                (None, None) => None,
+                (reference_gap, query_gap) => Some((
+                    parse_field::<u64>(reference_gap, "reference gap", line_number)?,
+                    parse_field::<u64>(query_gap, "query gap", line_number)?,
+                )),
+            };
+            let (Ok(reference_start), Ok(query_start)) = (
+                u32::try_from(chain.reference_position),
+                u32::try_from(chain.query_position),
+            ) else {
+                return Err(IndexError::Parse {
+                    line: line_number,
+                    message: "position exceeds 32 bit unsigned int".to_string(),
+                });
+            };
+            data.blocks.push(Block {
+                reference_start,
+                query_start,
+                size,
+                chain: (data.chains.len() - 1) as u32,
+            });
+            chain.reference_position += u64::from(size);
+            chain.query_position += u64::from(size);
+            match gaps {
+                Some((reference_gap, query_gap)) => {
+                    chain.reference_position += reference_gap;
+                    chain.query_position += query_gap;
+                }
+                None => chain.complete = true,
+            }
+        }
+        match &current {
+            Some(chain) => data.check_complete(chain, line_number)?,
+            None => {
+                return Err(IndexError::Parse {
+                    line: line_number,
+                    message: "no chains found".to_string(),
+                })
+            }
+        }
+        Ok((data, hash))
+    }
+
+    /// Parse the fields of a chain header line that follow ``chain``
+    fn parse_header<'a>(
+        &mut self,
+        mut fields: impl Iterator<Item = &'a str>,
+        contig_ids: &mut HashMap<String, u32>,
+        line: usize,
+    ) -> Result<(ChainRecord, OpenChain), IndexError> {
+        let score: u64 = parse_field(fields.next(), "score", line)?;
+        let reference_name = fields.next().ok_or_else(|| IndexError::Parse {
+            line,
+            message: "missing reference name".to_string(),
+        })?;
+        let reference_size: u64 = parse_field(fields.next(), "reference size", line)?;
+        if fields.next() != Some("+") {
+            return Err(IndexError::Parse {
+                line,
+                message: "reference strand must be \"+\"".to_string(),
+            });
+        }
+        let reference_start: u64 = parse_field(fields.next(), "reference start", line)?;
+        let reference_end: u64 = parse_field(fields.next(), "reference end", line)?;
+        let query_name = fields.next().ok_or_else(|| IndexError::Parse {
+            line,
+            message: "missing query name".to_string(),
+        })?;
+        let query_size: u64 = parse_field(fields.next(), "query size", line)?;
+        let query_positive = match fields.next() {
+            Some("+") => true,
+            Some("-") => false,
+            _ => {
+                return Err(IndexError::Parse {
+                    line,
+                    message: "query strand must be \"+\" or \"-\"".to_string(),
+                })
+            }
+        };
+        let query_start: u64 = parse_field(fields.next(), "query start", line)?;
+        let query_end: u64 = parse_field(fields.next(), "query end", line)?;
+        let id: u64 = parse_field(fields.next(), "chain ID", line)?;
+        if reference_start > reference_end
+            || reference_end > reference_size
+            || query_start > query_end
+            || query_end > query_size
+            || reference_end > u64::from(u32::MAX)
+            || query_end > u64::from(u32::MAX)
+        {
+            return Err(IndexError::Parse {
+                line,
+                message: "chain bounds are inconsistent with sequence sizes".to_string(),
+            });
+        }
+        let record = ChainRecord {
+            score,
+            reference_size,
+            query_size,
+            id,
+            reference: self.intern(reference_name, contig_ids),
+            query: self.intern(query_name, contig_ids),
+            query_positive,
+        };
+        let chain = OpenChain {
+            reference_position: reference_start,
+            query_position: query_start,
+            reference_end,
+            query_end,
+            complete: false,
+        };
+        Ok((record, chain))
+    }
+
+    /// Ensure that a finished chain's blocks add up to the bounds in its header
+    fn check_complete(&self, chain: &OpenChain, line: usize) -> Result<(), IndexError> {
+        if !chain.complete
+            || chain.reference_position != chain.reference_end
+            || chain.query_position != chain.query_end
+        {
+            return Err(IndexError::Parse {
+                line,
+                message: "chain alignment data doesn't match chain header".to_string(),
+            });
+        }
+        Ok(())
+    }
+
+    /// Get the ID for a contig name, adding it if necessary
+    fn intern(&mut self, name: &str, contig_ids: &mut HashMap<String, u32>) -> u32 {
+        if let Some(id) = contig_ids.get(name) {
+            return *id;
+        }
+        let id = self.contigs.len() as u32;
+        self.contigs.push(name.to_string());
+        contig_ids.insert(name.to_string(), id);
+        id
+    }
+
+    /// Serialize into the binary index layout
+    pub fn to_index_bytes(&self, source: SourceInfo) -> Vec<u8> {
+        let mut order: Vec<usize> = (0..self.blocks.len()).collect();
+        order.sort_by_key(|i| {
+            let block = &self.blocks[*i];
+            (
+                self.chains[block.chain as usize].reference,
+                block.reference_start,
+            )
+        });
+
+        let mut contig_ranges = vec![(0u64, 0u64, 0u32); self.contigs.len()];
+        for (position, i) in order.iter().enumerate() {
+            let block = &self.blocks[*i];
+            let contig = self.chains[block.chain as usize].reference as usize;
+            let (start, end, max_len) = &mut contig_ranges[contig];
+            if *end == 0 {
+                *start = position as u64;
+            }
+            *end = position as u64 + 1;
+            *max_len = (*max_len).max(block.size);
+        }
+
+        let names_len: usize = self.contigs.iter().map(String::len).sum();
+        let mut bytes = Vec::with_capacity(
+            HEADER_LEN
+                + self.contigs.len() * CONTIG_LEN
+                + self.chains.len() * CHAIN_LEN
+                + self.blocks.len() * BLOCK_LEN
+                + names_len,
+        );
+        bytes.extend_from_slice(MAGIC);
+        bytes.extend_from_slice(&VERSION.to_le_bytes());
+        bytes.extend_from_slice(&0u32.to_le_bytes());
+        for value in [
+            source.len,
+            source.mtime_ns,
+            source.hash,
+            self.contigs.len() as u64,
+            self.chains.len() as u64,
+            self.blocks.len() as u64,
+        ] {
+            bytes.extend_from_slice(&value.to_le_bytes());
+        }
+
+        let mut name_offset = 0u64;
+        for (name, (start, end, max_len)) in self.contigs.iter().zip(contig_ranges) {
+            bytes.extend_from_slice(&name_offset.to_le_bytes());
+            bytes.extend_from_slice(&(name.len() as u32).to_le_bytes());
+            bytes.extend_from_slice(&max_len.to_le_bytes());
+            bytes.extend_from_slice(&start.to_le_bytes());
+            bytes.extend_from_slice(&end.to_le_bytes());
+            name_offset += name.len() as u64;
+        }
+        for chain in &self.chains {
+            for value in [
+                chain.score,
+                chain.reference_size,
+                chain.query_size,
+                chain.id,
+            ] {
+                bytes.extend_from_slice(&value.to_le_bytes());
+            }
+            bytes.extend_from_slice(&chain.reference.to_le_bytes());
+            bytes.extend_from_slice(&chain.query.to_le_bytes());
+            bytes.push(u8::from(chain.query_positive));
+            bytes.extend_from_slice(&[0u8; 7]);
+        }
+        for i in order {
+            let block = &self.blocks[i];
+            for value in [
+                block.reference_start,
+                block.query_start,
+                block.size,
+                block.chain,
+            ] {
+                bytes.extend_from_slice(&value.to_le_bytes());
+            }
+        }
+        for name in &self.contigs {
+            bytes.extend_from_slice(name.as_bytes());
+        }
+        bytes
+    }
+}
+
+/// Read a little-endian u32 at the given offset
+fn read_u32(bytes: &[u8], offset: usize) -> u32 {
+    u32::from_le_bytes(bytes[offset..offset + 4].try_into().unwrap())
+}
+
+/// Read a little-endian u64 at the given offset
+fn read_u64(bytes: &[u8], offset: usize) -> u64 {
+    u64::from_le_bytes(bytes[offset..offset + 8].try_into().unwrap())
+}
+
+/// Backing bytes of an index
+enum Storage {
+    Owned(Vec<u8>),
+    Mapped(Mmap),
+}
+
+impl Storage {
+    fn bytes(&self) -> &[u8] {
+        match self {
+            Storage::Owned(bytes) => bytes,
+            Storage::Mapped(mmap) => mmap,
+        }
+    }
+}
+
+/// Read-only view over a binary chain index, either memory-mapped from disk or held
+/// in memory
+pub struct ChainIndex {
+    storage: Storage,
+    contig_ids: HashMap<String, u32>,
+    source: SourceInfo,
+    contigs_offset: usize,
+    chains_offset: usize,
+    blocks_offset: usize,
+    names_offset: usize,
+}
+
+impl ChainIndex {
+    /// Compile a chainfile into a binary index on disk.
+    ///
+    /// The index is written to a temporary file and then moved into place, so that
+    /// concurrent readers never see a partially-written index.
+    pub fn compile(chainfile_path: &Path, index_path: &Path) -> Result<(), IndexError> {
+        let bytes = ChainIndex::compile_bytes(chainfile_path)?;
+        let mut tmp_path = index_path.as_os_str().to_owned();
+        tmp_path.push(format!(".{}.tmp", std::process::id()));
+        let tmp_path = Path::new(&tmp_path);
+        let mut file = File::create(tmp_path)?;
+        file.write_all(&bytes)?;
+        file.sync_all()?;
+        fs::rename(tmp_path, index_path)?;
+        Ok(())
+    }
+
+    /// Compile a chainfile into an index held in memory
+    pub fn build(chainfile_path: &Path) -> Result<ChainIndex, IndexError> {
+        ChainIndex::from_bytes(ChainIndex::compile_bytes(chainfile_path)?)
+    }
+
+    /// Parse a chainfile and lay it out as index bytes
+    fn compile_bytes(chainfile_path: &Path) -> Result<Vec<u8>, IndexError> {
+        let mut source = SourceInfo::from_path(chainfile_path)?;
+        let reader = compression::open(chainfile_path)?;
+        let (data, hash) = ChainData::parse(reader)?;
+        source.hash = hash;
+        Ok(data.to_index_bytes(source))
+    }
+
+    /// Memory-map a compiled index
+    pub fn open(index_path: &Path) -> Result<ChainIndex, IndexError> {
+        let file = File::open(index_path)?;
+        // Safety: the index is never modified in place (``compile`` atomically replaces
+        // it), so the mapped bytes can't change underneath us.
+        let mmap = unsafe { Mmap::map(&file)? };
+        ChainIndex::from_storage(Storage::Mapped(mmap))
+    }
+
+    /// Load an index from bytes held in memory
+    pub fn from_bytes(bytes: Vec<u8>) -> Result<ChainIndex, IndexError> {
+        ChainIndex::from_storage(Storage::Owned(bytes))
+    }
+
+    /// Validate index bytes and build the contig name lookup
+    fn from_storage(storage: Storage) -> Result<ChainIndex, IndexError> {
+        let bytes = storage.bytes();
+        if bytes.len() < HEADER_LEN || &bytes[..8] != MAGIC {
+            return Err(IndexError::Format(
+                "File is not an agct chainfile index".to_string(),
+            ));
+        }
+        let version = read_u32(bytes, 8);
+        if version != VERSION {
+            return Err(IndexError::Format(format!(
+                "Unsupported chainfile index version {} (expected {})",
+                version, VERSION
+            )));
+        }
+        let source = SourceInfo {
+            len: read_u64(bytes, 16),
+            mtime_ns: read_u64(bytes, 24),
+            hash: read_u64(bytes, 32),
+        };
+        let n_contigs = read_u64(bytes, 40);
+        let n_chains = read_u64(bytes, 48);
+        let n_blocks = read_u64(bytes, 56);
+        // the counts come straight from the file, so a corrupt header can't be allowed
+        // to overflow the offsets derived from them
+        let table_end = |offset: usize, count: u64, len: usize| {
+            usize::try_from(count)
+                .ok()
+                .and_then(|count| count.checked_mul(len))
+                .and_then(|size| offset.checked_add(size))
+                .filter(|&end| end <= bytes.len())
+                .ok_or_else(|| IndexError::Format("Chainfile index is truncated".to_string()))
+        };
+        let contigs_offset = HEADER_LEN;
+        let chains_offset = table_end(contigs_offset, n_contigs, CONTIG_LEN)?;
+        let blocks_offset = table_end(chains_offset, n_chains, CHAIN_LEN)?;
+        let names_offset = table_end(blocks_offset, n_blocks, BLOCK_LEN)?;
+        if n_contigs > u64::from(u32::MAX) || n_chains > u64::from(u32::MAX) {
+            return Err(IndexError::Format(
+                "Chainfile index has too many records".to_string(),
+            ));
+        }
+        let mut index = ChainIndex {
+            storage,
+            contig_ids: HashMap::new(),
+            source,
+            contigs_offset,
+            chains_offset,
+            blocks_offset,
+            names_offset,
+        };
+        index.contig_ids = index.validate(n_contigs as u32)?;
+        Ok(index)
+    }
+
+    /// Check that every record refers only to records and bytes that exist, so that
+    /// lookups can't read out of bounds, and build the contig name lookup.
+    ///
+    /// This reads the whole index once, sequentially, so opening an index costs time
+    /// linear in its size, although no parsing or allocation per block is needed.
+    fn validate(&self, n_contigs: u32) -> Result<HashMap<String, u32>, IndexError> {
+        let invalid = |what: &str| IndexError::Format(format!("Chainfile index has {}", what));
+        let bytes = self.storage.bytes();
+        let names = &bytes[self.names_offset..];
+        let mut contig_ids = HashMap::with_capacity(n_contigs as usize);
+        for id in 0..n_contigs {
+            let offset = self.contigs_offset + id as usize * CONTIG_LEN;
+            let name = usize::try_from(read_u64(bytes, offset))
+                .ok()
+                .and_then(|start| {
+                    Some(start..start.checked_add(read_u32(bytes, offset + 8) as usize)?)
+                })
+                .and_then(|range| names.get(range))
+                .and_then(|name| std::str::from_utf8(name).ok())
+                .ok_or_else(|| invalid("an invalid contig name"))?;
+            if contig_ids.insert(name.to_string(), id).is_some() {
+                return Err(invalid("a duplicate contig name"));
+            }
+        }
+        for i in 0..self.chain_count() as u32 {
+            let chain = self.chain(i);
+            if chain.reference >= n_contigs || chain.query >= n_contigs {
+                return Err(invalid("a chain on an unknown contig"));
+            }
+        }
+        for i in 0..self.block_count() {
+            let block = self.block(i);
+            if block.chain as usize >= self.chain_count() {
+                return Err(invalid("a block of an unknown chain"));
+            }
+            let chain = self.chain(block.chain);
+            let reference_end = u64::from(block.reference_start) + u64::from(block.size);
+            let query_end = u64::from(block.query_start) + u64::from(block.size);
+            if reference_end > chain.reference_size.min(u64::from(u32::MAX))
+                || query_end > chain.query_size.min(u64::from(u32::MAX))
+            {
+                return Err(invalid("a block outside its chain"));
+            }
+        }
+        for id in 0..n_contigs {
+            let offset = self.contigs_offset + id as usize * CONTIG_LEN;
+            let (start, end) = (read_u64(bytes, offset + 16), read_u64(bytes, offset + 24));
+            if start > end || end > self.block_count() as u64 {
+                return Err(invalid("an invalid block range"));
+            }
+            let (range, max_len) = self.contig_blocks(id);
+            let mut previous = 0;
+            for i in range {
+                let block = self.block(i);
+                if self.chain(block.chain).reference != id
+                    || block.reference_start < previous
+                    || block.size > max_len
+                {
+                    return Err(invalid("blocks out of order"));
+                }
+                previous = block.reference_start;
+            }
+        }
+        Ok(contig_ids)
+    }
+
+    /// Get the chainfile this index was compiled from
+    pub fn source(&self) -> SourceInfo {
+        self.source
+    }
+
+    /// Get the ID of a contig by name
+    pub fn contig_id(&self, name: &str) -> Option<u32> {
+        self.contig_ids.get(name).copied()
+    }
+
+    /// Get the name of a contig by ID
+    pub fn contig_name(&self, id: u32) -> &str {
+        let bytes = self.storage.bytes();
+        let offset = self.contigs_offset + id as usize * CONTIG_LEN;
+        let start = self.names_offset + read_u64(bytes, offset) as usize;
+        let end = start + read_u32(bytes, offset + 8) as usize;
+        // Safety of unwrap: names are validated when the index is loaded
+        std::str::from_utf8(&bytes[start..end]).unwrap()
+    }
+
+    /// Get the size of the index's tables, in bytes
+    pub fn byte_len(&self) -> usize {
+        self.storage.bytes().len()
+    }
+
+    /// Get the number of contigs
+    pub fn contig_count(&self) -> usize {
+        self.contig_ids.len()
+    }
+
+    /// Get the number of chains
+    pub fn chain_count(&self) -> usize {
+        (self.blocks_offset - self.chains_offset) / CHAIN_LEN
+    }
+
+    /// Get the number of blocks
+    pub fn block_count(&self) -> usize {
+        (self.names_offset - self.blocks_offset) / BLOCK_LEN
+    }
+
+    /// Build an in-memory index of the inverse mapping, from the query assembly back
+    /// to the reference assembly, by swapping the two sides of every chain.
+    ///
+    /// A chain aligned to the negative query strand stays on the negative strand: its
+    /// blocks are laid out forward along the old query, and their new query
+    /// positions are counted from the end of the old reference.
+    pub fn inverse(&self) -> ChainIndex {
+        let contigs = (0..self.contig_count() as u32)
+            .map(|id| self.contig_name(id).to_string())
+            .collect();
+        let chains: Vec<ChainRecord> = (0..self.chain_count() as u32)
+            .map(|i| {
+                let chain = self.chain(i);
+                ChainRecord {
+                    reference_size: chain.query_size,
+                    query_size: chain.reference_size,
+                    reference: chain.query,
+                    query: chain.reference,
+                    ..chain
+                }
+            })
+            .collect();
+        let blocks = (0..self.block_count())
+            .map(|i| {
+                let block = self.block(i);
+                let chain = &chains[block.chain as usize];
+                if chain.query_positive {
+                    Block {
+                        reference_start: block.query_start,
+                        query_start: block.reference_start,
+                        ..block
+                    }
+                } else {
+                    let size = u64::from(block.size);
+                    Block {
+                        reference_start: (chain.reference_size
+                            - u64::from(block.query_start)
+                            - size) as u32,
+                        query_start: (chain.query_size - u64::from(block.reference_start) - size)
+                            as u32,
+                        ..block
+                    }
+                }
+            })
+            .collect();
+        let data = ChainData {
+            contigs,
+            chains,
+            blocks,
+        };
+        // Safety of unwrap: the bytes are laid out by ``to_index_bytes`` itself
+        ChainIndex::from_bytes(data.to_index_bytes(self.source)).unwrap()
+    }
+
+    /// Get the range of block indices on a reference contig, and the length of the
+    /// longest of those blocks
+    pub fn contig_blocks(&self, id: u32) -> (Range<usize>, u32) {
+        let bytes = self.storage.bytes();
+        let offset = self.contigs_offset + id as usize * CONTIG_LEN;
+        let start = read_u64(bytes, offset + 16) as usize;
+        let end = read_u64(bytes, offset + 24) as usize;
+        (start..end, read_u32(bytes, offset + 12))
+    }
+
+    /// Get a chain header by index
+    pub fn chain(&self, i: u32) -> ChainRecord {
+        let bytes = self.storage.bytes();
+        let offset = self.chains_offset + i as usize * CHAIN_LEN;
+        ChainRecord {
+            score: read_u64(bytes, offset),
+            reference_size: read_u64(bytes, offset + 8),
+            query_size: read_u64(bytes, offset + 16),
+            id: read_u64(bytes, offset + 24),
+            reference: read_u32(bytes, offset + 32),
+            query: read_u32(bytes, offset + 36),
+            query_positive: bytes[offset + 40] != 0,
+        }
+    }
+
+    /// Get a block by its position in reference order
+    pub fn block(&self, i: usize) -> Block {
+        let bytes = self.storage.bytes();
+        let offset = self.blocks_offset + i * BLOCK_LEN;
+        Block {
+            reference_start: read_u32(bytes, offset),
+            query_start: read_u32(bytes, offset + 4),
+            size: read_u32(bytes, offset + 8),
+            chain: read_u32(bytes, offset + 12),
+        }
+    }
+
+    /// Lift the base at a 0-based position on a reference contig through the block
+    /// containing it. If blocks of more than one chain contain the base, the
+    /// highest-scoring chain is used (the first in chainfile order, on a tie).
+    ///
+    /// Unlike ``lift``, no segments are built, so nothing is allocated.
+    pub fn lift_position(&self, contig: u32, position: u32) -> Option<LiftedPosition> {
+        let (range, max_len) = self.contig_blocks(contig);
+        // binary search for the first block starting after the position
+        let (mut low, mut high) = (range.start, range.end);
+        while low < high {
+            let mid = low + (high - low) / 2;
+            if self.block(mid).reference_start <= position {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        self.best_block((range.start..low).rev(), max_len, position)
+    }
+
+    /// Lift the next base of a coordinate-sorted stream, as with ``lift_position``,
+    /// by advancing a cursor through the chain blocks (see ``lift_sorted``).
+    pub fn lift_position_sorted(
+        &self,
+        cursor: &mut SortedCursor,
+        contig: u32,
+        position: u32,
+    ) -> Option<LiftedPosition> {
+        let (range, max_len) = self.contig_blocks(contig);
+        match cursor.last {
+            Some((last_contig, last_position)) if last_contig == contig => {
+                if position < last_position {
+                    cursor.violations += 1;
+                    cursor.low = range.start;
+                }
+            }
+            _ => cursor.low = range.start,
+        }
+        cursor.last = Some((contig, position));
+        let is_behind = |i: usize| {
+            u64::from(self.block(i).reference_start) + u64::from(max_len) <= u64::from(position)
+        };
+        cursor.low = gallop(cursor.low, range.end, is_behind);
+        let end = gallop(cursor.low, range.end, |i| {
+            self.block(i).reference_start <= position
+        });
+        self.best_block((cursor.low..end).rev(), max_len, position)
+    }
+
+    /// Find the highest-scoring block containing a position, among blocks given in
+    /// descending order of start, all starting at or before the position
+    fn best_block(
+        &self,
+        blocks: impl Iterator<Item = usize>,
+        max_len: u32,
+        position: u32,
+    ) -> Option<LiftedPosition> {
+        let mut best: Option<(Block, ChainRecord)> = None;
+        for i in blocks {
+            let block = self.block(i);
+            if u64::from(block.reference_start) + u64::from(max_len) <= u64::from(position) {
+                break;
+            }
+            if block.reference_end() <= position {
+                continue;
+            }
+            let chain = self.chain(block.chain);
+            let better = best.as_ref().map_or(true, |(best_block, best_chain)| {
+                (chain.score, std::cmp::Reverse(block.chain))
+                    > (best_chain.score, std::cmp::Reverse(best_block.chain))
+            });
+            if better {
+                best = Some((block, chain));
+            }
+        }
+        let (block, chain) = best?;
+        let offset = u64::from(block.query_start) + u64::from(position - block.reference_start);
+        Some(LiftedPosition {
+            contig: chain.query,
+            position: if chain.query_positive {
+                offset
+            } else {
+                chain.query_size - offset - 1
+            },
+            positive: chain.query_positive,
+            score: chain.score,
+        })
+    }
+
+    /// Get positions (in reference order) of every block overlapping ``[start, end)``
+    /// on a reference contig. An empty interval overlaps the block containing it.
+    pub fn overlapping_blocks(&self, contig: u32, start: u32, end: u32) -> Vec<usize> {
+        let (range, max_len) = self.contig_blocks(contig);
+        let upper = u64::from(end).max(u64::from(start) + 1);
+        // binary search for the first block starting at or after the end of the query
+        let (mut low, mut high) = (range.start, range.end);
+        while low < high {
+            let mid = low + (high - low) / 2;
+            if u64::from(self.block(mid).reference_start) < upper {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        // blocks are sorted by start, so walk backwards until no block can reach the query
+        let mut hits = Vec::new();
+        for i in (range.start..low).rev() {
+            let block = self.block(i);
+            if u64::from(block.reference_start) + u64::from(max_len) <= u64::from(start) {
+                break;
+            }
+            if block.reference_end() > start {
+                hits.push(i);
+            }
+        }
+        hits.reverse();
+        hits
+    }
+
+    /// Map the part of a block that overlaps ``[start, end)`` onto the query
+    pub fn map_block(&self, block: &Block, start: u32, end: u32, positive: bool) -> LiftedSegment {
+        let chain = self.chain(block.chain);
+        let clipped_start = start.max(block.reference_start);
+        let clipped_end = end.min(block.reference_end()).max(clipped_start);
+        let mut mapped_start =
+            u64::from(block.query_start) + u64::from(clipped_start - block.reference_start);
+        let mut mapped_end =
+            u64::from(block.query_start) + u64::from(clipped_end - block.reference_start);
+        if !chain.query_positive {
+            mapped_start = chain.query_size - mapped_start;
+            mapped_end = chain.query_size - mapped_end;
+        }
+        if !positive {
+            std::mem::swap(&mut mapped_start, &mut mapped_end);
+        }
+        LiftedSegment {
+            chain: block.chain,
+            contig: chain.query,
+            start: mapped_start,
+            end: mapped_end,
+            positive: chain.query_positive == positive,
+            score: chain.score,
+        }
+    }
+
+    /// Lift an interval. ``start`` and ``end`` follow omics conventions, i.e.
+    /// ``start <= end`` on the positive strand and ``start >= end`` on the negative
+    /// strand.
+    ///
+    /// Segments are grouped by chain in chainfile order, and ordered by reference
+    /// position within each chain.
+    pub fn lift(&self, contig: u32, start: u32, end: u32, positive: bool) -> Vec<LiftedSegment> {
+        let (lower, upper) = if positive { (start, end) } else { (end, start) };
+        let hits = self.overlapping_blocks(contig, lower, upper);
+        self.map_blocks(hits, lower, upper, positive)
+    }
+
+    /// Lift the next interval of a coordinate-sorted stream, as with ``lift``.
+    ///
+    /// Rather than searching for each query independently, the cursor walks forward
+    /// through the contig's blocks as queries advance, so lifting N sorted intervals
+    /// is a linear merge against the blocks. A query on a new contig, or one that
+    /// starts before the previous query (a sort violation), repositions the cursor
+    /// with a search instead, so unsorted input is still lifted correctly.
+    pub fn lift_sorted(
+        &self,
+        cursor: &mut SortedCursor,
+        contig: u32,
+        start: u32,
+        end: u32,
+        positive: bool,
+    ) -> Vec<LiftedSegment> {
+        let (lower, upper) = if positive { (start, end) } else { (end, start) };
+        let (range, max_len) = self.contig_blocks(contig);
+        match cursor.last {
+            Some((last_contig, last_lower)) if last_contig == contig => {
+                if lower < last_lower {
+                    cursor.violations += 1;
+                    cursor.low = range.start;
+                }
+            }
+            _ => cursor.low = range.start,
+        }
+        cursor.last = Some((contig, lower));
+        // skip blocks that end before any remaining query can start
+        let is_behind = |i: usize| {
+            u64::from(self.block(i).reference_start) + u64::from(max_len) <= u64::from(lower)
+        };
+        cursor.low = gallop(cursor.low, range.end, is_behind);
+
+        let upper_bound = u64::from(upper).max(u64::from(lower) + 1);
+        let mut hits = Vec::new();
+        for i in cursor.low..range.end {
+            let block = self.block(i);
+            if u64::from(block.reference_start) >= upper_bound {
+                break;
+            }
+            if block.reference_end() > lower {
+                hits.push(i);
+            }
+        }
+        self.map_blocks(hits, lower, upper, positive)
+    }
+
+    /// Map overlapping blocks, grouped by chain and ordered by reference position
+    fn map_blocks(
+        &self,
+        hits: Vec<usize>,
+        lower: u32,
+        upper: u32,
+        positive: bool,
+    ) -> Vec<LiftedSegment> {
+        let mut blocks: Vec<Block> = hits.into_iter().map(|i| self.block(i)).collect();
+        blocks.sort_by_key(|block| (block.chain, block.reference_start));
+        blocks
+            .iter()
+            .map(|block| self.map_block(block, lower, upper, positive))
+            .collect()
+    }
+}
+
+/// Position of a coordinate-sorted stream of queries within an index's blocks
+#[derive(Clone, Debug, Default)]
+pub struct SortedCursor {
+    /// Contig and lower bound of the previous query
+    last: Option<(u32, u32)>,
+    /// First block on the current contig that may overlap the next query
+    low: usize,
+    /// Number of queries that started before the previous query on the same contig
+    pub violations: usize,
+}
+
+/// Find the first index in ``[from, to)`` for which ``before`` is false, given that
+/// ``before`` is true for some prefix of the range and false after it.
+///
+/// Searches with exponentially growing steps from ``from``, so that short advances
+/// cost a few comparisons and long jumps cost a binary search.
+fn gallop(from: usize, to: usize, before: impl Fn(usize) -> bool) -> usize {
+    let (mut low, mut high) = (from, from);
+    let mut step = 1;
+    while high < to && before(high) {
+        low = high + 1;
+        high = (high + step).min(to);
+        step *= 2;
+    }
+    while low < high {
+        let mid = low + (high - low) / 2;
+        if before(mid) {
+            low = mid + 1;
+        } else {
+            high = mid;
+        }
+    }
+    low
+}
@@ -0,0 +1,210 @@
+//! Per-contig lazy loading of chainfile data.
+//!
+//! Opening a chainfile lazily only scans it for chain headers, recording the byte
+//! ranges of each reference contig's chains. The alignment blocks for a contig are
+//! parsed into a liftover machine the first time that contig is queried, so memory
+//! use and startup time scale with the contigs that are actually used.
+//!
+//! Byte ranges are offsets into the decompressed text of compressed chainfiles. A
+//! BGZF chainfile's blocks are indexed when it's opened, and a contig's chains are
+//! read by decompressing only the blocks that hold them. Other gzip files can't be
+//! read at arbitrary offsets, so they can't be loaded lazily.
+use crate::compression::{self, BgzfBlock};
+use chainfile as chain;
+use flate2::read::MultiGzDecoder;
+use std::collections::HashMap;
+use std::fs::File;
+use std::io::{self, BufRead, BufReader, Read, Seek, SeekFrom};
+use std::ops::Range;
+use std::path::{Path, PathBuf};
+use std::sync::OnceLock;
+
+/// Chains for a single reference contig
+struct LazyContig {
+    /// Byte ranges of the contig's chains within the chainfile
+    ranges: Vec<Range<u64>>,
+    /// Liftover machine, and the number of chainfile lines parsed into it, built on
+    /// first use
+    machine: OnceLock<Result<(chain::liftover::machine::Machine, usize), String>>,
+}
+
+/// Where a lazily-loaded chainfile's text is read from
+enum Source {
+    /// Uncompressed chainfile, read in place
+    Plain,
+    /// BGZF chainfile, read by decompressing the blocks that hold each range
+    Bgzf(Vec<BgzfBlock>),
+}
+
+/// Chainfile whose chains are parsed on demand, one reference contig at a time
+pub struct LazyChains {
+    path: PathBuf,
+    source: Source,
+    contigs: HashMap<String, LazyContig>,
+}
+
+impl LazyChains {
+    /// Scan a chainfile for chain headers.
+    ///
+    /// Only header lines are tokenized; alignment data lines are skipped over.
+    /// Returns None for gzipped chainfiles that aren't BGZF, since chains can't be read
+    /// out of them by offset.
+    pub fn open(path: &Path) -> io::Result<Option<LazyChains>> {
+        let (source, contigs) = if !compression::is_gzip_file(path)? {
+            (
+                Source::Plain,
+                Self::scan(BufReader::new(File::open(path)?))?,
+            )
+        } else if let Some(blocks) = compression::bgzf_index(path)? {
+            let decoder = MultiGzDecoder::new(BufReader::new(File::open(path)?));
+            (Source::Bgzf(blocks), Self::scan(BufReader::new(decoder))?)
+        } else {
+            return Ok(None);
+        };
+        Ok(Some(LazyChains {
+            path: path.to_path_buf(),
+            source,
+            contigs,
+        }))
+    }
+
+    /// Record the byte ranges of each reference contig's chains
+    fn scan<R: BufRead>(mut reader: R) -> io::Result<HashMap<String, LazyContig>> {
+        let mut contigs: HashMap<String, LazyContig> = HashMap::new();
+        let mut current: Option<(String, u64)> = None;
+        let mut offset = 0u64;
+        let mut line = Vec::new();
+        loop {
+            line.clear();
+            let n = reader.read_until(b'\n', &mut line)? as u64;
+            if n == 0 {
+                break;
+            }
+            if line.starts_with(b"chain") {
+                let header = std::str::from_utf8(&line)
+                    .map_err(|e| io::Error::new(io::ErrorKind::InvalidData, e))?;
+                let Some(contig) = header.split_ascii_whitespace().nth(2) else {
+                    return Err(io::Error::new(
+                        io::ErrorKind::InvalidData,
+                        format!(
+                            "Chain header at byte {} is missing a reference name",
+                            offset
+                        ),
+                    ));
+                };
+                if let Some((previous, start)) = current.take() {
+                    Self::add_range(&mut contigs, previous, start..offset);
+                }
+                current = Some((contig.to_string(), offset));
+            }
+            offset += n;
+        }
+        if let Some((previous, start)) = current {
+            Self::add_range(&mut contigs, previous, start..offset);
+        }
+        Ok(contigs)
+    }
+
+    /// Record the byte range of a chain on a contig, extending the contig's last range
+    /// if the chain directly follows it
+    fn add_range(contigs: &mut HashMap<String, LazyContig>, contig: String, range: Range<u64>) {
+        let ranges = &mut contigs
+            .entry(contig)
+            .or_insert_with(|| LazyContig {
+                ranges: Vec::new(),
+                machine: OnceLock::new(),
+            })
+            .ranges;
+        match ranges.last_mut() {
+            Some(last) if last.end == range.start => last.end = range.end,
+            _ => ranges.push(range),
+        }
+    }
+
+    /// Get the liftover machine for a reference contig, parsing its chains if this is
+    /// the first time it's been requested. Returns None for unknown contigs.
+    ///
+    /// Concurrent first callers for the same contig wait on a single parse.
+    pub fn machine(
+        &self,
+        contig: &str,
+    ) -> Option<Result<&chain::liftover::machine::Machine, String>> {
+        let lazy_contig = self.contigs.get(contig)?;
+        let machine = lazy_contig
+            .machine
+            .get_or_init(|| self.build_machine(contig, &lazy_contig.ranges));
+        Some(
+            machine
+                .as_ref()
+                .map(|(machine, _)| machine)
+                .map_err(Clone::clone),
+        )
+    }
+
+    /// Get the number of reference contigs whose chains have been parsed
+    pub fn loaded_contig_count(&self) -> usize {
+        self.contigs
+            .values()
+            .filter(|contig| contig.machine.get().is_some())
+            .count()
+    }
+
+    /// Get the number of chainfile lines parsed into liftover machines so far
+    pub fn loaded_line_count(&self) -> usize {
+        self.contigs
+            .values()
+            .filter_map(|contig| match contig.machine.get() {
+                Some(Ok((_, lines))) => Some(lines),
+                _ => None,
+            })
+            .sum()
+    }
+
+    /// Read a contig's chains out of the chainfile and build a liftover machine
+    fn build_machine(
+        &self,
+        contig: &str,
+        ranges: &[Range<u64>],
+    ) -> Result<(chain::liftover::machine::Machine, usize), String> {
+        let read_error = |e: io::Error| {
+            format!(
+                "Encountered error while reading chains for \"{}\" from \"{}\": {}",
+                contig,
+                self.path.display(),
+                e
+            )
+        };
+        let mut file = File::open(&self.path).map_err(read_error)?;
+        let mut data = Vec::new();
+        for range in ranges {
+            match &self.source {
+                Source::Bgzf(blocks) => data.extend(
+                    compression::read_bgzf_range(&mut file, blocks, range.clone())
+                        .map_err(read_error)?,
+                ),
+                Source::Plain => {
+                    file.seek(SeekFrom::Start(range.start))
+                        .map_err(read_error)?;
+                    (&mut file)
+                        .take(range.end - range.start)
+                        .read_to_end(&mut data)
+                        .map_err(read_error)?;
+                }
+            }
+            if !data.ends_with(b"\n") {
+                data.push(b'\n');
+            }
+        }
+        let reader = chain::Reader::new(&data[..]);
+        chain::liftover::machine::Builder
+            .try_build_from(reader)
+            .map(|machine| (machine, compression::count_lines(&data)))
+            .map_err(|_| {
+                format!(
+                    "Encountered error while reading chains for \"{}\" from \"{}\"",
+                    contig,
+                    self.path.display()
+                )
+            })
+    }
+}
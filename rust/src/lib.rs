@@ -1,101 +1,1473 @@
 //! Provide Rust-based chainfile wrapping classes.
+mod accessions;
+mod compose;
+mod compression;
+mod index;
+mod lazy;
+mod metrics;
+mod modes;
+
+use accessions::AccessionTable;
 use chainfile as chain;
+use index::{ChainData, ChainIndex, IndexError, LiftedPosition, SortedCursor, SourceInfo};
+use lazy::LazyChains;
+use metrics::{Counts, Metrics};
+use modes::LiftMode;
 use omics::coordinate::Contig;
 use omics::coordinate::{interbase::Coordinate, interval::interbase::Interval, Strand};
+use pyo3::buffer::{Element, PyBuffer};
 use pyo3::create_exception;
-use pyo3::exceptions::{PyException, PyFileNotFoundError, PyValueError};
+use pyo3::exceptions::{
+    PyException, PyFileNotFoundError, PyOSError, PyOverflowError, PyTypeError, PyValueError,
+};
 use pyo3::prelude::*;
-use std::fs::File;
-use std::io::BufReader;
+use pyo3::types::{PyBytes, PyDict};
+use std::borrow::Cow;
+use std::collections::HashMap;
+use std::io::ErrorKind;
+use std::path::{Path, PathBuf};
+use std::sync::OnceLock;
+use std::time::{Duration, Instant};
+
+/// Rough memory held by a liftover machine per chainfile line parsed into it. The
+/// machine doesn't report its size, but it stores each alignment block as a pair of
+/// intervals whose coordinates each carry their own contig name and strand, several
+/// times the 16 bytes a block takes in a ``ChainIndex``.
+const MACHINE_LINE_BYTES: usize = 256;
 
 create_exception!(agct, NoLiftoverError, PyException);
 create_exception!(agct, ChainfileError, PyException);
 create_exception!(agct, StrandValueError, PyException);
 
+/// Columnar batch liftover output: (input index, chrom, start, end, strand, score)
+type LiftManyColumns = (
+    Vec<usize>,
+    Vec<String>,
+    Vec<u64>,
+    Vec<u64>,
+    Vec<String>,
+    Vec<usize>,
+);
+
+/// Parse a strand string into an omics strand
+fn parse_strand(strand: &str) -> PyResult<Strand> {
+    match strand {
+        "+" => Ok(Strand::Positive),
+        "-" => Ok(Strand::Negative),
+        _ => Err(PyValueError::new_err(format!(
+            "Unrecognized strand value: \"{}\"",
+            strand
+        ))),
+    }
+}
+
+/// Extract a column of positions from a buffer-protocol object (e.g. a NumPy array) or
+/// from any sequence of ints.
+///
+/// Buffers are copied out in a single pass so that the liftover loop can run without
+/// holding the GIL.
+fn extract_positions(column: &Bound<'_, PyAny>) -> PyResult<Vec<u32>> {
+    let py = column.py();
+    if let Ok(buffer) = column.extract::<PyBuffer<u32>>() {
+        return buffer.to_vec(py);
+    }
+    if let Ok(buffer) = column.extract::<PyBuffer<i64>>() {
+        return narrow_positions(buffer.to_vec(py)?);
+    }
+    if let Ok(buffer) = column.extract::<PyBuffer<u64>>() {
+        return narrow_positions(buffer.to_vec(py)?);
+    }
+    if let Ok(buffer) = column.extract::<PyBuffer<i32>>() {
+        return narrow_positions(buffer.to_vec(py)?);
+    }
+    column.extract::<Vec<u32>>()
+}
+
+/// Extract and check batch input columns
+fn batch_columns(
+    chroms: &[String],
+    starts: &Bound<'_, PyAny>,
+    ends: &Bound<'_, PyAny>,
+    strands: Option<Vec<String>>,
+) -> PyResult<(Vec<u32>, Vec<u32>, Vec<Strand>)> {
+    let starts = extract_positions(starts)?;
+    let ends = extract_positions(ends)?;
+    if starts.len() != chroms.len()
+        || ends.len() != chroms.len()
+        || strands.as_ref().is_some_and(|s| s.len() != chroms.len())
+    {
+        return Err(PyValueError::new_err(
+            "Input columns must all be the same length",
+        ));
+    }
+    let strands = match strands {
+        Some(strands) => strands
+            .iter()
+            .map(|strand| parse_strand(strand))
+            .collect::<PyResult<Vec<Strand>>>()?,
+        None => vec![Strand::Positive; chroms.len()],
+    };
+    Ok((starts, ends, strands))
+}
+
+/// Convert wider integer positions to u32, failing on values that can't be represented
+fn narrow_positions<T>(values: Vec<T>) -> PyResult<Vec<u32>>
+where
+    T: TryInto<u32> + Copy + std::fmt::Display,
+{
+    values
+        .into_iter()
+        .map(|value| {
+            value.try_into().map_err(|_| {
+                PyOverflowError::new_err(format!(
+                    "Position {} can't be represented as a 32 bit unsigned int",
+                    value
+                ))
+            })
+        })
+        .collect()
+}
+
+/// Copy the contents of a one-dimensional buffer, so that it can be read without
+/// holding the GIL (as in ``extract_positions``)
+fn buffer_column<T: Element>(py: Python<'_>, buffer: &PyBuffer<T>) -> PyResult<Vec<T>> {
+    if buffer.dimensions() != 1 {
+        return Err(PyValueError::new_err(
+            "Input buffers must be one-dimensional",
+        ));
+    }
+    buffer.to_vec(py)
+}
+
+/// Convert an i64 position from an input table to u32
+fn table_position(value: i64) -> PyResult<u32> {
+    u32::try_from(value).map_err(|_| {
+        PyOverflowError::new_err(format!(
+            "Position {} can't be represented as a 32 bit unsigned int",
+            value
+        ))
+    })
+}
+
+/// One interval of a batch: (chrom, start, end, strand), or None for a row that
+/// can't be lifted, such as a row with missing values in an input table
+type BatchInterval<'c> = Option<(&'c str, u32, u32, Strand)>;
+
+/// Python-facing segment of a liftover result: (chrom, start, end, strand, score)
+type LiftedSegment = (String, u64, u64, String, usize);
+
+/// Python-facing lifted base: (chrom, 0-based position, strand, score)
+type LiftedBase = (String, u64, String, usize);
+
+/// Array-backed batch liftover output: contig name table, then the input index,
+/// contig ID (into the name table), start, end, strand (+1/-1), and score columns as
+/// native-endian i64/i32/i64/i64/i8/i64 bytes
+type LiftManyArrays<'py> = (
+    Vec<String>,
+    Bound<'py, PyBytes>,
+    Bound<'py, PyBytes>,
+    Bound<'py, PyBytes>,
+    Bound<'py, PyBytes>,
+    Bound<'py, PyBytes>,
+    Bound<'py, PyBytes>,
+);
+
+/// Segment of a liftover result. The contig name is borrowed from the chain data
+/// when lifting through an index, so that no string is allocated per segment.
+struct Segment<'a> {
+    /// Chain the segment was lifted through, unique within one interval's result
+    chain: u32,
+    contig: Cow<'a, str>,
+    start: u64,
+    end: u64,
+    positive: bool,
+    score: u64,
+}
+
+impl<'a> Segment<'a> {
+    /// Describe a base lifted through an index as a one-base segment
+    fn from_position(index: &'a ChainIndex, lifted: LiftedPosition) -> Segment<'a> {
+        let (start, end) = if lifted.positive {
+            (lifted.position, lifted.position + 1)
+        } else {
+            (lifted.position + 1, lifted.position)
+        };
+        Segment {
+            chain: 0,
+            contig: Cow::Borrowed(index.contig_name(lifted.contig)),
+            start,
+            end,
+            positive: lifted.positive,
+            score: lifted.score,
+        }
+    }
+
+    /// Convert a one-base segment into a Python-facing lifted base
+    fn into_base(self) -> LiftedBase {
+        (
+            self.contig.into_owned(),
+            self.start.min(self.end),
+            if self.positive { "+" } else { "-" }.to_string(),
+            self.score as usize,
+        )
+    }
+
+    /// Convert into a Python-facing segment
+    fn into_tuple(self) -> LiftedSegment {
+        (
+            self.contig.into_owned(),
+            self.start,
+            self.end,
+            if self.positive { "+" } else { "-" }.to_string(),
+            self.score as usize,
+        )
+    }
+}
+
+/// Builder for array-backed batch output, interning contig names
+#[derive(Default)]
+struct SegmentArrays {
+    names: Vec<String>,
+    ids: HashMap<String, i32>,
+    index: Vec<i64>,
+    contig: Vec<i32>,
+    start: Vec<i64>,
+    end: Vec<i64>,
+    strand: Vec<i8>,
+    score: Vec<i64>,
+}
+
+impl SegmentArrays {
+    /// Start output whose contig IDs refer to a fixed table of names
+    fn with_names(names: Vec<String>) -> SegmentArrays {
+        SegmentArrays {
+            names,
+            ..SegmentArrays::default()
+        }
+    }
+
+    fn push(&mut self, i: usize, segment: Segment<'_>) {
+        let id = match self.ids.get(&*segment.contig) {
+            Some(&id) => id,
+            None => {
+                let id = self.names.len() as i32;
+                self.names.push(segment.contig.to_string());
+                self.ids.insert(segment.contig.to_string(), id);
+                id
+            }
+        };
+        self.push_id(i, id, segment);
+    }
+
+    /// Add a segment whose contig ID is already known
+    fn push_id(&mut self, i: usize, id: i32, segment: Segment<'_>) {
+        self.index.push(i as i64);
+        self.contig.push(id);
+        self.start.push(segment.start as i64);
+        self.end.push(segment.end as i64);
+        self.strand.push(if segment.positive { 1 } else { -1 });
+        self.score.push(segment.score as i64);
+    }
+
+    /// Get the offset of each input interval's first segment, followed by the total
+    /// number of segments (like Arrow list offsets), for a batch of ``len`` intervals
+    fn offsets(&self, len: usize) -> Vec<i64> {
+        let mut offsets = Vec::with_capacity(len + 1);
+        let mut segment = 0;
+        for i in 0..len {
+            offsets.push(segment as i64);
+            while segment < self.index.len() && self.index[segment] == i as i64 {
+                segment += 1;
+            }
+        }
+        offsets.push(segment as i64);
+        offsets
+    }
+
+    fn into_columns(self, py: Python<'_>) -> LiftManyArrays<'_> {
+        (
+            self.names,
+            column_bytes(py, &self.index),
+            column_bytes(py, &self.contig),
+            column_bytes(py, &self.start),
+            column_bytes(py, &self.end),
+            column_bytes(py, &self.strand),
+            column_bytes(py, &self.score),
+        )
+    }
+}
+
+/// Primitive integers, which have no padding or invalid bit patterns
+trait Primitive: Copy {}
+impl Primitive for i8 {}
+impl Primitive for i32 {}
+impl Primitive for i64 {}
+
+/// Copy a column of integers into a Python bytes object, in native byte order
+fn column_bytes<'py, T: Primitive>(py: Python<'py>, values: &[T]) -> Bound<'py, PyBytes> {
+    // Safety: every byte of a primitive integer slice is initialized
+    let bytes = unsafe {
+        std::slice::from_raw_parts(values.as_ptr().cast::<u8>(), std::mem::size_of_val(values))
+    };
+    PyBytes::new(py, bytes)
+}
+
+/// Reasons that a single interval can't be lifted
+enum LiftError {
+    InvalidContig,
+    InvalidInterval,
+    Chainfile(String),
+}
+
+/// Liftover implementation backing a Converter
+enum Backend {
+    /// chainfile crate liftover machine, built by parsing a text chainfile
+    Machine(chain::liftover::machine::Machine),
+    /// Precompiled binary chainfile index, usually memory-mapped
+    Index(ChainIndex),
+    /// Text chainfile parsed on demand, one reference contig at a time
+    Lazy(LazyChains),
+}
+
+/// Lift an interval with a chainfile crate liftover machine
+fn lift_with_machine(
+    machine: &chain::liftover::machine::Machine,
+    chrom: &str,
+    start: u32,
+    end: u32,
+    strand: &Strand,
+) -> Result<Option<Vec<Segment<'static>>>, LiftError> {
+    let contig = Contig::try_new(chrom).map_err(|_| LiftError::InvalidContig)?;
+    let start_coordinate = Coordinate::new(contig.clone(), strand.clone(), start);
+    let end_coordinate = Coordinate::new(contig, strand.clone(), end);
+    let interval = Interval::try_new(start_coordinate, end_coordinate)
+        .map_err(|_| LiftError::InvalidInterval)?;
+    Ok(machine.liftover(interval).map(|liftover_result| {
+        liftover_result
+            .iter()
+            .enumerate()
+            .flat_map(|(chain, chain_liftover)| {
+                chain_liftover
+                    .segments()
+                    .iter()
+                    .map(move |segment| Segment {
+                        chain: chain as u32,
+                        contig: Cow::Owned(segment.query().contig().to_string()),
+                        start: segment.query().start().position().get(),
+                        end: segment.query().end().position().get(),
+                        positive: matches!(segment.query().strand(), Strand::Positive),
+                        score: chain_liftover.chain().score() as u64,
+                    })
+            })
+            .collect()
+    }))
+}
+
+/// Check that an interval is well-formed without building omics coordinates
+fn check_interval(chrom: &str, start: u32, end: u32, strand: &Strand) -> Result<(), LiftError> {
+    if chrom.is_empty() {
+        return Err(LiftError::InvalidContig);
+    }
+    let positive = matches!(strand, Strand::Positive);
+    if (positive && start > end) || (!positive && start < end) {
+        return Err(LiftError::InvalidInterval);
+    }
+    Ok(())
+}
+
+/// Build a lift mode from Python arguments
+fn lift_mode(merge: bool, best_chain: bool, min_match: f64) -> PyResult<LiftMode> {
+    if !(0.0..=1.0).contains(&min_match) {
+        return Err(PyValueError::new_err(format!(
+            "`min_match` must be between 0 and 1, got {}",
+            min_match
+        )));
+    }
+    Ok(LiftMode {
+        merge,
+        best_chain,
+        min_match,
+    })
+}
+
+/// Reduce an interval's lifted segments with a lift mode. An interval left without
+/// segments has no liftover.
+fn apply_mode<'a>(
+    segments: Option<Vec<Segment<'a>>>,
+    mode: &LiftMode,
+    start: u32,
+    end: u32,
+) -> Option<Vec<Segment<'a>>> {
+    let segments = mode.apply(segments?, u64::from(start.abs_diff(end)));
+    (!segments.is_empty()).then_some(segments)
+}
+
+/// Convert segments lifted through an index into result segments that borrow contig
+/// names from the index, or None if there aren't any
+fn index_segments<'a>(
+    index: &'a ChainIndex,
+    segments: &[index::LiftedSegment],
+) -> Option<Vec<Segment<'a>>> {
+    if segments.is_empty() {
+        return None;
+    }
+    Some(
+        segments
+            .iter()
+            .map(|segment| Segment {
+                chain: segment.chain,
+                contig: Cow::Borrowed(index.contig_name(segment.contig)),
+                start: segment.start,
+                end: segment.end,
+                positive: segment.positive,
+                score: segment.score,
+            })
+            .collect(),
+    )
+}
+
+/// Convert an error from reading a chainfile or index into a Python exception
+fn index_error(error: IndexError, path: &str) -> PyErr {
+    match error {
+        IndexError::Io(e) if e.kind() == ErrorKind::NotFound => {
+            PyFileNotFoundError::new_err(format!("Unable to open file located at \"{}\"", path))
+        }
+        // malformed or truncated data, e.g. a corrupt compressed chainfile
+        IndexError::Io(e)
+            if matches!(
+                e.kind(),
+                ErrorKind::InvalidData | ErrorKind::InvalidInput | ErrorKind::UnexpectedEof
+            ) =>
+        {
+            ChainfileError::new_err(format!(
+                "Encountered error while reading \"{}\": {}",
+                path, e
+            ))
+        }
+        IndexError::Io(e) => PyOSError::new_err(format!(
+            "Encountered error while accessing \"{}\": {}",
+            path, e
+        )),
+        e => ChainfileError::new_err(format!(
+            "Encountered error while reading \"{}\": {}",
+            path, e
+        )),
+    }
+}
+
 /// Define core Converter class to be used by Python interface.
-/// Effectively just a wrapper on top of the chainfile crate's Machine struct.
-#[pyclass]
+/// Effectively just a wrapper on top of the chainfile crate's Machine struct, or on a
+/// precompiled binary index of the same chain data.
+///
+/// Converters are immutable once loaded (anything built on demand is guarded by a
+/// ``OnceLock``), so a single instance can be shared by any number of threads, and
+/// liftover runs with the GIL released.
+#[pyclass(frozen)]
 pub struct Converter {
-    pub machine: chain::liftover::machine::Machine,
+    backend: Backend,
+    /// Path of the chainfile or index the converter was loaded from
+    path: PathBuf,
+    /// Whether ``path`` is a binary index rather than a text chainfile
+    from_index: bool,
+    /// Whether the converter lifts from the query assembly of ``path`` back to its
+    /// reference assembly
+    inverted: bool,
+    /// Block index for sorted lifts with a Machine, built on first use
+    sorted_index: OnceLock<Result<ChainIndex, String>>,
+    /// Number of chainfile lines parsed into a Machine
+    machine_lines: usize,
+    /// Refget accessions of the source and target sequences, for liftover by accession
+    accessions: OnceLock<AccessionTable>,
+    /// Liftover instrumentation, disabled by default
+    metrics: Metrics,
+}
+
+impl Converter {
+    fn with_backend(backend: Backend, path: &str, started: Instant) -> Converter {
+        Converter {
+            from_index: matches!(backend, Backend::Index(_)),
+            backend,
+            path: PathBuf::from(path),
+            inverted: false,
+            sorted_index: OnceLock::new(),
+            machine_lines: 0,
+            accessions: OnceLock::new(),
+            metrics: Metrics::new(started.elapsed()),
+        }
+    }
+}
+
+impl Converter {
+    /// Lift a single interval, returning None if no liftover is available
+    fn lift_interval(
+        &self,
+        chrom: &str,
+        start: u32,
+        end: u32,
+        strand: &Strand,
+    ) -> Result<Option<Vec<Segment<'_>>>, LiftError> {
+        match &self.backend {
+            Backend::Machine(machine) => lift_with_machine(machine, chrom, start, end, strand),
+            Backend::Index(index) => {
+                check_interval(chrom, start, end, strand)?;
+                let positive = matches!(strand, Strand::Positive);
+                let Some(contig) = index.contig_id(chrom) else {
+                    return Ok(None);
+                };
+                Ok(index_segments(
+                    index,
+                    &index.lift(contig, start, end, positive),
+                ))
+            }
+            Backend::Lazy(lazy) => match lazy.machine(chrom) {
+                Some(Ok(machine)) => lift_with_machine(machine, chrom, start, end, strand),
+                Some(Err(message)) => Err(LiftError::Chainfile(message)),
+                None => check_interval(chrom, start, end, strand).map(|_| None),
+            },
+        }
+    }
+
+    /// Lift a single interval and reduce its segments with a lift mode, recording
+    /// metrics if they're enabled
+    fn lift_interval_recorded(
+        &self,
+        chrom: &str,
+        start: u32,
+        end: u32,
+        strand: &Strand,
+        mode: &LiftMode,
+    ) -> Result<Option<Vec<Segment<'_>>>, LiftError> {
+        let lift = || {
+            self.lift_interval(chrom, start, end, strand)
+                .map(|segments| apply_mode(segments, mode, start, end))
+        };
+        if !self.metrics.enabled() {
+            return lift();
+        }
+        let started = Instant::now();
+        let result = lift();
+        let mut counts = Counts::default();
+        match &result {
+            Ok(segments) => counts.lifted(segments.as_ref().map_or(0, Vec::len)),
+            Err(_) => counts.failed(),
+        }
+        self.metrics.record_single(&counts, started.elapsed());
+        result
+    }
+
+    /// Lift the next interval of a coordinate-sorted stream by advancing a cursor
+    /// through the chain blocks (see ``ChainIndex::lift_sorted``).
+    ///
+    /// A converter built from a text chainfile builds an in-memory block index the
+    /// first time this is called. Lazily-loaded chainfiles don't have a block index,
+    /// so they fall back to independent lookups.
+    fn lift_interval_sorted(
+        &self,
+        cursor: &mut SortedCursor,
+        chrom: &str,
+        start: u32,
+        end: u32,
+        strand: &Strand,
+    ) -> Result<Option<Vec<Segment<'_>>>, LiftError> {
+        let index = match &self.backend {
+            Backend::Index(index) => index,
+            Backend::Machine(_) => self.sorted_index()?,
+            Backend::Lazy(_) => return self.lift_interval(chrom, start, end, strand),
+        };
+        check_interval(chrom, start, end, strand)?;
+        let positive = matches!(strand, Strand::Positive);
+        let Some(contig) = index.contig_id(chrom) else {
+            return Ok(None);
+        };
+        Ok(index_segments(
+            index,
+            &index.lift_sorted(cursor, contig, start, end, positive),
+        ))
+    }
+
+    /// Get the block index for sorted lifts with a Machine, building it if needed.
+    ///
+    /// The Machine's chains can't be read back out of it, so the index is built by
+    /// parsing the chainfile a second time. It's kept for the life of the converter,
+    /// alongside the Machine, so a converter that makes sorted, single-base or inverse
+    /// lifts holds its chain data twice. Lifts through the index give the same
+    /// segments as lifts through the Machine.
+    fn sorted_index(&self) -> Result<&ChainIndex, LiftError> {
+        let path = &self.path;
+        self.sorted_index
+            .get_or_init(|| {
+                ChainIndex::build(path).map_err(|e| {
+                    format!(
+                        "Encountered error while indexing \"{}\": {}",
+                        path.display(),
+                        e
+                    )
+                })
+            })
+            .as_ref()
+            .map_err(|message| LiftError::Chainfile(message.clone()))
+    }
+
+    /// Get the accession table, failing if none has been set
+    fn accession_table(&self) -> PyResult<&AccessionTable> {
+        self.accessions.get().ok_or_else(|| {
+            PyValueError::new_err("No refget accessions have been set for this converter")
+        })
+    }
+
+    /// Lift the base at a 0-based position on the positive strand through the block
+    /// containing it, as a one-base segment, or None if no liftover is available.
+    /// If ``cursor`` is given, bases are expected to be coordinate-sorted (see
+    /// ``ChainIndex::lift_position_sorted``).
+    ///
+    /// A converter built from a text chainfile builds an in-memory block index the
+    /// first time this is called. Lazily-loaded chainfiles don't have a block index,
+    /// so they lift a one-base interval instead, keeping the highest-scoring segment.
+    fn lift_base(
+        &self,
+        cursor: Option<&mut SortedCursor>,
+        chrom: &str,
+        position: u32,
+    ) -> Result<Option<Segment<'_>>, LiftError> {
+        let index = match &self.backend {
+            Backend::Index(index) => index,
+            Backend::Machine(_) => self.sorted_index()?,
+            Backend::Lazy(_) => {
+                let end = position.checked_add(1).ok_or(LiftError::InvalidInterval)?;
+                let segments = self.lift_interval(chrom, position, end, &Strand::Positive)?;
+                return Ok(segments.and_then(|segments| {
+                    segments.into_iter().reduce(|best, segment| {
+                        if segment.score > best.score {
+                            segment
+                        } else {
+                            best
+                        }
+                    })
+                }));
+            }
+        };
+        if chrom.is_empty() {
+            return Err(LiftError::InvalidContig);
+        }
+        let Some(contig) = index.contig_id(chrom) else {
+            return Ok(None);
+        };
+        let lifted = match cursor {
+            Some(cursor) => index.lift_position_sorted(cursor, contig, position),
+            None => index.lift_position(contig, position),
+        };
+        Ok(lifted.map(|lifted| Segment::from_position(index, lifted)))
+    }
+
+    /// Lift a batch of ``len`` intervals, getting each one from ``interval``,
+    /// reducing its segments with ``mode``, and passing each remaining segment to
+    /// ``emit`` along with the index of the input interval it came from. Intervals
+    /// without a liftover, on an invalid contig, or missing from the input produce no
+    /// segments.
+    fn lift_batch<'a, 'c>(
+        &'a self,
+        len: usize,
+        interval: impl Fn(usize) -> PyResult<BatchInterval<'c>>,
+        sorted_input: bool,
+        mode: &LiftMode,
+        mut emit: impl FnMut(usize, Segment<'a>),
+    ) -> PyResult<()> {
+        let started = self.metrics.enabled().then(Instant::now);
+        let mut counts = Counts::default();
+        let mut cursor = SortedCursor::default();
+        for i in 0..len {
+            let Some((chrom, start, end, strand)) = interval(i)? else {
+                counts.lifted(0);
+                continue;
+            };
+            let lifted = if sorted_input {
+                self.lift_interval_sorted(&mut cursor, chrom, start, end, &strand)
+            } else {
+                self.lift_interval(chrom, start, end, &strand)
+            };
+            let segments = match lifted.map(|segments| apply_mode(segments, mode, start, end)) {
+                Ok(Some(segments)) => segments,
+                Ok(None) => {
+                    counts.lifted(0);
+                    continue;
+                }
+                Err(LiftError::InvalidContig) => {
+                    counts.failed();
+                    continue;
+                }
+                Err(LiftError::InvalidInterval) => {
+                    return Err(PyValueError::new_err(format!(
+                        "Invalid interval at index {}: \"{}\" [{}, {}] on strand \"{}\"",
+                        i, chrom, start, end, strand
+                    )))
+                }
+                Err(LiftError::Chainfile(message)) => return Err(ChainfileError::new_err(message)),
+            };
+            counts.lifted(segments.len());
+            for segment in segments {
+                emit(i, segment);
+            }
+        }
+        if let Some(started) = started {
+            self.metrics.record_batch(&counts, started.elapsed());
+        }
+        Ok(())
+    }
 }
 
 #[pymethods]
 impl Converter {
+    /// Load a text chainfile, which may be gzip- or BGZF-compressed.
+    ///
+    /// If ``lazy`` is true, only chain headers are read up front, and each reference
+    /// contig's chains are parsed the first time that contig is lifted. Chains are
+    /// read out of the chainfile by offset: BGZF chainfiles are read by decompressing
+    /// only the blocks that hold a contig's chains, but other gzipped chainfiles can
+    /// only be read from the start, so they're parsed in full as if ``lazy`` were
+    /// false.
     #[new]
-    pub fn new(chainfile_path: &str) -> PyResult<Converter> {
-        let Ok(chainfile_file) = File::open(chainfile_path) else {
-            return Err(PyFileNotFoundError::new_err(format!(
-                "Unable to open chainfile located at \"{}\"",
-                &chainfile_path
-            )));
+    #[pyo3(signature = (chainfile_path, lazy=false))]
+    pub fn new(chainfile_path: &str, lazy: bool) -> PyResult<Converter> {
+        let started = Instant::now();
+        if lazy {
+            let lazy_chains = LazyChains::open(Path::new(chainfile_path))
+                .map_err(|e| index_error(IndexError::from(e), chainfile_path))?;
+            if let Some(lazy_chains) = lazy_chains {
+                return Ok(Converter::with_backend(
+                    Backend::Lazy(lazy_chains),
+                    chainfile_path,
+                    started,
+                ));
+            }
+        }
+        let data = match compression::open(Path::new(chainfile_path)) {
+            Ok(data) => data,
+            Err(e) if e.kind() == ErrorKind::NotFound => {
+                return Err(PyFileNotFoundError::new_err(format!(
+                    "Unable to open chainfile located at \"{}\"",
+                    &chainfile_path
+                )));
+            }
+            Err(e) => return Err(index_error(IndexError::from(e), chainfile_path)),
         };
-        let data = BufReader::new(chainfile_file);
-        let reader = chain::Reader::new(data);
+        let mut data = compression::LineCounter::new(data);
+        let reader = chain::Reader::new(&mut data);
         let Ok(machine) = chain::liftover::machine::Builder.try_build_from(reader) else {
             return Err(ChainfileError::new_err(format!(
                 "Encountered error while reading chainfile at \"{}\"",
                 &chainfile_path
             )));
         };
-        Ok(Converter { machine })
+        Ok(Converter {
+            machine_lines: data.line_count(),
+            ..Converter::with_backend(Backend::Machine(machine), chainfile_path, started)
+        })
+    }
+
+    /// Load a binary chainfile index (see ``compile_index``) via mmap.
+    ///
+    /// Loading doesn't parse anything, so it's effectively instant, and the mapped
+    /// pages are shared between all processes on a host that load the same index.
+    #[staticmethod]
+    pub fn from_index(index_path: &str) -> PyResult<Converter> {
+        let started = Instant::now();
+        let index =
+            ChainIndex::open(Path::new(index_path)).map_err(|e| index_error(e, index_path))?;
+        Ok(Converter::with_backend(
+            Backend::Index(index),
+            index_path,
+            started,
+        ))
+    }
+
+    /// Load chainfile contents held in memory, e.g. as read from a Python file
+    /// object. The contents may be gzip- or BGZF-compressed.
+    ///
+    /// The chains are parsed into an in-memory block index, without building the
+    /// liftover machine, so nothing is written to disk. Converters loaded this way
+    /// have no path to be reloaded from, so they can't be pickled.
+    #[staticmethod]
+    pub fn from_bytes(py: Python<'_>, data: &[u8]) -> PyResult<Converter> {
+        let started = Instant::now();
+        let index = py
+            .allow_threads(|| {
+                let text = compression::decompress(data)?;
+                let (chains, hash) = ChainData::parse(&text[..])?;
+                let source = SourceInfo {
+                    len: text.len() as u64,
+                    mtime_ns: 0,
+                    hash,
+                };
+                ChainIndex::from_bytes(chains.to_index_bytes(source))
+            })
+            .map_err(|e| index_error(e, "<bytes>"))?;
+        Ok(Converter::with_backend(Backend::Index(index), "", started))
+    }
+
+    /// Build a converter for the inverse mapping, from the query assembly back to the
+    /// reference assembly, out of this converter's chain data, without reading a
+    /// second chainfile.
+    ///
+    /// The inverse is held as an in-memory block index. Converters loaded from an
+    /// index invert it directly; converters loaded from a text chainfile invert the
+    /// block index built for sorted lifts (see ``lift_many``), and lazily-loaded
+    /// converters index the whole chainfile first. Inverting an inverse restores the
+    /// original mapping.
+    pub fn inverse(&self, py: Python<'_>) -> PyResult<Converter> {
+        let started = Instant::now();
+        let inverse = py.allow_threads(|| match &self.backend {
+            Backend::Index(index) => Ok(index.inverse()),
+            Backend::Machine(_) => {
+                self.sorted_index()
+                    .map(ChainIndex::inverse)
+                    .map_err(|e| match e {
+                        LiftError::Chainfile(message) => ChainfileError::new_err(message),
+                        _ => unreachable!("indexing only fails with a chainfile error"),
+                    })
+            }
+            Backend::Lazy(_) => ChainIndex::build(&self.path)
+                .map(|index| index.inverse())
+                .map_err(|e| index_error(e, &self.path.to_string_lossy())),
+        })?;
+        Ok(Converter {
+            path: self.path.clone(),
+            from_index: self.from_index,
+            inverted: !self.inverted,
+            ..Converter::with_backend(Backend::Index(inverse), "", started)
+        })
+    }
+
+    /// Load the inverse of a text chainfile or binary index (see ``inverse``).
+    ///
+    /// A text chainfile is indexed in memory and inverted, without building the
+    /// forward liftover machine.
+    #[staticmethod]
+    #[pyo3(signature = (path, from_index=false))]
+    pub fn load_inverse(py: Python<'_>, path: &str, from_index: bool) -> PyResult<Converter> {
+        let started = Instant::now();
+        let inverse = py
+            .allow_threads(|| {
+                let index = if from_index {
+                    ChainIndex::open(Path::new(path))
+                } else {
+                    ChainIndex::build(Path::new(path))
+                };
+                index.map(|index| index.inverse())
+            })
+            .map_err(|e| index_error(e, path))?;
+        Ok(Converter {
+            from_index,
+            inverted: true,
+            ..Converter::with_backend(Backend::Index(inverse), path, started)
+        })
+    }
+
+    /// Whether the converter lifts from the query assembly of its chainfile back to
+    /// the reference assembly
+    #[getter]
+    pub fn inverted(&self) -> bool {
+        self.inverted
+    }
+
+    /// Describe the chainfile that a loaded index was compiled from, as
+    /// (size in bytes, modification time in ns, content hash). None if the converter
+    /// was built directly from a chainfile.
+    #[getter]
+    pub fn index_source(&self) -> Option<(u64, u64, u64)> {
+        match &self.backend {
+            Backend::Index(index) => {
+                let source = index.source();
+                Some((source.len, source.mtime_ns, source.hash))
+            }
+            Backend::Machine(_) | Backend::Lazy(_) => None,
+        }
+    }
+
+    /// Estimate the memory held by the converter's chain data, in bytes.
+    ///
+    /// Block indexes report the size of their tables, whether they're held in memory
+    /// or mapped from disk. Liftover machines are estimated from the number of
+    /// chainfile lines parsed into them, so lazily-loaded converters only count the
+    /// contigs loaded so far. A block index built for sorted lifts is included.
+    pub fn chain_data_size(&self) -> usize {
+        let parsed = match &self.backend {
+            Backend::Index(index) => index.byte_len(),
+            Backend::Machine(_) => self.machine_lines * MACHINE_LINE_BYTES,
+            Backend::Lazy(lazy) => lazy.loaded_line_count() * MACHINE_LINE_BYTES,
+        };
+        let sorted = match self.sorted_index.get() {
+            Some(Ok(index)) => index.byte_len(),
+            _ => 0,
+        };
+        parsed + sorted
+    }
+
+    /// Get the number of reference contigs whose chains have been parsed, for a
+    /// lazily-loaded chainfile. None for other converters.
+    pub fn loaded_contig_count(&self) -> Option<usize> {
+        match &self.backend {
+            Backend::Lazy(lazy) => Some(lazy.loaded_contig_count()),
+            Backend::Machine(_) | Backend::Index(_) => None,
+        }
+    }
+
+    /// Whether liftover metrics are being recorded
+    #[getter]
+    pub fn metrics_enabled(&self) -> bool {
+        self.metrics.enabled()
     }
 
-    /// Perform liftover
+    /// Start or stop recording liftover metrics. Recorded values are kept either way.
+    pub fn set_metrics_enabled(&self, enabled: bool) {
+        self.metrics.set_enabled(enabled);
+    }
+
+    /// Get current metric values.
+    ///
+    /// Counters are ints. Latency histograms (``lift_latency_ns``,
+    /// ``batch_latency_ns``, and ``call_latency_ns``) are given as a list of counts
+    /// per power-of-two nanosecond bucket along with the total recorded time.
+    pub fn metrics_snapshot<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyDict>> {
+        let snapshot = PyDict::new(py);
+        for (name, value) in self.metrics.counters() {
+            snapshot.set_item(name, value)?;
+        }
+        snapshot.set_item("lift_latency_ns", self.metrics.lift_latency.snapshot())?;
+        snapshot.set_item("batch_latency_ns", self.metrics.batch_latency.snapshot())?;
+        snapshot.set_item("call_latency_ns", self.metrics.call_latency.snapshot())?;
+        Ok(snapshot)
+    }
+
+    /// Zero all recorded metrics other than load time
+    pub fn reset_metrics(&self) {
+        self.metrics.reset();
+    }
+
+    /// Record the end-to-end duration of a single-interval call made through a
+    /// wrapper, so that time spent outside of Rust can be measured
+    pub fn record_call_latency(&self, ns: u64) {
+        self.metrics.call_latency.record(Duration::from_nanos(ns));
+    }
+
+    /// Support pickling by reference: a pickled converter records only the path it
+    /// was loaded from, and is reloaded from that path when unpickled. Converters
+    /// loaded from an index memory-map it again, which is effectively free.
+    pub fn __reduce__(slf: &Bound<'_, Self>) -> PyResult<(PyObject, PyObject)> {
+        let py = slf.py();
+        let converter = slf.get();
+        if converter.path.as_os_str().is_empty() {
+            return Err(PyTypeError::new_err(
+                "Converters loaded from bytes can't be pickled",
+            ));
+        }
+        let path = converter.path.to_string_lossy().into_owned();
+        let cls = slf.get_type();
+        let (constructor, args) = match &converter.backend {
+            _ if converter.inverted => (
+                cls.getattr("load_inverse")?,
+                (path, converter.from_index).into_pyobject(py)?.into_any(),
+            ),
+            _ if converter.from_index => (
+                cls.getattr("from_index")?,
+                (path,).into_pyobject(py)?.into_any(),
+            ),
+            Backend::Lazy(_) => (cls.into_any(), (path, true).into_pyobject(py)?.into_any()),
+            Backend::Machine(_) | Backend::Index(_) => {
+                (cls.into_any(), (path, false).into_pyobject(py)?.into_any())
+            }
+        };
+        Ok((constructor.unbind(), args.unbind()))
+    }
+
+    /// Perform liftover. Runs with the GIL released.
+    ///
+    /// By default, every segment is returned: one per chain alignment block that the
+    /// interval overlaps. Lift modes reduce them during the lift:
+    ///
+    /// * ``min_match``: drop chains that map less than this fraction of the interval's
+    ///   bases (like UCSC ``liftOver -minMatch``)
+    /// * ``best_chain``: keep only the highest-scoring chain (ties go to the chain
+    ///   mapping more bases, then to the first one)
+    /// * ``merge``: merge the segments of each chain into the single span covering
+    ///   them, bridging gaps in the alignment
+    ///
+    /// Filters are applied before merging. An interval left without segments has no
+    /// liftover.
+    #[pyo3(signature = (chrom, start, end, strand, merge=false, best_chain=false, min_match=0.0))]
     pub fn lift(
         &self,
+        py: Python<'_>,
         chrom: &str,
         start: u32,
         end: u32,
         strand: &str,
-    ) -> PyResult<Vec<(String, u64, u64, String, usize)>> {
-        let parsed_strand = if strand == "+" {
-            Strand::Positive
-        } else if strand == "-" {
-            Strand::Negative
-        } else {
-            return Err(PyValueError::new_err(format!(
-                "Unrecognized strand value: \"{}\"",
-                strand
-            )));
-        };
-        let chrom_contig = Contig::try_new(chrom).map_err(|_| {
-            PyValueError::new_err(format!(
+        merge: bool,
+        best_chain: bool,
+        min_match: f64,
+    ) -> PyResult<Vec<LiftedSegment>> {
+        let parsed_strand = parse_strand(strand)?;
+        let mode = lift_mode(merge, best_chain, min_match)?;
+        match py
+            .allow_threads(|| self.lift_interval_recorded(chrom, start, end, &parsed_strand, &mode))
+        {
+            Ok(Some(segments)) => Ok(segments.into_iter().map(Segment::into_tuple).collect()),
+            Ok(None) => Err(NoLiftoverError::new_err(format!(
+                "No liftover available for \"{}\" on [\"{}\",\"{}\"]",
+                chrom, start, end
+            ))),
+            Err(LiftError::InvalidContig) => Err(PyValueError::new_err(format!(
                 "Unable to create contig from chrom name (must be nonempty): {}",
                 chrom
-            ))
-        })?;
-        let start_coordinate = Coordinate::new(chrom_contig.clone(), parsed_strand.clone(), start);
-        let end_coordinate = Coordinate::new(chrom_contig, parsed_strand.clone(), end);
-
-        let Ok(interval) = Interval::try_new(start_coordinate.clone(), end_coordinate.clone())
-        else {
-            return Err(ChainfileError::new_err(format!(
+            ))),
+            Err(LiftError::InvalidInterval) => Err(ChainfileError::new_err(format!(
                 "Chainfile yielded invalid interval from coordinates: \"{}\" (\"{}\", \"{}\")",
-                &chrom, start_coordinate, end_coordinate
-            )));
+                chrom, start, end
+            ))),
+            Err(LiftError::Chainfile(message)) => Err(ChainfileError::new_err(message)),
+        }
+    }
+
+    /// Set the refget accessions of the sequences in the source and target assemblies,
+    /// as (accession, contig name) pairs, for liftover by accession. Has no effect if
+    /// accessions are already set.
+    ///
+    /// Returns whether the accessions were set by this call.
+    pub fn set_accessions(
+        &self,
+        source: Vec<(String, String)>,
+        target: Vec<(String, String)>,
+    ) -> bool {
+        self.accessions
+            .set(AccessionTable::new(source, target))
+            .is_ok()
+    }
+
+    /// Whether refget accessions have been set (see ``set_accessions``)
+    #[getter]
+    pub fn has_accessions(&self) -> bool {
+        self.accessions.get().is_some()
+    }
+
+    /// Perform liftover of an interval on a sequence given by refget accession,
+    /// returning segments on target sequences by accession. Runs with the GIL
+    /// released.
+    ///
+    /// Segments on target contigs without a known accession are left out, as are
+    /// intervals on unknown source accessions. Lift modes are as for ``lift``, and
+    /// apply before segments are translated to accessions.
+    #[pyo3(signature = (accession, start, end, strand, merge=false, best_chain=false, min_match=0.0))]
+    pub fn lift_refget(
+        &self,
+        py: Python<'_>,
+        accession: &str,
+        start: u32,
+        end: u32,
+        strand: &str,
+        merge: bool,
+        best_chain: bool,
+        min_match: f64,
+    ) -> PyResult<Vec<LiftedSegment>> {
+        let parsed_strand = parse_strand(strand)?;
+        let mode = lift_mode(merge, best_chain, min_match)?;
+        let table = self.accession_table()?;
+        let Some(chrom) = table.source_contig(accession) else {
+            return Ok(Vec::new());
         };
-        if let Some(liftover_result) = self.machine.liftover(interval.clone()) {
-            Ok(liftover_result
-                .iter()
-                .flat_map(|chain_liftover| {
-                    chain_liftover.segments().iter().map(|segment| {
-                        (
-                            segment.query().contig().to_string(),
-                            segment.query().start().position().get(),
-                            segment.query().end().position().get(),
-                            segment.query().strand().to_string(),
-                            chain_liftover.chain().score(),
-                        )
+        match py
+            .allow_threads(|| self.lift_interval_recorded(chrom, start, end, &parsed_strand, &mode))
+        {
+            Ok(segments) => Ok(segments
+                .unwrap_or_default()
+                .into_iter()
+                .filter_map(|segment| {
+                    let id = table.target_id(&segment.contig)?;
+                    Some(Segment {
+                        contig: Cow::Borrowed(table.target_accession(id)),
+                        ..segment
                     })
                 })
-                .collect())
-        } else {
-            Err(NoLiftoverError::new_err(format!(
-                "No liftover available for \"{}\" on [\"{}\",\"{}\"]",
-                chrom, start_coordinate, end_coordinate
-            )))
+                .map(Segment::into_tuple)
+                .collect()),
+            Err(LiftError::InvalidContig) => Ok(Vec::new()),
+            Err(LiftError::InvalidInterval) => Err(ChainfileError::new_err(format!(
+                "Chainfile yielded invalid interval from coordinates: \"{}\" (\"{}\", \"{}\")",
+                accession, start, end
+            ))),
+            Err(LiftError::Chainfile(message)) => Err(ChainfileError::new_err(message)),
         }
     }
+
+    /// Lift a single base, given by its 0-based position on the positive strand,
+    /// through the ungapped alignment block containing it.
+    ///
+    /// This is a fast path for single-base variants: no interval or segments are
+    /// built. If more than one chain aligns the base, the highest-scoring chain is
+    /// used. Indexed converters look the base up without releasing the GIL, which
+    /// would cost more than the lookup itself.
+    ///
+    /// Returns the lifted base as (chrom, 0-based position, strand, score), where the
+    /// strand is that of the target relative to the source, or None if the base
+    /// doesn't lift.
+    pub fn lift_position(
+        &self,
+        py: Python<'_>,
+        chrom: &str,
+        position: u32,
+    ) -> PyResult<Option<LiftedBase>> {
+        let lift = || {
+            if !self.metrics.enabled() {
+                return self.lift_base(None, chrom, position);
+            }
+            let started = Instant::now();
+            let result = self.lift_base(None, chrom, position);
+            let mut counts = Counts::default();
+            match &result {
+                Ok(segment) => counts.lifted(usize::from(segment.is_some())),
+                Err(_) => counts.failed(),
+            }
+            self.metrics.record_single(&counts, started.elapsed());
+            result
+        };
+        let result = match &self.backend {
+            Backend::Index(_) => lift(),
+            Backend::Machine(_) | Backend::Lazy(_) => py.allow_threads(lift),
+        };
+        match result {
+            Ok(segment) => Ok(segment.map(Segment::into_base)),
+            Err(LiftError::InvalidContig) => Err(PyValueError::new_err(format!(
+                "Unable to create contig from chrom name (must be nonempty): {}",
+                chrom
+            ))),
+            Err(LiftError::InvalidInterval) => Err(PyOverflowError::new_err(format!(
+                "Position {} is too large to lift",
+                position
+            ))),
+            Err(LiftError::Chainfile(message)) => Err(ChainfileError::new_err(message)),
+        }
+    }
+
+    /// Lift a batch of single bases, as with ``lift_position``, returning
+    /// array-backed output as for ``lift_many_arrays``.
+    ///
+    /// ``positions`` may be any sequence of ints or an integer buffer (e.g. a NumPy
+    /// array), and must be the same length as ``chroms``. Each base that lifts has
+    /// one row of output, as a one-base segment; bases that don't lift, or are on an
+    /// invalid contig, are absent. If ``sorted_input`` is true, bases are lifted by
+    /// walking a cursor through the chain blocks, as for ``lift_many``. Runs with the
+    /// GIL released.
+    #[pyo3(signature = (chroms, positions, sorted_input=false))]
+    pub fn lift_positions<'py>(
+        &self,
+        py: Python<'py>,
+        chroms: Vec<String>,
+        positions: &Bound<'_, PyAny>,
+        sorted_input: bool,
+    ) -> PyResult<LiftManyArrays<'py>> {
+        let positions = extract_positions(positions)?;
+        if positions.len() != chroms.len() {
+            return Err(PyValueError::new_err(
+                "Input columns must all be the same length",
+            ));
+        }
+        let arrays = py.allow_threads(|| {
+            let started = self.metrics.enabled().then(Instant::now);
+            let mut counts = Counts::default();
+            let mut cursor = SortedCursor::default();
+            let mut arrays = SegmentArrays::default();
+            for (i, (chrom, &position)) in chroms.iter().zip(&positions).enumerate() {
+                let cursor = sorted_input.then_some(&mut cursor);
+                match self.lift_base(cursor, chrom, position) {
+                    Ok(Some(segment)) => {
+                        counts.lifted(1);
+                        arrays.push(i, segment);
+                    }
+                    Ok(None) => counts.lifted(0),
+                    Err(LiftError::InvalidContig) => counts.failed(),
+                    Err(LiftError::InvalidInterval) => {
+                        return Err(PyOverflowError::new_err(format!(
+                            "Position {} at index {} is too large to lift",
+                            position, i
+                        )))
+                    }
+                    Err(LiftError::Chainfile(message)) => {
+                        return Err(ChainfileError::new_err(message))
+                    }
+                }
+            }
+            if let Some(started) = started {
+                self.metrics.record_batch(&counts, started.elapsed());
+            }
+            Ok(arrays)
+        })?;
+        Ok(arrays.into_columns(py))
+    }
+
+    /// Perform liftover for a batch of intervals
+    ///
+    /// Input columns must all be the same length. ``starts`` and ``ends`` may be any
+    /// sequence of ints or an integer buffer (e.g. a NumPy array); ``strands`` defaults
+    /// to the positive strand. The liftover loop runs with the GIL released.
+    ///
+    /// If ``sorted_input`` is true, intervals are expected to be sorted by contig and
+    /// start position, and are lifted by walking a cursor forward through the chain
+    /// blocks instead of searching for each interval independently. Out-of-order
+    /// intervals are detected and looked up normally, so results are the same either
+    /// way.
+    ///
+    /// Lift modes (``merge``, ``best_chain``, and ``min_match``) are as for ``lift``,
+    /// and apply to each interval.
+    ///
+    /// Returns columnar output, one entry per lifted segment, along with the index of
+    /// the input interval each segment came from. Intervals without a liftover are
+    /// simply absent from the output.
+    #[pyo3(signature = (chroms, starts, ends, strands=None, sorted_input=false, merge=false, best_chain=false, min_match=0.0))]
+    pub fn lift_many(
+        &self,
+        py: Python<'_>,
+        chroms: Vec<String>,
+        starts: &Bound<'_, PyAny>,
+        ends: &Bound<'_, PyAny>,
+        strands: Option<Vec<String>>,
+        sorted_input: bool,
+        merge: bool,
+        best_chain: bool,
+        min_match: f64,
+    ) -> PyResult<LiftManyColumns> {
+        let (starts, ends, strands) = batch_columns(&chroms, starts, ends, strands)?;
+        let mode = lift_mode(merge, best_chain, min_match)?;
+        py.allow_threads(|| {
+            let mut columns = LiftManyColumns::default();
+            self.lift_batch(
+                chroms.len(),
+                |i| {
+                    Ok(Some((
+                        chroms[i].as_str(),
+                        starts[i],
+                        ends[i],
+                        strands[i].clone(),
+                    )))
+                },
+                sorted_input,
+                &mode,
+                |i, segment| {
+                    let (chrom, start, end, strand, score) = segment.into_tuple();
+                    columns.0.push(i);
+                    columns.1.push(chrom);
+                    columns.2.push(start);
+                    columns.3.push(end);
+                    columns.4.push(strand);
+                    columns.5.push(score);
+                },
+            )?;
+            Ok(columns)
+        })
+    }
+
+    /// Perform liftover for a batch of intervals, returning array-backed output.
+    ///
+    /// Arguments are as for ``lift_many``. Output has one row per lifted segment, like
+    /// ``lift_many``, but contig names are interned: a table of distinct names is
+    /// returned along with columns of fixed-width integers, each as a bytes object in
+    /// native byte order (input index: int64, contig ID into the name table: int32,
+    /// start: int64, end: int64, strand as +1/-1: int8, score: int64). Bytes support
+    /// the buffer protocol, so they can be wrapped by NumPy or Arrow without copying.
+    #[pyo3(signature = (chroms, starts, ends, strands=None, sorted_input=false, merge=false, best_chain=false, min_match=0.0))]
+    pub fn lift_many_arrays<'py>(
+        &self,
+        py: Python<'py>,
+        chroms: Vec<String>,
+        starts: &Bound<'_, PyAny>,
+        ends: &Bound<'_, PyAny>,
+        strands: Option<Vec<String>>,
+        sorted_input: bool,
+        merge: bool,
+        best_chain: bool,
+        min_match: f64,
+    ) -> PyResult<LiftManyArrays<'py>> {
+        let (starts, ends, strands) = batch_columns(&chroms, starts, ends, strands)?;
+        let mode = lift_mode(merge, best_chain, min_match)?;
+        let arrays = py.allow_threads(|| {
+            let mut arrays = SegmentArrays::default();
+            self.lift_batch(
+                chroms.len(),
+                |i| {
+                    Ok(Some((
+                        chroms[i].as_str(),
+                        starts[i],
+                        ends[i],
+                        strands[i].clone(),
+                    )))
+                },
+                sorted_input,
+                &mode,
+                |i, segment| arrays.push(i, segment),
+            )?;
+            Ok::<_, PyErr>(arrays)
+        })?;
+        Ok(arrays.into_columns(py))
+    }
+
+    /// Perform liftover for columns of an Arrow table or similar, given as buffers.
+    ///
+    /// Chromosomes are given dictionary-encoded, as ``contig_names`` and a buffer of
+    /// int32 codes into it; a negative code marks a row with missing values, which is
+    /// treated as unmapped. ``starts`` and ``ends`` are int64 buffers, and ``strands``
+    /// an optional int8 buffer of +1/-1 (positive by default). Buffers are copied
+    /// before the GIL is released, one pass each, so liftover never reads memory
+    /// that Python code could change or free. Lift modes are as for ``lift``.
+    ///
+    /// Returns output as for ``lift_many_arrays``, along with int64 offsets (as
+    /// bytes) of each input row's first segment, followed by the total number of
+    /// segments.
+    #[pyo3(signature = (contig_names, contigs, starts, ends, strands=None, sorted_input=false, merge=false, best_chain=false, min_match=0.0))]
+    pub fn lift_columns<'py>(
+        &self,
+        py: Python<'py>,
+        contig_names: Vec<String>,
+        contigs: PyBuffer<i32>,
+        starts: PyBuffer<i64>,
+        ends: PyBuffer<i64>,
+        strands: Option<PyBuffer<i8>>,
+        sorted_input: bool,
+        merge: bool,
+        best_chain: bool,
+        min_match: f64,
+    ) -> PyResult<(LiftManyArrays<'py>, Bound<'py, PyBytes>)> {
+        let mode = lift_mode(merge, best_chain, min_match)?;
+        let contigs = buffer_column(py, &contigs)?;
+        let starts = buffer_column(py, &starts)?;
+        let ends = buffer_column(py, &ends)?;
+        let strands = strands
+            .map(|strands| buffer_column(py, &strands))
+            .transpose()?;
+        if starts.len() != contigs.len()
+            || ends.len() != contigs.len()
+            || strands.as_ref().is_some_and(|s| s.len() != contigs.len())
+        {
+            return Err(PyValueError::new_err(
+                "Input columns must all be the same length",
+            ));
+        }
+        let (arrays, offsets) = py.allow_threads(|| {
+            let mut arrays = SegmentArrays::default();
+            self.lift_batch(
+                contigs.len(),
+                |i| {
+                    let Ok(code) = usize::try_from(contigs[i]) else {
+                        return Ok(None);
+                    };
+                    let Some(chrom) = contig_names.get(code) else {
+                        return Err(PyValueError::new_err(format!(
+                            "Invalid chromosome code at index {}: {}",
+                            i, code
+                        )));
+                    };
+                    let strand = match strands.as_ref().map_or(1, |s| s[i]) {
+                        1 => Strand::Positive,
+                        -1 => Strand::Negative,
+                        other => {
+                            return Err(PyValueError::new_err(format!(
+                                "Unrecognized strand value at index {}: {}",
+                                i, other
+                            )))
+                        }
+                    };
+                    Ok(Some((
+                        chrom.as_str(),
+                        table_position(starts[i])?,
+                        table_position(ends[i])?,
+                        strand,
+                    )))
+                },
+                sorted_input,
+                &mode,
+                |i, segment| arrays.push(i, segment),
+            )?;
+            let offsets = arrays.offsets(contigs.len());
+            Ok::<_, PyErr>((arrays, offsets))
+        })?;
+        Ok((arrays.into_columns(py), column_bytes(py, &offsets)))
+    }
+
+    /// Perform liftover for a batch of intervals on sequences given by refget
+    /// accession, returning array-backed output as for ``lift_many_arrays``.
+    ///
+    /// Arguments are as for ``lift_many``, with accessions in place of chromosome
+    /// names. The name table of the output is every target accession (see
+    /// ``set_accessions``), in a fixed order, so segment contig IDs are accession IDs.
+    /// Segments on target contigs without a known accession are left out, as are
+    /// intervals on unknown source accessions.
+    #[pyo3(signature = (accessions, starts, ends, strands=None, sorted_input=false, merge=false, best_chain=false, min_match=0.0))]
+    pub fn lift_refget_many<'py>(
+        &self,
+        py: Python<'py>,
+        accessions: Vec<String>,
+        starts: &Bound<'_, PyAny>,
+        ends: &Bound<'_, PyAny>,
+        strands: Option<Vec<String>>,
+        sorted_input: bool,
+        merge: bool,
+        best_chain: bool,
+        min_match: f64,
+    ) -> PyResult<LiftManyArrays<'py>> {
+        let table = self.accession_table()?;
+        let (starts, ends, strands) = batch_columns(&accessions, starts, ends, strands)?;
+        let mode = lift_mode(merge, best_chain, min_match)?;
+        let arrays = py.allow_threads(|| {
+            let mut arrays = SegmentArrays::with_names(table.target_accessions().to_vec());
+            self.lift_batch(
+                accessions.len(),
+                |i| {
+                    Ok(table
+                        .source_contig(&accessions[i])
+                        .map(|chrom| (chrom, starts[i], ends[i], strands[i].clone())))
+                },
+                sorted_input,
+                &mode,
+                |i, segment| {
+                    if let Some(id) = table.target_id(&segment.contig) {
+                        arrays.push_id(i, id as i32, segment);
+                    }
+                },
+            )?;
+            Ok::<_, PyErr>(arrays)
+        })?;
+        Ok(arrays.into_columns(py))
+    }
+}
+
+/// Compile a chainfile into a binary index, to be loaded with ``Converter.from_index``.
+///
+/// The index is written to a temporary file and atomically moved into place.
+#[pyfunction]
+fn compile_index(py: Python<'_>, chainfile_path: &str, index_path: &str) -> PyResult<()> {
+    py.allow_threads(|| ChainIndex::compile(Path::new(chainfile_path), Path::new(index_path)))
+        .map_err(|e| index_error(e, chainfile_path))
+}
+
+/// Compose two chainfiles into one, where the query assembly of the first is the
+/// reference assembly of the second. The composed chainfile lifts directly from the
+/// reference assembly of the first to the query assembly of the second.
+///
+/// The output is written to a temporary file and atomically moved into place.
+#[pyfunction]
+fn compose_chainfiles(
+    py: Python<'_>,
+    first_path: &str,
+    second_path: &str,
+    output_path: &str,
+) -> PyResult<()> {
+    py.allow_threads(|| {
+        let first = compression::open(Path::new(first_path))
+            .map_err(IndexError::from)
+            .and_then(ChainData::parse)
+            .map_err(|e| index_error(e, first_path))?
+            .0;
+        let second =
+            ChainIndex::build(Path::new(second_path)).map_err(|e| index_error(e, second_path))?;
+        compose::compose(&first, &second, Path::new(output_path))
+            .map_err(|e| index_error(IndexError::from(e), output_path))
+    })
 }
 
 /// agct._core Python module. Collect Python-facing methods.
@@ -103,6 +1475,8 @@ impl Converter {
 #[pyo3(name = "_core")]
 fn agct(_py: Python<'_>, m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<Converter>()?;
+    m.add_function(wrap_pyfunction!(compile_index, m)?)?;
+    m.add_function(wrap_pyfunction!(compose_chainfiles, m)?)?;
     m.add("NoLiftoverError", _py.get_type::<NoLiftoverError>())?;
     m.add("ChainfileError", _py.get_type::<ChainfileError>())?;
     m.add("StrandValueError", _py.get_type::<StrandValueError>())?;
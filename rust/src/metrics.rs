@@ -0,0 +1,195 @@
+//! Liftover instrumentation.
+//!
+//! Counters and latency histograms are plain atomics updated with relaxed ordering,
+//! so recording never blocks and a converter can be shared freely between threads.
+//! Everything is gated on a single flag: when metrics are disabled, the only cost
+//! per call is one atomic load.
+use std::sync::atomic::{AtomicBool, AtomicU64, Ordering};
+use std::time::Duration;
+
+/// Number of histogram buckets. Bucket ``i`` counts durations in
+/// ``[2^i, 2^(i+1))`` nanoseconds (bucket 0 also counts 0 ns); the last bucket
+/// collects everything longer.
+pub const BUCKETS: usize = 48;
+
+/// Histogram of durations with power-of-two nanosecond buckets
+pub struct Histogram {
+    buckets: [AtomicU64; BUCKETS],
+    total_ns: AtomicU64,
+}
+
+impl Default for Histogram {
+    fn default() -> Self {
+        Histogram {
+            buckets: std::array::from_fn(|_| AtomicU64::new(0)),
+            total_ns: AtomicU64::new(0),
+        }
+    }
+}
+
+impl Histogram {
+    /// Record a duration
+    pub fn record(&self, duration: Duration) {
+        let ns = u64::try_from(duration.as_nanos()).unwrap_or(u64::MAX);
+        let bucket = (ns.max(1).ilog2() as usize).min(BUCKETS - 1);
+        self.buckets[bucket].fetch_add(1, Ordering::Relaxed);
+        self.total_ns.fetch_add(ns, Ordering::Relaxed);
+    }
+
+    /// Get bucket counts and the sum of all recorded durations in ns
+    pub fn snapshot(&self) -> (Vec<u64>, u64) {
+        (
+            self.buckets
+                .iter()
+                .map(|bucket| bucket.load(Ordering::Relaxed))
+                .collect(),
+            self.total_ns.load(Ordering::Relaxed),
+        )
+    }
+
+    fn reset(&self) {
+        for bucket in &self.buckets {
+            bucket.store(0, Ordering::Relaxed);
+        }
+        self.total_ns.store(0, Ordering::Relaxed);
+    }
+}
+
+/// Outcome counts for a set of lifted intervals
+#[derive(Clone, Copy, Debug, Default)]
+pub struct Counts {
+    /// Intervals lifted
+    pub intervals: u64,
+    /// Intervals that lifted to at least one segment
+    pub mapped: u64,
+    /// Intervals with no liftover
+    pub unmapped: u64,
+    /// Intervals that lifted to more than one segment
+    pub multi_segment: u64,
+    /// Segments returned
+    pub segments: u64,
+    /// Intervals that couldn't be lifted because of invalid input or chain data
+    pub errors: u64,
+}
+
+impl Counts {
+    /// Count an interval that lifted to ``segments`` segments
+    pub fn lifted(&mut self, segments: usize) {
+        self.intervals += 1;
+        self.segments += segments as u64;
+        if segments == 0 {
+            self.unmapped += 1;
+        } else {
+            self.mapped += 1;
+            if segments > 1 {
+                self.multi_segment += 1;
+            }
+        }
+    }
+
+    /// Count an interval that couldn't be lifted
+    pub fn failed(&mut self) {
+        self.intervals += 1;
+        self.errors += 1;
+    }
+}
+
+/// Liftover metrics for one converter
+#[derive(Default)]
+pub struct Metrics {
+    enabled: AtomicBool,
+    load_time_ns: AtomicU64,
+    single_calls: AtomicU64,
+    batch_calls: AtomicU64,
+    intervals: AtomicU64,
+    mapped: AtomicU64,
+    unmapped: AtomicU64,
+    multi_segment: AtomicU64,
+    segments: AtomicU64,
+    errors: AtomicU64,
+    /// Time spent in Rust per single-interval lift
+    pub lift_latency: Histogram,
+    /// Time spent in Rust per batch lift
+    pub batch_latency: Histogram,
+    /// End-to-end time per single-interval call, as reported by the Python wrapper
+    pub call_latency: Histogram,
+}
+
+impl Metrics {
+    /// Create metrics for a converter that took ``load_time`` to load
+    pub fn new(load_time: Duration) -> Metrics {
+        let metrics = Metrics::default();
+        metrics.load_time_ns.store(
+            u64::try_from(load_time.as_nanos()).unwrap_or(u64::MAX),
+            Ordering::Relaxed,
+        );
+        metrics
+    }
+
+    pub fn enabled(&self) -> bool {
+        self.enabled.load(Ordering::Relaxed)
+    }
+
+    pub fn set_enabled(&self, enabled: bool) {
+        self.enabled.store(enabled, Ordering::Relaxed);
+    }
+
+    /// Record a single-interval lift
+    pub fn record_single(&self, counts: &Counts, duration: Duration) {
+        self.single_calls.fetch_add(1, Ordering::Relaxed);
+        self.add_counts(counts);
+        self.lift_latency.record(duration);
+    }
+
+    /// Record a batch lift
+    pub fn record_batch(&self, counts: &Counts, duration: Duration) {
+        self.batch_calls.fetch_add(1, Ordering::Relaxed);
+        self.add_counts(counts);
+        self.batch_latency.record(duration);
+    }
+
+    fn add_counts(&self, counts: &Counts) {
+        self.intervals
+            .fetch_add(counts.intervals, Ordering::Relaxed);
+        self.mapped.fetch_add(counts.mapped, Ordering::Relaxed);
+        self.unmapped.fetch_add(counts.unmapped, Ordering::Relaxed);
+        self.multi_segment
+            .fetch_add(counts.multi_segment, Ordering::Relaxed);
+        self.segments.fetch_add(counts.segments, Ordering::Relaxed);
+        self.errors.fetch_add(counts.errors, Ordering::Relaxed);
+    }
+
+    /// Get named counter values
+    pub fn counters(&self) -> [(&'static str, u64); 9] {
+        [
+            ("load_time_ns", self.load_time_ns.load(Ordering::Relaxed)),
+            ("single_calls", self.single_calls.load(Ordering::Relaxed)),
+            ("batch_calls", self.batch_calls.load(Ordering::Relaxed)),
+            ("intervals", self.intervals.load(Ordering::Relaxed)),
+            ("mapped", self.mapped.load(Ordering::Relaxed)),
+            ("unmapped", self.unmapped.load(Ordering::Relaxed)),
+            ("multi_segment", self.multi_segment.load(Ordering::Relaxed)),
+            ("segments", self.segments.load(Ordering::Relaxed)),
+            ("errors", self.errors.load(Ordering::Relaxed)),
+        ]
+    }
+
+    /// Zero all counters and histograms, except load time
+    pub fn reset(&self) {
+        for counter in [
+            &self.single_calls,
+            &self.batch_calls,
+            &self.intervals,
+            &self.mapped,
+            &self.unmapped,
+            &self.multi_segment,
+            &self.segments,
+            &self.errors,
+        ] {
+            counter.store(0, Ordering::Relaxed);
+        }
+        self.lift_latency.reset();
+        self.batch_latency.reset();
+        self.call_latency.reset();
+    }
+}
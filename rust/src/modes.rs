@@ -0,0 +1,114 @@
+//! Lift modes, which reduce the segments of a lifted interval before they're returned.
+//!
+//! Liftover yields one segment per alignment block that an interval overlaps, grouped
+//! by chain. Modes filter chains by how much of the interval they map (like UCSC
+//! ``liftOver -minMatch``), keep only the best chain, or merge each chain's segments
+//! into one span, so that only the final answer is converted into Python objects.
+use crate::Segment;
+
+/// How the segments of a lifted interval are reduced. The default returns every
+/// segment as-is.
+#[derive(Clone, Copy, Debug, Default)]
+pub struct LiftMode {
+    /// Merge the segments of each chain into a single span
+    pub merge: bool,
+    /// Keep only the chain with the highest score
+    pub best_chain: bool,
+    /// Minimum fraction of the interval's length that a chain must map to be kept
+    pub min_match: f64,
+}
+
+impl LiftMode {
+    /// Whether segments are returned as-is
+    pub fn is_raw(&self) -> bool {
+        !self.merge && !self.best_chain && self.min_match <= 0.0
+    }
+
+    /// Reduce the segments of an interval of ``query_len`` bases, which must be
+    /// grouped by chain
+    pub fn apply<'a>(&self, segments: Vec<Segment<'a>>, query_len: u64) -> Vec<Segment<'a>> {
+        if self.is_raw() {
+            return segments;
+        }
+        let mut chains = chain_ranges(&segments);
+        chains.retain(|chain| mapped_fraction(chain.mapped, query_len) >= self.min_match);
+        if self.best_chain {
+            // highest score, then most bases mapped; ties go to the earlier chain
+            chains = chains
+                .into_iter()
+                .reduce(|best, chain| {
+                    let key = |c: &ChainRange| (segments[c.first].score, c.mapped);
+                    if key(&chain) > key(&best) {
+                        chain
+                    } else {
+                        best
+                    }
+                })
+                .into_iter()
+                .collect();
+        }
+        let mut segments: Vec<Option<Segment<'a>>> = segments.into_iter().map(Some).collect();
+        let mut reduced = Vec::new();
+        for chain in chains {
+            let chain_segments = segments[chain.first..chain.end]
+                .iter_mut()
+                .filter_map(Option::take);
+            if self.merge {
+                reduced.extend(chain_segments.reduce(merge));
+            } else {
+                reduced.extend(chain_segments);
+            }
+        }
+        reduced
+    }
+}
+
+/// Segments of an interval that come from one chain
+struct ChainRange {
+    first: usize,
+    end: usize,
+    /// Number of interval bases the chain maps
+    mapped: u64,
+}
+
+/// Find the range of each chain's segments
+fn chain_ranges(segments: &[Segment<'_>]) -> Vec<ChainRange> {
+    let mut chains: Vec<ChainRange> = Vec::new();
+    for (i, segment) in segments.iter().enumerate() {
+        let len = segment.start.abs_diff(segment.end);
+        match chains.last_mut() {
+            Some(chain) if segments[chain.first].chain == segment.chain => {
+                chain.end = i + 1;
+                chain.mapped += len;
+            }
+            _ => chains.push(ChainRange {
+                first: i,
+                end: i + 1,
+                mapped: len,
+            }),
+        }
+    }
+    chains
+}
+
+/// Get the fraction of an interval's bases that are mapped. Zero-length intervals
+/// (e.g. insertion points) are fully mapped by any chain that lifts them.
+fn mapped_fraction(mapped: u64, query_len: u64) -> f64 {
+    if query_len == 0 {
+        1.0
+    } else {
+        mapped as f64 / query_len as f64
+    }
+}
+
+/// Merge two segments of the same chain into the span covering both
+fn merge<'a>(span: Segment<'a>, segment: Segment<'a>) -> Segment<'a> {
+    let lower = span.start.min(span.end).min(segment.start.min(segment.end));
+    let upper = span.start.max(span.end).max(segment.start.max(segment.end));
+    let (start, end) = if span.positive {
+        (lower, upper)
+    } else {
+        (upper, lower)
+    };
+    Segment { start, end, ..span }
+}
@@ -1,18 +1,55 @@
 """Provide fast liftover in Python via the ``chainfile`` crate."""
 
-from agct.converter import Converter, LiftoverResult, Strand, get_converter
+from agct.converter import (
+    BatchLiftoverResult,
+    CacheInfo,
+    Converter,
+    ConverterRegistry,
+    LiftedPosition,
+    LiftoverArrays,
+    LiftoverResult,
+    RegistryInfo,
+    RoundTripResult,
+    Strand,
+    compile_index,
+    compose_chainfiles,
+    find_assembly_path,
+    get_converter,
+    get_registry,
+    prefetch_chainfiles,
+)
 from agct.seqref_registry import (
     Assembly,
+    SequenceInfo,
+    SequenceRegistry,
+    get_assembly_refget_ids,
     get_refget_id_from_seqinfo,
     get_seqinfo_from_refget_id,
+    get_sequence_registry,
 )
 
 __all__ = [
     "Assembly",
+    "BatchLiftoverResult",
+    "CacheInfo",
     "Converter",
+    "ConverterRegistry",
+    "LiftedPosition",
+    "LiftoverArrays",
     "LiftoverResult",
+    "RegistryInfo",
+    "RoundTripResult",
+    "SequenceInfo",
+    "SequenceRegistry",
     "Strand",
+    "compile_index",
+    "compose_chainfiles",
+    "find_assembly_path",
+    "get_assembly_refget_ids",
     "get_converter",
     "get_refget_id_from_seqinfo",
+    "get_registry",
     "get_seqinfo_from_refget_id",
+    "get_sequence_registry",
+    "prefetch_chainfiles",
 ]
@@ -0,0 +1,242 @@
+"""Provide an asyncio interface to liftover.
+
+Single-interval requests made concurrently from the event loop are collected over a
+short window and lifted together in one batch call, which runs in an executor
+thread with the GIL released, so the loop is never blocked on liftover.
+"""
+
+import asyncio
+from collections.abc import Sequence
+from concurrent.futures import Executor
+from functools import partial
+from typing import NamedTuple
+
+from agct.converter import (
+    BatchLiftoverResult,
+    Converter,
+    LiftoverResult,
+    Strand,
+    get_converter,
+)
+from agct.seqref_registry import Assembly
+
+DEFAULT_WINDOW = 0.001
+DEFAULT_MAX_BATCH_SIZE = 10_000
+
+_MAX_POSITION = 2**32 - 1
+
+
+class _Request(NamedTuple):
+    """A pending single-interval request"""
+
+    chrom: str
+    start: int
+    end: int
+    strand: Strand
+    future: asyncio.Future[list[LiftoverResult]]
+
+
+class AsyncConverter:
+    """Asyncio facade over a :py:class:`~agct.converter.Converter`.
+
+    Concurrent :py:meth:`convert_coordinate` calls are micro-batched: the first
+    request opens a window of ``window`` seconds, and everything requested before it
+    closes (or before ``max_batch_size`` requests accumulate) is lifted in a single
+    :py:meth:`Converter.convert_coordinates() <agct.converter.Converter.convert_coordinates>`
+    call in an executor thread.
+
+    .. code-block:: pycon
+
+       >>> from agct import Assembly
+       >>> from agct.aio import AsyncConverter
+       >>> converter = await AsyncConverter.create(Assembly.HG19, Assembly.HG38)
+       >>> await converter.convert_coordinate("chr7", 140453136, 140453137)
+       [LiftoverResult(chrom='chr7', start=140753336, end=140753337, strand=<Strand.POSITIVE: '+'>, score=14633688187)]
+
+    An instance should only be used from one event loop.
+    """
+
+    def __init__(
+        self,
+        converter: Converter,
+        window: float = DEFAULT_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        executor: Executor | None = None,
+    ) -> None:
+        """Wrap a converter.
+
+        :param converter: converter to lift with
+        :param window: seconds to wait for more requests before lifting a batch
+        :param max_batch_size: number of pending requests that triggers a batch
+            immediately
+        :param executor: executor to run batches in (the event loop's default
+            executor if not given)
+        :raise ValueError: if ``window`` is negative or ``max_batch_size`` isn't
+            positive
+        """
+        if window < 0:
+            msg = f"`window` must be non-negative, got {window}"
+            raise ValueError(msg)
+        if max_batch_size < 1:
+            msg = f"`max_batch_size` must be positive, got {max_batch_size}"
+            raise ValueError(msg)
+        self.converter = converter
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._executor = executor
+        self._pending: list[_Request] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @classmethod
+    async def create(
+        cls,
+        from_assembly: Assembly | None = None,
+        to_assembly: Assembly | None = None,
+        chainfile: str | None = None,
+        window: float = DEFAULT_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        executor: Executor | None = None,
+        **kwargs,
+    ) -> "AsyncConverter":
+        """Construct a converter without blocking the event loop.
+
+        Chainfile download and loading run in ``executor``. Arguments are as for
+        :py:class:`~agct.converter.Converter` and :py:meth:`__init__`.
+
+        :return: async converter
+        """
+        loop = asyncio.get_running_loop()
+        converter = await loop.run_in_executor(
+            executor,
+            partial(
+                Converter,
+                from_assembly=from_assembly,
+                to_assembly=to_assembly,
+                chainfile=chainfile,
+                **kwargs,
+            ),
+        )
+        return cls(converter, window, max_batch_size, executor)
+
+    async def convert_coordinate(
+        self, chrom: str, start: int, end: int, strand: Strand = Strand.POSITIVE
+    ) -> list[LiftoverResult]:
+        """Perform liftover for given params, batched with concurrent requests.
+
+        Arguments and results are as for
+        :py:meth:`Converter.convert_coordinate() <agct.converter.Converter.convert_coordinate>`,
+        except that results aren't cached.
+
+        :param chrom: chromosome name as given in chainfile
+        :param start: start position of coordinate interval (inter-residue)
+        :param end: end position of coordinate interval (inter-residue)
+        :param strand: query strand (``"+"`` by default)
+        :return: list of coordinate matches (possibly empty)
+        :raise ValueError: if ``start`` and ``end`` are inconsistent with
+            ``strand``, or a position is too large to represent as a 32 bit unsigned
+            int
+        """
+        # validate up front, so that a bad request can't fail the whole batch
+        if start < end and strand == Strand.NEGATIVE:
+            msg = f"`start` must be less than `end` on the negative strand: {start=}, {end=}"
+            raise ValueError(msg)
+        if start > end and strand == Strand.POSITIVE:
+            msg = f"`end` must be less than `start` on the positive strand: {start=}, {end=}"
+            raise ValueError(msg)
+        if not (0 <= start <= _MAX_POSITION and 0 <= end <= _MAX_POSITION):
+            msg = f"Coordinates exceed representable bounds of a 32 bit unsigned int: {start=}, {end=} -- this is unsupported"
+            raise ValueError(msg)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(_Request(chrom, start, end, Strand(strand), future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await future
+
+    async def convert_coordinates(
+        self,
+        chroms: Sequence[str],
+        starts: Sequence[int],
+        ends: Sequence[int],
+        strands: Sequence[Strand] | None = None,
+        sorted_input: bool = False,
+    ) -> BatchLiftoverResult:
+        """Perform liftover for a batch of intervals in an executor thread.
+
+        Arguments and results are as for
+        :py:meth:`Converter.convert_coordinates() <agct.converter.Converter.convert_coordinates>`.
+
+        :return: columnar liftover results
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            partial(
+                self.converter.convert_coordinates,
+                chroms,
+                starts,
+                ends,
+                strands,
+                sorted_input=sorted_input,
+            ),
+        )
+
+    def _flush(self) -> None:
+        """Start lifting all pending requests as a batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        requests, self._pending = self._pending, []
+        if requests:
+            task = asyncio.get_running_loop().create_task(self._lift(requests))
+            # keep a reference until the task finishes
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _lift(self, requests: list[_Request]) -> None:
+        """Lift a batch of requests and resolve their futures."""
+        try:
+            result = await self.convert_coordinates(
+                [request.chrom for request in requests],
+                [request.start for request in requests],
+                [request.end for request in requests],
+                [request.strand for request in requests],
+            )
+        except Exception as e:
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        results: list[list[LiftoverResult]] = [[] for _ in requests]
+        for i, chrom, start, end, strand, score in zip(*result, strict=True):
+            results[i].append(LiftoverResult(chrom, start, end, Strand(strand), score))
+        for request, request_results in zip(requests, results, strict=True):
+            if not request.future.done():
+                request.future.set_result(request_results)
+
+
+async def aget_converter(
+    from_assembly: Assembly,
+    to_assembly: Assembly,
+    use_index: bool = False,
+    executor: Executor | None = None,
+) -> Converter:
+    """Get the shared converter from
+    :py:func:`~agct.converter.get_converter` without blocking the event loop.
+
+    :param from_assembly: Name of assembly being lifted over from
+    :param to_assembly: Name of assembly to lift over to
+    :param use_index: whether to load chain data from a precompiled binary index
+    :param executor: executor to load the converter in (the event loop's default
+        executor if not given)
+    :return: Converter instance
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, partial(get_converter, from_assembly, to_assembly, use_index)
+    )
@@ -0,0 +1,238 @@
+"""Provide command-line interface to agct."""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from agct.converter import Converter, prefetch_chainfiles
+from agct.pipeline import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_BUFFER_SIZE,
+    FileFormat,
+    lift_file,
+)
+from agct.seqref_registry import Assembly
+
+
+def _get_default_unmapped_path(output_file: Path) -> Path:
+    """Derive unmapped output path from converted output path, e.g.
+    ``out.bed.gz`` -> ``out.unmapped.bed.gz``
+    """
+    name = output_file.name
+    base, _, suffixes = name.partition(".")
+    unmapped_name = f"{base}.unmapped.{suffixes}" if suffixes else f"{base}.unmapped"
+    return output_file.with_name(unmapped_name)
+
+
+def _build_converter(args: argparse.Namespace) -> Converter:
+    """Construct converter from shared CLI args."""
+    return Converter(
+        from_assembly=args.from_assembly,
+        to_assembly=args.to_assembly,
+        chainfile=args.chainfile,
+        use_index=args.use_index,
+        via=args.via,
+    )
+
+
+def _add_converter_args(parser: argparse.ArgumentParser) -> None:
+    """Add args for constructing a converter."""
+    parser.add_argument(
+        "--from",
+        dest="from_assembly",
+        type=Assembly,
+        choices=list(Assembly),
+        help="assembly to lift over from",
+    )
+    parser.add_argument(
+        "--to",
+        dest="to_assembly",
+        type=Assembly,
+        choices=list(Assembly),
+        help="assembly to lift over to",
+    )
+    parser.add_argument(
+        "--via",
+        action="append",
+        type=Assembly,
+        choices=list(Assembly),
+        help="intermediate assembly to lift through (repeat for a longer path; found automatically if not given)",
+    )
+    parser.add_argument(
+        "--chainfile", help="path to chainfile (overrides --from and --to)"
+    )
+    parser.add_argument(
+        "--use-index",
+        action="store_true",
+        help="load chain data from a precompiled binary index",
+    )
+
+
+def _lift(args: argparse.Namespace) -> int:
+    """Run file liftover."""
+    converter = _build_converter(args)
+    unmapped = args.unmapped or _get_default_unmapped_path(args.output)
+    stats = lift_file(
+        converter,
+        args.input,
+        args.output,
+        unmapped,
+        file_format=args.format,
+        batch_size=args.batch_size,
+        buffer_size=args.buffer_size,
+        chrom_col=args.chrom_col,
+        start_col=args.start_col,
+        end_col=args.end_col,
+        one_based=args.one_based,
+        processes=args.processes,
+        sort_output=args.sort,
+        sorted_input=args.sorted_input,
+    )
+    print(  # noqa: T201
+        f"Converted {stats.converted} records, {stats.unmapped} unmapped (see {unmapped})",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _assembly_pair(value: str) -> tuple[Assembly, Assembly]:
+    """Parse a ``FROM:TO`` assembly pair."""
+    from_assembly, _, to_assembly = value.partition(":")
+    try:
+        return Assembly(from_assembly), Assembly(to_assembly)
+    except ValueError as e:
+        msg = f"invalid assembly pair: {value!r} (expected e.g. hg19:hg38)"
+        raise argparse.ArgumentTypeError(msg) from e
+
+
+def _prefetch(args: argparse.Namespace) -> int:
+    """Acquire chainfiles ahead of time."""
+    chainfiles = prefetch_chainfiles(
+        args.pairs, use_index=args.use_index, max_workers=args.workers
+    )
+    for chainfile in chainfiles:
+        print(chainfile)  # noqa: T201
+    return 0
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Build CLI argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="agct", description="Lift over genomic coordinates between assemblies."
+    )
+    parser.add_argument("--verbose", "-v", action="store_true", help="log progress")
+    subparsers = parser.add_subparsers(required=True)
+
+    lift_parser = subparsers.add_parser(
+        "lift", help="lift over records in a BED, VCF, GTF, GFF3, or TSV file"
+    )
+    _add_converter_args(lift_parser)
+    lift_parser.add_argument(
+        "input", type=Path, help="input file (plain text, gzip, or BGZF)"
+    )
+    lift_parser.add_argument(
+        "output", type=Path, help="output file (gzipped if name ends in .gz)"
+    )
+    lift_parser.add_argument(
+        "--unmapped",
+        "-u",
+        type=Path,
+        help="file to write unmapped records to (default: OUTPUT with .unmapped infix)",
+    )
+    lift_parser.add_argument(
+        "--format",
+        type=FileFormat,
+        choices=list(FileFormat),
+        help="input format (default: guess from input file name)",
+    )
+    lift_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="number of records to lift at a time",
+    )
+    lift_parser.add_argument(
+        "--buffer-size",
+        type=int,
+        default=DEFAULT_BUFFER_SIZE,
+        help="read/write buffer size in bytes",
+    )
+    lift_parser.add_argument(
+        "--chrom-col", type=int, default=0, help="TSV chromosome column index"
+    )
+    lift_parser.add_argument(
+        "--start-col", type=int, default=1, help="TSV start position column index"
+    )
+    lift_parser.add_argument(
+        "--end-col", type=int, default=2, help="TSV end position column index"
+    )
+    lift_parser.add_argument(
+        "--one-based",
+        action="store_true",
+        help="TSV positions are 1-based and fully closed rather than inter-residue",
+    )
+    lift_parser.add_argument(
+        "--processes",
+        "-p",
+        type=int,
+        default=1,
+        help="number of worker processes (uncompressed input only)",
+    )
+    lift_parser.add_argument(
+        "--sort",
+        action="store_true",
+        help="sort converted records by lifted position rather than input order",
+    )
+    lift_parser.add_argument(
+        "--sorted-input",
+        action="store_true",
+        help="input is sorted by chromosome and position, so lift it in a single pass",
+    )
+    lift_parser.set_defaults(func=_lift)
+
+    prefetch_parser = subparsers.add_parser(
+        "prefetch", help="download chainfiles ahead of time"
+    )
+    prefetch_parser.add_argument(
+        "pairs",
+        nargs="+",
+        type=_assembly_pair,
+        metavar="FROM:TO",
+        help="assembly pair to download the chainfile for, e.g. hg19:hg38",
+    )
+    prefetch_parser.add_argument(
+        "--use-index",
+        action="store_true",
+        help="also compile each chainfile into a binary index",
+    )
+    prefetch_parser.add_argument(
+        "--workers",
+        type=int,
+        help="maximum number of chainfiles to download at once",
+    )
+    prefetch_parser.set_defaults(func=_prefetch)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run agct CLI.
+
+    :param argv: command-line args (defaults to ``sys.argv``)
+    :return: exit code
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO)
+    if (
+        hasattr(args, "chainfile")
+        and not args.chainfile
+        and (args.from_assembly is None or args.to_assembly is None)
+    ):
+        parser.error("either --chainfile or both --from and --to are required")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,37 @@
 """Perform chainfile-driven liftover."""
 
 import logging
-from collections.abc import Callable
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import StrEnum
-from functools import cache
+from functools import lru_cache, partial
+from itertools import pairwise
 from pathlib import Path
-from typing import NamedTuple
-
-from wags_tails import CustomData
-from wags_tails.utils.downloads import download_http, handle_gzip
-from wags_tails.utils.storage import get_data_dir
+from typing import IO, TYPE_CHECKING, NamedTuple
 
 from agct import _core
-from agct.seqref_registry import Assembly
+from agct.metrics import MetricsCallback, MetricsSnapshot
+from agct.seqref_registry import Assembly, get_assembly_refget_ids
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pyarrow as pa
 
 _logger = logging.getLogger(__name__)
 
+# Assembly pairs with a chainfile published by UCSC
+_UCSC_CHAINFILES = frozenset(
+    {
+        (Assembly.HG18, Assembly.HG19),
+        (Assembly.HG19, Assembly.HG18),
+        (Assembly.HG19, Assembly.HG38),
+        (Assembly.HG38, Assembly.HG19),
+    }
+)
+
 
 class Strand(StrEnum):
     """Constrain strand values."""
@@ -34,16 +50,212 @@ class LiftoverResult(NamedTuple):
     score: int
 
 
+class LiftedPosition(NamedTuple):
+    """Declare structure of single-base liftover response
+
+    ``position`` is the 0-based position of the lifted base, and ``strand`` is the
+    strand of the target sequence that the base aligns to.
+    """
+
+    chrom: str
+    position: int
+    strand: Strand
+    score: int
+
+
+class BatchLiftoverResult(NamedTuple):
+    """Declare structure of columnar batch liftover response
+
+    Each column has one entry per lifted segment. Because one input interval can lift
+    to multiple segments (or to none at all), ``index`` gives the position of the input
+    interval that each segment came from.
+    """
+
+    index: list[int]
+    chrom: list[str]
+    start: list[int]
+    end: list[int]
+    strand: list[str]
+    score: list[int]
+
+
+class LiftoverArrays:
+    """Array-backed batch liftover results
+
+    Holds one row per lifted segment, like :py:class:`BatchLiftoverResult`, but in
+    fixed-width integer columns built in Rust: chromosome names are interned into
+    :py:attr:`contig_names` and referenced by ID, and strands are stored as ``1`` or
+    ``-1``. No Python object is created per segment until rows are accessed, and
+    :py:meth:`to_numpy` and :py:meth:`to_arrow` wrap the columns without copying.
+
+    Indexing or iterating yields :py:class:`LiftoverResult` objects, built on demand.
+    Use :py:attr:`index` to find the input interval that each row came from.
+    """
+
+    _COLUMNS = (
+        ("index", "q"),
+        ("contig", "i"),
+        ("start", "q"),
+        ("end", "q"),
+        ("strand", "b"),
+        ("score", "q"),
+    )
+
+    def __init__(
+        self,
+        contig_names: Sequence[str],
+        index: bytes,
+        contig: bytes,
+        start: bytes,
+        end: bytes,
+        strand: bytes,
+        score: bytes,
+    ) -> None:
+        """Wrap columns returned by ``_core.Converter.lift_many_arrays()``
+
+        :param contig_names: chromosome names that ``contig`` IDs refer to
+        :param index: input interval positions, as native-endian int64s
+        :param contig: chromosome IDs into ``contig_names``, as native-endian int32s
+        :param start: start positions, as native-endian int64s
+        :param end: end positions, as native-endian int64s
+        :param strand: strands (``1`` or ``-1``), as int8s
+        :param score: chain scores, as native-endian int64s
+        """
+        self.contig_names = tuple(contig_names)
+        self._buffers = (index, contig, start, end, strand, score)
+        self.index, self.contig, self.start, self.end, self.strand, self.score = (
+            memoryview(buffer).cast(format_)
+            for buffer, (_, format_) in zip(self._buffers, self._COLUMNS, strict=True)
+        )
+
+    def __len__(self) -> int:
+        """Get number of lifted segments"""
+        return len(self.index)
+
+    def __getitem__(self, i: int) -> LiftoverResult:
+        """Get a lifted segment
+
+        :param i: row position
+        :return: liftover result for the row
+        """
+        return LiftoverResult(
+            self.contig_names[self.contig[i]],
+            self.start[i],
+            self.end[i],
+            Strand.POSITIVE if self.strand[i] > 0 else Strand.NEGATIVE,
+            self.score[i],
+        )
+
+    def __iter__(self) -> Iterator[LiftoverResult]:
+        """Iterate over lifted segments, building each result as it's reached"""
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        """Summarize results"""
+        return f"LiftoverArrays(<{len(self)} segments on {len(self.contig_names)} contigs>)"
+
+    def to_numpy(self) -> dict[str, "np.ndarray"]:
+        """Get columns as NumPy arrays, without copying
+
+        The arrays are read-only views of the underlying buffers.
+
+        :return: arrays keyed by column name (``index``, ``contig``, ``start``,
+            ``end``, ``strand``, ``score``). Map ``contig`` IDs to names with
+            ``numpy.asarray(results.contig_names)[arrays["contig"]]``.
+        :raise ImportError: if NumPy isn't installed
+        """
+        try:
+            import numpy as np  # noqa: PLC0415
+        except ImportError as e:
+            msg = "NumPy is required for `to_numpy()` -- install it with `pip install agct[numpy]`"
+            raise ImportError(msg) from e
+        return {
+            name: np.frombuffer(buffer, dtype=format_)
+            for buffer, (name, format_) in zip(
+                self._buffers, self._COLUMNS, strict=True
+            )
+        }
+
+    def to_arrow(self) -> "pa.Table":
+        """Get results as an Arrow table, without copying
+
+        ``chrom`` is a dictionary-encoded column over :py:attr:`contig_names`; other
+        columns are integers, with strand given as ``1`` or ``-1``.
+
+        :return: table with ``index``, ``chrom``, ``start``, ``end``, ``strand``, and
+            ``score`` columns
+        :raise ImportError: if PyArrow isn't installed
+        """
+        try:
+            import pyarrow as pa  # noqa: PLC0415
+        except ImportError as e:
+            msg = "PyArrow is required for `to_arrow()` -- install it with `pip install agct[arrow]`"
+            raise ImportError(msg) from e
+        types = {"q": pa.int64(), "i": pa.int32(), "b": pa.int8()}
+        columns = {
+            name: pa.Array.from_buffers(
+                types[format_], len(self), [None, pa.py_buffer(buffer)]
+            )
+            for buffer, (name, format_) in zip(
+                self._buffers, self._COLUMNS, strict=True
+            )
+        }
+        columns["chrom"] = pa.DictionaryArray.from_arrays(
+            columns.pop("contig"), pa.array(self.contig_names, pa.string())
+        )
+        return pa.table(
+            {
+                name: columns[name]
+                for name in ("index", "chrom", "start", "end", "strand", "score")
+            }
+        )
+
+
+class RoundTripResult(NamedTuple):
+    """Declare structure of batch round-trip check response
+
+    Each column has one entry per input interval.
+    """
+
+    lifted: list[bool]
+    returned: list[bool]
+
+
+class CacheInfo(NamedTuple):
+    """Declare structure of liftover result cache statistics"""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
 class Converter:
     """Chainfile-based liftover provider for a single sequence to sequence
     association.
+
+    A converter is safe to use from many threads at once. Liftover runs in Rust with
+    the GIL released, so threads lifting through a shared converter run in parallel.
+
+    Converters pickle by reference: only the chainfile path and options are pickled,
+    and the converter is reloaded from them on the other side (e.g. in a
+    ``multiprocessing`` or Dask worker). With ``use_index=True``, reloading just
+    memory-maps the index, so it's effectively free and all workers on a host share
+    the same pages.
     """
 
     def __init__(
         self,
         from_assembly: Assembly | None = None,
         to_assembly: Assembly | None = None,
-        chainfile: str | None = None,
+        chainfile: str | bytes | IO[bytes] | None = None,
+        use_index: bool = False,
+        lazy: bool = False,
+        cache_size: int = 0,
+        metrics: bool = False,
+        via: Sequence[Assembly] | None = None,
+        inverted: bool = False,
     ) -> None:
         """Initialize liftover instance.
 
@@ -53,49 +265,315 @@ class Converter:
         * If using assembly params, the ``wags-tails`` library will be used to locate and, if
           necessary, acquire the pertinent chainfile from the UCSC web server. See
           the `wags-tails documentation <https://wags-tails.readthedocs.io/>`_ for more info.
-        * If ``chainfile`` arg is provided, all other args are ignored.
+        * If UCSC doesn't publish a chainfile for the assembly pair, or if ``via`` lists
+          intermediate assemblies, liftover follows a path of assemblies (see
+          :py:func:`find_assembly_path`). The chainfiles along the path are composed into
+          a single chainfile that lifts directly from ``from_assembly`` to
+          ``to_assembly``, which is cached alongside downloaded chainfiles, so every
+          query is still a single lookup.
+        * If ``chainfile`` arg is provided, assembly args are only used to look up
+          sequences for :py:meth:`convert_refget`. It may be a path,
+          or the chainfile contents as ``bytes`` or a binary file object. Chainfiles
+          may be gzip- or BGZF-compressed, and are read without decompressing them
+          to disk (BGZF blocks are decompressed in parallel). Converters loaded from
+          contents rather than a path can't use ``use_index`` or ``lazy``, and can't
+          be pickled.
+        * If ``use_index`` is True, the chainfile is compiled into a binary index on
+          first use (see :py:func:`compile_index`), and that index is memory-mapped
+          instead of parsing the chainfile. Loading is near-instant and mapped pages
+          are shared by all processes on a host. The index is recompiled if the
+          chainfile changes.
+        * If ``lazy`` is True, only chain headers are read up front. Each reference
+          contig's alignment data is parsed the first time that contig is lifted, so
+          load time and memory use scale with the contigs actually queried. Useful
+          for e.g. per-chromosome jobs.
+        * If ``cache_size`` is positive, results of :py:meth:`convert_coordinate` are
+          kept in a least-recently-used cache of up to that many intervals, so that
+          repeated lookups of the same interval skip liftover entirely. See
+          :py:meth:`cache_info`.
+        * If ``metrics`` is True, liftover metrics are recorded from the start. See
+          :py:meth:`enable_metrics`.
+        * If ``inverted`` is True, the chainfile is read in reverse, lifting from its
+          query assembly back to its reference assembly. With assembly params, this
+          means the chainfile from ``to_assembly`` to ``from_assembly`` is used, e.g.
+          ``Converter(Assembly.HG38, Assembly.HG19, inverted=True)`` lifts with the
+          inverse of the hg19-to-hg38 chainfile. See :py:meth:`inverse`.
 
         :param from_assembly: Name of assembly being lifted over from
         :param to_assembly: Name of assembly to lift over to
-        :param chainfile: Path to chainfile
+        :param chainfile: Path to chainfile, or chainfile contents
+        :param use_index: whether to load chain data from a precompiled binary index
+        :param lazy: whether to defer parsing each contig's chains until first use.
+            Chains are read out of the chainfile by offset, which BGZF-compressed
+            chainfiles (as written by ``bgzip``) support, but other gzipped
+            chainfiles, such as those published by UCSC, don't: those are parsed in
+            full up front, as if ``lazy`` were false.
+        :param cache_size: maximum number of intervals to cache results for (no
+            caching if 0)
+        :param metrics: whether to record liftover metrics
+        :param via: intermediate assemblies to lift through, in order
+        :param inverted: whether to lift with the inverse of the chainfile
         :raise ValueError: if required arguments are not passed or are invalid
         :raise FileNotFoundError: if unable to open corresponding chainfile
         :raise _core.ChainfileError: if unable to read chainfile (i.e. it's invalid)
         """
-        if not chainfile:
+        if use_index and lazy:
+            msg = "`use_index` and `lazy` can't both be set"
+            raise ValueError(msg)
+        if inverted and lazy:
+            msg = "`inverted` and `lazy` can't both be set"
+            raise ValueError(msg)
+        if cache_size < 0:
+            msg = f"`cache_size` must be non-negative, got {cache_size}"
+            raise ValueError(msg)
+
+        contents = _read_contents(chainfile)
+        if contents is not None and (use_index or lazy):
+            msg = "`use_index` and `lazy` require `chainfile` to be a path"
+            raise ValueError(msg)
+
+        if contents is None and not chainfile:
             if from_assembly is None or to_assembly is None:
                 msg = "Must provide both `from_assembly` and `to_assembly`"
                 raise ValueError(msg)
 
-            if from_assembly == to_assembly:
-                msg = "Liftover must be to/from different sources."
-                raise ValueError(msg)
+            if inverted:
+                chainfile_path = self.get_chainfile(
+                    to_assembly, from_assembly, None if via is None else via[::-1]
+                )
+            else:
+                chainfile_path = self.get_chainfile(from_assembly, to_assembly, via)
+            chainfile = str(chainfile_path.absolute())
 
+        self.chainfile = None if contents is not None else Path(chainfile)
+        self.from_assembly = from_assembly
+        self.to_assembly = to_assembly
+        self.use_index = use_index
+        self.lazy = lazy
+        self.inverted = inverted
+        self.cache_size = cache_size
+        self._reset_state()
+
+        if contents is not None:
+            try:
+                self._converter = _core.Converter.from_bytes(contents)
+            except _core.ChainfileError:
+                _logger.exception("Error reading chainfile contents")
+                raise
+            if inverted:
+                self._converter = self._converter.inverse()
+        elif use_index:
+            self._converter = _load_index(self.chainfile)
+            if inverted:
+                self._converter = self._converter.inverse()
+        else:
             try:
-                file_prefix = f"chainfile_{from_assembly.value}_to_{to_assembly.value}"
-            except AttributeError as e:
-                msg = f"Assembly args must be instance of `agct.seqref_registry.Genome`, instead got from_assembly={from_assembly} and to_assembly={to_assembly}"
-                _logger.exception(msg)
-                raise ValueError(msg) from e
-
-            data_handler = CustomData(
-                file_prefix,
-                "chain",
-                lambda: "",
-                self._download_function_builder(from_assembly, to_assembly),
-                data_dir=get_data_dir() / "ucsc-chainfile",
-            )
-            file, _ = data_handler.get_latest()
-            chainfile = str(file.absolute())
+                if inverted:
+                    self._converter = _core.Converter.load_inverse(chainfile)
+                else:
+                    self._converter = _core.Converter(chainfile, lazy=lazy)
+            except FileNotFoundError:
+                _logger.exception("Unable to open chainfile located at %s", chainfile)
+                raise
+            except _core.ChainfileError:
+                _logger.exception("Error reading chainfile located at %s", chainfile)
+                raise
 
-        try:
-            self._converter = _core.Converter(chainfile)
-        except FileNotFoundError:
-            _logger.exception("Unable to open chainfile located at %s", chainfile)
-            raise
-        except _core.ChainfileError:
-            _logger.exception("Error reading chainfile located at %s", chainfile)
-            raise
+        if metrics:
+            self.enable_metrics()
+
+    def __reduce__(self) -> tuple[Callable[[], "Converter"], tuple]:
+        """Pickle by reference to the chainfile, rather than by value.
+
+        Cached results, recorded metrics, and metrics callbacks aren't carried over.
+
+        :raise TypeError: if the converter was loaded from chainfile contents rather
+            than a path
+        """
+        if self.chainfile is None:
+            msg = "Converters loaded from chainfile contents can't be pickled"
+            raise TypeError(msg)
+        return (
+            partial(
+                self.__class__,
+                self.from_assembly,
+                self.to_assembly,
+                chainfile=str(self.chainfile),
+                use_index=self.use_index,
+                lazy=self.lazy,
+                cache_size=self.cache_size,
+                metrics=self.metrics_enabled,
+                inverted=self.inverted,
+            ),
+            (),
+        )
+
+    def _reset_state(self) -> None:
+        """Set up an empty result cache and metrics state, and forget the inverse."""
+        self._cached_lift = (
+            lru_cache(maxsize=self.cache_size)(self._lift) if self.cache_size else None
+        )
+        self._metrics_enabled = False
+        self._metrics_callback: MetricsCallback | None = None
+        self._inverse: Converter | None = None
+
+    def inverse(self) -> "Converter":
+        """Get a converter for the inverse mapping, built from this converter's chain
+        data.
+
+        The inverse lifts from the chainfile's query assembly back to its reference
+        assembly, so round trips don't need a second chainfile to be downloaded and
+        parsed. Chain alignments are symmetric, but note that the inverse of e.g.
+        the hg19-to-hg38 chainfile isn't identical to UCSC's separately-built
+        hg38-to-hg19 chainfile.
+
+        The inverse is built once, and its chain data is held in a compact
+        in-memory block index. For a converter loaded directly from a text chainfile,
+        it's inverted from the block index built for sorted lifts (see
+        ``sorted_input`` in :py:meth:`convert_coordinates`). It gets its own result cache, of the same size, and
+        records metrics separately. The inverse of the inverse is this converter.
+
+        .. code-block:: pycon
+
+           >>> from agct import Assembly, Converter
+           >>> c = Converter(Assembly.HG19, Assembly.HG38)
+           >>> c.inverse().convert_coordinate("chr7", 140753336, 140753337)
+           [LiftoverResult(chrom='chr7', start=140453136, end=140453137, strand=<Strand.POSITIVE: '+'>, score=14633688187)]
+
+        :return: inverse converter
+        :raise _core.ChainfileError: if unable to read chainfile (i.e. it's invalid)
+        """
+        if self._inverse is None:
+            # a race between threads only builds a spare inverse, which is harmless
+            # copy attributes directly, since copying via pickling reloads the
+            # chainfile
+            inverse = object.__new__(self.__class__)
+            # inverses are always fully loaded
+            inverse.__dict__.update(
+                self.__dict__,
+                from_assembly=self.to_assembly,
+                to_assembly=self.from_assembly,
+                inverted=not self.inverted,
+                lazy=False,
+            )
+            inverse._reset_state()  # noqa: SLF001
+            inverse._converter = self._converter.inverse()  # noqa: SLF001
+            inverse._inverse = self  # noqa: SLF001
+            self._inverse = inverse
+        return self._inverse
+
+    def _set_accessions(self) -> None:
+        """Give the Rust converter the refget accessions of the sequences in its
+        assemblies, if they're known and haven't been given yet, for
+        :py:meth:`convert_refget`.
+
+        Called on first use rather than on load, so that converters that are never
+        used with refget accessions don't load the sequence registry.
+        """
+        if (
+            self.from_assembly is None
+            or self.to_assembly is None
+            or self._converter.has_accessions
+        ):
+            return
+        self._converter.set_accessions(
+            list(get_assembly_refget_ids(self.from_assembly).items()),
+            list(get_assembly_refget_ids(self.to_assembly).items()),
+        )
+
+    @classmethod
+    def get_chainfile(
+        cls,
+        from_assembly: Assembly,
+        to_assembly: Assembly,
+        via: Sequence[Assembly] | None = None,
+    ) -> Path:
+        """Locate the chainfile for lifting from one assembly to another, acquiring
+        it if necessary. See :py:class:`Converter` for how assembly args are used.
+
+        :param from_assembly: Name of assembly being lifted over from
+        :param to_assembly: Name of assembly to lift over to
+        :param via: intermediate assemblies to lift through, in order
+        :return: path to chainfile
+        :raise ValueError: if the assemblies are invalid, or no path connects them
+        """
+        if from_assembly == to_assembly:
+            msg = "Liftover must be to/from different sources."
+            raise ValueError(msg)
+
+        if not all(
+            isinstance(assembly, Assembly)
+            for assembly in (from_assembly, to_assembly, *(via or ()))
+        ):
+            msg = f"Assembly args must be instance of `agct.seqref_registry.Genome`, instead got from_assembly={from_assembly} and to_assembly={to_assembly}"
+            _logger.error(msg)
+            raise ValueError(msg)
+
+        if via is None:
+            path = find_assembly_path(from_assembly, to_assembly)
+        else:
+            path = (from_assembly, *via, to_assembly)
+            if any(a == b for a, b in pairwise(path)):
+                msg = f"Consecutive assemblies in a liftover path must differ: {path}"
+                raise ValueError(msg)
+        return cls._get_chainfile(path)
+
+    @classmethod
+    def _get_chainfile(cls, path: tuple[Assembly, ...]) -> Path:
+        """Locate the chainfile for a path of assemblies, acquiring it if necessary.
+
+        Chainfiles for a single step are downloaded from UCSC and kept gzipped, as
+        published. Chainfiles for longer paths are composed from the chainfile for
+        every step but the last and the chainfile for the last step.
+
+        :param path: assemblies to lift through, from first to last
+        :return: path to chainfile
+        """
+        # wags-tails pulls in an HTTP stack, so it's only imported once a chainfile
+        # needs to be found
+        from wags_tails import CustomData  # noqa: PLC0415
+        from wags_tails.utils.storage import get_data_dir  # noqa: PLC0415
+
+        prefix = "chainfile_" + "_to_".join(assembly.value for assembly in path)
+        data_dir = get_data_dir() / "ucsc-chainfile"
+        if len(path) == 2:  # noqa: PLR2004
+            acquire = cls._download_function_builder(*path)
+            # chainfiles previously saved decompressed are still used
+            filetype = (
+                "chain" if (data_dir / f"{prefix}_.chain").exists() else "chain.gz"
+            )
+        else:
+            acquire = cls._compose_function_builder(path)
+            filetype = "chain"
+        data_handler = CustomData(
+            prefix,
+            filetype,
+            lambda: "",
+            acquire,
+            data_dir=data_dir,
+        )
+        file, _ = data_handler.get_latest()
+        return file
+
+    @classmethod
+    def _compose_function_builder(cls, path: tuple[Assembly, ...]) -> Callable:
+        """Build function that composes the chainfile for a multi-step path.
+
+        :param path: assemblies to lift through, from first to last
+        :return: Function that writes the composed chainfile
+        """
+
+        def _compose_data(version: str, file: Path) -> None:  # noqa: ARG001
+            """Compose chainfile from the chainfiles for shorter paths.
+
+            :param version: not used
+            :param file: path to save file to
+            """
+            compose_chainfiles(
+                cls._get_chainfile(path[:-1]), cls._get_chainfile(path[-2:]), file
+            )
+
+        return _compose_data
 
     @staticmethod
     def _download_function_builder(
@@ -113,18 +591,34 @@ class Converter:
         """
 
         def _download_data(version: str, file: Path) -> None:  # noqa: ARG001
-            """Download and gunzip chainfile from UCSC.
+            """Download and verify chainfile from UCSC, keeping it compressed if
+            ``file`` is a ``.gz`` path.
 
             :param version: not used
             :param file: path to save file to
             """
-            url = f"https://hgdownload.soe.ucsc.edu/goldenPath/{from_assembly.value}/liftOver/{from_assembly.value}To{to_assembly.value.title()}.over.chain.gz"
-            download_http(url, file, handler=handle_gzip)
+            from agct.downloads import (  # noqa: PLC0415
+                download_chainfile,
+                get_chainfile_url,
+            )
+
+            download_chainfile(
+                get_chainfile_url(from_assembly, to_assembly),
+                file,
+                decompress=file.suffix != ".gz",
+            )
 
         return _download_data
 
     def convert_coordinate(
-        self, chrom: str, start: int, end: int, strand: Strand = Strand.POSITIVE
+        self,
+        chrom: str,
+        start: int,
+        end: int,
+        strand: Strand = Strand.POSITIVE,
+        merge: bool = False,
+        best_chain: bool = False,
+        min_match: float = 0.0,
     ) -> list[LiftoverResult]:
         """Perform liftover for given params
 
@@ -141,10 +635,19 @@ class Converter:
         :param start: start position of coordinate interval (inter-residue)
         :param end: end position of coordinate interval (inter-residue)
         :param strand: query strand (``"+"`` by default).
-        :return: list of coordinate matches (possibly empty)
+        :param merge: if True, merge each chain's matches into a single match spanning
+            them, bridging gaps in the alignment
+        :param best_chain: if True, only return matches from the chain with the
+            highest score
+        :param min_match: minimum fraction of the interval's bases that a chain must
+            map for its matches to be returned, like UCSC ``liftOver -minMatch``.
+            Applied before ``best_chain`` and ``merge``.
+        :return: list of coordinate matches (possibly empty). By default, there's one
+            match per chain alignment block that the interval overlaps.
         :raise ValueError: if ``start`` > ``end`` and strandedness is positive, or
-            ``start`` < ``end`` and strandedness is negative, or if position is too large
-            to represent as a 32 bit unsigned int
+            ``start`` < ``end`` and strandedness is negative, if position is too large
+            to represent as a 32 bit unsigned int, or if ``min_match`` isn't between
+            0 and 1
         """
         if start < end and strand == Strand.NEGATIVE:
             msg = f"`start` must be less than `end` on the negative strand: {start=}, {end=}"
@@ -152,14 +655,421 @@ class Converter:
         if start > end and strand == Strand.POSITIVE:
             msg = f"`end` must be less than `start` on the positive strand: {start=}, {end=}"
             raise ValueError(msg)
+        lift = self._cached_lift or self._lift
+        args = (chrom, start, end, strand, merge, best_chain, min_match)
+        started = time.perf_counter_ns() if self._metrics_enabled else 0
+        # errors are handled outside the cache, so that failed lifts aren't cached
+        # and are retried on the next call
         try:
-            results = self._converter.lift(chrom, start, end, strand)
+            results = list(lift(*args))
+        except _core.ChainfileError:
+            _logger.exception(
+                "Encountered internal error while converting coordinates - is the chainfile invalid? (%s, [%s, %s], %s)",
+                chrom,
+                start,
+                end,
+                strand,
+            )
+            results = []
+        if self._metrics_enabled:
+            self._converter.record_call_latency(time.perf_counter_ns() - started)
+            self._maybe_export_metrics()
+        return results
+
+    def _lift(
+        self,
+        chrom: str,
+        start: int,
+        end: int,
+        strand: Strand,
+        merge: bool,
+        best_chain: bool,
+        min_match: float,
+    ) -> tuple[LiftoverResult, ...]:
+        """Lift an interval in Rust.
+
+        Results are returned as a tuple so that they can be safely shared from the
+        cache.
+
+        :raise _core.ChainfileError: if the chainfile can't be read
+        """
+        try:
+            results = self._converter.lift(
+                chrom,
+                start,
+                end,
+                strand,
+                merge=merge,
+                best_chain=best_chain,
+                min_match=min_match,
+            )
         except _core.NoLiftoverError:
             results = []
+        except OverflowError as e:
+            msg = f"Coordinates exceed representable bounds of a 32 bit unsigned int: {start=}, {end=} -- this is unsupported"
+            raise ValueError(msg) from e
+        return tuple(LiftoverResult(*r) for r in results)
+
+    def cache_info(self) -> CacheInfo | None:
+        """Get statistics for the :py:meth:`convert_coordinate` result cache.
+
+        :return: cache hits, misses, maximum size, and current size, or None if the
+            converter wasn't created with a ``cache_size``
+        """
+        if self._cached_lift is None:
+            return None
+        return CacheInfo(*self._cached_lift.cache_info())
+
+    def cache_clear(self) -> None:
+        """Empty the :py:meth:`convert_coordinate` result cache and reset its
+        statistics, e.g. after a chainfile is replaced.
+        """
+        if self._cached_lift is not None:
+            self._cached_lift.cache_clear()
+
+    def convert_position(self, chrom: str, position: int) -> LiftedPosition | None:
+        """Perform liftover for a single base
+
+        A fast path for single-base variants such as SNVs: the base is mapped
+        through the ungapped alignment block containing it, without building an
+        interval or segments, so each call costs a fraction of
+        :py:meth:`convert_coordinate`. If more than one chain aligns the base, the
+        highest-scoring chain is used.
+
+        .. code-block:: pycon
+
+           >>> from agct import Converter, Assembly
+           >>> c = Converter(Assembly.HG19, Assembly.HG38)
+           >>> c.convert_position("chr7", 140453136)
+           LiftedPosition(chrom='chr7', position=140753336, strand=<Strand.POSITIVE: '+'>, score=14633688187)
+
+        For a converter loaded directly from a text chainfile, the first call builds
+        an in-memory block index (see ``sorted_input`` in
+        :py:meth:`convert_coordinates`), which costs a second parse of the chainfile
+        and about as much memory again. Results aren't cached (see ``cache_size``),
+        since a lookup is about as cheap as a cache hit.
+
+        :param chrom: chromosome name as given in chainfile. Usually e.g. ``"chr7"``.
+        :param position: 0-based position of base on the positive strand, i.e. the
+            start of its inter-residue interval
+        :return: lifted base, or None if it doesn't lift
+        :raise ValueError: if ``chrom`` is empty, or ``position`` is negative or too
+            large to represent as a 32 bit unsigned int
+        """
+        try:
+            result = self._converter.lift_position(chrom, position)
+        except OverflowError as e:
+            msg = f"Position exceeds representable bounds of a 32 bit unsigned int: {position=} -- this is unsupported"
+            raise ValueError(msg) from e
         except _core.ChainfileError:
             _logger.exception(
-                "Encountered internal error while converting coordinates - is the chainfile invalid? (%s, [%s, %s], %s)",
+                "Encountered internal error while converting position - is the chainfile invalid? (%s, %s)",
                 chrom,
+                position,
+            )
+            return None
+        if self._metrics_enabled:
+            self._maybe_export_metrics()
+        if result is None:
+            return None
+        chrom, position, strand, score = result
+        return LiftedPosition(chrom, position, Strand(strand), score)
+
+    def convert_positions(
+        self,
+        chroms: Sequence[str],
+        positions: Sequence[int],
+        sorted_input: bool = False,
+    ) -> LiftoverArrays:
+        """Perform liftover for a batch of single bases, returning array-backed
+        results
+
+        Each base is lifted as with :py:meth:`convert_position`, in a single call into
+        Rust without holding the GIL.
+
+        .. code-block:: pycon
+
+           >>> from agct import Converter, Assembly
+           >>> c = Converter(Assembly.HG19, Assembly.HG38)
+           >>> results = c.convert_positions(["chr7", "chr7"], [140453136, 1])
+           >>> results.to_numpy()["start"]
+           array([140753336])
+
+        :param chroms: chromosome names as given in chainfile
+        :param positions: 0-based positions of bases on the positive strand. Can be
+            any sequence of ints, or an integer array supporting the buffer protocol
+            (e.g. a NumPy array).
+        :param sorted_input: whether bases are sorted by chromosome and position. See
+            :py:meth:`convert_coordinates`.
+        :return: array-backed liftover results, with a one-base segment for each
+            base that lifts, and :py:attr:`LiftoverArrays.index` giving the input it
+            came from. Bases that don't lift, or are on an empty chromosome name, are
+            left out.
+        :raise ValueError: if input columns differ in length, or a position is
+            negative or too large to represent as a 32 bit unsigned int
+        """
+        try:
+            results = self._converter.lift_positions(
+                chroms, positions, sorted_input=sorted_input
+            )
+        except OverflowError as e:
+            msg = f"Positions exceed representable bounds of a 32 bit unsigned int -- this is unsupported: {e}"
+            raise ValueError(msg) from e
+        if self._metrics_enabled:
+            self._maybe_export_metrics()
+        return LiftoverArrays(*results)
+
+    def convert_coordinates(
+        self,
+        chroms: Sequence[str],
+        starts: Sequence[int],
+        ends: Sequence[int],
+        strands: Sequence[Strand] | None = None,
+        sorted_input: bool = False,
+        merge: bool = False,
+        best_chain: bool = False,
+        min_match: float = 0.0,
+    ) -> BatchLiftoverResult:
+        """Perform liftover for a batch of intervals in a single call
+
+        Much faster than calling :py:meth:`convert_coordinate` in a loop: the whole
+        batch is lifted in Rust without holding the GIL.
+
+        .. code-block:: pycon
+
+           >>> from agct import Converter, Assembly
+           >>> c = Converter(Assembly.HG19, Assembly.HG38)
+           >>> c.convert_coordinates(["chr7", "chr7"], [140453136, 1], [140453137, 1])
+           BatchLiftoverResult(index=[0], chrom=['chr7'], start=[140753336], end=[140753337], strand=['+'], score=[14633688187])
+
+        :param chroms: chromosome names as given in chainfile
+        :param starts: start positions of coordinate intervals (inter-residue). Can be
+            any sequence of ints, or an integer array supporting the buffer protocol
+            (e.g. a NumPy array).
+        :param ends: end positions of coordinate intervals (inter-residue)
+        :param strands: query strands (all ``"+"`` by default)
+        :param sorted_input: whether intervals are sorted by chromosome and position.
+            If so, they're lifted in a single forward pass over the chain alignment
+            blocks rather than with a separate search per interval. Out-of-order
+            intervals are detected and looked up normally, so results never depend on
+            this flag, only speed does. For a converter loaded directly from a text
+            chainfile, the first sorted call builds an in-memory block index by
+            parsing the chainfile again, and keeps it alongside the parsed chains for
+            the life of the converter, roughly doubling its memory use. Load with
+            ``use_index=True`` to avoid both. Lazily loaded converters ignore this
+            flag.
+        :param merge: whether to merge each chain's segments into one span. See
+            :py:meth:`convert_coordinate`.
+        :param best_chain: whether to keep only the best chain's segments. See
+            :py:meth:`convert_coordinate`.
+        :param min_match: minimum fraction of each interval that a chain must map.
+            See :py:meth:`convert_coordinate`.
+        :return: columnar liftover results, one entry per lifted segment. Input
+            intervals without a liftover don't appear in the output.
+        :raise ValueError: if input columns differ in length, an interval's start and
+            end are inconsistent with its strand, a position is too large to
+            represent as a 32 bit unsigned int, or ``min_match`` isn't between 0 and 1
+        """
+        try:
+            results = self._converter.lift_many(
+                chroms,
+                starts,
+                ends,
+                strands,
+                sorted_input=sorted_input,
+                merge=merge,
+                best_chain=best_chain,
+                min_match=min_match,
+            )
+        except OverflowError as e:
+            msg = f"Coordinates exceed representable bounds of a 32 bit unsigned int -- this is unsupported: {e}"
+            raise ValueError(msg) from e
+        if self._metrics_enabled:
+            self._maybe_export_metrics()
+        return BatchLiftoverResult(*results)
+
+    def convert_coordinates_to_arrays(
+        self,
+        chroms: Sequence[str],
+        starts: Sequence[int],
+        ends: Sequence[int],
+        strands: Sequence[Strand] | None = None,
+        sorted_input: bool = False,
+        merge: bool = False,
+        best_chain: bool = False,
+        min_match: float = 0.0,
+    ) -> LiftoverArrays:
+        """Perform liftover for a batch of intervals, returning array-backed results
+
+        Arguments are as for :py:meth:`convert_coordinates`, but results stay in
+        compact integer columns rather than being converted into Python lists, which
+        saves time and memory for large batches and allows zero-copy export to NumPy
+        or Arrow.
+
+        .. code-block:: pycon
+
+           >>> from agct import Converter, Assembly
+           >>> c = Converter(Assembly.HG19, Assembly.HG38)
+           >>> results = c.convert_coordinates_to_arrays(
+           ...     ["chr7"], [140453136], [140453137]
+           ... )
+           >>> list(results)
+           [LiftoverResult(chrom='chr7', start=140753336, end=140753337, strand=<Strand.POSITIVE: '+'>, score=14633688187)]
+
+        :return: array-backed liftover results, one row per lifted segment
+        :raise ValueError: if input columns differ in length, an interval's start and
+            end are inconsistent with its strand, a position is too large to
+            represent as a 32 bit unsigned int, or ``min_match`` isn't between 0 and 1
+        """
+        try:
+            results = self._converter.lift_many_arrays(
+                chroms,
+                starts,
+                ends,
+                strands,
+                sorted_input=sorted_input,
+                merge=merge,
+                best_chain=best_chain,
+                min_match=min_match,
+            )
+        except OverflowError as e:
+            msg = f"Coordinates exceed representable bounds of a 32 bit unsigned int -- this is unsupported: {e}"
+            raise ValueError(msg) from e
+        if self._metrics_enabled:
+            self._maybe_export_metrics()
+        return LiftoverArrays(*results)
+
+    def convert_columns(
+        self,
+        contig_names: Sequence[str],
+        contigs: memoryview,
+        starts: memoryview,
+        ends: memoryview,
+        strands: memoryview | None = None,
+        sorted_input: bool = False,
+        merge: bool = False,
+        best_chain: bool = False,
+        min_match: float = 0.0,
+    ) -> tuple[LiftoverArrays, memoryview]:
+        """Perform liftover for columns held in buffers
+
+        This is the low-level entry point behind
+        :py:func:`agct.tables.lift_table`. Columns can be any one-dimensional
+        objects supporting the buffer protocol (e.g. NumPy arrays or memoryviews of
+        Arrow buffers). Each is copied into Rust in a single pass, and liftover then
+        runs with the GIL released.
+
+        :param contig_names: chromosome names as given in chainfile
+        :param contigs: int32 codes into ``contig_names``, one per interval. Negative
+            codes mark intervals with missing values, which are treated as unmapped.
+        :param starts: int64 start positions (inter-residue)
+        :param ends: int64 end positions (inter-residue)
+        :param strands: int8 strands, ``1`` or ``-1`` (all positive by default)
+        :param sorted_input: whether intervals are sorted by chromosome and position.
+            See :py:meth:`convert_coordinates`.
+        :param merge: whether to merge each chain's segments into one span. See
+            :py:meth:`convert_coordinate`.
+        :param best_chain: whether to keep only the best chain's segments. See
+            :py:meth:`convert_coordinate`.
+        :param min_match: minimum fraction of each interval that a chain must map.
+            See :py:meth:`convert_coordinate`.
+        :return: array-backed liftover results, one row per lifted segment, along
+            with int64 offsets of each interval's first row in the results, followed
+            by the total number of rows
+        :raise ValueError: if input columns differ in length or have the wrong type,
+            an interval's start and end are inconsistent with its strand, a position
+            is negative or too large to represent as a 32 bit unsigned int, or
+            ``min_match`` isn't between 0 and 1
+        """
+        try:
+            results, offsets = self._converter.lift_columns(
+                contig_names,
+                contigs,
+                starts,
+                ends,
+                strands,
+                sorted_input=sorted_input,
+                merge=merge,
+                best_chain=best_chain,
+                min_match=min_match,
+            )
+        except OverflowError as e:
+            msg = f"Coordinates exceed representable bounds of a 32 bit unsigned int -- this is unsupported: {e}"
+            raise ValueError(msg) from e
+        except BufferError as e:
+            msg = f"Input columns must be buffers of the documented types: {e}"
+            raise ValueError(msg) from e
+        if self._metrics_enabled:
+            self._maybe_export_metrics()
+        return LiftoverArrays(*results), memoryview(offsets).cast("q")
+
+    def convert_refget(
+        self,
+        refget_accession: str,
+        start: int,
+        end: int,
+        strand: Strand = Strand.POSITIVE,
+        merge: bool = False,
+        best_chain: bool = False,
+        min_match: float = 0.0,
+    ) -> list[LiftoverResult]:
+        """Perform liftover for an interval on a sequence given by refget accession
+        (e.g. from a GA4GH VRS object), getting results on target sequences by
+        accession
+
+        Accessions are translated to and from chromosome names in Rust, using a table
+        built when the converter is loaded, so there's no registry lookup per call.
+
+        .. code-block:: pycon
+
+           >>> from agct import Converter, Assembly
+           >>> c = Converter(Assembly.HG19, Assembly.HG38)
+           >>> c.convert_refget(
+           ...     "SQ.IW78mgV5Cqf6M24hy52hPjyyo5tCCd86", 140453136, 140453137
+           ... )
+           [LiftoverResult(chrom='SQ.F-LrLMe1SRpfUZHkQmvkVKFEGaoDeHul', start=140753336, end=140753337, strand=<Strand.POSITIVE: '+'>, score=14633688187)]
+
+        :param refget_accession: refget accession of sequence in the assembly being
+            lifted over from
+        :param start: start position of coordinate interval (inter-residue)
+        :param end: end position of coordinate interval (inter-residue)
+        :param strand: query strand (``"+"`` by default).
+        :param merge: whether to merge each chain's segments into one span. See
+            :py:meth:`convert_coordinate`.
+        :param best_chain: whether to keep only the best chain's segments. See
+            :py:meth:`convert_coordinate`.
+        :param min_match: minimum fraction of the interval that a chain must map.
+            See :py:meth:`convert_coordinate`.
+        :return: list of coordinate matches (possibly empty), with the refget
+            accession of each target sequence in place of its chromosome name.
+            Matches on target sequences without a known accession are left out, and
+            unknown accessions have no matches.
+        :raise ValueError: if the converter's assemblies aren't known, ``start`` >
+            ``end`` and strandedness is positive, or ``start`` < ``end`` and
+            strandedness is negative, if position is too large to represent as a 32
+            bit unsigned int, or if ``min_match`` isn't between 0 and 1
+        """
+        if start < end and strand == Strand.NEGATIVE:
+            msg = f"`start` must be less than `end` on the negative strand: {start=}, {end=}"
+            raise ValueError(msg)
+        if start > end and strand == Strand.POSITIVE:
+            msg = f"`end` must be less than `start` on the positive strand: {start=}, {end=}"
+            raise ValueError(msg)
+        self._set_accessions()
+        try:
+            results = self._converter.lift_refget(
+                refget_accession,
+                start,
+                end,
+                strand,
+                merge=merge,
+                best_chain=best_chain,
+                min_match=min_match,
+            )
+        except _core.ChainfileError:
+            _logger.exception(
+                "Encountered internal error while converting coordinates - is the chainfile invalid? (%s, [%s, %s], %s)",
+                refget_accession,
                 start,
                 end,
                 strand,
@@ -168,18 +1078,705 @@ class Converter:
         except OverflowError as e:
             msg = f"Coordinates exceed representable bounds of a 32 bit unsigned int: {start=}, {end=} -- this is unsupported"
             raise ValueError(msg) from e
+        if self._metrics_enabled:
+            self._maybe_export_metrics()
         return [LiftoverResult(*r) for r in results]
 
+    def convert_refgets(
+        self,
+        refget_accessions: Sequence[str],
+        starts: Sequence[int],
+        ends: Sequence[int],
+        strands: Sequence[Strand] | None = None,
+        sorted_input: bool = False,
+        merge: bool = False,
+        best_chain: bool = False,
+        min_match: float = 0.0,
+    ) -> LiftoverArrays:
+        """Perform liftover for a batch of intervals on sequences given by refget
+        accession, returning array-backed results
+
+        Arguments are as for :py:meth:`convert_coordinates`, with refget accessions
+        in place of chromosome names. Results are as for
+        :py:meth:`convert_coordinates_to_arrays`, but
+        :py:attr:`LiftoverArrays.contig_names` lists every known accession of the
+        target assembly, so that results from different batches share contig IDs.
+
+        :param refget_accessions: refget accessions of sequences in the assembly being
+            lifted over from
+        :param starts: start positions of coordinate intervals (inter-residue)
+        :param ends: end positions of coordinate intervals (inter-residue)
+        :param strands: query strands (all ``"+"`` by default)
+        :param sorted_input: whether intervals are sorted by sequence and position.
+            See :py:meth:`convert_coordinates`.
+        :param merge: whether to merge each chain's segments into one span. See
+            :py:meth:`convert_coordinate`.
+        :param best_chain: whether to keep only the best chain's segments. See
+            :py:meth:`convert_coordinate`.
+        :param min_match: minimum fraction of each interval that a chain must map.
+            See :py:meth:`convert_coordinate`.
+        :return: array-backed liftover results, one row per lifted segment. Segments
+            on target sequences without a known accession are left out, and intervals
+            on unknown accessions have no segments.
+        :raise ValueError: if the converter's assemblies aren't known, input columns
+            differ in length, an interval's start and end are inconsistent with its
+            strand, a position is too large to represent as a 32 bit unsigned int, or
+            ``min_match`` isn't between 0 and 1
+        """
+        self._set_accessions()
+        try:
+            results = self._converter.lift_refget_many(
+                refget_accessions,
+                starts,
+                ends,
+                strands,
+                sorted_input=sorted_input,
+                merge=merge,
+                best_chain=best_chain,
+                min_match=min_match,
+            )
+        except OverflowError as e:
+            msg = f"Coordinates exceed representable bounds of a 32 bit unsigned int -- this is unsupported: {e}"
+            raise ValueError(msg) from e
+        if self._metrics_enabled:
+            self._maybe_export_metrics()
+        return LiftoverArrays(*results)
+
+    def check_round_trip(
+        self,
+        chroms: Sequence[str],
+        starts: Sequence[int],
+        ends: Sequence[int],
+        strands: Sequence[Strand] | None = None,
+        sorted_input: bool = False,
+    ) -> RoundTripResult:
+        """Check whether a batch of intervals lift back onto themselves.
+
+        Each interval is lifted, and every segment it lifts to is lifted back with
+        :py:meth:`inverse`. An interval returns if any of those segments lifts back
+        to exactly the original chromosome, positions, and strand. Intervals that
+        don't return, e.g. because they fall in regions where the alignment is
+        ambiguous, are worth flagging in QC.
+
+        .. code-block:: pycon
+
+           >>> from agct import Assembly, Converter
+           >>> c = Converter(Assembly.HG19, Assembly.HG38)
+           >>> c.check_round_trip(["chr7", "chr7"], [140453136, 1], [140453137, 1])
+           RoundTripResult(lifted=[True, False], returned=[True, False])
+
+        :param chroms: chromosome names as given in chainfile
+        :param starts: start positions of coordinate intervals (inter-residue)
+        :param ends: end positions of coordinate intervals (inter-residue)
+        :param strands: query strands (all ``"+"`` by default)
+        :param sorted_input: whether intervals are sorted by chromosome and position.
+            See :py:meth:`convert_coordinates`.
+        :return: whether each interval lifted at all, and whether it returned
+        :raise ValueError: if input columns differ in length, an interval's start and
+            end are inconsistent with its strand, or a position is too large to
+            represent as a 32 bit unsigned int
+        """
+        forward = self.convert_coordinates(
+            chroms, starts, ends, strands, sorted_input=sorted_input
+        )
+        back = self.inverse().convert_coordinates(
+            forward.chrom, forward.start, forward.end, forward.strand
+        )
+        lifted = [False] * len(chroms)
+        for i in forward.index:
+            lifted[i] = True
+        returned = [False] * len(chroms)
+        for segment, chrom, start, end, strand in zip(
+            back.index, back.chrom, back.start, back.end, back.strand, strict=True
+        ):
+            i = forward.index[segment]
+            if (chrom, start, end) == (chroms[i], starts[i], ends[i]) and strand == (
+                Strand.POSITIVE if strands is None else strands[i]
+            ):
+                returned[i] = True
+        return RoundTripResult(lifted, returned)
+
+    @property
+    def metrics_enabled(self) -> bool:
+        """Whether liftover metrics are being recorded"""
+        return self._metrics_enabled
+
+    def enable_metrics(
+        self, callback: MetricsCallback | None = None, interval: float = 60.0
+    ) -> None:
+        """Start recording liftover metrics.
+
+        Counters and latency histograms are kept in Rust and updated atomically, so
+        recording is cheap and safe across threads. While metrics are disabled (the
+        default), liftover calls skip recording entirely.
+
+        To export metrics to another system, provide a ``callback``. It's called with
+        a :py:class:`~agct.metrics.MetricsSnapshot` by whichever liftover call first
+        finds that ``interval`` seconds have passed since the last export (so no
+        background thread is needed), or on demand by :py:meth:`export_metrics`.
+        Errors raised by the callback are logged rather than propagated.
+
+        :param callback: function to export metric snapshots with
+        :param interval: minimum number of seconds between automatic exports
+        """
+        self._metrics_callback = callback
+        self._metrics_interval = interval
+        self._next_metrics_export = time.monotonic() + interval
+        self._converter.set_metrics_enabled(True)
+        self._metrics_enabled = True
+
+    def disable_metrics(self) -> None:
+        """Stop recording liftover metrics. Values recorded so far are kept."""
+        self._metrics_enabled = False
+        self._converter.set_metrics_enabled(False)
+
+    def metrics_snapshot(self) -> MetricsSnapshot:
+        """Get current liftover metrics.
+
+        :return: counters and latency histograms recorded since the converter was
+            created or metrics were last reset
+        """
+        return MetricsSnapshot.from_core(self._converter.metrics_snapshot())
+
+    def reset_metrics(self) -> None:
+        """Zero all recorded metrics (other than load time)."""
+        self._converter.reset_metrics()
+
+    def export_metrics(self) -> None:
+        """Pass a metrics snapshot to the callback given to :py:meth:`enable_metrics`,
+        if any.
+        """
+        callback = self._metrics_callback
+        if callback is None:
+            return
+        self._next_metrics_export = time.monotonic() + self._metrics_interval
+        try:
+            callback(self.metrics_snapshot())
+        except Exception:
+            _logger.exception("Error while exporting liftover metrics")
+
+    def _maybe_export_metrics(self) -> None:
+        """Export metrics if a callback is set and its interval has passed."""
+        if (
+            self._metrics_callback is not None
+            and time.monotonic() >= self._next_metrics_export
+        ):
+            self.export_metrics()
+
+
+def _read_contents(chainfile: str | bytes | IO[bytes] | None) -> bytes | None:
+    """Get chainfile contents passed in place of a chainfile path.
+
+    :param chainfile: chainfile path, contents, or binary file object
+    :return: contents, or None if ``chainfile`` is a path (or missing)
+    """
+    if isinstance(chainfile, bytes):
+        return chainfile
+    if isinstance(chainfile, bytearray | memoryview):
+        return bytes(chainfile)
+    if hasattr(chainfile, "read"):
+        return chainfile.read()
+    return None
+
+
+def get_index_path(chainfile: Path) -> Path:
+    """Get location of the binary index for a chainfile.
+
+    Indexes are stored alongside their chainfile, e.g. in the ``wags-tails``
+    ``ucsc-chainfile`` data directory for chainfiles acquired by assembly name.
+
+    :param chainfile: path to chainfile
+    :return: path to corresponding binary index (which may not exist yet)
+    """
+    return chainfile.with_suffix(".agctidx")
+
+
+def compile_index(chainfile: Path, index_file: Path | None = None) -> Path:
+    """Compile a chainfile into a compact binary index.
+
+    This is a one-time step: the resulting index can be memory-mapped by
+    ``Converter(..., use_index=True)`` without parsing the chainfile again.
+
+    :param chainfile: path to chainfile
+    :param index_file: location to write index to. Defaults to the chainfile path with
+        an ``.agctidx`` suffix.
+    :return: path to compiled index
+    :raise FileNotFoundError: if unable to open chainfile
+    :raise _core.ChainfileError: if unable to read chainfile (i.e. it's invalid)
+    """
+    if index_file is None:
+        index_file = get_index_path(chainfile)
+    try:
+        _core.compile_index(str(chainfile), str(index_file))
+    except FileNotFoundError:
+        _logger.exception("Unable to open chainfile located at %s", chainfile)
+        raise
+    except _core.ChainfileError:
+        _logger.exception("Error reading chainfile located at %s", chainfile)
+        raise
+    return index_file
+
+
+def compose_chainfiles(first: Path, second: Path, output_file: Path) -> Path:
+    """Compose two chainfiles into a single chainfile.
+
+    The query assembly of ``first`` must be the reference assembly of ``second``. The
+    composed chainfile lifts directly from the reference assembly of ``first`` to the
+    query assembly of ``second``, giving the same results as lifting through both
+    chainfiles in turn. Each composed chain is scored with the lower of the scores of
+    the two chains it came from.
+
+    :param first: path to chainfile for the first step
+    :param second: path to chainfile for the second step
+    :param output_file: location to write composed chainfile to
+    :return: path to composed chainfile
+    :raise FileNotFoundError: if unable to open either chainfile
+    :raise _core.ChainfileError: if unable to read either chainfile (i.e. it's invalid)
+    """
+    _logger.info("Composing chainfiles %s and %s into %s", first, second, output_file)
+    try:
+        _core.compose_chainfiles(str(first), str(second), str(output_file))
+    except FileNotFoundError:
+        _logger.exception("Unable to open chainfile for composition")
+        raise
+    except _core.ChainfileError:
+        _logger.exception("Error reading chainfile for composition")
+        raise
+    return output_file
+
 
-@cache
-def get_converter(from_assembly: Assembly, to_assembly: Assembly) -> Converter:
+def find_assembly_path(
+    from_assembly: Assembly, to_assembly: Assembly
+) -> tuple[Assembly, ...]:
+    """Find the shortest path of UCSC chainfiles from one assembly to another.
+
+    .. code-block:: pycon
+
+       >>> from agct import Assembly, find_assembly_path
+       >>> find_assembly_path(Assembly.HG18, Assembly.HG38)
+       (<Assembly.HG18: 'hg18'>, <Assembly.HG19: 'hg19'>, <Assembly.HG38: 'hg38'>)
+
+    :param from_assembly: assembly to lift over from
+    :param to_assembly: assembly to lift over to
+    :return: assemblies to lift through, including ``from_assembly`` and
+        ``to_assembly``
+    :raise ValueError: if the assemblies are the same, or no path connects them
+    """
+    if from_assembly == to_assembly:
+        msg = "Liftover must be to/from different sources."
+        raise ValueError(msg)
+    paths = {from_assembly: (from_assembly,)}
+    frontier = [from_assembly]
+    while frontier and to_assembly not in paths:
+        next_frontier = []
+        for assembly in frontier:
+            for source, target in sorted(_UCSC_CHAINFILES):
+                if source == assembly and target not in paths:
+                    paths[target] = (*paths[assembly], target)
+                    next_frontier.append(target)
+        frontier = next_frontier
+    if to_assembly not in paths:
+        msg = f"No chainfiles connect {from_assembly} to {to_assembly}"
+        raise ValueError(msg)
+    return paths[to_assembly]
+
+
+def _load_index(chainfile: Path) -> _core.Converter:
+    """Load the binary index for a chainfile, compiling it first if it's missing or
+    out of date.
+
+    :param chainfile: path to chainfile
+    :return: core converter backed by the memory-mapped index
+    """
+    index_file = get_index_path(chainfile)
+    stat = chainfile.stat()
+    if index_file.exists():
+        try:
+            converter = _core.Converter.from_index(str(index_file))
+        except _core.ChainfileError:
+            _logger.warning("Unable to read chainfile index at %s", index_file)
+        else:
+            source_size, source_mtime_ns, _ = converter.index_source
+            if (source_size, source_mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                return converter
+            _logger.info("Chainfile index at %s is out of date", index_file)
+    _logger.info("Compiling chainfile %s to index at %s", chainfile, index_file)
+    compile_index(chainfile, index_file)
+    return _core.Converter.from_index(str(index_file))
+
+
+class RegistryInfo(NamedTuple):
+    """Declare structure of converter registry statistics"""
+
+    converters: int
+    bytes: int
+    max_converters: int | None
+    max_bytes: int | None
+
+
+# from_assembly, to_assembly, use_index, via
+_RegistryKey = tuple[Assembly, Assembly, bool, tuple[Assembly, ...] | None]
+
+
+class ConverterRegistry:
+    """Process-wide store of converters, keyed by assembly pair and options.
+
+    * Each converter is built once. Construction is single-flight: if several
+      threads ask for the same converter at once, one of them loads it and the rest
+      wait for its result, rather than each parsing the same chainfile.
+    * The registry can be bounded by a number of converters and/or an approximate
+      memory budget, measured as the size of each converter's parsed chain data as
+      estimated in Rust, however its chainfile is compressed on disk. Converters are re-measured whenever the budget is
+      checked, since a converter's chain data can grow after it's loaded. When a
+      newly loaded converter takes the registry over budget, the least recently
+      used converters are evicted. The converter just loaded is always kept, even
+      if it exceeds the budget alone.
+    * Eviction only drops a converter from the registry, so callers still holding
+      it can keep lifting with it. Its memory is freed once it's no longer
+      referenced.
+
+    .. code-block:: pycon
+
+       >>> from agct import Assembly, ConverterRegistry
+       >>> registry = ConverterRegistry(max_converters=2)
+       >>> registry.warm_up(
+       ...     [(Assembly.HG19, Assembly.HG38), (Assembly.HG38, Assembly.HG19)]
+       ... )
+       >>> registry.get(Assembly.HG19, Assembly.HG38).convert_coordinate(
+       ...     "chr7", 140453136, 140453137
+       ... )
+       [LiftoverResult(chrom='chr7', start=140753336, end=140753337, strand=<Strand.POSITIVE: '+'>, score=14633688187)]
+       >>> registry.close()
+
+    :py:func:`get_converter` uses a shared, unbounded default registry, available
+    from :py:func:`get_registry`.
+    """
+
+    def __init__(
+        self, max_converters: int | None = None, max_bytes: int | None = None
+    ) -> None:
+        """Create an empty registry.
+
+        :param max_converters: maximum number of converters to keep (unbounded if
+            None)
+        :param max_bytes: approximate memory budget, in bytes of parsed chain data
+            (unbounded if None)
+        :raise ValueError: if a budget isn't positive
+        """
+        self._lock = threading.Lock()
+        self._converters: OrderedDict[_RegistryKey, Future[Converter]] = OrderedDict()
+        self._sizes: dict[_RegistryKey, int] = {}
+        self._closed = False
+        self.max_converters: int | None = None
+        self.max_bytes: int | None = None
+        self.set_budget(max_converters, max_bytes)
+
+    def get(
+        self,
+        from_assembly: Assembly,
+        to_assembly: Assembly,
+        use_index: bool = False,
+        via: Sequence[Assembly] | None = None,
+    ) -> Converter:
+        """Get the converter for an assembly pair, loading it if necessary.
+
+        :param from_assembly: Name of assembly being lifted over from
+        :param to_assembly: Name of assembly to lift over to
+        :param use_index: whether to load chain data from a precompiled binary index
+        :param via: intermediate assemblies to lift through, in order
+        :return: Converter instance
+        :raise RuntimeError: if the registry has been closed
+        """
+        via = None if via is None else tuple(via)
+        key = (from_assembly, to_assembly, use_index, via)
+        with self._lock:
+            if self._closed:
+                msg = "Converter registry is closed"
+                raise RuntimeError(msg)
+            future = self._converters.get(key)
+            loading = future is None
+            if loading:
+                future = Future()
+                self._converters[key] = future
+            else:
+                self._converters.move_to_end(key)
+        if not loading:
+            # wait for whichever thread is loading it
+            return future.result()
+
+        try:
+            converter = Converter(
+                from_assembly=from_assembly,
+                to_assembly=to_assembly,
+                use_index=use_index,
+                via=via,
+            )
+        except BaseException as e:
+            # let the next caller retry
+            with self._lock:
+                if self._converters.get(key) is future:
+                    del self._converters[key]
+            future.set_exception(e)
+            raise
+        future.set_result(converter)
+        with self._lock:
+            if self._converters.get(key) is future:
+                self._sizes[key] = _chain_data_size(converter)
+                self._evict(keep=key)
+        return converter
+
+    def warm_up(
+        self,
+        pairs: Iterable[tuple[Assembly, Assembly]],
+        use_index: bool = False,
+        max_workers: int | None = None,
+    ) -> None:
+        """Load converters ahead of time, e.g. at service startup.
+
+        Converters are loaded from a thread pool, so chainfile downloads overlap.
+
+        :param pairs: ``(from_assembly, to_assembly)`` pairs to load
+        :param use_index: whether to load chain data from precompiled binary indexes
+        :param max_workers: maximum number of converters to load at once (see
+            :py:class:`concurrent.futures.ThreadPoolExecutor`)
+        :raise RuntimeError: if the registry has been closed
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.get, from_assembly, to_assembly, use_index)
+                for from_assembly, to_assembly in pairs
+            ]
+            for future in futures:
+                future.result()
+
+    def set_budget(
+        self, max_converters: int | None = None, max_bytes: int | None = None
+    ) -> None:
+        """Change the registry's budget, evicting converters if it's now exceeded.
+
+        The most recently used converter is always kept.
+
+        :param max_converters: maximum number of converters to keep (unbounded if
+            None)
+        :param max_bytes: approximate memory budget, in bytes of parsed chain data
+            (unbounded if None)
+        :raise ValueError: if a budget isn't positive
+        """
+        if max_converters is not None and max_converters < 1:
+            msg = f"`max_converters` must be positive, got {max_converters}"
+            raise ValueError(msg)
+        if max_bytes is not None and max_bytes < 1:
+            msg = f"`max_bytes` must be positive, got {max_bytes}"
+            raise ValueError(msg)
+        with self._lock:
+            self.max_converters = max_converters
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def evict(
+        self,
+        from_assembly: Assembly,
+        to_assembly: Assembly,
+        use_index: bool = False,
+        via: Sequence[Assembly] | None = None,
+    ) -> bool:
+        """Drop a converter from the registry.
+
+        :param from_assembly: Name of assembly being lifted over from
+        :param to_assembly: Name of assembly to lift over to
+        :param use_index: whether the converter loads chain data from a binary index
+        :param via: intermediate assemblies the converter lifts through, in order
+        :return: whether the converter was in the registry
+        """
+        key = (
+            from_assembly,
+            to_assembly,
+            use_index,
+            None if via is None else tuple(via),
+        )
+        with self._lock:
+            self._sizes.pop(key, None)
+            return self._converters.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Drop every converter from the registry."""
+        with self._lock:
+            self._converters.clear()
+            self._sizes.clear()
+
+    def close(self) -> None:
+        """Drop every converter, and stop loading new ones.
+
+        Converters that are still loading are dropped when they finish.
+        """
+        with self._lock:
+            self._closed = True
+            self._converters.clear()
+            self._sizes.clear()
+
+    def info(self) -> RegistryInfo:
+        """Get the number and approximate size of converters in the registry.
+
+        :return: number of loaded converters, their total size in bytes of parsed
+            chain data, and the registry's budget
+        """
+        with self._lock:
+            self._measure()
+            return RegistryInfo(
+                len(self._sizes),
+                sum(self._sizes.values()),
+                self.max_converters,
+                self.max_bytes,
+            )
+
+    def __enter__(self) -> "ConverterRegistry":
+        """Use the registry as a context manager, closing it on exit."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close the registry."""
+        self.close()
+
+    def _measure(self) -> None:
+        """Update the size of every loaded converter. Must be called with the lock
+        held.
+        """
+        for key in self._sizes:
+            self._sizes[key] = _chain_data_size(self._converters[key].result())
+
+    def _evict(self, keep: _RegistryKey | None = None) -> None:
+        """Evict least recently used converters until the registry is within budget.
+
+        Converters that are still loading aren't counted or evicted. Must be called
+        with the lock held.
+
+        :param keep: key of a converter not to evict (the most recently used one by
+            default)
+        """
+        self._measure()
+        loaded = [key for key in self._converters if key in self._sizes]
+        if keep is None and loaded:
+            keep = loaded[-1]
+        total = sum(self._sizes.values())
+        for key in loaded:
+            if key == keep:
+                continue
+            over_count = (
+                self.max_converters is not None
+                and len(self._sizes) > self.max_converters
+            )
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            if not (over_count or over_bytes):
+                break
+            total -= self._sizes.pop(key)
+            del self._converters[key]
+            _logger.info("Evicted converter %s from registry", key)
+
+
+def _chain_data_size(converter: Converter) -> int:
+    """Approximate a converter's memory use by the size of its parsed chain data.
+
+    The size is estimated in Rust, from the chain data the converter holds rather
+    than the size of its chainfile on disk, which understates it several-fold for
+    compressed chainfiles. It includes the block index built for sorted lifts, and
+    the inverse converter if one has been built.
+
+    :param converter: converter to measure
+    :return: approximate size of the converter's chain data, in bytes
+    """
+    size = converter._converter.chain_data_size()  # noqa: SLF001
+    if converter._inverse is not None:  # noqa: SLF001
+        size += converter._inverse._converter.chain_data_size()  # noqa: SLF001
+    return size
+
+
+_default_registry = ConverterRegistry()
+
+
+def get_registry() -> ConverterRegistry:
+    """Get the default converter registry used by :py:func:`get_converter`.
+
+    Use it to warm up converters at startup, set a budget, or release converters:
+
+    .. code-block:: pycon
+
+       >>> from agct import Assembly, get_registry
+       >>> get_registry().warm_up([(Assembly.HG19, Assembly.HG38)])
+       >>> get_registry().set_budget(max_converters=4)
+
+    :return: default registry
+    """
+    return _default_registry
+
+
+def prefetch_chainfiles(
+    pairs: Iterable[tuple[Assembly, Assembly]],
+    use_index: bool = False,
+    max_workers: int | None = None,
+) -> list[Path]:
+    """Acquire chainfiles for several assembly pairs at once, e.g. while provisioning
+    a node, without loading converters.
+
+    Chainfiles that are already present are left alone. Downloads run concurrently,
+    resume if interrupted, and are verified against UCSC's published checksums (see
+    :py:mod:`agct.downloads`).
+
+    :param pairs: ``(from_assembly, to_assembly)`` pairs to acquire chainfiles for
+    :param use_index: whether to also compile each chainfile into a binary index
+        (see :py:func:`compile_index`), if it isn't already up to date
+    :param max_workers: maximum number of chainfiles to acquire at once (see
+        :py:class:`concurrent.futures.ThreadPoolExecutor`)
+    :return: paths to chainfiles, in the same order as ``pairs``
+    """
+
+    def _prefetch(pair: tuple[Assembly, Assembly]) -> Path:
+        chainfile = Converter.get_chainfile(*pair)
+        if use_index:
+            _load_index(chainfile)
+        return chainfile
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_prefetch, pairs))
+
+
+def get_converter(
+    from_assembly: Assembly,
+    to_assembly: Assembly,
+    use_index: bool = False,
+    metrics: bool = False,
+    via: Sequence[Assembly] | None = None,
+    inverted: bool = False,
+) -> Converter:
     """Get a converter to lift from one assembly to another.
 
-    This function wraps converter initialization with ``functools.cache``, so successive
-    calls should return the same converter instance.
+    Converters are kept in the default :py:class:`ConverterRegistry` (see
+    :py:func:`get_registry`), so successive calls should return the same converter
+    instance, unless it has been evicted in the meantime.
+
+    Assemblies without a direct UCSC chainfile are connected through intermediate
+    assemblies, either found automatically or given in ``via``, e.g.
+    ``get_converter(Assembly.HG18, Assembly.HG38, via=[Assembly.HG19])``. See
+    :py:class:`Converter`.
 
     :param from_assembly: Name of assembly being lifted over from
     :param to_assembly: Name of assembly to lift over to
+    :param use_index: whether to load chain data from a precompiled binary index
+    :param metrics: whether to record liftover metrics on the converter (see
+        :py:meth:`Converter.enable_metrics`). Once enabled, metrics stay enabled for
+        every caller of the shared converter.
+    :param via: intermediate assemblies to lift through, in order
+    :param inverted: whether to derive the converter from the one lifting from
+        ``to_assembly`` to ``from_assembly``, sharing its chain data rather than
+        loading another chainfile (see :py:meth:`Converter.inverse`)
     :return: Converter instance
+    :raise RuntimeError: if the default registry has been closed
     """
-    return Converter(from_assembly=from_assembly, to_assembly=to_assembly)
+    if inverted:
+        converter = _default_registry.get(
+            to_assembly, from_assembly, use_index, None if via is None else via[::-1]
+        ).inverse()
+    else:
+        converter = _default_registry.get(from_assembly, to_assembly, use_index, via)
+    if metrics and not converter.metrics_enabled:
+        converter.enable_metrics()
+    return converter
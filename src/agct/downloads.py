@@ -0,0 +1,244 @@
+"""Download chainfiles, resuming interrupted downloads and verifying checksums.
+
+Compressed chainfiles are downloaded next to their destination, as
+``<chainfile>.part``. If a download is interrupted, the next attempt asks the server
+for just the rest of the file. Once complete, the download is checked against the
+``md5sum.txt`` that UCSC publishes alongside its chainfiles, and then either moved
+into place as-is or streamed through gzip decompression into place.
+
+Threads and processes downloading the same chainfile take turns, holding a lock on
+``<chainfile>.lock`` throughout, so they never write to the same partial download at
+once. A download that was waiting on another one that completed the same chainfile
+is skipped.
+
+Chainfiles are fetched from UCSC by default. Set the ``AGCT_CHAINFILE_URL``
+environment variable to use a mirror with the same layout (e.g. a local server).
+"""
+
+import contextlib
+import gzip
+import hashlib
+import http.client
+import logging
+import os
+import shutil
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from pathlib import Path
+
+from agct.seqref_registry import Assembly
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_CHAINFILE_URL = "https://hgdownload.soe.ucsc.edu/goldenPath"
+CHAINFILE_URL_ENV = "AGCT_CHAINFILE_URL"
+
+_CHUNK_SIZE = 1 << 20
+_TIMEOUT = 60
+_LOCK_POLL_INTERVAL = 0.1
+
+
+def get_chainfile_url(from_assembly: Assembly, to_assembly: Assembly) -> str:
+    """Get the URL of the gzipped UCSC chainfile between two assemblies.
+
+    :param from_assembly: genome lifting from
+    :param to_assembly: genome lifting to
+    :return: chainfile URL, under ``AGCT_CHAINFILE_URL`` if set
+    """
+    base_url = os.environ.get(CHAINFILE_URL_ENV, DEFAULT_CHAINFILE_URL).rstrip("/")
+    return f"{base_url}/{from_assembly.value}/liftOver/{from_assembly.value}To{to_assembly.value.title()}.over.chain.gz"
+
+
+def download_chainfile(
+    url: str, outfile: Path, verify: bool = True, decompress: bool = True
+) -> None:
+    """Download a gzipped chainfile, optionally decompressing it.
+
+    :param url: URL of gzipped chainfile
+    :param outfile: path to save chainfile to
+    :param verify: whether to check the download against the ``md5sum.txt`` file in
+        the same directory as ``url``. Verification is skipped, with a warning, if
+        there's no such file.
+    :param decompress: whether to save the chainfile decompressed. Otherwise, it's
+        saved gzipped, as published. Converters read either.
+    :raise ValueError: if the download doesn't match its checksum, or ``url`` isn't
+        an HTTP(S) URL
+    :raise urllib.error.URLError: if the download fails
+    """
+    previous = _stat(outfile)
+    with _lock(outfile.with_name(f"{outfile.name}.lock")):
+        current = _stat(outfile)
+        if current is not None and current != previous:
+            _logger.info("Chainfile at %s was downloaded while waiting", outfile)
+            return
+        _download_chainfile(url, outfile, verify, decompress)
+
+
+def _download_chainfile(
+    url: str, outfile: Path, verify: bool, decompress: bool
+) -> None:
+    """Download a gzipped chainfile, optionally decompressing it. The caller must
+    hold the chainfile's lock.
+
+    See :py:func:`download_chainfile` for parameters.
+    """
+    suffix = ".gz.part" if decompress else ".part"
+    download_path = outfile.with_name(f"{outfile.name}{suffix}")
+    _download(url, download_path)
+
+    if verify:
+        expected = _get_checksum(url)
+        if expected is None:
+            _logger.warning("No checksum published for %s, skipping verification", url)
+        else:
+            actual = _md5(download_path)
+            if actual != expected:
+                download_path.unlink()
+                msg = f"Checksum mismatch for {url}: expected MD5 {expected}, got {actual}"
+                raise ValueError(msg)
+
+    if not decompress:
+        download_path.replace(outfile)
+        _logger.info("Downloaded chainfile from %s to %s", url, outfile)
+        return
+
+    tmp_path = outfile.with_name(f"{outfile.name}.{os.getpid()}.tmp")
+    try:
+        with gzip.open(download_path) as src, tmp_path.open("wb") as dst:
+            shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+    except (OSError, EOFError):
+        _logger.exception("Unable to decompress chainfile downloaded from %s", url)
+        tmp_path.unlink(missing_ok=True)
+        download_path.unlink()
+        raise
+    tmp_path.replace(outfile)
+    download_path.unlink()
+    _logger.info("Downloaded chainfile from %s to %s", url, outfile)
+
+
+def _stat(path: Path) -> tuple[int, int] | None:
+    """Get a file's size and modification time, to tell whether it's changed.
+
+    :param path: path to file
+    :return: size and modification time in ns, or None if there's no file
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+@contextlib.contextmanager
+def _lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on a file, waiting for other threads and processes to
+    release it first. The file is created if needed, and left in place afterwards.
+
+    :param path: path to lock file
+    """
+    with path.open("a+b") as f:
+        if sys.platform == "win32":
+            import msvcrt  # noqa: PLC0415
+
+            # locks the first byte, which needn't exist yet
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(_LOCK_POLL_INTERVAL)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl  # noqa: PLC0415
+
+            # flock locks belong to the open file, so threads exclude each other too
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _open_url(
+    url: str, headers: dict[str, str] | None = None
+) -> http.client.HTTPResponse:
+    """Open an HTTP(S) URL.
+
+    :param url: URL to open
+    :param headers: request headers
+    :return: HTTP response
+    :raise ValueError: if ``url`` isn't an HTTP(S) URL
+    """
+    if not url.startswith(("http://", "https://")):
+        msg = f"Chainfile URLs must use HTTP or HTTPS: {url}"
+        raise ValueError(msg)
+    request = urllib.request.Request(url, headers=headers or {})  # noqa: S310
+    return urllib.request.urlopen(request, timeout=_TIMEOUT)  # noqa: S310
+
+
+def _download(url: str, path: Path) -> None:
+    """Download a file, resuming from a partial download at ``path`` if there is one.
+
+    :param url: URL to download
+    :param path: path to save file to
+    """
+    offset = path.stat().st_size if path.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else None
+    try:
+        response = _open_url(url, headers)
+    except urllib.error.HTTPError as e:
+        # nothing left to download
+        if e.code == 416 and offset:  # noqa: PLR2004
+            return
+        raise
+    with response:
+        if offset and response.status != 206:  # noqa: PLR2004
+            _logger.info("Server ignored range request for %s, restarting", url)
+            offset = 0
+        elif offset:
+            _logger.info("Resuming download of %s from byte %s", url, offset)
+        with path.open("ab" if offset else "wb") as f:
+            shutil.copyfileobj(response, f, _CHUNK_SIZE)
+
+
+def _get_checksum(url: str) -> str | None:
+    """Get the published MD5 checksum of a file.
+
+    :param url: URL of file
+    :return: checksum listed for the file in ``md5sum.txt`` in the same directory, or
+        None if there's no such file or it doesn't list this one
+    """
+    directory, _, name = url.rpartition("/")
+    try:
+        with _open_url(f"{directory}/md5sum.txt") as response:
+            checksums = response.read().decode()
+    except urllib.error.HTTPError as e:
+        if e.code == 404:  # noqa: PLR2004
+            return None
+        raise
+    for line in checksums.splitlines():
+        checksum, _, listed_name = line.partition(" ")
+        if listed_name.strip().lstrip("*") == name:
+            return checksum.lower()
+    return None
+
+
+def _md5(path: Path) -> str:
+    """Compute the MD5 checksum of a file.
+
+    :param path: path to file
+    :return: hex digest
+    """
+    digest = hashlib.md5()  # noqa: S324
+    with path.open("rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,103 @@
+"""Describe liftover metrics recorded by a converter.
+
+Counters and latency histograms are maintained in Rust with atomic operations, and
+are only updated while metrics are enabled (see
+:py:meth:`Converter.enable_metrics() <agct.converter.Converter.enable_metrics>`).
+"""
+
+from collections.abc import Callable
+from typing import NamedTuple
+
+
+class LatencyHistogram(NamedTuple):
+    """Declare structure of a latency histogram
+
+    ``counts[i]`` is the number of durations of at least ``2**i`` and less than
+    ``2**(i + 1)`` nanoseconds (the first bucket also counts durations under 1 ns, and
+    the last bucket counts everything longer).
+    """
+
+    counts: list[int]
+    total_ns: int
+
+    @property
+    def count(self) -> int:
+        """Get number of recorded durations"""
+        return sum(self.counts)
+
+    @property
+    def mean_ns(self) -> float:
+        """Get mean recorded duration, in ns (0 if nothing has been recorded)"""
+        count = self.count
+        return self.total_ns / count if count else 0.0
+
+    def quantile(self, q: float) -> int:
+        """Estimate a quantile of recorded durations.
+
+        :param q: quantile, between 0 and 1
+        :return: upper bound of the bucket containing the quantile, in ns (0 if nothing
+            has been recorded)
+        :raise ValueError: if ``q`` is out of range
+        """
+        if not 0 <= q <= 1:
+            msg = f"Quantile must be between 0 and 1, got {q}"
+            raise ValueError(msg)
+        count = self.count
+        if not count:
+            return 0
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= q * count:
+                return 2 ** (i + 1)
+        return 2 ** len(self.counts)
+
+
+class MetricsSnapshot(NamedTuple):
+    """Declare structure of a converter's metrics at a point in time
+
+    ``lift_latency`` and ``batch_latency`` measure time spent in Rust per
+    single-interval and per batch call, respectively. ``call_latency`` measures
+    single-interval calls end to end, including Python wrapping and result caching,
+    so the difference between it and ``lift_latency`` is the cost of the Python
+    layer.
+    """
+
+    load_time_ns: int
+    single_calls: int
+    batch_calls: int
+    intervals: int
+    mapped: int
+    unmapped: int
+    multi_segment: int
+    segments: int
+    errors: int
+    lift_latency: LatencyHistogram
+    batch_latency: LatencyHistogram
+    call_latency: LatencyHistogram
+
+    @classmethod
+    def from_core(cls, snapshot: dict) -> "MetricsSnapshot":
+        """Build a snapshot from the values reported by ``_core.Converter``
+
+        :param snapshot: output of ``_core.Converter.metrics_snapshot()``
+        :return: structured snapshot
+        """
+        return cls(
+            **{
+                name: value
+                for name, value in snapshot.items()
+                if not name.endswith("_latency_ns")
+            },
+            lift_latency=LatencyHistogram(*snapshot["lift_latency_ns"]),
+            batch_latency=LatencyHistogram(*snapshot["batch_latency_ns"]),
+            call_latency=LatencyHistogram(*snapshot["call_latency_ns"]),
+        )
+
+    @property
+    def mapped_rate(self) -> float:
+        """Get fraction of lifted intervals that mapped to at least one segment"""
+        return self.mapped / self.intervals if self.intervals else 0.0
+
+
+MetricsCallback = Callable[[MetricsSnapshot], None]
@@ -0,0 +1,433 @@
+"""Precompute and persist liftover of fixed sets of single-base positions.
+
+Variant panels and catalogs are the same few million positions lifted again in every
+job. A panel table lifts them once, with
+:py:meth:`Converter.convert_positions() <agct.converter.Converter.convert_positions>`,
+and writes the results to a file in the ``wags-tails`` data directory, sorted by
+source position. Loading a table memory-maps the file, so it costs nothing up front
+and its pages are shared between every process on a host, and a lookup is a binary
+search over the mapped keys, without touching chain data at all. With NumPy
+installed, batch lookups search the keys for the whole batch at once.
+
+Tables are keyed by a SHA-256 hash of the converter's chainfile (and its direction),
+so a table is only ever used with the chainfile it was built from: once the
+chainfile changes, :py:func:`load_panel` no longer finds it, and it must be rebuilt.
+
+File layout (native byte order):
+
+* header: magic, format version, whether the chainfile is inverted, chainfile hash,
+  length of the contig names block, and number of rows
+* contig names: source contig names, a newline, then target contig names, each
+  tab-separated, padded to a multiple of 8 bytes
+* columns, one entry per row: source keys (contig ID in the upper 32 bits and
+  position in the lower 32) as int64s in ascending order, lifted positions and
+  scores as int64s, target contig IDs as int32s (``-1`` for positions that don't
+  lift), and strands as int8s
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from agct.converter import Converter, LiftedPosition, LiftoverArrays, Strand
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_logger = logging.getLogger(__name__)
+
+_MAGIC = b"AGCTPNL\x00"
+_VERSION = 1
+_HEADER = struct.Struct("=8sII32sQQ")
+_MAX_POSITION = 2**32 - 1
+_UNMAPPED = -1
+
+
+@lru_cache(maxsize=32)
+def _hash_chainfile(chainfile: Path, size: int, mtime_ns: int) -> bytes:  # noqa: ARG001
+    """Hash a chainfile's contents. Cached by size and modification time, which
+    change whenever the file does.
+    """
+    with chainfile.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").digest()
+
+
+def _get_chainfile_hash(converter: Converter) -> bytes:
+    """Get the SHA-256 hash of a converter's chainfile.
+
+    :raise ValueError: if the converter was loaded from chainfile contents rather
+        than a path
+    """
+    if converter.chainfile is None:
+        msg = "Panel tables require a converter loaded from a chainfile path"
+        raise ValueError(msg)
+    stat = converter.chainfile.stat()
+    return _hash_chainfile(
+        converter.chainfile.resolve(), stat.st_size, stat.st_mtime_ns
+    )
+
+
+def get_panel_path(converter: Converter, name: str) -> Path:
+    """Get location of a panel table.
+
+    Tables are stored in the ``agct-panels`` directory of the ``wags-tails`` data
+    directory, named by panel and chainfile hash.
+
+    :param converter: converter that the panel is lifted with
+    :param name: panel name
+    :return: path to panel table (which may not exist yet)
+    :raise ValueError: if ``name`` isn't a plain file name, or ``converter`` was
+        loaded from chainfile contents rather than a path
+    """
+    from wags_tails.utils.storage import get_data_dir  # noqa: PLC0415
+
+    if not name or name != Path(name).name or name.startswith("."):
+        msg = f"`name` must be a plain file name, got {name!r}"
+        raise ValueError(msg)
+    key = _get_chainfile_hash(converter).hex()[:16]
+    if converter.inverted:
+        key += "-inverse"
+    return get_data_dir() / "agct-panels" / f"{name}.{key}.agctpanel"
+
+
+class LiftPanel:
+    """Memory-mapped liftover results for a fixed set of single-base positions
+
+    Create with :py:func:`build_panel`, or reopen with :py:func:`load_panel`. Lookups
+    give the same results as
+    :py:meth:`Converter.convert_position() <agct.converter.Converter.convert_position>`,
+    for positions in the panel only.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Map a panel table.
+
+        :param path: path to panel table
+        :raise ValueError: if the file isn't a panel table of a supported version
+        """
+        self.path = path
+        with path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if len(view) < _HEADER.size:
+            msg = f"Not a panel table: {path}"
+            raise ValueError(msg)
+        magic, version, inverted, chainfile_hash, names_len, rows = _HEADER.unpack(
+            view[: _HEADER.size]
+        )
+        if magic != _MAGIC:
+            msg = f"Not a panel table: {path}"
+            raise ValueError(msg)
+        if version != _VERSION:
+            msg = f"Unsupported panel table version {version} (expected {_VERSION}): {path}"
+            raise ValueError(msg)
+        self.inverted = bool(inverted)
+        self.chainfile_hash = chainfile_hash
+
+        offset = _HEADER.size
+        names = bytes(view[offset : offset + names_len]).decode().rstrip("\0")
+        source_names, _, target_names = names.partition("\n")
+        self.source_contigs = tuple(source_names.split("\t")) if source_names else ()
+        self.target_contigs = tuple(target_names.split("\t")) if target_names else ()
+        self._source_ids = {name: i for i, name in enumerate(self.source_contigs)}
+        offset += names_len
+
+        columns = []
+        for format_ in ("q", "q", "q", "i", "b"):
+            size = rows * struct.calcsize(format_)
+            columns.append(view[offset : offset + size].cast(format_))
+            offset += size
+        self._keys, self._positions, self._scores, self._contigs, self._strands = (
+            columns
+        )
+
+    def __len__(self) -> int:
+        """Get number of positions in the panel"""
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        """Summarize panel"""
+        return f"LiftPanel(<{len(self)} positions at {self.path}>)"
+
+    def _find(self, chrom: str, position: int) -> int:
+        """Find the row for a position.
+
+        :raise KeyError: if the position isn't in the panel
+        """
+        contig = self._source_ids.get(chrom)
+        if contig is not None and 0 <= position <= _MAX_POSITION:
+            key = (contig << 32) | position
+            row = bisect_left(self._keys, key)
+            if row < len(self._keys) and self._keys[row] == key:
+                return row
+        raise KeyError((chrom, position))
+
+    def lift(self, chrom: str, position: int) -> LiftedPosition | None:
+        """Look up a lifted base.
+
+        .. code-block:: pycon
+
+           >>> from agct import Assembly, Converter
+           >>> from agct.panels import load_panel
+           >>> panel = load_panel(Converter(Assembly.HG19, Assembly.HG38), "clinical")
+           >>> panel.lift("chr7", 140453136)
+           LiftedPosition(chrom='chr7', position=140753336, strand=<Strand.POSITIVE: '+'>, score=14633688187)
+
+        :param chrom: chromosome name as given in chainfile
+        :param position: 0-based position of base on the positive strand
+        :return: lifted base, or None if it doesn't lift
+        :raise KeyError: if the position isn't in the panel
+        """
+        row = self._find(chrom, position)
+        contig = self._contigs[row]
+        if contig == _UNMAPPED:
+            return None
+        return LiftedPosition(
+            self.target_contigs[contig],
+            self._positions[row],
+            Strand.POSITIVE if self._strands[row] > 0 else Strand.NEGATIVE,
+            self._scores[row],
+        )
+
+    def lift_many(
+        self, chroms: Sequence[str], positions: Sequence[int]
+    ) -> LiftoverArrays:
+        """Look up a batch of lifted bases.
+
+        :param chroms: chromosome names as given in chainfile
+        :param positions: 0-based positions of bases on the positive strand
+        :return: array-backed results, as returned by
+            :py:meth:`Converter.convert_positions() <agct.converter.Converter.convert_positions>`:
+            a one-base segment for each base that lifts, with
+            :py:attr:`LiftoverArrays.index <agct.converter.LiftoverArrays.index>`
+            giving the input it came from
+        :raise ValueError: if input columns differ in length
+        :raise KeyError: if a position isn't in the panel
+        """
+        if len(chroms) != len(positions):
+            msg = f"`chroms` and `positions` must be the same length, got {len(chroms)} and {len(positions)}"
+            raise ValueError(msg)
+        try:
+            columns = self._lift_rows_numpy(chroms, positions)
+        except ImportError:
+            columns = self._lift_rows(chroms, positions)
+        return LiftoverArrays(
+            self.target_contigs, *(memoryview(column).cast("B") for column in columns)
+        )
+
+    def _lift_rows(
+        self, chroms: Sequence[str], positions: Sequence[int]
+    ) -> tuple[array, ...]:
+        """Look up a batch of lifted bases one at a time.
+
+        :return: index, contig, start, end, strand, and score columns
+        :raise KeyError: if a position isn't in the panel
+        """
+        index, contig, start, end, strand, score = (
+            array(format_) for format_ in ("q", "i", "q", "q", "b", "q")
+        )
+        for i, (chrom, position) in enumerate(zip(chroms, positions, strict=True)):
+            row = self._find(chrom, position)
+            if self._contigs[row] == _UNMAPPED:
+                continue
+            lifted = self._positions[row]
+            index.append(i)
+            contig.append(self._contigs[row])
+            strand.append(self._strands[row])
+            score.append(self._scores[row])
+            # negative strand segments run from end to start, as in liftover results
+            if self._strands[row] > 0:
+                start.append(lifted)
+                end.append(lifted + 1)
+            else:
+                start.append(lifted + 1)
+                end.append(lifted)
+        return index, contig, start, end, strand, score
+
+    def _lift_rows_numpy(
+        self, chroms: Sequence[str], positions: Sequence[int]
+    ) -> tuple["np.ndarray", ...]:
+        """Look up a batch of lifted bases with NumPy, searching the mapped keys for
+        the whole batch at once.
+
+        :return: index, contig, start, end, strand, and score columns
+        :raise KeyError: if a position isn't in the panel
+        :raise ImportError: if NumPy isn't installed
+        """
+        import numpy as np  # noqa: PLC0415
+
+        try:
+            position_array = np.asarray(positions, dtype=np.int64)
+        except OverflowError:
+            # positions beyond int64 bounds can't be in the panel; report the first
+            return self._lift_rows(chroms, positions)
+        names, inverse = np.unique(
+            np.asarray(chroms, dtype=np.str_), return_inverse=True
+        )
+        contig_ids = np.array(
+            [self._source_ids.get(name, -1) for name in names.tolist()], dtype=np.int64
+        )[inverse.reshape(-1)]
+        keys = (contig_ids << 32) | position_array
+        panel_keys = np.frombuffer(self._keys, dtype=np.int64)
+        rows = np.searchsorted(panel_keys, keys)
+        found = (
+            (contig_ids >= 0)
+            & (position_array >= 0)
+            & (position_array <= _MAX_POSITION)
+            & (rows < len(panel_keys))
+        )
+        found[found] = panel_keys[rows[found]] == keys[found]
+        if not found.all():
+            missing = int(np.argmin(found))
+            raise KeyError((chroms[missing], positions[missing]))
+
+        contigs = np.frombuffer(self._contigs, dtype=np.int32)[rows]
+        index = np.flatnonzero(contigs != _UNMAPPED)
+        rows = rows[index]
+        lifted = np.frombuffer(self._positions, dtype=np.int64)[rows]
+        strands = np.frombuffer(self._strands, dtype=np.int8)[rows]
+        # negative strand segments run from end to start, as in liftover results
+        negative = strands < 0
+        return (
+            index.astype(np.int64),
+            contigs[index],
+            lifted + negative,
+            lifted + ~negative,
+            strands,
+            np.frombuffer(self._scores, dtype=np.int64)[rows],
+        )
+
+
+def build_panel(
+    converter: Converter,
+    name: str,
+    chroms: Sequence[str],
+    positions: Sequence[int],
+) -> LiftPanel:
+    """Lift a set of single-base positions, and store the results as a panel table.
+
+    Any existing table for the panel and chainfile is replaced. The table is written
+    to a temporary file and moved into place, so processes that already have it
+    mapped keep their copy.
+
+    .. code-block:: pycon
+
+       >>> from agct import Assembly, Converter
+       >>> from agct.panels import build_panel
+       >>> converter = Converter(Assembly.HG19, Assembly.HG38)
+       >>> build_panel(converter, "clinical", ["chr7", "chr7"], [140453136, 140453137])
+       LiftPanel(<2 positions at .../agct-panels/clinical.3f2c...agctpanel>)
+
+    :param converter: converter to lift positions with
+    :param name: panel name, used in the table's file name
+    :param chroms: chromosome names as given in chainfile
+    :param positions: 0-based positions of bases on the positive strand. Duplicate
+        positions are stored once.
+    :return: the new panel table
+    :raise ValueError: if input columns differ in length, a position is negative or
+        too large to represent as a 32 bit unsigned int, ``name`` isn't a plain file
+        name, or ``converter`` was loaded from chainfile contents rather than a path
+    """
+    if len(chroms) != len(positions):
+        msg = f"`chroms` and `positions` must be the same length, got {len(chroms)} and {len(positions)}"
+        raise ValueError(msg)
+    path = get_panel_path(converter, name)
+    source_contigs = sorted(set(chroms))
+    source_ids = {chrom: i for i, chrom in enumerate(source_contigs)}
+    keys = set()
+    for chrom, position in zip(chroms, positions, strict=True):
+        if not 0 <= position <= _MAX_POSITION:
+            msg = f"Position exceeds representable bounds of a 32 bit unsigned int: {position=} -- this is unsupported"
+            raise ValueError(msg)
+        keys.add((source_ids[chrom] << 32) | position)
+    keys = array("q", sorted(keys))
+
+    # keys are in chromosome and position order, so they lift in a single pass
+    results = converter.convert_positions(
+        [source_contigs[key >> 32] for key in keys],
+        [key & _MAX_POSITION for key in keys],
+        sorted_input=True,
+    )
+    lifted_positions = array("q", bytes(8 * len(keys)))
+    scores = array("q", bytes(8 * len(keys)))
+    contigs = array("i", [_UNMAPPED]) * len(keys)
+    strands = array("b", bytes(len(keys)))
+    for i, contig, start, end, strand, score in zip(
+        results.index,
+        results.contig,
+        results.start,
+        results.end,
+        results.strand,
+        results.score,
+        strict=True,
+    ):
+        lifted_positions[i] = min(start, end)
+        scores[i] = score
+        contigs[i] = contig
+        strands[i] = strand
+
+    names = (
+        "\t".join(source_contigs) + "\n" + "\t".join(results.contig_names)
+    ).encode()
+    names += b"\0" * (-len(names) % 8)
+    header = _HEADER.pack(
+        _MAGIC,
+        _VERSION,
+        converter.inverted,
+        _get_chainfile_hash(converter),
+        len(names),
+        len(keys),
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = path.with_name(f".{path.name}.{os.getpid()}")
+    with partial_path.open("wb") as f:
+        f.write(header)
+        f.write(names)
+        for column in (keys, lifted_positions, scores, contigs, strands):
+            column.tofile(f)
+    partial_path.replace(path)
+    _logger.info("Built panel table for %s positions at %s", len(keys), path)
+    return LiftPanel(path)
+
+
+def load_panel(converter: Converter, name: str) -> LiftPanel:
+    """Open the panel table built with a converter's current chainfile.
+
+    .. code-block:: pycon
+
+       >>> from agct import Assembly, Converter
+       >>> from agct.panels import build_panel, load_panel
+       >>> converter = Converter(Assembly.HG19, Assembly.HG38)
+       >>> try:
+       ...     panel = load_panel(converter, "clinical")
+       ... except FileNotFoundError:
+       ...     panel = build_panel(converter, "clinical", chroms, positions)
+
+    :param converter: converter that the panel was lifted with
+    :param name: panel name
+    :return: memory-mapped panel table
+    :raise FileNotFoundError: if there's no table for the panel that was built from
+        the converter's chainfile as it is now
+    :raise ValueError: if ``name`` isn't a plain file name, ``converter`` was loaded
+        from chainfile contents rather than a path, or the table is unreadable
+    """
+    path = get_panel_path(converter, name)
+    if not path.exists():
+        msg = f"No panel table for {name!r} built from chainfile {converter.chainfile}"
+        raise FileNotFoundError(msg)
+    panel = LiftPanel(path)
+    if (
+        panel.chainfile_hash != _get_chainfile_hash(converter)
+        or panel.inverted != converter.inverted
+    ):
+        msg = f"Panel table at {path} was built from a different chainfile"
+        raise FileNotFoundError(msg)
+    return panel
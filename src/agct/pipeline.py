@@ -0,0 +1,1101 @@
+"""Lift over records in BED, VCF, GTF, GFF3, and other tabular files.
+
+Files are streamed: records are read and lifted in fixed-size batches with
+:py:meth:`Converter.convert_coordinates() <agct.converter.Converter.convert_coordinates>`,
+and written out as each batch completes, so memory use is bounded by the batch size
+rather than the file size. Input may be plain text, gzip, or BGZF-compressed.
+
+Large uncompressed files can be split into byte ranges and lifted by a pool of worker
+processes, each holding its own :py:class:`~agct.converter.Converter` for the same
+chainfile. Results are merged back in input order, or in coordinate order on request.
+
+A record is converted if it lifts to exactly one segment. Records that don't lift,
+that are split across multiple segments, or that can't be parsed are written to a
+separate unmapped output, each preceded by a UCSC ``liftOver``-style comment giving
+the reason.
+
+GTF and GFF3 records are read in loci: runs of records linked by gene, transcript,
+or parent IDs, which are lifted together so that transcript structure can be checked.
+Memory use is then bounded by the batch size plus the largest locus.
+"""
+
+import contextlib
+import gzip
+import heapq
+import io
+import logging
+import math
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from enum import StrEnum
+from functools import partial
+from itertools import pairwise
+from pathlib import Path
+from typing import IO, NamedTuple
+
+from agct.converter import Converter
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100_000
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+_MAX_POSITION = 2**32 - 1
+_SHARDS_PER_PROCESS = 4
+_MAX_SHARD_SIZE = 256 * 1024 * 1024
+_SORT_RUN_SIZE = 64 * 1024 * 1024
+_GZIP_MAGIC = b"\x1f\x8b"
+_GZIP_SUFFIXES = {".gz", ".bgz"}
+_FLIPPED_STRANDS = {"+": "-", "-": "+"}
+
+
+class FileFormat(StrEnum):
+    """Constrain supported file formats."""
+
+    BED = "bed"
+    VCF = "vcf"
+    GTF = "gtf"
+    GFF3 = "gff3"
+    TSV = "tsv"
+
+
+class UnmappedReason(StrEnum):
+    """Describe why a record wasn't converted."""
+
+    DELETED = "Deleted in new"
+    SPLIT = "Split in new"
+    INVERTED = "Inverted in new"
+    RESIZED = "Partially deleted in new"
+    INVALID = "Invalid record"
+    TRANSCRIPT_SPLIT = "Transcript split in new"
+    EXONS_REORDERED = "Exons reordered in new"
+
+
+class LiftoverStats(NamedTuple):
+    """Count records written to each output."""
+
+    converted: int
+    unmapped: int
+
+
+class _Record(NamedTuple):
+    """Parsed input record, or a record that failed to parse (``chrom`` is None)."""
+
+    line: str
+    fields: list[str]
+    chrom: str | None
+    start: int
+    end: int
+
+
+class _Lifted(NamedTuple):
+    """Single segment that a record lifted to."""
+
+    chrom: str
+    start: int
+    end: int
+    strand: str
+
+
+def detect_format(path: Path) -> FileFormat:
+    """Guess file format from a file name, ignoring any compression suffix.
+
+    :param path: path to file
+    :return: file format (TSV if unrecognized)
+    """
+    suffixes = [s.lower() for s in path.suffixes]
+    if suffixes and suffixes[-1] in _GZIP_SUFFIXES:
+        suffixes = suffixes[:-1]
+    if suffixes and suffixes[-1] == ".bed":
+        return FileFormat.BED
+    if suffixes and suffixes[-1] == ".vcf":
+        return FileFormat.VCF
+    if suffixes and suffixes[-1] == ".gtf":
+        return FileFormat.GTF
+    if suffixes and suffixes[-1] in {".gff", ".gff3"}:
+        return FileFormat.GFF3
+    return FileFormat.TSV
+
+
+def open_input(path: Path, buffer_size: int = DEFAULT_BUFFER_SIZE) -> IO[str]:
+    """Open a possibly-compressed text file for reading.
+
+    Compression is detected from file contents rather than name. BGZF files are
+    multi-member gzip files, so they're handled by the standard gzip reader.
+
+    :param path: path to file
+    :param buffer_size: read buffer size, in bytes
+    :return: text file handle
+    """
+    with path.open("rb") as f:
+        compressed = f.read(2) == _GZIP_MAGIC
+    if compressed:
+        raw = io.BufferedReader(gzip.GzipFile(path, "rb"), buffer_size)
+    else:
+        raw = path.open("rb", buffering=buffer_size)
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+
+def open_output(path: Path, buffer_size: int = DEFAULT_BUFFER_SIZE) -> IO[str]:
+    """Open a text file for writing, gzip-compressing it if its name ends in ``.gz``.
+
+    :param path: path to file
+    :param buffer_size: write buffer size, in bytes
+    :return: text file handle
+    """
+    if path.suffix.lower() in _GZIP_SUFFIXES:
+        raw = io.BufferedWriter(gzip.GzipFile(path, "wb"), buffer_size)
+    else:
+        raw = path.open("wb", buffering=buffer_size)
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+
+class _RecordFormat:
+    """Parse and rewrite records of a tabular format with interbase coordinates."""
+
+    def __init__(
+        self,
+        chrom_col: int = 0,
+        start_col: int = 1,
+        end_col: int = 2,
+        strand_col: int | None = None,
+        one_based: bool = False,
+    ) -> None:
+        """Configure column layout.
+
+        :param chrom_col: index of chromosome column
+        :param start_col: index of start position column
+        :param end_col: index of end position column
+        :param strand_col: index of strand column, if any. Strands are flipped when a
+            record lifts to the opposite strand.
+        :param one_based: whether positions are 1-based and fully closed (rather than
+            0-based and half-open, i.e. inter-residue)
+        """
+        self.chrom_col = chrom_col
+        self.start_col = start_col
+        self.end_col = end_col
+        self.strand_col = strand_col
+        self.offset = 1 if one_based else 0
+
+    def is_header(self, line: str) -> bool:
+        """Check whether a line is a header or comment line."""
+        return line.startswith(("#", "track", "browser"))
+
+    def convert_header(self, line: str) -> str | None:
+        """Get header line to write to converted output, or None to drop it."""
+        return line
+
+    def parse(self, line: str) -> _Record:
+        """Parse a data line."""
+        fields = line.rstrip("\r\n").split("\t")
+        try:
+            chrom = fields[self.chrom_col]
+            start = int(fields[self.start_col]) - self.offset
+            end = int(fields[self.end_col])
+        except (IndexError, ValueError):
+            return _Record(line, fields, None, 0, 0)
+        return _Record(line, fields, chrom, start, end)
+
+    def convert(
+        self, record: _Record, chrom: str, start: int, end: int, strand: str
+    ) -> str | UnmappedReason:
+        """Rewrite a record with lifted coordinates.
+
+        :return: converted line, or reason that it can't be converted
+        """
+        fields = list(record.fields)
+        fields[self.chrom_col] = chrom
+        fields[self.start_col] = str(min(start, end) + self.offset)
+        fields[self.end_col] = str(max(start, end))
+        if (
+            strand == "-"
+            and self.strand_col is not None
+            and self.strand_col < len(fields)
+        ):
+            fields[self.strand_col] = _FLIPPED_STRANDS.get(
+                fields[self.strand_col], fields[self.strand_col]
+            )
+        return "\t".join(fields) + "\n"
+
+
+class _BedFormat(_RecordFormat):
+    """BED records: chrom, start, end, then optional name, score, strand, ..."""
+
+    def __init__(self) -> None:
+        """Use BED column layout."""
+        super().__init__(strand_col=5)
+
+
+class _VcfFormat(_RecordFormat):
+    """VCF records, lifted by the span of their reference allele.
+
+    Records that lift to the negative strand, or whose reference allele doesn't lift
+    to a span of the same length, are left unmapped rather than rewriting alleles.
+    """
+
+    def __init__(self) -> None:
+        """Use VCF column layout."""
+        super().__init__(chrom_col=0, start_col=1)
+
+    def is_header(self, line: str) -> bool:
+        """Check whether a line is a header line."""
+        return line.startswith("#")
+
+    def convert_header(self, line: str) -> str | None:
+        """Drop contig declarations, which describe the source assembly."""
+        if line.startswith("##contig="):
+            return None
+        return line
+
+    def parse(self, line: str) -> _Record:
+        """Parse a data line, spanning the reference allele."""
+        fields = line.rstrip("\r\n").split("\t")
+        try:
+            start = int(fields[1]) - 1
+            end = start + len(fields[3])
+        except (IndexError, ValueError):
+            return _Record(line, fields, None, 0, 0)
+        return _Record(line, fields, fields[0], start, end)
+
+    def convert(
+        self, record: _Record, chrom: str, start: int, end: int, strand: str
+    ) -> str | UnmappedReason:
+        """Rewrite CHROM and POS."""
+        if strand == "-":
+            return UnmappedReason.INVERTED
+        if end - start != record.end - record.start:
+            return UnmappedReason.RESIZED
+        fields = list(record.fields)
+        fields[0] = chrom
+        fields[1] = str(start + 1)
+        return "\t".join(fields) + "\n"
+
+
+class _Feature(NamedTuple):
+    """GTF/GFF3 record, placed in its gene's hierarchy.
+
+    ``node`` is the ID that other records refer to this one by, if any, ``parents``
+    are the IDs of the records it belongs to, and ``links`` are every ID that ties it
+    to the rest of its locus.
+    """
+
+    record: _Record
+    feature_type: str
+    node: str | None
+    parents: tuple[str, ...]
+    links: frozenset[str]
+
+
+class _FeatureFormat(_RecordFormat, ABC):
+    """GTF and GFF3 records: 1-based, fully closed positions in columns 4 and 5, and
+    strand in column 7, with attributes in column 9 that place each record in its
+    gene's hierarchy.
+    """
+
+    def __init__(self) -> None:
+        """Use GTF/GFF3 column layout."""
+        super().__init__(
+            chrom_col=0, start_col=3, end_col=4, strand_col=6, one_based=True
+        )
+
+    def is_header(self, line: str) -> bool:
+        """Check whether a line is a header line or directive."""
+        return line.startswith("#")
+
+    def parse_feature(self, line: str) -> _Feature:
+        """Parse a data line, along with the IDs that link it to its locus."""
+        record = self.parse(line)
+        if len(record.fields) < 9:  # noqa: PLR2004
+            return _Feature(record, "", None, (), frozenset())
+        feature_type = record.fields[2]
+        node, parents, links = self.hierarchy(feature_type, record.fields[8])
+        return _Feature(record, feature_type, node, parents, links)
+
+    @abstractmethod
+    def hierarchy(
+        self, feature_type: str, attributes: str
+    ) -> tuple[str | None, tuple[str, ...], frozenset[str]]:
+        """Get a record's node, parent, and linking IDs from its attributes."""
+
+
+class _GtfFormat(_FeatureFormat):
+    """GTF records, where every record names its gene and transcript by
+    ``gene_id`` and ``transcript_id`` attributes.
+    """
+
+    def hierarchy(
+        self, feature_type: str, attributes: str
+    ) -> tuple[str | None, tuple[str, ...], frozenset[str]]:
+        """Place gene and transcript records by their own IDs, and every other record
+        under its transcript (or gene, if it has no transcript).
+        """
+        values = {}
+        for attribute in attributes.split(";"):
+            key, _, value = attribute.strip().partition(" ")
+            values.setdefault(key, value.strip().strip('"'))
+        gene = f"gene:{values['gene_id']}" if values.get("gene_id") else None
+        transcript = (
+            f"transcript:{values['transcript_id']}"
+            if values.get("transcript_id")
+            else None
+        )
+        if feature_type == "gene":
+            node, parent = gene, None
+        elif feature_type == "transcript":
+            node, parent = transcript, gene
+        else:
+            node, parent = None, transcript or gene
+        parents = (parent,) if parent else ()
+        return node, parents, frozenset(filter(None, (gene, transcript)))
+
+
+class _Gff3Format(_FeatureFormat):
+    """GFF3 records, linked by ``ID`` and ``Parent`` attributes."""
+
+    def convert_header(self, line: str) -> str | None:
+        """Drop sequence region declarations, which describe the source assembly."""
+        if line.startswith("##sequence-region"):
+            return None
+        return line
+
+    def hierarchy(
+        self,
+        feature_type: str,  # noqa: ARG002
+        attributes: str,
+    ) -> tuple[str | None, tuple[str, ...], frozenset[str]]:
+        """Get a record's ``ID`` and ``Parent`` IDs."""
+        values = {}
+        for attribute in attributes.split(";"):
+            key, _, value = attribute.strip().partition("=")
+            values[key] = value
+        node = values.get("ID") or None
+        parents = tuple(
+            parent for parent in values.get("Parent", "").split(",") if parent
+        )
+        return node, parents, frozenset(filter(None, (node, *parents)))
+
+
+def _get_record_format(
+    file_format: FileFormat,
+    chrom_col: int,
+    start_col: int,
+    end_col: int,
+    one_based: bool,
+) -> _RecordFormat:
+    """Get record parser for a file format."""
+    if file_format == FileFormat.BED:
+        return _BedFormat()
+    if file_format == FileFormat.VCF:
+        return _VcfFormat()
+    if file_format == FileFormat.GTF:
+        return _GtfFormat()
+    if file_format == FileFormat.GFF3:
+        return _Gff3Format()
+    return _RecordFormat(chrom_col, start_col, end_col, one_based=one_based)
+
+
+def _batches(
+    lines: Iterator[str], record_format: _RecordFormat, batch_size: int
+) -> Iterator[list[_Record]]:
+    """Group data lines into batches of parsed records."""
+    batch = []
+    for line in lines:
+        batch.append(record_format.parse(line))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _lift_records(
+    converter: Converter, batch: list[_Record], sorted_input: bool = False
+) -> list[UnmappedReason | _Lifted]:
+    """Lift a batch of records.
+
+    :return: for each record, either the single segment it lifted to, or the reason
+        it's unmapped
+    """
+    valid = [
+        i
+        for i, record in enumerate(batch)
+        if record.chrom is not None and 0 <= record.start <= record.end <= _MAX_POSITION
+    ]
+    result = converter.convert_coordinates(
+        [batch[i].chrom for i in valid],
+        [batch[i].start for i in valid],
+        [batch[i].end for i in valid],
+        sorted_input=sorted_input,
+    )
+    outcomes: list[UnmappedReason | _Lifted] = [UnmappedReason.INVALID] * len(batch)
+    for i in valid:
+        outcomes[i] = UnmappedReason.DELETED
+    for i, chrom, start, end, strand in zip(
+        result.index, result.chrom, result.start, result.end, result.strand, strict=True
+    ):
+        record_i = valid[i]
+        if outcomes[record_i] == UnmappedReason.DELETED:
+            outcomes[record_i] = _Lifted(chrom, start, end, strand)
+        else:
+            outcomes[record_i] = UnmappedReason.SPLIT
+    return outcomes
+
+
+def _write_records(
+    batch: list[_Record],
+    outcomes: list[UnmappedReason | _Lifted],
+    record_format: _RecordFormat,
+    converted_out: IO[str],
+    unmapped_out: IO[str],
+) -> LiftoverStats:
+    """Write lifted records to the appropriate outputs."""
+    converted = 0
+    for record, outcome in zip(batch, outcomes, strict=True):
+        if not isinstance(outcome, UnmappedReason):
+            outcome = record_format.convert(record, *outcome)  # noqa: PLW2901
+        if isinstance(outcome, UnmappedReason):
+            unmapped_out.write(f"#{outcome}\n")
+            unmapped_out.write(record.line.rstrip("\r\n") + "\n")
+        else:
+            converted_out.write(outcome)
+            converted += 1
+    return LiftoverStats(converted, len(batch) - converted)
+
+
+def _lift_batch(
+    converter: Converter,
+    batch: list[_Record],
+    record_format: _RecordFormat,
+    converted_out: IO[str],
+    unmapped_out: IO[str],
+    sorted_input: bool = False,
+) -> LiftoverStats:
+    """Lift a batch of records and write them to the appropriate outputs."""
+    outcomes = _lift_records(converter, batch, sorted_input=sorted_input)
+    return _write_records(batch, outcomes, record_format, converted_out, unmapped_out)
+
+
+def _feature_loci(
+    lines: Iterable[str], record_format: _FeatureFormat
+) -> Iterator[list[_Feature]]:
+    """Group GTF/GFF3 data lines into loci.
+
+    A record starts a new locus unless it shares an ID with the current one (records
+    that can't be parsed stay in the current locus). GFF3 ``###`` directives also end
+    a locus, and a ``##FASTA`` directive ends the features. Other comments are
+    dropped.
+    """
+    locus: list[_Feature] = []
+    ids: set[str] = set()
+    for line in lines:
+        if record_format.is_header(line):
+            if line.startswith("##FASTA"):
+                break
+            if line.startswith("###") and locus:
+                yield locus
+                locus, ids = [], set()
+            continue
+        if not line.strip():
+            continue
+        feature = record_format.parse_feature(line)
+        if locus and feature.record.chrom is not None and ids.isdisjoint(feature.links):
+            yield locus
+            locus, ids = [], set()
+        locus.append(feature)
+        ids.update(feature.links)
+    if locus:
+        yield locus
+
+
+def _locus_batches(
+    loci: Iterator[list[_Feature]], batch_size: int
+) -> Iterator[list[list[_Feature]]]:
+    """Group whole loci into batches of at least ``batch_size`` records (or fewer,
+    at the end).
+    """
+    batch = []
+    size = 0
+    for locus in loci:
+        batch.append(locus)
+        size += len(locus)
+        if size >= batch_size:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def _check_exons(
+    exons: list[_Record], outcomes: list[UnmappedReason | _Lifted]
+) -> UnmappedReason | None:
+    """Check that a transcript's exons lift intact, in order.
+
+    :return: reason the transcript can't be converted, if any
+    """
+    lifted = [outcome for outcome in outcomes if isinstance(outcome, _Lifted)]
+    if len(lifted) < len(outcomes) or len({(o.chrom, o.strand) for o in lifted}) > 1:
+        return UnmappedReason.TRANSCRIPT_SPLIT
+    order = sorted(range(len(exons)), key=lambda i: exons[i].start)
+    spans = [sorted((lifted[i].start, lifted[i].end)) for i in order]
+    if lifted and lifted[0].strand == "-":
+        spans.reverse()
+    if any(previous[1] > span[0] for previous, span in pairwise(spans)):
+        return UnmappedReason.EXONS_REORDERED
+    return None
+
+
+def _span(outcomes: list[_Lifted]) -> UnmappedReason | _Lifted:
+    """Get the span of segments, which must be on one chromosome and strand."""
+    if len({(o.chrom, o.strand) for o in outcomes}) > 1:
+        return UnmappedReason.SPLIT
+    return _Lifted(
+        outcomes[0].chrom,
+        min(min(o.start, o.end) for o in outcomes),
+        max(max(o.start, o.end) for o in outcomes),
+        outcomes[0].strand,
+    )
+
+
+def _check_locus(
+    locus: list[_Feature], outcomes: list[UnmappedReason | _Lifted]
+) -> None:
+    """Check the transcripts of a lifted locus, updating its outcomes in place.
+
+    A transcript is split if any of its exons don't lift to a single segment, or
+    they lift to different chromosomes or strands, and reordered if its exons don't
+    keep their order without overlapping. Every record of such a transcript is left
+    unmapped. Intact transcripts span their lifted exons, and genes span their
+    converted transcripts, even where introns don't lift to a single segment.
+    """
+    exons: dict[str, list[int]] = {}
+    for i, feature in enumerate(locus):
+        if feature.feature_type == "exon":
+            for parent in feature.parents:
+                exons.setdefault(parent, []).append(i)
+    if not exons:
+        return
+    flags = {}
+    for transcript, indices in exons.items():
+        reason = _check_exons(
+            [locus[i].record for i in indices], [outcomes[i] for i in indices]
+        )
+        if reason is not None:
+            flags[transcript] = reason
+
+    lifted = list(outcomes)
+    genes: dict[str, list[int]] = {}
+    for i, feature in enumerate(locus):
+        reason = next(
+            (
+                flags[transcript]
+                for transcript in (feature.node, *feature.parents)
+                if transcript in flags
+            ),
+            None,
+        )
+        if reason is not None:
+            outcomes[i] = reason
+        elif feature.node in exons:
+            outcomes[i] = _span([lifted[exon] for exon in exons[feature.node]])
+            for gene in feature.parents:
+                genes.setdefault(gene, []).append(i)
+    for i, feature in enumerate(locus):
+        if feature.node in genes and feature.node not in exons:
+            transcripts = [
+                outcomes[transcript]
+                for transcript in genes[feature.node]
+                if isinstance(outcomes[transcript], _Lifted)
+            ]
+            if transcripts:
+                outcomes[i] = _span(transcripts)
+
+
+def _lift_features(
+    converter: Converter,
+    lines: Iterable[str],
+    record_format: _FeatureFormat,
+    batch_size: int,
+    converted_out: IO[str],
+    unmapped_out: IO[str],
+) -> LiftoverStats:
+    """Lift GTF/GFF3 data lines in batches of whole loci, checking transcript
+    structure, and write them to the appropriate outputs.
+
+    Records of a locus are close together, so each batch is lifted as sorted input:
+    a locus's records are found by galloping forward from the chain block where the
+    previous record was found, rather than by searching from scratch.
+    """
+    converted, unmapped = 0, 0
+    for loci in _locus_batches(_feature_loci(lines, record_format), batch_size):
+        batch = [feature.record for locus in loci for feature in locus]
+        outcomes = _lift_records(converter, batch, sorted_input=True)
+        offset = 0
+        for locus in loci:
+            locus_outcomes = outcomes[offset : offset + len(locus)]
+            _check_locus(locus, locus_outcomes)
+            outcomes[offset : offset + len(locus)] = locus_outcomes
+            offset += len(locus)
+        stats = _write_records(
+            batch, outcomes, record_format, converted_out, unmapped_out
+        )
+        converted += stats.converted
+        unmapped += stats.unmapped
+    return LiftoverStats(converted, unmapped)
+
+
+def _lift_lines(
+    converter: Converter,
+    lines: Iterable[str],
+    record_format: _RecordFormat,
+    batch_size: int,
+    converted_out: IO[str],
+    unmapped_out: IO[str],
+    sorted_input: bool = False,
+) -> LiftoverStats:
+    """Lift data lines in batches, writing them to the appropriate outputs."""
+    if isinstance(record_format, _FeatureFormat):
+        return _lift_features(
+            converter, lines, record_format, batch_size, converted_out, unmapped_out
+        )
+    converted, unmapped = 0, 0
+    lines = (
+        line for line in lines if line.strip() and not record_format.is_header(line)
+    )
+    for batch in _batches(lines, record_format, batch_size):
+        stats = _lift_batch(
+            converter,
+            batch,
+            record_format,
+            converted_out,
+            unmapped_out,
+            sorted_input=sorted_input,
+        )
+        converted += stats.converted
+        unmapped += stats.unmapped
+    return LiftoverStats(converted, unmapped)
+
+
+def _sort_key(record_format: _RecordFormat, line: str) -> tuple[str, int]:
+    """Get coordinate sort key for a converted line."""
+    record = record_format.parse(line)
+    return (record.chrom or "", record.start)
+
+
+class _SortedRuns:
+    """Sink for converted lines that sorts them with an external merge sort.
+
+    Lines are held until about ``run_size`` characters have been written, then
+    sorted and written to a run file, so memory use is bounded by the run size
+    rather than the output size. :py:meth:`merge` merges the runs into one sorted
+    output.
+    """
+
+    def __init__(
+        self, record_format: _RecordFormat, prefix: Path, run_size: int
+    ) -> None:
+        """Start collecting lines.
+
+        :param record_format: format of lines, to get sort keys from
+        :param prefix: path prefix of run files
+        :param run_size: number of characters to hold before writing a run
+        """
+        self._key = partial(_sort_key, record_format)
+        self._prefix = prefix
+        self._run_size = run_size
+        self._lines: list[str] = []
+        self._size = 0
+        self._runs: list[Path] = []
+
+    def write(self, text: str) -> None:
+        """Add converted lines."""
+        self._lines.append(text)
+        self._size += len(text)
+        if self._size >= self._run_size:
+            self._write_run()
+
+    def _write_run(self) -> None:
+        """Sort held lines into a new run file."""
+        if not self._lines:
+            return
+        lines = "".join(self._lines).splitlines(keepends=True)
+        self._lines, self._size = [], 0
+        lines.sort(key=self._key)
+        run = self._prefix.with_name(f"{self._prefix.name}.run{len(self._runs)}")
+        with run.open("w", encoding="utf-8", newline="") as f:
+            f.writelines(lines)
+        self._runs.append(run)
+
+    def merge(self, out: IO[str]) -> None:
+        """Write all lines to an output in sorted order, removing run files."""
+        self._write_run()
+        with contextlib.ExitStack() as stack:
+            runs = [
+                stack.enter_context(run.open(encoding="utf-8", newline=""))
+                for run in self._runs
+            ]
+            out.writelines(heapq.merge(*runs, key=self._key))
+        for run in self._runs:
+            run.unlink()
+        self._runs = []
+
+
+class _Shard(NamedTuple):
+    """Byte range of an input file to lift, and where to write its results."""
+
+    input_file: Path
+    start: int
+    end: int
+    converted_file: Path
+    unmapped_file: Path
+
+
+# converter held by each worker process in parallel mode
+_worker_converter: Converter | None = None
+
+
+def _init_worker(converter: Converter) -> None:
+    """Set the converter for a worker process.
+
+    Converters pickle by reference, so workers started by ``spawn`` reload the
+    chainfile themselves. When the converter uses an index, every worker
+    memory-maps the same index, so chain data is loaded once per host rather than
+    once per worker.
+    """
+    global _worker_converter  # noqa: PLW0603
+    _worker_converter = converter
+
+
+def _read_shard(shard: _Shard, buffer_size: int) -> Iterator[str]:
+    """Yield every line that starts within a shard's byte range."""
+    with shard.input_file.open("rb", buffering=buffer_size) as f:
+        position = shard.start
+        if position > 0:
+            # skip the line in progress, which belongs to the previous shard
+            f.seek(position - 1)
+            position += len(f.readline()) - 1
+        while position < shard.end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode("utf-8")
+
+
+def _lift_shard(
+    shard: _Shard,
+    record_format: _RecordFormat,
+    batch_size: int,
+    buffer_size: int,
+    sort_output: bool,
+    sorted_input: bool,
+    converter: Converter | None = None,
+) -> LiftoverStats:
+    """Lift a shard of an input file into its own output files.
+
+    :param converter: converter to use (defaults to the worker process's converter)
+    """
+    converter = converter or _worker_converter
+    with contextlib.ExitStack() as stack:
+        if shard.start < 0:
+            lines = stack.enter_context(open_input(shard.input_file, buffer_size))
+        else:
+            # closing the generator closes the file it reads from
+            lines = stack.enter_context(
+                contextlib.closing(_read_shard(shard, buffer_size))
+            )
+        converted_out = stack.enter_context(
+            shard.converted_file.open("w", encoding="utf-8", newline="")
+        )
+        unmapped_out = stack.enter_context(
+            shard.unmapped_file.open("w", encoding="utf-8", newline="")
+        )
+        if not sort_output:
+            return _lift_lines(
+                converter,
+                lines,
+                record_format,
+                batch_size,
+                converted_out,
+                unmapped_out,
+                sorted_input=sorted_input,
+            )
+        runs = _SortedRuns(record_format, shard.converted_file, _SORT_RUN_SIZE)
+        stats = _lift_lines(
+            converter,
+            lines,
+            record_format,
+            batch_size,
+            runs,
+            unmapped_out,
+            sorted_input=sorted_input,
+        )
+        runs.merge(converted_out)
+        return stats
+
+
+def _get_shards(
+    input_file: Path, data_start: int, processes: int, workdir: Path
+) -> list[_Shard]:
+    """Split the data section of an input file into byte ranges."""
+    size = input_file.stat().st_size
+    n_shards = max(
+        processes * _SHARDS_PER_PROCESS,
+        math.ceil((size - data_start) / _MAX_SHARD_SIZE),
+    )
+    shard_size = max(1, math.ceil((size - data_start) / n_shards))
+    return [
+        _Shard(
+            input_file,
+            start,
+            min(start + shard_size, size),
+            workdir / f"{i}.converted",
+            workdir / f"{i}.unmapped",
+        )
+        for i, start in enumerate(range(data_start, size, shard_size))
+    ]
+
+
+def _lift_file_sharded(
+    converter: Converter,
+    input_file: Path,
+    output_file: Path,
+    unmapped_file: Path,
+    record_format: _RecordFormat,
+    batch_size: int,
+    buffer_size: int,
+    processes: int,
+    sort_output: bool,
+    sorted_input: bool,
+) -> LiftoverStats:
+    """Lift a file in shards, possibly in parallel, then merge shard outputs."""
+    with input_file.open("rb") as f:
+        compressed = f.read(2) == _GZIP_MAGIC
+    if compressed and processes > 1:
+        _logger.warning(
+            "Compressed input can't be split for parallel liftover; using one process"
+        )
+        processes = 1
+    # GTF/GFF3 loci can't be split across shards
+    single_shard = compressed or isinstance(record_format, _FeatureFormat)
+    if single_shard and processes > 1:
+        _logger.warning(
+            "GTF/GFF3 input can't be split for parallel liftover; using one process"
+        )
+        processes = 1
+
+    with (
+        tempfile.TemporaryDirectory(dir=output_file.parent, prefix=".agct-") as workdir,
+        open_output(output_file, buffer_size) as converted_out,
+        open_output(unmapped_file, buffer_size) as unmapped_out,
+    ):
+        data_start = 0
+        with open_input(input_file, buffer_size) as reader:
+            for line in reader:
+                if line.strip() and not record_format.is_header(line):
+                    break
+                header = record_format.convert_header(line)
+                if header is not None:
+                    converted_out.write(header)
+                unmapped_out.write(line)
+                data_start += len(line.encode("utf-8"))
+
+        if single_shard:
+            # stream the whole file in one shard; headers are skipped while lifting
+            shards = [
+                _Shard(
+                    input_file,
+                    -1,
+                    -1,
+                    Path(workdir) / "0.converted",
+                    Path(workdir) / "0.unmapped",
+                )
+            ]
+        else:
+            shards = _get_shards(input_file, data_start, processes, Path(workdir))
+        lift_shard = partial(
+            _lift_shard,
+            record_format=record_format,
+            batch_size=batch_size,
+            buffer_size=buffer_size,
+            sort_output=sort_output,
+            sorted_input=sorted_input,
+        )
+        if processes > 1:
+            with ProcessPoolExecutor(
+                processes,
+                initializer=_init_worker,
+                initargs=(converter,),
+            ) as executor:
+                shard_stats = list(executor.map(lift_shard, shards))
+        else:
+            shard_stats = [lift_shard(shard, converter=converter) for shard in shards]
+
+        if sort_output:
+            shard_files = [
+                shard.converted_file.open(encoding="utf-8", newline="")
+                for shard in shards
+            ]
+            try:
+                converted_out.writelines(
+                    heapq.merge(*shard_files, key=partial(_sort_key, record_format))
+                )
+            finally:
+                for f in shard_files:
+                    f.close()
+        else:
+            for shard in shards:
+                with shard.converted_file.open(encoding="utf-8", newline="") as f:
+                    shutil.copyfileobj(f, converted_out)
+        for shard in shards:
+            with shard.unmapped_file.open(encoding="utf-8", newline="") as f:
+                shutil.copyfileobj(f, unmapped_out)
+
+    return LiftoverStats(
+        sum(stats.converted for stats in shard_stats),
+        sum(stats.unmapped for stats in shard_stats),
+    )
+
+
+def lift_file(
+    converter: Converter,
+    input_file: Path,
+    output_file: Path,
+    unmapped_file: Path,
+    file_format: FileFormat | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    chrom_col: int = 0,
+    start_col: int = 1,
+    end_col: int = 2,
+    one_based: bool = False,
+    processes: int = 1,
+    sort_output: bool = False,
+    sorted_input: bool = False,
+) -> LiftoverStats:
+    """Lift over every record in a BED, VCF, GTF, GFF3, or TSV file.
+
+    Header lines are copied to both outputs. For VCFs, ``##contig`` declarations are
+    dropped from the converted output, since they describe the source assembly, as
+    are GFF3 ``##sequence-region`` declarations.
+
+    GTF and GFF3 records are lifted in batches of whole loci (genes, along with their
+    transcripts and exons). Transcripts whose exons don't all lift to one chromosome
+    and strand, or that change order or overlap, are written to the unmapped output
+    along with all of their records, as ``Transcript split in new`` or
+    ``Exons reordered in new``. Intact transcripts and their genes are given the span
+    of their lifted exons, even if their introns don't lift to a single segment.
+
+    .. code-block:: pycon
+
+       >>> from pathlib import Path
+       >>> from agct import Assembly, get_converter
+       >>> from agct.pipeline import lift_file
+       >>> converter = get_converter(Assembly.HG19, Assembly.HG38)
+       >>> lift_file(
+       ...     converter, Path("in.bed"), Path("out.bed"), Path("out.unmapped.bed")
+       ... )
+       LiftoverStats(converted=99876, unmapped=124)
+
+    :param converter: converter to lift records with
+    :param input_file: path to input file (plain text, gzip, or BGZF)
+    :param output_file: path to write converted records to. Gzip-compressed if the
+        name ends in ``.gz``.
+    :param unmapped_file: path to write records that couldn't be converted to
+    :param file_format: input file format. Guessed from ``input_file`` if not given.
+    :param batch_size: number of records to lift at a time. Larger batches cost more
+        memory but make fewer calls into Rust.
+    :param buffer_size: read/write buffer size, in bytes
+    :param chrom_col: for TSV input, index of chromosome column
+    :param start_col: for TSV input, index of start position column
+    :param end_col: for TSV input, index of end position column
+    :param one_based: for TSV input, whether positions are 1-based and fully closed
+        rather than inter-residue
+    :param processes: number of worker processes. If greater than 1, the input is
+        split into byte ranges that are lifted in parallel. Workers that aren't
+        forked reload ``converter`` from its chainfile (see
+        :py:class:`~agct.converter.Converter`), so use a converter with
+        ``use_index=True`` to have them share one memory-mapped copy of the chain
+        data. Only uncompressed BED, VCF, and TSV input can be split.
+    :param sort_output: if True, write converted records sorted by lifted chromosome
+        and position rather than in input order. Records are sorted with an external
+        merge sort through temporary files next to ``output_file``, so memory use
+        stays bounded.
+    :param sorted_input: whether input records are sorted by chromosome and position
+        (e.g. a sorted VCF or BED), in which case each batch is lifted in a single
+        forward pass over the chain alignment blocks. See
+        :py:meth:`Converter.convert_coordinates() <agct.converter.Converter.convert_coordinates>`.
+        GTF and GFF3 loci are always lifted this way.
+    :return: number of records converted and unmapped
+    :raise ValueError: if ``batch_size`` or ``processes`` isn't positive
+    """
+    if batch_size < 1:
+        msg = f"`batch_size` must be positive, got {batch_size}"
+        raise ValueError(msg)
+    if processes < 1:
+        msg = f"`processes` must be positive, got {processes}"
+        raise ValueError(msg)
+    if file_format is None:
+        file_format = detect_format(input_file)
+    record_format = _get_record_format(
+        file_format, chrom_col, start_col, end_col, one_based
+    )
+
+    if processes > 1 or sort_output:
+        stats = _lift_file_sharded(
+            converter,
+            input_file,
+            output_file,
+            unmapped_file,
+            record_format,
+            batch_size,
+            buffer_size,
+            processes,
+            sort_output,
+            sorted_input,
+        )
+        _logger.info(
+            "Lifted %s: %s records converted, %s unmapped",
+            input_file,
+            stats.converted,
+            stats.unmapped,
+        )
+        return stats
+
+    with (
+        open_input(input_file, buffer_size) as reader,
+        open_output(output_file, buffer_size) as converted_out,
+        open_output(unmapped_file, buffer_size) as unmapped_out,
+    ):
+        line = reader.readline()
+        while line and (record_format.is_header(line) or not line.strip()):
+            header = record_format.convert_header(line)
+            if header is not None:
+                converted_out.write(header)
+            unmapped_out.write(line)
+            line = reader.readline()
+        stats = _lift_lines(
+            converter,
+            _chain_first(line, reader),
+            record_format,
+            batch_size,
+            converted_out,
+            unmapped_out,
+            sorted_input=sorted_input,
+        )
+    _logger.info(
+        "Lifted %s: %s records converted, %s unmapped",
+        input_file,
+        stats.converted,
+        stats.unmapped,
+    )
+    return stats
+
+
+def _chain_first(first: str, rest: IO[str]) -> Iterator[str]:
+    """Yield an already-read line (if any), then the remainder of a file."""
+    if first:
+        yield first
+    yield from rest
@@ -1,13 +1,23 @@
 """Sequence reference registry.
 
-Maps refget accessions (``SQ.*``) to a tuple of (:class:`Assembly`, :class:`Chromosome`)
-and exposes helpers to look up the assembly/chromosome for a given ID. The registry is
-curated for internally-used builds (currently ``hg19``/``hg38``); extend as needed.
+Maps refget accessions (``SQ.*``) and sequence aliases (e.g. RefSeq ``NC_`` accessions
+or Ensembl-style names like ``"7"``) to sequences in reference assemblies, and exposes
+helpers to look up the assembly/chromosome for a given ID.
+
+Sequences are read from tab-separated tables, in bulk, the first time the registry is
+used. A table covering the primary chromosomes of ``hg19``/``hg38`` is bundled; load
+more with :py:meth:`SequenceRegistry.load_table` or
+:py:meth:`SequenceRegistry.load_assembly_report` (e.g. for alts, decoys, unplaced
+scaffolds, or other assemblies).
 """
 
 import logging
 import re
+import threading
+from collections.abc import Iterable
 from enum import StrEnum
+from pathlib import Path
+from typing import NamedTuple
 
 _logger = logging.getLogger(__name__)
 
@@ -23,18 +33,21 @@ class Assembly(StrEnum):
 
     HG38 = "hg38"
     HG19 = "hg19"
+    HG18 = "hg18"
 
     @property
     def as_grc(self) -> str:
         """Return official Genome Reference Consortium assembly names
 
-        :return: `"GRCh38"` or `"GRCh37"`
+        :return: `"GRCh38"`, `"GRCh37"`, or `"NCBI36"`
         :raise ValueError: if unrecognized enum option
         """
         if self.value == "hg38":
             return "GRCh38"
         if self.value == "hg19":
             return "GRCh37"
+        if self.value == "hg18":
+            return "NCBI36"
         raise ValueError
 
 
@@ -73,66 +86,292 @@ class Chromosome(StrEnum):
     CHRY = "chrY"
 
 
-REFGET_ID_INFO = {
-    "SQ.Ya6Rs7DHhDeg7YaOSg1EoNi3U_nQ9SvO": (Assembly.HG38, Chromosome.CHR1),
-    "SQ.pnAqCRBrTsUoBghSD1yp_jXWSmlbdh4g": (Assembly.HG38, Chromosome.CHR2),
-    "SQ.Zu7h9AggXxhTaGVsy7h_EZSChSZGcmgX": (Assembly.HG38, Chromosome.CHR3),
-    "SQ.HxuclGHh0XCDuF8x6yQrpHUBL7ZntAHc": (Assembly.HG38, Chromosome.CHR4),
-    "SQ.aUiQCzCPZ2d0csHbMSbh2NzInhonSXwI": (Assembly.HG38, Chromosome.CHR5),
-    "SQ.0iKlIQk2oZLoeOG9P1riRU6hvL5Ux8TV": (Assembly.HG38, Chromosome.CHR6),
-    "SQ.F-LrLMe1SRpfUZHkQmvkVKFEGaoDeHul": (Assembly.HG38, Chromosome.CHR7),
-    "SQ.209Z7zJ-mFypBEWLk4rNC6S_OxY5p7bs": (Assembly.HG38, Chromosome.CHR8),
-    "SQ.KEO-4XBcm1cxeo_DIQ8_ofqGUkp4iZhI": (Assembly.HG38, Chromosome.CHR9),
-    "SQ.ss8r_wB0-b9r44TQTMmVTI92884QvBiB": (Assembly.HG38, Chromosome.CHR10),
-    "SQ.2NkFm8HK88MqeNkCgj78KidCAXgnsfV1": (Assembly.HG38, Chromosome.CHR11),
-    "SQ.6wlJpONE3oNb4D69ULmEXhqyDZ4vwNfl": (Assembly.HG38, Chromosome.CHR12),
-    "SQ._0wi-qoDrvram155UmcSC-zA5ZK4fpLT": (Assembly.HG38, Chromosome.CHR13),
-    "SQ.eK4D2MosgK_ivBkgi6FVPg5UXs1bYESm": (Assembly.HG38, Chromosome.CHR14),
-    "SQ.AsXvWL1-2i5U_buw6_niVIxD6zTbAuS6": (Assembly.HG38, Chromosome.CHR15),
-    "SQ.yC_0RBj3fgBlvgyAuycbzdubtLxq-rE0": (Assembly.HG38, Chromosome.CHR16),
-    "SQ.dLZ15tNO1Ur0IcGjwc3Sdi_0A6Yf4zm7": (Assembly.HG38, Chromosome.CHR17),
-    "SQ.vWwFhJ5lQDMhh-czg06YtlWqu0lvFAZV": (Assembly.HG38, Chromosome.CHR18),
-    "SQ.IIB53T8CNeJJdUqzn9V_JnRtQadwWCbl": (Assembly.HG38, Chromosome.CHR19),
-    "SQ.-A1QmD_MatoqxvgVxBLZTONHz9-c7nQo": (Assembly.HG38, Chromosome.CHR20),
-    "SQ.5ZUqxCmDDgN4xTRbaSjN8LwgZironmB8": (Assembly.HG38, Chromosome.CHR21),
-    "SQ.7B7SHsmchAR0dFcDCuSFjJAo7tX87krQ": (Assembly.HG38, Chromosome.CHR22),
-    "SQ.w0WZEvgJF0zf_P4yyTzjjv9oW1z61HHP": (Assembly.HG38, Chromosome.CHRX),
-    "SQ.8_liLu1aycC0tPQPFmUaGXJLDs5SbPZ5": (Assembly.HG38, Chromosome.CHRY),
-    "SQ.S_KjnFVz-FE7M0W6yoaUDgYxLPc1jyWU": (Assembly.HG19, Chromosome.CHR1),
-    "SQ.9KdcA9ZpY1Cpvxvg8bMSLYDUpsX6GDLO": (Assembly.HG19, Chromosome.CHR2),
-    "SQ.VNBualIltAyi2AI_uXcKU7M9XUOuA7MS": (Assembly.HG19, Chromosome.CHR3),
-    "SQ.iy7Zfceb5_VGtTQzJ-v5JpPbpeifHD_V": (Assembly.HG19, Chromosome.CHR4),
-    "SQ.vbjOdMfHJvTjK_nqvFvpaSKhZillW0SX": (Assembly.HG19, Chromosome.CHR5),
-    "SQ.KqaUhJMW3CDjhoVtBetdEKT1n6hM-7Ek": (Assembly.HG19, Chromosome.CHR6),
-    "SQ.IW78mgV5Cqf6M24hy52hPjyyo5tCCd86": (Assembly.HG19, Chromosome.CHR7),
-    "SQ.tTm7wmhz0G4lpt8wPspcNkAD_qiminj6": (Assembly.HG19, Chromosome.CHR8),
-    "SQ.HBckYGQ4wYG9APHLpjoQ9UUe9v7NxExt": (Assembly.HG19, Chromosome.CHR9),
-    "SQ.-BOZ8Esn8J88qDwNiSEwUr5425UXdiGX": (Assembly.HG19, Chromosome.CHR10),
-    "SQ.XXi2_O1ly-CCOi3HP5TypAw7LtC6niFG": (Assembly.HG19, Chromosome.CHR11),
-    "SQ.105bBysLoDFQHhajooTAUyUkNiZ8LJEH": (Assembly.HG19, Chromosome.CHR12),
-    "SQ.Ewb9qlgTqN6e_XQiRVYpoUfZJHXeiUfH": (Assembly.HG19, Chromosome.CHR13),
-    "SQ.5Ji6FGEKfejK1U6BMScqrdKJK8GqmIGf": (Assembly.HG19, Chromosome.CHR14),
-    "SQ.zIMZb3Ft7RdWa5XYq0PxIlezLY2ccCgt": (Assembly.HG19, Chromosome.CHR15),
-    "SQ.W6wLoIFOn4G7cjopxPxYNk2lcEqhLQFb": (Assembly.HG19, Chromosome.CHR16),
-    "SQ.AjWXsI7AkTK35XW9pgd3UbjpC3MAevlz": (Assembly.HG19, Chromosome.CHR17),
-    "SQ.BTj4BDaaHYoPhD3oY2GdwC_l0uqZ92UD": (Assembly.HG19, Chromosome.CHR18),
-    "SQ.ItRDD47aMoioDCNW_occY5fWKZBKlxCX": (Assembly.HG19, Chromosome.CHR19),
-    "SQ.iy_UbUrvECxFRX5LPTH_KPojdlT7BKsf": (Assembly.HG19, Chromosome.CHR20),
-    "SQ.LpTaNW-hwuY_yARP0rtarCnpCQLkgVCg": (Assembly.HG19, Chromosome.CHR21),
-    "SQ.XOgHwwR3Upfp5sZYk6ZKzvV25a4RBVu8": (Assembly.HG19, Chromosome.CHR22),
-    "SQ.v7noePfnNpK8ghYXEqZ9NukMXW7YeNsm": (Assembly.HG19, Chromosome.CHRX),
-    "SQ.BT7QyW5iXaX_1PSX-msSGYsqRdMKqkj-": (Assembly.HG19, Chromosome.CHRY),
-}
-
-REFGET_ID_LOOKUP = {v: k for k, v in REFGET_ID_INFO.items()}
-
-
-_REFGET_AC_PATTERN = re.compile(r"^SQ\.[0-9A-Za-z_\\-]{32}$")
+class SequenceInfo(NamedTuple):
+    """Describe a sequence in a reference assembly"""
+
+    assembly: Assembly | str
+    name: str
+    refget_id: str | None
+    aliases: tuple[str, ...]
+
+
+_DEFAULT_TABLE = Path(__file__).parent / "data" / "sequences.tsv"
+
+# compiled (and cached by ``re``) on first use
+_REFGET_AC_PATTERN = r"^SQ\.[0-9A-Za-z_\\-]{32}$"
+
+
+def _check_refget_id(refget_accession: str) -> None:
+    """Check that a refget accession ID is well-formed
+
+    :param refget_accession: sequence reference (must start with `"SQ."`)
+    :raise ValueError: if input appears to be in an invalid format for a refget accession ID
+    """
+    if not re.match(_REFGET_AC_PATTERN, refget_accession):
+        msg = f"refget accession ID must be in format 'SQ.ABCDEFGHIJKLMNOPQRSTUVWXYZ123456'; got {refget_accession}"
+        _logger.error(msg)
+        raise ValueError(msg)
+
+
+def _as_assembly(assembly: str) -> Assembly | str:
+    """Use the :class:`Assembly` member for an assembly name, if there is one
+
+    :param assembly: assembly name
+    :return: assembly enum member, or the name as given
+    """
+    try:
+        return Assembly(assembly)
+    except ValueError:
+        return assembly
+
+
+class SequenceRegistry:
+    """Registry of reference sequences, their refget accessions, and their aliases.
+
+    Every lookup is a single dict access, by refget accession or by assembly and any
+    name or alias of a sequence. Sequences are loaded from the bundled table (unless
+    ``include_default`` is False) the first time the registry is used, so creating a
+    registry is free.
+
+    Refget accessions are only ever taken from loaded data: sequences without a
+    published digest are registered without one, and never get a derived one.
+
+    Tables are tab-separated, with a column for each of assembly, sequence name (as
+    used in UCSC chainfiles, e.g. ``chr7``), refget accession (may be empty), and
+    comma-separated aliases. Lines starting with ``#`` are ignored.
+    """
+
+    def __init__(
+        self, tables: Iterable[Path] = (), include_default: bool = True
+    ) -> None:
+        """Initialize registry.
+
+        :param tables: additional tables to load on first use, after the bundled
+            table
+        :param include_default: whether to load the bundled table of ``hg19``/``hg38``
+            primary chromosomes
+        """
+        self._pending = [*([_DEFAULT_TABLE] if include_default else []), *tables]
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._by_refget_id: dict[str, SequenceInfo] = {}
+        self._by_name: dict[tuple[str, str], SequenceInfo] = {}
+
+    def _ensure_loaded(self) -> None:
+        """Load pending tables, if that hasn't happened yet."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            for table in self._pending:
+                self._load_table(table)
+            self._pending.clear()
+            self._loaded = True
+
+    def add(
+        self,
+        assembly: Assembly | str,
+        name: str,
+        refget_id: str | None = None,
+        aliases: Iterable[str] = (),
+    ) -> SequenceInfo:
+        """Register a sequence, or add a refget accession or aliases to a registered one.
+
+        :param assembly: reference assembly of sequence
+        :param name: sequence name, or an existing alias of a registered sequence
+        :param refget_id: refget accession of sequence, if known
+        :param aliases: other names for the sequence
+        :return: sequence info, including anything previously registered for it
+        :raise ValueError: if ``refget_id`` is malformed or conflicts with a
+            registered sequence, or an alias already refers to another sequence
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return self._add(assembly, name, refget_id, aliases)
+
+    def _add(
+        self,
+        assembly: Assembly | str,
+        name: str,
+        refget_id: str | None,
+        aliases: Iterable[str],
+    ) -> SequenceInfo:
+        """Register a sequence. Callers must hold the lock.
+
+        See :py:meth:`add` for params.
+        """
+        assembly = _as_assembly(assembly)
+        existing = self._by_name.get((assembly, name))
+        if existing is not None:
+            name = existing.name
+        if refget_id:
+            _check_refget_id(refget_id)
+            registered = self._by_refget_id.get(refget_id)
+            if registered is not None and (registered.assembly, registered.name) != (
+                assembly,
+                name,
+            ):
+                msg = f"refget accession {refget_id} is already registered for {registered.assembly} {registered.name}"
+                raise ValueError(msg)
+            if existing is not None and existing.refget_id not in (None, refget_id):
+                msg = f"{assembly} {name} already has refget accession {existing.refget_id}, not {refget_id}"
+                raise ValueError(msg)
+        new_aliases = []
+        for alias in aliases:
+            registered = self._by_name.get((assembly, alias))
+            if registered is not None and registered.name != name:
+                msg = f"{alias} already refers to {assembly} {registered.name}, not {name}"
+                raise ValueError(msg)
+            if alias != name and alias not in new_aliases:
+                new_aliases.append(alias)
+        if existing is None:
+            info = SequenceInfo(assembly, name, refget_id or None, tuple(new_aliases))
+        else:
+            info = existing._replace(
+                refget_id=existing.refget_id or refget_id or None,
+                aliases=existing.aliases
+                + tuple(
+                    alias for alias in new_aliases if alias not in existing.aliases
+                ),
+            )
+        for key in (name, *info.aliases):
+            self._by_name[(assembly, key)] = info
+        if info.refget_id:
+            self._by_refget_id[info.refget_id] = info
+        return info
+
+    def load_table(self, path: Path) -> int:
+        """Register every sequence in a table (see :py:class:`SequenceRegistry`).
+
+        :param path: path to table
+        :return: number of rows loaded
+        :raise ValueError: if a row is malformed or conflicts with a registered
+            sequence
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return self._load_table(path)
+
+    def _load_table(self, path: Path) -> int:
+        """Register every sequence in a table. Callers must hold the lock.
+
+        :param path: path to table
+        :return: number of rows loaded
+        """
+        count = 0
+        with path.open() as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip() or line.startswith("#"):
+                    continue
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) != 4:  # noqa: PLR2004
+                    msg = f"Expected 4 tab-separated columns on line {line_number} of {path}, got {len(fields)}"
+                    raise ValueError(msg)
+                assembly, name, refget_id, aliases = fields
+                self._add(assembly, name, refget_id, filter(None, aliases.split(",")))
+                count += 1
+        _logger.debug("Loaded %s sequences from %s", count, path)
+        return count
+
+    def load_assembly_report(self, path: Path, assembly: Assembly | str) -> int:
+        """Register every sequence in an NCBI assembly report (e.g.
+        ``GCF_000001405.40_GRCh38.p14_assembly_report.txt``), with its RefSeq and
+        GenBank accessions and NCBI sequence name as aliases.
+
+        Sequences are named by their UCSC-style name, where the report gives one.
+        Assembly reports don't include refget accessions, so none are added.
+
+        :param path: path to assembly report
+        :param assembly: assembly that the report describes
+        :return: number of sequences loaded
+        :raise ValueError: if the report has no column header, or conflicts with a
+            registered sequence
+        """
+        self._ensure_loaded()
+        columns = None
+        rows = []
+        with path.open() as f:
+            for line in f:
+                if line.startswith("#"):
+                    # the last comment line is the column header
+                    columns = line.lstrip("#").strip().split("\t")
+                elif line.strip():
+                    rows.append(line.rstrip("\n").split("\t"))
+        if columns is None:
+            msg = f"No column header found in assembly report {path}"
+            raise ValueError(msg)
+        with self._lock:
+            for row in rows:
+                record = dict(zip(columns, row, strict=False))
+                names = [
+                    record.get(column, "na")
+                    for column in (
+                        "UCSC-style-name",
+                        "Sequence-Name",
+                        "RefSeq-Accn",
+                        "GenBank-Accn",
+                    )
+                ]
+                names = [name for name in names if name and name != "na"]
+                if names:
+                    self._add(assembly, names[0], None, names[1:])
+        _logger.debug("Loaded %s sequences from %s", len(rows), path)
+        return len(rows)
+
+    def get(self, assembly: Assembly | str, name: str) -> SequenceInfo | None:
+        """Look up a sequence by name or alias
+
+        :param assembly: reference assembly
+        :param name: sequence name or alias, e.g. ``"chr7"``, ``"7"``, or
+            ``"NC_000007.14"``
+        :return: sequence info, if the sequence is registered
+        """
+        self._ensure_loaded()
+        return self._by_name.get((assembly, name))
+
+    def get_by_refget_id(self, refget_id: str) -> SequenceInfo | None:
+        """Look up a sequence by refget accession
+
+        :param refget_id: refget accession, e.g. ``"SQ.F-LrLMe1SRpfUZHkQmvkVKFEGaoDeHul"``
+        :return: sequence info, if the sequence is registered
+        """
+        self._ensure_loaded()
+        return self._by_refget_id.get(refget_id)
+
+    def sequences(self, assembly: Assembly | str) -> list[SequenceInfo]:
+        """Get every registered sequence in an assembly
+
+        :param assembly: reference assembly
+        :return: sequence info for each sequence, in order of registration
+        """
+        self._ensure_loaded()
+        return list(
+            {
+                info.name: info
+                for (info_assembly, _), info in self._by_name.items()
+                if info_assembly == assembly
+            }.values()
+        )
+
+
+_default_registry = SequenceRegistry()
+
+
+def get_sequence_registry() -> SequenceRegistry:
+    """Get the process-wide sequence registry used by lookup helpers and converters.
+
+    Sequences added to it are available to converters loaded afterward (see
+    :py:meth:`agct.Converter.convert_refget`).
+
+    :return: default sequence registry
+    """
+    return _default_registry
 
 
 def get_seqinfo_from_refget_id(
     refget_accession: str,
-) -> tuple[Assembly, Chromosome] | None:
+) -> tuple[Assembly | str, Chromosome | str] | None:
     """Given a GA4GH SequenceReference refget accession ID, get back its reference genome and chromosome name
 
     .. code-block:: pycon
@@ -145,23 +384,74 @@ def get_seqinfo_from_refget_id(
     variation object.
 
     :param refget_accession: sequence reference (must start with `"SQ."`)
-    :return: a reference assembly and chromosome, if successful
+    :return: a reference assembly and chromosome, if successful. Primary chromosomes
+        are given as :class:`Chromosome` members, and other sequences by name.
     :raise ValueError: if input appears to be in an invalid format for a refget accession ID
     """
-    if not re.match(_REFGET_AC_PATTERN, refget_accession):
-        msg = f"refget accession ID must be in format 'SQ.ABCDEFGHIJKLMNOPQRSTUVWXYZ123456'; got {refget_accession}"
-        _logger.error(msg)
-        raise ValueError(msg)
-    return REFGET_ID_INFO.get(refget_accession)
+    _check_refget_id(refget_accession)
+    info = _default_registry.get_by_refget_id(refget_accession)
+    if info is None:
+        return None
+    return info.assembly, _as_chromosome(info.name)
 
 
 def get_refget_id_from_seqinfo(
-    assembly: Assembly, chromosome: Chromosome
+    assembly: Assembly | str, chromosome: Chromosome | str
 ) -> str | None:
     """Given an assembly/chromosome pairing, get a refget accession ID, if known
 
     :param assembly: reference assembly for sequence
-    :param chromosome: chromosome name
+    :param chromosome: chromosome name, or any alias of the sequence
     :return: a refget sequence accession ID, if known
     """
-    return REFGET_ID_LOOKUP.get((assembly, chromosome))
+    info = _default_registry.get(assembly, chromosome)
+    return None if info is None else info.refget_id
+
+
+def get_assembly_refget_ids(assembly: Assembly | str) -> dict[str, str]:
+    """Get the refget accession IDs of every known sequence in an assembly
+
+    :param assembly: reference assembly
+    :return: mapping of refget accession IDs to sequence names
+    """
+    return {
+        info.refget_id: info.name
+        for info in _default_registry.sequences(assembly)
+        if info.refget_id
+    }
+
+
+def _as_chromosome(name: str) -> Chromosome | str:
+    """Use the :class:`Chromosome` member for a sequence name, if there is one
+
+    :param name: sequence name
+    :return: chromosome enum member, or the name as given
+    """
+    try:
+        return Chromosome(name)
+    except ValueError:
+        return name
+
+
+def __getattr__(name: str) -> dict:
+    """Build the legacy ``REFGET_ID_INFO`` and ``REFGET_ID_LOOKUP`` mappings, of
+    primary chromosomes only, from the registry on first access.
+
+    :param name: module attribute name
+    :return: mapping
+    :raise AttributeError: for other names
+    """
+    if name == "REFGET_ID_INFO":
+        value = {
+            info.refget_id: (info.assembly, Chromosome(info.name))
+            for assembly in Assembly
+            for info in _default_registry.sequences(assembly)
+            if info.refget_id and info.name in Chromosome.__members__.values()
+        }
+    elif name == "REFGET_ID_LOOKUP":
+        value = {v: k for k, v in __getattr__("REFGET_ID_INFO").items()}
+    else:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    globals()[name] = value
+    return value
@@ -0,0 +1,230 @@
+"""Lift over columns of Arrow tables and pandas or polars DataFrames.
+
+A table is lifted in a single call into Rust: chromosome names are
+dictionary-encoded, and position columns are handed over as buffers and copied in
+a single pass, so no Python object is created per row. pandas and polars DataFrames are
+converted to Arrow and back, which is also copy-free for numeric columns.
+
+Requires PyArrow (install the ``arrow`` extra).
+"""
+
+import sys
+from collections.abc import Callable
+from typing import TYPE_CHECKING, TypeVar
+
+from agct.converter import Converter
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+Table = TypeVar("Table")
+
+
+def lift_table(
+    converter: Converter,
+    table: Table,
+    chrom_col: str = "chrom",
+    start_col: str = "start",
+    end_col: str = "end",
+    strand_col: str | None = None,
+    sorted_input: bool = False,
+    prefix: str = "lifted_",
+    merge: bool = False,
+    best_chain: bool = False,
+    min_match: float = 0.0,
+) -> Table:
+    """Lift over every row of a table.
+
+    The output has the same rows and columns as ``table``, plus:
+
+    * ``{prefix}chrom``, ``{prefix}start``, ``{prefix}end``, ``{prefix}strand``,
+      and ``{prefix}score``: the first segment that the row lifted to, or nulls if
+      it didn't lift
+    * ``mapped``: whether the row lifted to at least one segment
+    * ``segment_count``: the number of segments the row lifted to. Rows split across
+      more than one segment can be found with ``segment_count > 1``, and all of their
+      segments retrieved with
+      :py:meth:`Converter.convert_coordinates_to_arrays() <agct.converter.Converter.convert_coordinates_to_arrays>`.
+
+    Rows with a missing chromosome or position are left unmapped.
+
+    .. code-block:: pycon
+
+       >>> import polars as pl
+       >>> from agct import Assembly, get_converter
+       >>> from agct.tables import lift_table
+       >>> converter = get_converter(Assembly.HG19, Assembly.HG38)
+       >>> df = pl.DataFrame(
+       ...     {
+       ...         "chrom": ["chr7", "chr1"],
+       ...         "start": [140453136, 1],
+       ...         "end": [140453137, 1],
+       ...     }
+       ... )
+       >>> lift_table(converter, df).select("lifted_start", "mapped", "segment_count")
+       shape: (2, 3)
+       ┌──────────────┬────────┬───────────────┐
+       │ lifted_start ┆ mapped ┆ segment_count │
+       │ ---          ┆ ---    ┆ ---           │
+       │ i64          ┆ bool   ┆ i64           │
+       ╞══════════════╪════════╪═══════════════╡
+       │ 140753336    ┆ true   ┆ 1             │
+       │ null         ┆ false  ┆ 0             │
+       └──────────────┴────────┴───────────────┘
+
+    :param converter: converter to lift rows with
+    :param table: PyArrow table, pandas DataFrame, or polars DataFrame
+    :param chrom_col: name of chromosome column
+    :param start_col: name of start position column (inter-residue, integers)
+    :param end_col: name of end position column (inter-residue, integers)
+    :param strand_col: name of strand column, containing ``"+"`` or ``"-"``. All rows
+        are on the positive strand if not given.
+    :param sorted_input: whether rows are sorted by chromosome and position. See
+        :py:meth:`Converter.convert_coordinates() <agct.converter.Converter.convert_coordinates>`.
+    :param prefix: prefix for names of lifted columns
+    :param merge: whether to merge each chain's segments into one span. See
+        :py:meth:`Converter.convert_coordinate() <agct.converter.Converter.convert_coordinate>`.
+    :param best_chain: whether to keep only the best chain's segments. See
+        :py:meth:`Converter.convert_coordinate() <agct.converter.Converter.convert_coordinate>`.
+    :param min_match: minimum fraction of each row's interval that a chain must map.
+        See :py:meth:`Converter.convert_coordinate() <agct.converter.Converter.convert_coordinate>`.
+    :return: table of the same type as ``table``, with lifted columns added
+    :raise ValueError: if a column is missing, an output column name is already
+        taken, a strand value is unrecognized, or an interval is invalid (see
+        :py:meth:`Converter.convert_coordinates() <agct.converter.Converter.convert_coordinates>`)
+    :raise TypeError: if ``table`` isn't a supported table type
+    """
+    import pyarrow as pa  # noqa: PLC0415
+    import pyarrow.compute as pc  # noqa: PLC0415
+
+    arrow_table, from_arrow = _to_arrow(table)
+    output_names = [
+        f"{prefix}{name}" for name in ("chrom", "start", "end", "strand", "score")
+    ] + ["mapped", "segment_count"]
+    for name in output_names:
+        if name in arrow_table.column_names:
+            msg = f"Output column `{name}` already exists in input table"
+            raise ValueError(msg)
+
+    chroms = _column(arrow_table, chrom_col)
+    if pa.types.is_dictionary(chroms.type):
+        chroms = chroms.cast(pa.dictionary(pa.int32(), pa.string()))
+    else:
+        chroms = pc.dictionary_encode(chroms.cast(pa.string()))
+    contigs = chroms.indices
+    starts = _column(arrow_table, start_col).cast(pa.int64())
+    ends = _column(arrow_table, end_col).cast(pa.int64())
+    if contigs.null_count or starts.null_count or ends.null_count:
+        valid = pc.and_(pc.and_(contigs.is_valid(), starts.is_valid()), ends.is_valid())
+        contigs = pc.if_else(valid, contigs, pa.scalar(-1, pa.int32()))
+        starts = starts.fill_null(0)
+        ends = ends.fill_null(0)
+    strands = None
+    if strand_col is not None:
+        strands = _strand_codes(_column(arrow_table, strand_col))
+
+    results, offsets = converter.convert_columns(
+        chroms.dictionary.to_pylist(),
+        _values(contigs, "i"),
+        _values(starts, "q"),
+        _values(ends, "q"),
+        None if strands is None else _values(strands, "b"),
+        sorted_input=sorted_input,
+        merge=merge,
+        best_chain=best_chain,
+        min_match=min_match,
+    )
+
+    offsets = pa.Array.from_buffers(
+        pa.int64(), len(offsets), [None, pa.py_buffer(offsets)]
+    )
+    first = offsets.slice(0, arrow_table.num_rows)
+    segment_count = pc.subtract(offsets.slice(1), first)
+    mapped = pc.greater(segment_count, 0)
+    lifted = results.to_arrow().take(
+        pc.if_else(mapped, first, pa.scalar(None, pa.int64()))
+    )
+    columns = [
+        lifted.column("chrom").combine_chunks().dictionary_decode(),
+        lifted.column("start"),
+        lifted.column("end"),
+        pc.if_else(pc.greater(lifted.column("strand"), 0), "+", "-"),
+        lifted.column("score"),
+        mapped,
+        segment_count,
+    ]
+    for name, column in zip(output_names, columns, strict=True):
+        arrow_table = arrow_table.append_column(name, column)
+    return from_arrow(arrow_table)
+
+
+def _to_arrow(table: Table) -> tuple["pa.Table", Callable[["pa.Table"], Table]]:
+    """Convert a supported table to Arrow.
+
+    :param table: PyArrow table, pandas DataFrame, or polars DataFrame
+    :return: Arrow table, and a function converting an Arrow table back to the
+        original type
+    :raise TypeError: if ``table`` isn't a supported table type
+    """
+    import pyarrow as pa  # noqa: PLC0415
+
+    if isinstance(table, pa.Table):
+        return table, lambda arrow_table: arrow_table
+    # only check for DataFrame types whose libraries have already been imported
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(table, pd.DataFrame):
+        return pa.Table.from_pandas(table), lambda arrow_table: arrow_table.to_pandas()
+    pl = sys.modules.get("polars")
+    if pl is not None and isinstance(table, pl.DataFrame):
+        return table.to_arrow(), pl.from_arrow
+    msg = f"Expected a PyArrow table or a pandas or polars DataFrame, got {type(table).__name__}"
+    raise TypeError(msg)
+
+
+def _column(table: "pa.Table", name: str) -> "pa.Array":
+    """Get a table column as a single array, copying only if it's chunked.
+
+    :param table: Arrow table
+    :param name: column name
+    :return: column values
+    :raise ValueError: if there's no such column
+    """
+    if name not in table.column_names:
+        msg = f"Column `{name}` not found in input table"
+        raise ValueError(msg)
+    return table.column(name).combine_chunks()
+
+
+def _strand_codes(strands: "pa.Array") -> "pa.Array":
+    """Convert a column of ``"+"``/``"-"`` strands to int8 codes.
+
+    :param strands: strand column
+    :return: ``1`` for the positive strand, ``-1`` for the negative strand
+    :raise ValueError: if a strand value is missing or unrecognized
+    """
+    import pyarrow as pa  # noqa: PLC0415
+    import pyarrow.compute as pc  # noqa: PLC0415
+
+    strands = strands.cast(pa.string())
+    recognized = pc.is_in(strands, value_set=pa.array(["+", "-"]))
+    if not pc.all(recognized).as_py():
+        bad = strands.filter(pc.invert(recognized))
+        msg = f"Unrecognized strand value: {bad[0].as_py()!r}"
+        raise ValueError(msg)
+    return pc.if_else(
+        pc.equal(strands, "-"), pa.scalar(-1, pa.int8()), pa.scalar(1, pa.int8())
+    )
+
+
+def _values(array: "pa.Array", format_: str) -> memoryview:
+    """View the values of a null-free primitive Arrow array without copying.
+
+    :param array: array with no nulls
+    :param format_: struct format of array values
+    :return: typed view of the array's values
+    """
+    if not len(array):
+        return memoryview(b"").cast(format_)
+    return memoryview(array.buffers()[1]).cast(format_)[
+        array.offset : array.offset + len(array)
+    ]
@@ -0,0 +1,70 @@
+"""Test asyncio liftover interface."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from agct import Assembly, LiftoverResult, Strand, get_converter
+from agct.aio import AsyncConverter, aget_converter
+
+QUERIES = [
+    ("chr7", 140453136, 140453137, Strand.POSITIVE),
+    ("chr7", 140439611, 140439611, Strand.POSITIVE),
+    ("chr1", 206072708, 206072707, Strand.NEGATIVE),
+    ("chr7", 1, 2, Strand.POSITIVE),
+    ("chrUnknown", 1, 2, Strand.POSITIVE),
+]
+
+
+def test_convert_coordinate(data_dir: Path):
+    chainfile = str(data_dir / "ucsc-chainfile" / "chainfile_hg19_to_hg38_.chain")
+
+    async def run() -> None:
+        converter = await AsyncConverter.create(chainfile=chainfile, metrics=True)
+        expected = [converter.converter.convert_coordinate(*query) for query in QUERIES]
+        results = await asyncio.gather(
+            *(converter.convert_coordinate(*query) for query in QUERIES)
+        )
+        assert results == expected
+        assert results[0] == [
+            LiftoverResult("chr7", 140753336, 140753337, Strand.POSITIVE, 14633688187)
+        ]
+        # every request was lifted in one batch
+        assert converter.converter.metrics_snapshot().batch_calls == 1
+
+        small_batches = AsyncConverter(converter.converter, max_batch_size=2)
+        assert (
+            await asyncio.gather(
+                *(small_batches.convert_coordinate(*query) for query in QUERIES)
+            )
+            == expected
+        )
+        assert converter.converter.metrics_snapshot().batch_calls == 4
+
+        with pytest.raises(ValueError, match="`end` must be less than `start`"):
+            await converter.convert_coordinate("chr7", 2, 1)
+        with pytest.raises(ValueError, match="32 bit unsigned int"):
+            await converter.convert_coordinate("chr7", 1, 2**32)
+
+        result = await converter.convert_coordinates(["chr7"], [140453136], [140453137])
+        assert result.start == [140753336]
+
+    asyncio.run(run())
+
+
+def test_invalid_args():
+    converter = get_converter(Assembly.HG19, Assembly.HG38)
+    with pytest.raises(ValueError, match="`window` must be non-negative"):
+        AsyncConverter(converter, window=-1)
+    with pytest.raises(ValueError, match="`max_batch_size` must be positive"):
+        AsyncConverter(converter, max_batch_size=0)
+
+
+def test_aget_converter():
+    async def run() -> None:
+        assert await aget_converter(Assembly.HG19, Assembly.HG38) is get_converter(
+            Assembly.HG19, Assembly.HG38
+        )
+
+    asyncio.run(run())
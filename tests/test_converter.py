@@ -1,11 +1,35 @@
 """Module for testing Converter initialization"""
 
+import gzip
+import io
+import os
+import pickle
 import re
+import shutil
+import struct
+import threading
+import zlib
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
 
-from agct import Assembly, Converter, get_converter
+import agct.converter
+from agct import (
+    Assembly,
+    CacheInfo,
+    Converter,
+    ConverterRegistry,
+    LiftoverResult,
+    RegistryInfo,
+    Strand,
+    _core,
+    compile_index,
+    compose_chainfiles,
+    find_assembly_path,
+    get_converter,
+)
 
 
 def test_valid(data_dir: Path):
@@ -44,3 +68,488 @@ def test_factory_function():
     assert id(get_converter(Assembly.HG19, Assembly.HG38)) != id(
         get_converter(Assembly.HG38, Assembly.HG19)
     )
+
+
+def test_find_assembly_path():
+    assert find_assembly_path(Assembly.HG19, Assembly.HG38) == (
+        Assembly.HG19,
+        Assembly.HG38,
+    )
+    assert find_assembly_path(Assembly.HG18, Assembly.HG38) == (
+        Assembly.HG18,
+        Assembly.HG19,
+        Assembly.HG38,
+    )
+    with pytest.raises(ValueError, match="Liftover must be to/from different sources"):
+        find_assembly_path(Assembly.HG38, Assembly.HG38)
+
+
+def _lift_through(converters: list[Converter], chrom: str, pos: int) -> set:
+    """Lift a position through each converter in turn."""
+    positions = {(chrom, pos)}
+    for converter in converters:
+        lifted = set()
+        for chrom_, pos_ in positions:
+            for result in converter.convert_coordinate(chrom_, pos_, pos_ + 1):
+                lifted.add((result.chrom, min(result.start, result.end)))
+        positions = lifted
+    return positions
+
+
+def test_compose(tmp_path: Path, data_dir: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test composing chainfiles for multi-hop liftover"""
+    hg19_to_hg38 = data_dir / "ucsc-chainfile" / "chainfile_hg19_to_hg38_.chain"
+    hg38_to_hg19 = data_dir / "ucsc-chainfile" / "chainfile_hg38_to_hg19_.chain"
+    composed = compose_chainfiles(
+        hg19_to_hg38, hg38_to_hg19, tmp_path / "hg19_to_hg19.chain"
+    )
+    converter = Converter(chainfile=str(composed))
+    steps = [
+        Converter(chainfile=str(hg19_to_hg38)),
+        Converter(chainfile=str(hg38_to_hg19)),
+    ]
+    for chrom, pos in [("chr7", 140453136), ("chr1", 206072707), ("chr1", 1)]:
+        assert _lift_through([converter], chrom, pos) == _lift_through(
+            steps, chrom, pos
+        )
+
+    # composed chainfiles are cached next to downloaded ones
+    monkeypatch.setenv("WAGS_TAILS_DIR", str(tmp_path))
+    (tmp_path / "ucsc-chainfile").mkdir()
+    shutil.copy(hg19_to_hg38, tmp_path / "ucsc-chainfile")
+    shutil.copy(hg38_to_hg19, tmp_path / "ucsc-chainfile")
+    converter = Converter(
+        Assembly.HG38, Assembly.HG19, via=[Assembly.HG19, Assembly.HG38]
+    )
+    assert (
+        tmp_path / "ucsc-chainfile" / "chainfile_hg38_to_hg19_to_hg38_.chain"
+    ).exists()
+    assert (
+        tmp_path / "ucsc-chainfile" / "chainfile_hg38_to_hg19_to_hg38_to_hg19_.chain"
+    ).exists()
+    steps = [steps[1], steps[0], steps[1]]
+    for chrom, pos in [("chr7", 140753336), ("chr7", 100000000), ("chr1", 1)]:
+        assert _lift_through([converter], chrom, pos) == _lift_through(
+            steps, chrom, pos
+        )
+    assert _lift_through([converter], "chr7", 140753336) == {("chr7", 140453136)}
+
+    with pytest.raises(ValueError, match="Consecutive assemblies"):
+        Converter(Assembly.HG38, Assembly.HG19, via=[Assembly.HG38])
+
+
+def test_compose_compressed(
+    tmp_path: Path, data_dir: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that composed chainfiles don't make compressed ones look decompressed"""
+    monkeypatch.setenv("WAGS_TAILS_DIR", str(tmp_path))
+    chainfile_dir = tmp_path / "ucsc-chainfile"
+    chainfile_dir.mkdir()
+    hg38_to_hg19 = chainfile_dir / "chainfile_hg38_to_hg19_.chain.gz"
+    hg38_to_hg19.write_bytes(
+        gzip.compress(
+            (data_dir / "ucsc-chainfile" / "chainfile_hg38_to_hg19_.chain").read_bytes()
+        )
+    )
+    # stands in for hg19 to hg18, which only needs to compose with hg38 to hg19
+    (chainfile_dir / "chainfile_hg19_to_hg18_.chain.gz").write_bytes(
+        gzip.compress(
+            (data_dir / "ucsc-chainfile" / "chainfile_hg19_to_hg38_.chain").read_bytes()
+        )
+    )
+
+    Converter(Assembly.HG38, Assembly.HG18, via=[Assembly.HG19])
+    assert (chainfile_dir / "chainfile_hg38_to_hg19_to_hg18_.chain").exists()
+    # the direct pair still uses its compressed chainfile rather than downloading
+    # a decompressed copy
+    assert Converter(Assembly.HG38, Assembly.HG19).chainfile == hg38_to_hg19
+    assert not (chainfile_dir / "chainfile_hg38_to_hg19_.chain").exists()
+
+
+def test_index(tmp_path: Path, data_dir: Path):
+    """Test compiling and loading a binary chainfile index"""
+    chainfile = tmp_path / "chainfile_hg19_to_hg38_.chain"
+    shutil.copy(data_dir / "ucsc-chainfile" / chainfile.name, chainfile)
+
+    converter = Converter(chainfile=str(chainfile), use_index=True)
+    index_file = chainfile.with_suffix(".agctidx")
+    assert index_file.exists()
+    assert converter.convert_coordinate("chr7", 140453136, 140453137) == [
+        LiftoverResult("chr7", 140753336, 140753337, Strand.POSITIVE, 14633688187)
+    ]
+    assert converter.convert_coordinate("chr1", 206072707, 206072708) == [
+        LiftoverResult("chr1", 206268644, 206268643, Strand.NEGATIVE, 24611930)
+    ]
+    assert converter.convert_coordinate("chr7", 1, 2) == []
+
+    # existing, up-to-date index is reused rather than recompiled
+    mtime = index_file.stat().st_mtime_ns
+    Converter(chainfile=str(chainfile), use_index=True)
+    assert index_file.stat().st_mtime_ns == mtime
+
+    # stale index is recompiled
+    os.utime(chainfile, ns=(mtime + 10**9, mtime + 10**9))
+    Converter(chainfile=str(chainfile), use_index=True)
+    assert index_file.stat().st_mtime_ns != mtime
+
+
+def test_index_errors(tmp_path: Path, data_dir: Path):
+    """Test index compilation/loading errors"""
+    with pytest.raises(FileNotFoundError):
+        compile_index(data_dir / "non_existent_chainfile.chain")
+    with pytest.raises(_core.ChainfileError):
+        compile_index(
+            data_dir / "invalid_chainfile.chain", tmp_path / "invalid.agctidx"
+        )
+    not_an_index = tmp_path / "not_an_index.agctidx"
+    not_an_index.write_text("chain 1 chr1")
+    with pytest.raises(_core.ChainfileError):
+        _core.Converter.from_index(str(not_an_index))
+
+    # corrupt indexes are rejected on load rather than read out of bounds
+    index_file = tmp_path / "hg38_to_hg19.agctidx"
+    compile_index(
+        data_dir / "ucsc-chainfile" / "chainfile_hg38_to_hg19_.chain", index_file
+    )
+    data = index_file.read_bytes()
+    corrupt = tmp_path / "corrupt.agctidx"
+    for corrupt_data in [
+        data[: len(data) // 2],
+        data[:56] + (2**63).to_bytes(8, "little") + data[64:],
+    ]:
+        corrupt.write_bytes(corrupt_data)
+        with pytest.raises(_core.ChainfileError):
+            _core.Converter.from_index(str(corrupt))
+
+
+def _bgzf(data: bytes, block_size: int = 1 << 12) -> bytes:
+    """Compress data as BGZF blocks, as written by ``bgzip``."""
+    blocks = []
+    for offset in range(0, len(data), block_size):
+        chunk = data[offset : offset + block_size]
+        compressor = zlib.compressobj(wbits=-15)
+        payload = compressor.compress(chunk) + compressor.flush()
+        header = b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00"
+        blocks.append(
+            header
+            + struct.pack("<H", len(header) + 2 + len(payload) + 8 - 1)
+            + payload
+            + struct.pack("<II", zlib.crc32(chunk), len(chunk))
+        )
+    eof = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+    return b"".join(blocks) + eof
+
+
+@pytest.mark.parametrize("compress", [gzip.compress, _bgzf])
+def test_compressed(tmp_path: Path, data_dir: Path, compress: Callable):
+    """Test loading compressed chainfiles from paths and buffers"""
+    data = (data_dir / "ucsc-chainfile" / "chainfile_hg19_to_hg38_.chain").read_bytes()
+    compressed = compress(data)
+    chainfile = tmp_path / "chainfile.chain.gz"
+    chainfile.write_bytes(compressed)
+    expected = [
+        LiftoverResult("chr7", 140753336, 140753337, Strand.POSITIVE, 14633688187)
+    ]
+
+    for kwargs in [{}, {"use_index": True}, {"lazy": True}]:
+        converter = Converter(chainfile=str(chainfile), **kwargs)
+        assert converter.convert_coordinate("chr7", 140453136, 140453137) == expected
+    assert (tmp_path / "chainfile.chain.agctidx").exists()
+
+    for contents in [compressed, data, io.BytesIO(compressed)]:
+        converter = Converter(chainfile=contents)
+        assert converter.chainfile is None
+        assert converter.convert_coordinate("chr7", 140453136, 140453137) == expected
+        assert converter.inverse().convert_coordinate("chr7", 140753336, 140753337) == [
+            LiftoverResult("chr7", 140453136, 140453137, Strand.POSITIVE, 14633688187)
+        ]
+    with pytest.raises(TypeError, match="can't be pickled"):
+        pickle.dumps(converter)
+    with pytest.raises(ValueError, match="require `chainfile` to be a path"):
+        Converter(chainfile=compressed, use_index=True)
+    with pytest.raises(_core.ChainfileError):
+        Converter(chainfile=compressed[: len(compressed) // 2])
+
+
+def test_lazy(data_dir: Path):
+    """Test lazy per-contig chainfile loading"""
+    converter = Converter(
+        chainfile=str(data_dir / "ucsc-chainfile" / "chainfile_hg19_to_hg38_.chain"),
+        lazy=True,
+    )
+    core = converter._converter  # noqa: SLF001
+    assert core.loaded_contig_count() == 0
+
+    assert converter.convert_coordinate("chr7", 140453136, 140453137) == [
+        LiftoverResult("chr7", 140753336, 140753337, Strand.POSITIVE, 14633688187)
+    ]
+    assert core.loaded_contig_count() == 1
+    assert converter.convert_coordinate("chr7", 140439611, 140439611) == [
+        LiftoverResult("chr7", 140739811, 140739811, Strand.POSITIVE, 14633688187)
+    ]
+    assert core.loaded_contig_count() == 1
+
+    assert converter.convert_coordinate("chrUnknown", 1, 2) == []
+    assert core.loaded_contig_count() == 1
+
+    assert converter.convert_coordinate("chr1", 206072707, 206072708) == [
+        LiftoverResult("chr1", 206268644, 206268643, Strand.NEGATIVE, 24611930)
+    ]
+    assert core.loaded_contig_count() == 2
+
+    with pytest.raises(ValueError, match="`use_index` and `lazy` can't both be set"):
+        Converter(Assembly.HG19, Assembly.HG38, use_index=True, lazy=True)
+
+
+@pytest.mark.parametrize(("compress", "lazy"), [(gzip.compress, False), (_bgzf, True)])
+def test_lazy_compressed(
+    tmp_path: Path, data_dir: Path, compress: Callable, lazy: bool
+):
+    """Test that BGZF chainfiles load lazily, and other gzip files are parsed eagerly"""
+    data = (data_dir / "ucsc-chainfile" / "chainfile_hg19_to_hg38_.chain").read_bytes()
+    chainfile = tmp_path / "chainfile.chain.gz"
+    chainfile.write_bytes(compress(data))
+    converter = Converter(chainfile=str(chainfile), lazy=True)
+    core = converter._converter  # noqa: SLF001
+    assert core.loaded_contig_count() == (0 if lazy else None)
+    assert converter.convert_coordinate("chr1", 206072707, 206072708) == [
+        LiftoverResult("chr1", 206268644, 206268643, Strand.NEGATIVE, 24611930)
+    ]
+    assert core.loaded_contig_count() == (1 if lazy else None)
+    # nothing is decompressed to disk
+    assert list(tmp_path.iterdir()) == [chainfile]
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"use_index": True}, {"lazy": True}])
+def test_inverse(tmp_path: Path, data_dir: Path, kwargs: dict):
+    """Test lifting with the inverse of a loaded chainfile"""
+    chainfile = tmp_path / "chainfile_hg19_to_hg38_.chain"
+    shutil.copy(data_dir / "ucsc-chainfile" / chainfile.name, chainfile)
+    converter = Converter(chainfile=str(chainfile), **kwargs)
+    inverse = converter.inverse()
+    assert inverse.inverted
+    assert not converter.inverted
+    assert converter.inverse() is inverse
+    assert inverse.inverse() is converter
+
+    assert inverse.convert_coordinate("chr7", 140753336, 140753337) == [
+        LiftoverResult("chr7", 140453136, 140453137, Strand.POSITIVE, 14633688187)
+    ]
+    # negative-strand chain
+    assert inverse.convert_coordinate("chr1", 206268643, 206268644) == [
+        LiftoverResult("chr1", 206072708, 206072707, Strand.NEGATIVE, 24611930)
+    ]
+    assert inverse.convert_coordinate("chr7", 1, 2) == []
+
+    restored = pickle.loads(pickle.dumps(inverse))  # noqa: S301
+    assert restored.inverted
+    assert restored.convert_coordinate("chr7", 140753336, 140753337) == [
+        LiftoverResult("chr7", 140453136, 140453137, Strand.POSITIVE, 14633688187)
+    ]
+
+    if not kwargs:
+        direct = Converter(chainfile=str(chainfile), inverted=True)
+        assert direct.convert_coordinate("chr7", 140753336, 140753337) == [
+            LiftoverResult("chr7", 140453136, 140453137, Strand.POSITIVE, 14633688187)
+        ]
+        assert get_converter(Assembly.HG38, Assembly.HG19, inverted=True) is (
+            get_converter(Assembly.HG19, Assembly.HG38).inverse()
+        )
+
+
+def test_cache(data_dir: Path):
+    """Test LRU caching of single-interval liftover results"""
+    chainfile = str(data_dir / "ucsc-chainfile" / "chainfile_hg19_to_hg38_.chain")
+    assert Converter(chainfile=chainfile).cache_info() is None
+
+    converter = Converter(chainfile=chainfile, cache_size=2)
+    expected = [
+        LiftoverResult("chr7", 140753336, 140753337, Strand.POSITIVE, 14633688187)
+    ]
+    result = converter.convert_coordinate("chr7", 140453136, 140453137)
+    assert result == expected
+    result.clear()
+    assert converter.convert_coordinate("chr7", 140453136, 140453137) == expected
+    assert converter.convert_coordinate("chr7", 140453136, 140453137, "+") == expected
+    assert converter.cache_info() == CacheInfo(hits=2, misses=1, maxsize=2, currsize=1)
+
+    assert converter.convert_coordinate("chr7", 1, 2) == []
+    assert converter.convert_coordinate("chr7", 1, 2) == []
+    converter.convert_coordinate("chr1", 206072707, 206072708)
+    converter.convert_coordinate("chr7", 140453136, 140453137)
+    assert converter.cache_info() == CacheInfo(hits=3, misses=4, maxsize=2, currsize=2)
+
+    with pytest.raises(ValueError, match="`end` must be less than `start`"):
+        converter.convert_coordinate("chr7", 2, 1)
+
+    converter.cache_clear()
+    assert converter.cache_info() == CacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+    with pytest.raises(ValueError, match="`cache_size` must be non-negative"):
+        Converter(chainfile=chainfile, cache_size=-1)
+
+
+def test_cache_error(data_dir: Path):
+    """Test that liftover failures aren't cached, and are retried on the next call"""
+    chainfile = str(data_dir / "ucsc-chainfile" / "chainfile_hg19_to_hg38_.chain")
+    converter = Converter(chainfile=chainfile, cache_size=2)
+
+    class _FailOnce:
+        """Converter whose first lift raises a chainfile error"""
+
+        def __init__(self, converter: _core.Converter) -> None:
+            self.converter = converter
+            self.failed = False
+
+        def lift(self, *args, **kwargs) -> list:
+            if not self.failed:
+                self.failed = True
+                msg = "invalid chain"
+                raise _core.ChainfileError(msg)
+            return self.converter.lift(*args, **kwargs)
+
+    converter._converter = _FailOnce(converter._converter)  # noqa: SLF001
+    assert converter.convert_coordinate("chr7", 140453136, 140453137) == []
+    assert converter.convert_coordinate("chr7", 140453136, 140453137) == [
+        LiftoverResult("chr7", 140753336, 140753337, Strand.POSITIVE, 14633688187)
+    ]
+    assert converter.cache_info() == CacheInfo(hits=0, misses=2, maxsize=2, currsize=1)
+
+
+def test_pickle(tmp_path: Path, data_dir: Path):
+    """Test that converters pickle by reference and reload equivalently"""
+    chainfile = tmp_path / "chainfile.chain"
+    shutil.copy(
+        data_dir / "ucsc-chainfile" / "chainfile_hg19_to_hg38_.chain", chainfile
+    )
+    expected = [
+        LiftoverResult("chr7", 140753336, 140753337, Strand.POSITIVE, 14633688187)
+    ]
+    for kwargs in [{}, {"use_index": True}, {"lazy": True}, {"cache_size": 10}]:
+        converter = Converter(chainfile=str(chainfile), **kwargs)
+        converter.convert_coordinate("chr7", 140453136, 140453137)
+        data = pickle.dumps(converter)
+        assert len(data) < 1024
+
+        restored = pickle.loads(data)  # noqa: S301
+        assert restored.chainfile == chainfile
+        assert (restored.use_index, restored.lazy, restored.cache_size) == (
+            converter.use_index,
+            converter.lazy,
+            converter.cache_size,
+        )
+        assert restored.convert_coordinate("chr7", 140453136, 140453137) == expected
+        if converter.cache_size:
+            assert restored.cache_info() == CacheInfo(
+                hits=0, misses=1, maxsize=10, currsize=1
+            )
+
+
+def test_threads(data_dir: Path):
+    """Test concurrent liftover through a shared converter"""
+    converter = Converter(
+        chainfile=str(data_dir / "ucsc-chainfile" / "chainfile_hg19_to_hg38_.chain")
+    )
+    queries = [
+        ("chr7", 140453136, 140453137),
+        ("chr7", 140439611, 140439611),
+        ("chr1", 206072707, 206072708),
+        ("chr7", 1, 2),
+    ] * 50
+    expected = [converter.convert_coordinate(*query) for query in queries]
+    with ThreadPoolExecutor(8) as executor:
+        results = list(
+            executor.map(lambda query: converter.convert_coordinate(*query), queries)
+        )
+    assert results == expected
+
+
+def test_registry(monkeypatch: pytest.MonkeyPatch):
+    """Test converter registry loading, eviction, and lifecycle"""
+    loads = []
+    release = threading.Event()
+
+    class SlowConverter(Converter):
+        def __init__(self, *args, **kwargs):
+            loads.append(kwargs["from_assembly"])
+            release.wait(5)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(agct.converter, "Converter", SlowConverter)
+
+    registry = ConverterRegistry(max_converters=1)
+    # concurrent first callers share a single load
+    with ThreadPoolExecutor(8) as executor:
+        futures = [
+            executor.submit(registry.get, Assembly.HG19, Assembly.HG38)
+            for _ in range(8)
+        ]
+        release.set()
+        converters = [future.result() for future in futures]
+    assert loads == [Assembly.HG19]
+    assert all(converter is converters[0] for converter in converters)
+    assert registry.get(Assembly.HG19, Assembly.HG38) is converters[0]
+    info = registry.info()
+    assert info.converters == 1
+    assert info.bytes > 0
+
+    # least recently used converter is evicted
+    registry.warm_up([(Assembly.HG38, Assembly.HG19)])
+    assert registry.info().converters == 1
+    assert registry.get(Assembly.HG19, Assembly.HG38) is not converters[0]
+    assert len(loads) == 3
+
+    registry.set_budget(max_bytes=1)
+    assert registry.info() == RegistryInfo(1, info.bytes, None, 1)
+    assert registry.evict(Assembly.HG19, Assembly.HG38)
+    assert registry.info().converters == 0
+
+    with pytest.raises(ValueError, match="`max_converters` must be positive"):
+        registry.set_budget(max_converters=0)
+
+    registry.close()
+    with pytest.raises(RuntimeError, match="Converter registry is closed"):
+        registry.get(Assembly.HG19, Assembly.HG38)
+
+
+def test_registry_budget(
+    tmp_path: Path, data_dir: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that the registry's memory budget counts parsed chain data, however the
+    chainfile is compressed, and evicts converters once it's exceeded
+    """
+    monkeypatch.setenv("WAGS_TAILS_DIR", str(tmp_path))
+    chainfile_dir = tmp_path / "ucsc-chainfile"
+    chainfile_dir.mkdir()
+    for pair in ("hg19_to_hg38", "hg38_to_hg19"):
+        data = (data_dir / "ucsc-chainfile" / f"chainfile_{pair}_.chain").read_bytes()
+        (chainfile_dir / f"chainfile_{pair}_.chain.gz").write_bytes(gzip.compress(data))
+
+    plain = Converter(
+        chainfile=str(data_dir / "ucsc-chainfile" / "chainfile_hg19_to_hg38_.chain")
+    )
+    compressed = Converter(Assembly.HG19, Assembly.HG38)
+    size = agct.converter._chain_data_size(compressed)  # noqa: SLF001
+    assert size == agct.converter._chain_data_size(plain)  # noqa: SLF001
+    assert size > plain.chainfile.stat().st_size > compressed.chainfile.stat().st_size
+    other_size = agct.converter._chain_data_size(  # noqa: SLF001
+        Converter(Assembly.HG38, Assembly.HG19)
+    )
+
+    registry = ConverterRegistry(max_bytes=size + other_size)
+    first = registry.get(Assembly.HG19, Assembly.HG38)
+    registry.get(Assembly.HG38, Assembly.HG19)
+    assert registry.info() == RegistryInfo(
+        2, size + other_size, None, size + other_size
+    )
+
+    # building an inverse grows a converter's chain data, taking the registry over
+    # budget, so the least recently used converter is evicted at the next check
+    first.inverse()
+    assert registry.info().bytes > size + other_size
+    registry.set_budget(max_bytes=size + other_size)
+    assert registry.info() == RegistryInfo(1, other_size, None, size + other_size)
+    assert registry.get(Assembly.HG19, Assembly.HG38) is not first
+
+    registry.set_budget(max_bytes=1)
+    assert registry.info().converters == 1
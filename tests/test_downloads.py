@@ -0,0 +1,182 @@
+"""Test chainfile downloads against a local HTTP server."""
+
+import gzip
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import ClassVar
+
+import pytest
+
+import agct.downloads
+from agct import Assembly, Converter, prefetch_chainfiles
+from agct.cli import main
+from agct.downloads import download_chainfile, get_chainfile_url
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Serve files, honoring single ``bytes=N-`` range requests"""
+
+    ranges: ClassVar[list[str]] = []
+    paths: ClassVar[list[str]] = []
+
+    def send_head(self):
+        self.paths.append(self.path)
+        range_header = self.headers.get("Range")
+        if range_header is None:
+            return super().send_head()
+        self.ranges.append(range_header)
+        path = Path(self.translate_path(self.path))
+        data = path.read_bytes()
+        offset = int(range_header.removeprefix("bytes=").removesuffix("-"))
+        if offset >= len(data):
+            self.send_error(416)
+            return None
+        self.send_response(206)
+        self.send_header("Content-Length", str(len(data) - offset))
+        self.send_header("Content-Range", f"bytes {offset}-{len(data) - 1}/{len(data)}")
+        self.end_headers()
+        f = path.open("rb")
+        f.seek(offset)
+        return f
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path: Path, data_dir: Path, monkeypatch: pytest.MonkeyPatch):
+    """Serve gzipped test chainfiles with the UCSC directory layout."""
+    root = tmp_path / "server"
+    for from_assembly, to_assembly in [("hg19", "hg38"), ("hg38", "hg19")]:
+        directory = root / from_assembly / "liftOver"
+        directory.mkdir(parents=True)
+        name = f"{from_assembly}To{to_assembly.title()}.over.chain.gz"
+        chainfile = (
+            data_dir
+            / "ucsc-chainfile"
+            / f"chainfile_{from_assembly}_to_{to_assembly}_.chain"
+        )
+        data = gzip.compress(chainfile.read_bytes())
+        (directory / name).write_bytes(data)
+        checksum = hashlib.md5(data).hexdigest()  # noqa: S324
+        (directory / "md5sum.txt").write_text(f"{checksum}  {name}\n")
+
+    RangeRequestHandler.ranges = []
+    RangeRequestHandler.paths = []
+    handler = lambda *args: RangeRequestHandler(*args, directory=str(root))  # noqa: E731
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("AGCT_CHAINFILE_URL", f"http://127.0.0.1:{httpd.server_port}")
+    monkeypatch.setenv("WAGS_TAILS_DIR", str(tmp_path / "data"))
+    yield root
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_prefetch(server: Path, tmp_path: Path, data_dir: Path):
+    chainfiles = prefetch_chainfiles(
+        [(Assembly.HG19, Assembly.HG38), (Assembly.HG38, Assembly.HG19)],
+        use_index=True,
+    )
+    # chainfiles are cached compressed, as published
+    assert [chainfile.name for chainfile in chainfiles] == [
+        "chainfile_hg19_to_hg38_.chain.gz",
+        "chainfile_hg38_to_hg19_.chain.gz",
+    ]
+    for chainfile in chainfiles:
+        assert (
+            gzip.decompress(chainfile.read_bytes())
+            == (data_dir / "ucsc-chainfile" / chainfile.stem).read_bytes()
+        )
+    assert sorted(path.name for path in chainfiles[0].parent.iterdir()) == [
+        "chainfile_hg19_to_hg38_.chain.agctidx",
+        "chainfile_hg19_to_hg38_.chain.gz",
+        "chainfile_hg19_to_hg38_.chain.gz.lock",
+        "chainfile_hg38_to_hg19_.chain.agctidx",
+        "chainfile_hg38_to_hg19_.chain.gz",
+        "chainfile_hg38_to_hg19_.chain.gz.lock",
+    ]
+
+    # prefetched chainfiles are used without downloading again
+    (server / "hg19").rename(tmp_path / "moved")
+    converter = Converter(Assembly.HG19, Assembly.HG38)
+    assert converter.chainfile == chainfiles[0]
+
+    assert main(["prefetch", "hg38:hg19"]) == 0
+    with pytest.raises(SystemExit):
+        main(["prefetch", "hg19-hg38"])
+
+
+def test_download_resume(server: Path, tmp_path: Path):
+    url = get_chainfile_url(Assembly.HG19, Assembly.HG38)
+    outfile = tmp_path / "hg19_to_hg38.chain"
+    data = (server / "hg19" / "liftOver" / "hg19ToHg38.over.chain.gz").read_bytes()
+
+    # interrupted download picks up where it stopped
+    partial = tmp_path / "hg19_to_hg38.chain.gz.part"
+    partial.write_bytes(data[:1000])
+    download_chainfile(url, outfile)
+    assert RangeRequestHandler.ranges == ["bytes=1000-"]
+    assert outfile.read_bytes() == gzip.decompress(data)
+    assert not partial.exists()
+
+    # complete but unverified download
+    partial.write_bytes(data)
+    download_chainfile(url, outfile)
+    assert RangeRequestHandler.ranges[-1] == f"bytes={len(data)}-"
+    assert outfile.read_bytes() == gzip.decompress(data)
+
+    # corrupt partial download fails verification and is discarded
+    (tmp_path / "corrupt.chain.gz.part").write_bytes(b"x" * 1000)
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        download_chainfile(url, tmp_path / "corrupt.chain")
+    assert not (tmp_path / "corrupt.chain.gz.part").exists()
+
+    # kept compressed
+    download_chainfile(url, tmp_path / "hg19_to_hg38.chain.gz", decompress=False)
+    assert (tmp_path / "hg19_to_hg38.chain.gz").read_bytes() == data
+    assert not (tmp_path / "hg19_to_hg38.chain.gz.part").exists()
+
+    # no published checksum
+    (server / "hg19" / "liftOver" / "md5sum.txt").unlink()
+    download_chainfile(url, tmp_path / "unverified.chain")
+    assert (tmp_path / "unverified.chain").read_bytes() == gzip.decompress(data)
+
+
+@pytest.mark.parametrize("decompress", [True, False])
+def test_download_concurrent(
+    server: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, decompress: bool
+):
+    """Test that concurrent downloads of a chainfile take turns, rather than writing
+    to the same partial download at once
+    """
+    url = get_chainfile_url(Assembly.HG19, Assembly.HG38)
+    data = (server / "hg19" / "liftOver" / "hg19ToHg38.over.chain.gz").read_bytes()
+    outfile = tmp_path / ("hg19_to_hg38.chain" if decompress else "hg19_to_hg38.gz")
+    download = agct.downloads._download  # noqa: SLF001
+
+    def slow_download(url: str, path: Path) -> None:
+        # give the other downloads time to start
+        time.sleep(0.2)
+        download(url, path)
+
+    monkeypatch.setattr(agct.downloads, "_download", slow_download)
+    with ThreadPoolExecutor(4) as executor:
+        futures = [
+            executor.submit(download_chainfile, url, outfile, decompress=decompress)
+            for _ in range(4)
+        ]
+        for future in futures:
+            future.result()
+    assert outfile.read_bytes() == (gzip.decompress(data) if decompress else data)
+    # waiting downloads find the chainfile in place, and don't fetch it again
+    chainfile_path = "/hg19/liftOver/hg19ToHg38.over.chain.gz"
+    assert RangeRequestHandler.paths.count(chainfile_path) == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        ["server", outfile.name, f"{outfile.name}.lock"]
+    )
@@ -0,0 +1,49 @@
+"""Test that importing agct stays fast and leaves heavy dependencies unloaded."""
+
+import subprocess
+import sys
+
+# generous, so that slow CI machines don't fail; a regression back to eagerly
+# importing wags-tails and its HTTP stack is caught by the module checks below
+IMPORT_TIME_BUDGET_US = 300_000
+
+_SCRIPT = """
+import sys
+import agct
+from agct import seqref_registry
+
+lazy = ["wags_tails", "requests", "urllib.request", "agct.downloads"]
+print(",".join(name for name in lazy if name in sys.modules))
+print(seqref_registry._default_registry._loaded)
+print("REFGET_ID_LOOKUP" in vars(seqref_registry))
+"""
+
+
+def _import_agct() -> tuple[list[str], int]:
+    """Import agct in a fresh interpreter.
+
+    :return: lines printed by the import script, and cumulative import time of
+        ``agct`` in microseconds
+    """
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", _SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # lines look like ``import time:   self [us] | cumulative | imported package``
+    cumulative = next(
+        int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.split("|")[-1].strip() == "agct"
+    )
+    return result.stdout.splitlines(), cumulative
+
+
+def test_lazy_imports():
+    lines, cumulative = _import_agct()
+    loaded, registry_loaded, lookup_built = lines
+    assert loaded == ""
+    assert registry_loaded == "False"
+    assert lookup_built == "False"
+    assert cumulative < IMPORT_TIME_BUDGET_US
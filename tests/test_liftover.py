@@ -1,10 +1,22 @@
 """Run liftover tests."""
 
 import re
+import shutil
+from pathlib import Path
 
 import pytest
 
-from agct import Assembly, Converter, LiftoverResult, Strand
+from agct import (
+    Assembly,
+    BatchLiftoverResult,
+    Converter,
+    LiftedPosition,
+    LiftoverResult,
+    RoundTripResult,
+    Strand,
+    get_refget_id_from_seqinfo,
+)
+from agct.seqref_registry import Chromosome
 
 
 def test_hg19_to_hg38():
@@ -109,3 +121,334 @@ def test_raises_for_int_overflow():
         ),
     ):
         converter.convert_coordinate("chr7", 14040053136, 14040053136)
+
+
+def test_batch():
+    """Test batch liftover against single-interval liftover."""
+    converter = Converter(Assembly.HG19, Assembly.HG38)
+    chroms = ["chr7", "chr7", "chr1", "chr7", "chrUnknown"]
+    starts = [140439611, 140453136, 206072707, 1, 100]
+    ends = [140439611, 140453137, 206072708, 1, 101]
+
+    result = converter.convert_coordinates(chroms, starts, ends)
+    assert result == BatchLiftoverResult(
+        index=[0, 1, 2],
+        chrom=["chr7", "chr7", "chr1"],
+        start=[140739811, 140753336, 206268644],
+        end=[140739811, 140753337, 206268643],
+        strand=["+", "+", "-"],
+        score=[14633688187, 14633688187, 24611930],
+    )
+    for i, chrom, start, end, strand, score in zip(*result, strict=True):
+        assert LiftoverResult(
+            chrom, start, end, Strand(strand), score
+        ) in converter.convert_coordinate(chroms[i], starts[i], ends[i])
+
+    result = converter.convert_coordinates(
+        ["chr1"], [206072708], [206072707], [Strand.NEGATIVE]
+    )
+    assert result == BatchLiftoverResult(
+        [0], ["chr1"], [206268643], [206268644], ["+"], [24611930]
+    )
+
+    assert converter.convert_coordinates([], [], []) == BatchLiftoverResult(
+        [], [], [], [], [], []
+    )
+
+
+def test_batch_arrays():
+    """Test array-backed batch liftover and zero-copy export"""
+    converter = Converter(Assembly.HG19, Assembly.HG38)
+    chroms = ["chr7", "chr7", "chr1", "chr7", "chrUnknown"]
+    starts = [140439611, 140453136, 206072707, 1, 100]
+    ends = [140439611, 140453137, 206072708, 1, 101]
+
+    expected = converter.convert_coordinates(chroms, starts, ends)
+    results = converter.convert_coordinates_to_arrays(chroms, starts, ends)
+    assert len(results) == 3
+    assert results.contig_names == ("chr7", "chr1")
+    assert list(results.index) == expected.index
+    assert list(results.strand) == [1, 1, -1]
+    assert results[2] == LiftoverResult(
+        "chr1", 206268644, 206268643, Strand.NEGATIVE, 24611930
+    )
+    assert list(results) == [
+        LiftoverResult(chrom, start, end, Strand(strand), score)
+        for _, chrom, start, end, strand, score in zip(*expected, strict=True)
+    ]
+
+    assert len(converter.convert_coordinates_to_arrays([], [], [])) == 0
+    with pytest.raises(ValueError, match="Input columns must all be the same length"):
+        converter.convert_coordinates_to_arrays(["chr7", "chr7"], [1], [1])
+
+    np = pytest.importorskip("numpy")
+    arrays = results.to_numpy()
+    assert arrays["start"].dtype == np.int64
+    assert arrays["contig"].dtype == np.int32
+    assert arrays["start"].tolist() == expected.start
+    assert np.asarray(results.contig_names)[arrays["contig"]].tolist() == expected.chrom
+    assert not arrays["start"].flags.writeable
+
+    pytest.importorskip("pyarrow")
+    table = results.to_arrow()
+    assert table.column_names == ["index", "chrom", "start", "end", "strand", "score"]
+    assert table.column("chrom").to_pylist() == expected.chrom
+    assert table.column("score").to_pylist() == expected.score
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_batch_sorted(lazy: bool):
+    """Test that sorted-input batch liftover matches unsorted liftover, including
+    when the input turns out not to be sorted
+    """
+    chainfile = Converter(Assembly.HG19, Assembly.HG38).chainfile
+    converter = Converter(chainfile=str(chainfile), lazy=lazy)
+    chroms = ["chr1", "chr7", "chr7", "chr7", "chr7", "chr7", "chrUnknown"]
+    starts = [206072707, 1, 140439611, 140439611, 140453136, 140453137, 100]
+    ends = [206072708, 1, 140439611, 140439700, 140453137, 140453137, 101]
+
+    expected = converter.convert_coordinates(chroms, starts, ends)
+    assert len(expected.index) == 5
+    assert converter.convert_coordinates(chroms, starts, ends, sorted_input=True) == (
+        expected
+    )
+
+    order = [4, 0, 2, 6, 1, 5, 3]
+    shuffled = converter.convert_coordinates(
+        [chroms[i] for i in order],
+        [starts[i] for i in order],
+        [ends[i] for i in order],
+        sorted_input=True,
+    )
+    assert sorted(
+        (order[i], *segment) for i, *segment in zip(*shuffled, strict=True)
+    ) == sorted(zip(*expected, strict=True))
+
+
+@pytest.mark.parametrize(
+    ("lazy", "use_index"), [(False, False), (True, False), (False, True)]
+)
+def test_positions(lazy: bool, use_index: bool, tmp_path: Path):
+    """Test single-base liftover against interval liftover"""
+    chainfile = tmp_path / "chainfile.chain"
+    shutil.copy(Converter(Assembly.HG19, Assembly.HG38).chainfile, chainfile)
+    converter = Converter(chainfile=str(chainfile), lazy=lazy, use_index=use_index)
+    assert converter.convert_position("chr7", 140453136) == LiftedPosition(
+        "chr7", 140753336, Strand.POSITIVE, 14633688187
+    )
+    # on a chain to the negative strand
+    assert converter.convert_position("chr1", 206072707) == LiftedPosition(
+        "chr1", 206268643, Strand.NEGATIVE, 24611930
+    )
+    assert converter.convert_coordinate("chr1", 206072707, 206072708) == [
+        LiftoverResult("chr1", 206268644, 206268643, Strand.NEGATIVE, 24611930)
+    ]
+    assert converter.convert_position("chr7", 1) is None
+    assert converter.convert_position("chrUnknown", 1) is None
+    with pytest.raises(ValueError, match="32 bit unsigned int"):
+        converter.convert_position("chr7", -1)
+
+    chroms = ["chr7", "chr1", "chr7", "chrUnknown", "chr7"]
+    positions = [140453136, 206072707, 1, 5, 140439611]
+    expected = [
+        converter.convert_coordinate(chrom, position, position + 1)
+        for chrom, position in zip(chroms, positions, strict=True)
+    ]
+    for sorted_input in (False, True):
+        results = converter.convert_positions(
+            chroms, positions, sorted_input=sorted_input
+        )
+        assert list(results.index) == [0, 1, 4]
+        assert list(results) == [expected[0][0], expected[1][0], expected[4][0]]
+    with pytest.raises(ValueError, match="same length"):
+        converter.convert_positions(["chr7"], [1, 2])
+
+
+def _block_edges(chainfile: Path) -> tuple[list[str], list[int]]:
+    """Get the bases on either side of every alignment block boundary in a
+    chainfile, sorted by chromosome and position.
+    """
+    bases = set()
+    chrom, position = "", 0
+    for line in chainfile.read_text().splitlines():
+        fields = line.split()
+        if not fields:
+            continue
+        if fields[0] == "chain":
+            chrom, position = fields[2], int(fields[5])
+            continue
+        size = int(fields[0])
+        for base in (position - 1, position, position + size - 1, position + size):
+            if base >= 0:
+                bases.add((chrom, base))
+        if len(fields) == 3:
+            position += size + int(fields[1])
+    chroms, positions = zip(*sorted(bases), strict=True)
+    return list(chroms), list(positions)
+
+
+@pytest.mark.parametrize(
+    "name", ["chainfile_hg19_to_hg38_.chain", "chainfile_hg38_to_hg19_.chain"]
+)
+def test_block_index_matches_machine(data_dir: Path, name: str):
+    """Test that lifts through the block index built for sorted, single-base and
+    inverse lifts agree with lifts through the chainfile's liftover machine
+    """
+    chainfile = str(data_dir / "ucsc-chainfile" / name)
+    machine = Converter(chainfile=chainfile)
+    chroms, positions = _block_edges(Path(chainfile))
+    expected = [
+        machine.convert_coordinate(chrom, position, position + 1)
+        for chrom, position in zip(chroms, positions, strict=True)
+    ]
+
+    # the first sorted call builds the block index
+    converter = Converter(chainfile=chainfile)
+    lifted = converter.convert_coordinates(
+        chroms, positions, [position + 1 for position in positions], sorted_input=True
+    )
+    assert sorted(zip(*lifted, strict=True)) == sorted(
+        (i, *result) for i, results in enumerate(expected) for result in results
+    )
+
+    for chrom, position, results in zip(chroms, positions, expected, strict=True):
+        best = {
+            LiftedPosition(
+                result.chrom, min(result.start, result.end), result.strand, result.score
+            )
+            for result in results
+            if result.score == max(result.score for result in results)
+        }
+        lifted = converter.convert_position(chrom, position)
+        assert (lifted in best) if best else (lifted is None)
+
+    inverse = converter.inverse()
+    for chrom, position, results in zip(chroms, positions, expected, strict=True):
+        for result in results:
+            target = min(result.start, result.end)
+            assert (chrom, position, result.strand) in {
+                (back.chrom, min(back.start, back.end), back.strand)
+                for back in inverse.convert_coordinate(result.chrom, target, target + 1)
+            }
+
+
+def test_lift_modes():
+    """Test merging, best-chain, and min-match lift modes"""
+    converter = Converter(Assembly.HG19, Assembly.HG38)
+    # spans a 50 kb gap in the chain alignment
+    assert converter.convert_coordinate("chr7", 232000, 283000) == [
+        LiftoverResult("chr7", 232000, 232484, Strand.POSITIVE, 14633688187),
+        LiftoverResult("chr7", 242518, 243034, Strand.POSITIVE, 14633688187),
+    ]
+    assert converter.convert_coordinate("chr7", 232000, 283000, merge=True) == [
+        LiftoverResult("chr7", 232000, 243034, Strand.POSITIVE, 14633688187)
+    ]
+    assert converter.convert_coordinate("chr7", 232000, 283000, min_match=0.5) == []
+
+    # overlaps two chains, mapping 31% and 20% of the interval
+    converter = Converter(Assembly.HG38, Assembly.HG19)
+    results = converter.convert_coordinate("chr7", 60945000, 60955000)
+    assert {result.score for result in results} == {3274337, 2791030}
+    merged = [
+        LiftoverResult("chr7", 61732932, 61727207, Strand.NEGATIVE, 3274337),
+        LiftoverResult("chr7", 61814795, 61820013, Strand.POSITIVE, 2791030),
+    ]
+    assert (
+        converter.convert_coordinate("chr7", 60945000, 60955000, merge=True) == merged
+    )
+    best = converter.convert_coordinate("chr7", 60945000, 60955000, best_chain=True)
+    assert best == [result for result in results if result.score == 3274337]
+    assert (
+        converter.convert_coordinate("chr7", 60945000, 60955000, min_match=0.3) == best
+    )
+    assert (
+        converter.convert_coordinate(
+            "chr7", 60945000, 60955000, merge=True, best_chain=True
+        )
+        == merged[:1]
+    )
+
+    results = converter.convert_coordinates_to_arrays(
+        ["chr7", "chr7", "chr7"],
+        [60945000, 142400000, 1],
+        [60955000, 142400100, 2],
+        merge=True,
+        min_match=0.25,
+    )
+    assert list(results) == [
+        merged[0],
+        LiftoverResult("chr7", 142231949, 142231849, Strand.NEGATIVE, 15577193),
+    ]
+    assert list(results.index) == [0, 1]
+
+    with pytest.raises(ValueError, match="`min_match` must be between 0 and 1"):
+        converter.convert_coordinate("chr7", 60945000, 60955000, min_match=1.5)
+
+
+def test_round_trip():
+    converter = Converter(Assembly.HG19, Assembly.HG38)
+    result = converter.check_round_trip(
+        ["chr7", "chr1", "chr7", "chrUnknown"],
+        [140453136, 206072708, 1, 1],
+        [140453137, 206072707, 1, 2],
+        [Strand.POSITIVE, Strand.NEGATIVE, Strand.POSITIVE, Strand.POSITIVE],
+    )
+    assert result == RoundTripResult(
+        lifted=[True, True, False, False], returned=[True, True, False, False]
+    )
+
+
+def test_refget():
+    """Test liftover of intervals on sequences given by refget accession"""
+    hg19_chr7 = get_refget_id_from_seqinfo(Assembly.HG19, Chromosome.CHR7)
+    hg19_chr1 = get_refget_id_from_seqinfo(Assembly.HG19, Chromosome.CHR1)
+    hg38_chr7 = get_refget_id_from_seqinfo(Assembly.HG38, Chromosome.CHR7)
+    hg38_chr1 = get_refget_id_from_seqinfo(Assembly.HG38, Chromosome.CHR1)
+    converter = Converter(Assembly.HG19, Assembly.HG38)
+    assert converter.convert_refget(hg19_chr7, 140453136, 140453137) == [
+        LiftoverResult(hg38_chr7, 140753336, 140753337, Strand.POSITIVE, 14633688187)
+    ]
+    assert converter.convert_refget(hg19_chr7, 1, 2) == []
+    # accession from the wrong assembly
+    assert converter.convert_refget(hg38_chr7, 140453136, 140453137) == []
+
+    results = converter.convert_refgets(
+        [hg19_chr7, hg19_chr1, hg38_chr7, hg19_chr7],
+        [140453136, 206072708, 140453136, 1],
+        [140453137, 206072707, 140453137, 2],
+        [Strand.POSITIVE, Strand.NEGATIVE, Strand.POSITIVE, Strand.POSITIVE],
+    )
+    assert list(results.index) == [0, 1]
+    assert list(results) == [
+        LiftoverResult(hg38_chr7, 140753336, 140753337, Strand.POSITIVE, 14633688187),
+        LiftoverResult(hg38_chr1, 206268643, 206268644, Strand.POSITIVE, 24611930),
+    ]
+    assert len(results.contig_names) == 24
+
+    inverse = converter.inverse()
+    assert inverse.convert_refget(hg38_chr7, 140753336, 140753337) == [
+        LiftoverResult(hg19_chr7, 140453136, 140453137, Strand.POSITIVE, 14633688187)
+    ]
+
+    chainfile_only = Converter(chainfile=str(converter.chainfile))
+    with pytest.raises(ValueError, match="No refget accessions"):
+        chainfile_only.convert_refget(hg19_chr7, 140453136, 140453137)
+
+
+def test_batch_invalid_input():
+    """Test that malformed batch input raises errors"""
+    converter = Converter(Assembly.HG19, Assembly.HG38)
+
+    with pytest.raises(ValueError, match="Input columns must all be the same length"):
+        converter.convert_coordinates(["chr7", "chr7"], [1], [1])
+
+    with pytest.raises(ValueError, match="Invalid interval at index 1"):
+        converter.convert_coordinates(
+            ["chr7", "chr7"], [140439611, 140439611], [140439611, 140439609]
+        )
+
+    with pytest.raises(
+        ValueError,
+        match="Coordinates exceed representable bounds of a 32 bit unsigned int",
+    ):
+        converter.convert_coordinates(["chr7"], [14040053136], [14040053136])
@@ -0,0 +1,103 @@
+"""Test liftover metrics."""
+
+import logging
+from pathlib import Path
+
+import pytest
+
+from agct import Assembly, Converter, get_converter
+from agct.metrics import LatencyHistogram, MetricsSnapshot
+
+
+@pytest.fixture
+def converter(data_dir: Path):
+    return Converter(
+        chainfile=str(data_dir / "ucsc-chainfile" / "chainfile_hg19_to_hg38_.chain")
+    )
+
+
+def test_disabled(converter):
+    assert not converter.metrics_enabled
+    converter.convert_coordinate("chr7", 140453136, 140453137)
+    converter.convert_coordinates(["chr7"], [140453136], [140453137])
+    snapshot = converter.metrics_snapshot()
+    assert snapshot.load_time_ns > 0
+    assert snapshot.intervals == snapshot.single_calls == snapshot.batch_calls == 0
+    assert snapshot.call_latency.count == 0
+
+
+def test_counters(converter):
+    converter.enable_metrics()
+    assert converter.metrics_enabled
+    converter.convert_coordinate("chr7", 140453136, 140453137)
+    converter.convert_coordinate("chr7", 1, 2)
+    converter.convert_coordinates(
+        ["chr7", "chr1", "chr7"], [140453136, 206072707, 1], [140453137, 206072708, 2]
+    )
+
+    snapshot = converter.metrics_snapshot()
+    assert isinstance(snapshot, MetricsSnapshot)
+    assert snapshot.single_calls == 2
+    assert snapshot.batch_calls == 1
+    assert snapshot.intervals == 5
+    assert snapshot.mapped == 3
+    assert snapshot.unmapped == 2
+    assert snapshot.segments == 3
+    assert snapshot.multi_segment == snapshot.errors == 0
+    assert snapshot.mapped_rate == 0.6
+    assert snapshot.lift_latency.count == snapshot.call_latency.count == 2
+    assert snapshot.batch_latency.count == 1
+    assert snapshot.call_latency.total_ns >= snapshot.lift_latency.total_ns > 0
+
+    converter.disable_metrics()
+    converter.convert_coordinate("chr7", 140453136, 140453137)
+    assert converter.metrics_snapshot() == snapshot
+
+    converter.reset_metrics()
+    snapshot = converter.metrics_snapshot()
+    assert snapshot.intervals == snapshot.lift_latency.count == 0
+    assert snapshot.load_time_ns > 0
+
+
+def test_callback(converter, caplog):
+    snapshots = []
+    converter.enable_metrics(snapshots.append, interval=0)
+    converter.convert_coordinate("chr7", 140453136, 140453137)
+    converter.convert_coordinates(["chr7"], [140453136], [140453137])
+    assert [snapshot.intervals for snapshot in snapshots] == [1, 2]
+
+    converter.enable_metrics(snapshots.append, interval=3600)
+    converter.convert_coordinate("chr7", 140453136, 140453137)
+    assert len(snapshots) == 2
+    converter.export_metrics()
+    assert snapshots[-1].intervals == 3
+
+    def fail(_: MetricsSnapshot) -> None:
+        raise RuntimeError
+
+    converter.enable_metrics(fail, interval=0)
+    with caplog.at_level(logging.ERROR):
+        assert converter.convert_coordinate("chr7", 140453136, 140453137)
+    assert "Error while exporting liftover metrics" in caplog.text
+
+
+def test_histogram():
+    histogram = LatencyHistogram([0, 2, 0, 1] + [0] * 44, 30)
+    assert histogram.count == 3
+    assert histogram.mean_ns == 10
+    assert histogram.quantile(0.5) == 4
+    assert histogram.quantile(1) == 16
+    assert LatencyHistogram([0] * 48, 0).quantile(0.99) == 0
+    with pytest.raises(ValueError, match="Quantile must be between 0 and 1"):
+        histogram.quantile(2)
+
+
+def test_get_converter():
+    converter = get_converter(Assembly.HG19, Assembly.HG38)
+    try:
+        assert get_converter(Assembly.HG19, Assembly.HG38, metrics=True) is converter
+        assert converter.metrics_enabled
+        assert get_converter(Assembly.HG19, Assembly.HG38).metrics_enabled
+    finally:
+        converter.disable_metrics()
+        converter.reset_metrics()
@@ -0,0 +1,97 @@
+"""Test precomputed panel tables."""
+
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+from agct import Converter
+from agct.panels import LiftPanel, build_panel, get_panel_path, load_panel
+
+CHROMS = ["chr7", "chr1", "chr7", "chr7", "chr7", "chrX"]
+POSITIONS = [140453136, 206072707, 1, 140453136, 140439611, 100]
+
+
+@pytest.fixture
+def converter(tmp_path: Path, data_dir: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("WAGS_TAILS_DIR", str(tmp_path / "data"))
+    chainfile = tmp_path / "hg19ToHg38.over.chain"
+    shutil.copy(
+        data_dir / "ucsc-chainfile" / "chainfile_hg19_to_hg38_.chain", chainfile
+    )
+    return Converter(chainfile=str(chainfile))
+
+
+def test_panel(converter: Converter, tmp_path: Path):
+    panel = build_panel(converter, "clinical", CHROMS, POSITIONS)
+    assert len(panel) == 5
+    assert panel.path == get_panel_path(converter, "clinical")
+    assert panel.path.parent == tmp_path / "data" / "agct-panels"
+    for chrom, position in zip(CHROMS, POSITIONS, strict=True):
+        assert panel.lift(chrom, position) == converter.convert_position(
+            chrom, position
+        )
+    assert panel.lift("chr1", 206072707).strand == "-"
+    assert panel.lift("chr7", 1) is None
+    with pytest.raises(KeyError):
+        panel.lift("chr7", 2)
+    with pytest.raises(KeyError):
+        panel.lift("chr2", 100)
+
+    expected = converter.convert_positions(CHROMS, POSITIONS)
+    result = panel.lift_many(CHROMS, POSITIONS)
+    assert list(result.index) == list(expected.index) == [0, 1, 3, 4]
+    assert list(result) == list(expected)
+    with pytest.raises(ValueError, match="must be the same length"):
+        panel.lift_many(CHROMS, POSITIONS[:-1])
+
+    # reopened by mapping the stored table
+    loaded = load_panel(converter, "clinical")
+    assert isinstance(loaded, LiftPanel)
+    assert list(loaded.lift_many(CHROMS, POSITIONS)) == list(expected)
+    with pytest.raises(FileNotFoundError):
+        load_panel(converter, "research")
+    with pytest.raises(FileNotFoundError):
+        load_panel(converter.inverse(), "clinical")
+
+    # tables are keyed by chainfile contents, so a changed chainfile needs a new one
+    with converter.chainfile.open("a") as f:
+        f.write("\n")
+    with pytest.raises(FileNotFoundError):
+        load_panel(converter, "clinical")
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_panel_lift_many(
+    converter: Converter, monkeypatch: pytest.MonkeyPatch, numpy: bool
+):
+    """Test batch lookups, both with NumPy and without it"""
+    if not numpy:
+        monkeypatch.setitem(sys.modules, "numpy", None)
+    panel = build_panel(converter, "clinical", CHROMS, POSITIONS)
+    chroms = CHROMS * 3
+    positions = POSITIONS * 3
+    result = panel.lift_many(chroms, positions)
+    expected = converter.convert_positions(chroms, positions)
+    assert list(result.index) == list(expected.index)
+    assert list(result) == list(expected)
+    assert list(result.strand) == list(expected.strand)
+    assert len(panel.lift_many([], [])) == 0
+
+    for chrom, position in [("chr7", 2), ("chr2", 100), ("chr7", -1), ("chr7", 2**70)]:
+        with pytest.raises(KeyError) as e:
+            panel.lift_many([*CHROMS, chrom], [*POSITIONS, position])
+        assert e.value.args == ((chrom, position),)
+
+
+def test_invalid_panel(converter: Converter):
+    with pytest.raises(ValueError, match="`name` must be a plain file name"):
+        build_panel(converter, "../clinical", CHROMS, POSITIONS)
+    with pytest.raises(ValueError, match="32 bit unsigned int"):
+        build_panel(converter, "clinical", ["chr7"], [-1])
+    with pytest.raises(ValueError, match="must be the same length"):
+        build_panel(converter, "clinical", CHROMS, POSITIONS[:-1])
+    contents = Converter(chainfile=converter.chainfile.read_bytes())
+    with pytest.raises(ValueError, match="require a converter loaded from a chainfile"):
+        build_panel(contents, "clinical", CHROMS, POSITIONS)
@@ -0,0 +1,325 @@
+"""Test file liftover pipeline and CLI."""
+
+import gzip
+from pathlib import Path
+
+import pytest
+
+import agct.pipeline
+from agct import Assembly, Converter
+from agct.cli import main
+from agct.pipeline import FileFormat, LiftoverStats, detect_format, lift_file
+
+BED = """track name=test
+chr7\t140453136\t140453137\tBRAF\t0\t+
+chr1\t206072707\t206072708\tneg\t0\t+
+chr7\t1\t2\tunmapped\t0\t+
+chr7\tnot_a_number\t2\tinvalid\t0\t+
+chr7\t140439611\t140439612
+"""
+
+VCF = """##fileformat=VCFv4.2
+##contig=<ID=chr7,length=159138663>
+#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO
+chr7\t140453137\t.\tT\tA\t.\t.\t.
+chr7\t140453136\t.\tAT\tA\t.\t.\t.
+chr1\t206072708\t.\tG\tC\t.\t.\t.
+chr7\t2\t.\tG\tC\t.\t.\t.
+"""
+
+GTF = """#!genome-build GRCh37
+chr7\ttest\tgene\t140453001\t140454100\t.\t-\t.\tgene_id "g1";
+chr7\ttest\ttranscript\t140453001\t140454100\t.\t-\t.\tgene_id "g1"; transcript_id "t1";
+chr7\ttest\texon\t140453001\t140453100\t.\t-\t.\tgene_id "g1"; transcript_id "t1";
+chr7\ttest\texon\t140454001\t140454100\t.\t-\t.\tgene_id "g1"; transcript_id "t1";
+chr1\ttest\texon\t206072001\t206072100\t.\t+\t.\tgene_id "g2"; transcript_id "t2";
+chr1\ttest\texon\t206072801\t206072900\t.\t+\t.\tgene_id "g2"; transcript_id "t2";
+chr1\ttest\tCDS\t206072801\t206072900\t.\t+\t0\tgene_id "g2"; transcript_id "t2";
+chr1\ttest\texon\t206072801\t206072900\t.\t+\t.\tgene_id "g3"; transcript_id "t3";
+"""
+
+GFF3 = """##gff-version 3
+##sequence-region chr7 1 159345973
+chr7\ttest\tgene\t62050001\t62100100\t.\t+\t.\tID=gene1
+chr7\ttest\tmRNA\t62050001\t62100100\t.\t+\t.\tID=tx1;Parent=gene1
+chr7\ttest\texon\t62050001\t62050100\t.\t+\t.\tID=exon1;Parent=tx1
+chr7\ttest\tCDS\t62050051\t62050100\t.\t+\t0\tParent=tx1
+chr7\ttest\texon\t62100001\t62100100\t.\t+\t.\tID=exon2;Parent=tx1
+###
+chr7\ttest\tgene\t60880001\t62050100\t.\t-\t.\tID=gene2
+chr7\ttest\tmRNA\t60880001\t62050100\t.\t-\t.\tID=tx2;Parent=gene2
+chr7\ttest\texon\t60880001\t60880100\t.\t-\t.\tParent=tx2
+chr7\ttest\texon\t62050001\t62050100\t.\t-\t.\tParent=tx2
+chr7\ttest\tmRNA\t62100001\t62200100\t.\t+\t.\tID=tx3
+chr7\ttest\texon\t62100001\t62100100\t.\t+\t.\tParent=tx3
+chr7\ttest\texon\t62200001\t62200100\t.\t+\t.\tParent=tx3
+chr7\ttest\trepeat_region\t62350001\t62350100\t.\t.\t.\tName=r1
+##FASTA
+>chr7
+ACGT
+"""
+
+
+@pytest.fixture(scope="module")
+def converter():
+    return Converter(Assembly.HG19, Assembly.HG38)
+
+
+def test_detect_format():
+    assert detect_format(Path("x.bed")) == FileFormat.BED
+    assert detect_format(Path("x.BED.gz")) == FileFormat.BED
+    assert detect_format(Path("x.vcf.bgz")) == FileFormat.VCF
+    assert detect_format(Path("x.gtf.gz")) == FileFormat.GTF
+    assert detect_format(Path("x.gff3")) == FileFormat.GFF3
+    assert detect_format(Path("x.txt")) == FileFormat.TSV
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 100])
+def test_lift_bed(converter, tmp_path: Path, batch_size: int):
+    input_file = tmp_path / "in.bed"
+    input_file.write_text(BED)
+    output_file = tmp_path / "out.bed"
+    unmapped_file = tmp_path / "unmapped.bed"
+
+    stats = lift_file(
+        converter, input_file, output_file, unmapped_file, batch_size=batch_size
+    )
+    assert stats == LiftoverStats(converted=3, unmapped=2)
+    assert output_file.read_text() == (
+        "track name=test\n"
+        "chr7\t140753336\t140753337\tBRAF\t0\t+\n"
+        "chr1\t206268643\t206268644\tneg\t0\t-\n"
+        "chr7\t140739811\t140739812\n"
+    )
+    assert unmapped_file.read_text() == (
+        "track name=test\n"
+        "#Deleted in new\n"
+        "chr7\t1\t2\tunmapped\t0\t+\n"
+        "#Invalid record\n"
+        "chr7\tnot_a_number\t2\tinvalid\t0\t+\n"
+    )
+
+
+def test_lift_gzipped_vcf(converter, tmp_path: Path):
+    input_file = tmp_path / "in.vcf.gz"
+    with gzip.open(input_file, "wt") as f:
+        f.write(VCF)
+    output_file = tmp_path / "out.vcf.gz"
+    unmapped_file = tmp_path / "unmapped.vcf"
+
+    stats = lift_file(converter, input_file, output_file, unmapped_file)
+    assert stats == LiftoverStats(converted=2, unmapped=2)
+    with gzip.open(output_file, "rt") as f:
+        assert f.read() == (
+            "##fileformat=VCFv4.2\n"
+            "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n"
+            "chr7\t140753337\t.\tT\tA\t.\t.\t.\n"
+            "chr7\t140753336\t.\tAT\tA\t.\t.\t.\n"
+        )
+    unmapped = unmapped_file.read_text()
+    assert unmapped.startswith("##fileformat=VCFv4.2\n##contig=<ID=chr7")
+    assert "#Inverted in new\nchr1\t206072708" in unmapped
+    assert "#Deleted in new\nchr7\t2" in unmapped
+
+
+def test_lift_tsv(converter, tmp_path: Path):
+    input_file = tmp_path / "in.tsv"
+    input_file.write_text("#id\tchrom\tpos\nrs1\tchr7\t140453137\nrs2\tchr7\t1\n")
+    output_file = tmp_path / "out.tsv"
+
+    stats = lift_file(
+        converter,
+        input_file,
+        output_file,
+        tmp_path / "unmapped.tsv",
+        chrom_col=1,
+        start_col=2,
+        end_col=2,
+        one_based=True,
+    )
+    assert stats == LiftoverStats(converted=1, unmapped=1)
+    assert output_file.read_text() == "#id\tchrom\tpos\nrs1\tchr7\t140753337\n"
+
+
+# unclosed input files fail the test
+@pytest.mark.filterwarnings("error")
+@pytest.mark.parametrize(("batch_size", "processes"), [(1, 1), (100, 1), (100, 2)])
+def test_lift_gtf(converter, tmp_path: Path, batch_size: int, processes: int):
+    input_file = tmp_path / "in.gtf"
+    input_file.write_text(GTF)
+    output_file = tmp_path / "out.gtf"
+    unmapped_file = tmp_path / "unmapped.gtf"
+
+    stats = lift_file(
+        converter,
+        input_file,
+        output_file,
+        unmapped_file,
+        batch_size=batch_size,
+        processes=processes,
+    )
+    assert stats == LiftoverStats(converted=5, unmapped=3)
+    assert output_file.read_text() == (
+        "#!genome-build GRCh37\n"
+        'chr7\ttest\tgene\t140753201\t140754300\t.\t-\t.\tgene_id "g1";\n'
+        'chr7\ttest\ttranscript\t140753201\t140754300\t.\t-\t.\tgene_id "g1"; transcript_id "t1";\n'
+        'chr7\ttest\texon\t140753201\t140753300\t.\t-\t.\tgene_id "g1"; transcript_id "t1";\n'
+        'chr7\ttest\texon\t140754201\t140754300\t.\t-\t.\tgene_id "g1"; transcript_id "t1";\n'
+        'chr1\ttest\texon\t206268452\t206268551\t.\t-\t.\tgene_id "g3"; transcript_id "t3";\n'
+    )
+    # one exon of t2 is deleted, so the whole transcript is unmapped
+    unmapped = unmapped_file.read_text().splitlines()
+    assert unmapped[2::2] == GTF.splitlines()[5:8]
+    assert set(unmapped[1::2]) == {"#Transcript split in new"}
+
+
+def test_lift_gff3(tmp_path: Path):
+    hg38_to_hg19 = Converter(Assembly.HG38, Assembly.HG19)
+    input_file = tmp_path / "in.gff3"
+    input_file.write_text(GFF3)
+    output_file = tmp_path / "out.gff3"
+    unmapped_file = tmp_path / "unmapped.gff3"
+
+    stats = lift_file(hg38_to_hg19, input_file, output_file, unmapped_file)
+    assert stats == LiftoverStats(converted=6, unmapped=7)
+    # the gene and transcript span their exons, though their introns don't lift to
+    # a single segment
+    assert output_file.read_text() == (
+        "##gff-version 3\n"
+        "chr7\ttest\tgene\t61384410\t61434509\t.\t+\t.\tID=gene1\n"
+        "chr7\ttest\tmRNA\t61384410\t61434509\t.\t+\t.\tID=tx1;Parent=gene1\n"
+        "chr7\ttest\texon\t61384410\t61384509\t.\t+\t.\tID=exon1;Parent=tx1\n"
+        "chr7\ttest\tCDS\t61384460\t61384509\t.\t+\t0\tParent=tx1\n"
+        "chr7\ttest\texon\t61434410\t61434509\t.\t+\t.\tID=exon2;Parent=tx1\n"
+        "chr7\ttest\trepeat_region\t61794252\t61794351\t.\t.\t.\tName=r1\n"
+    )
+    # tx2's exons lift to the same strand in reverse order; tx3's to both strands
+    unmapped = unmapped_file.read_text()
+    assert "#Split in new\nchr7\ttest\tgene\t60880001" in unmapped
+    assert unmapped.count("#Exons reordered in new\n") == 3
+    assert unmapped.count("#Transcript split in new\n") == 3
+    assert "ACGT" not in unmapped
+
+
+@pytest.mark.parametrize("processes", [1, 3])
+def test_lift_bed_sharded(converter, tmp_path: Path, processes: int):
+    input_file = tmp_path / "in.bed"
+    header, _, records = BED.partition("\n")
+    input_file.write_text(header + "\n" + records * 50)
+    serial_output = tmp_path / "serial.bed"
+    serial_unmapped = tmp_path / "serial.unmapped.bed"
+    serial_stats = lift_file(converter, input_file, serial_output, serial_unmapped)
+
+    output_file = tmp_path / "out.bed"
+    unmapped_file = tmp_path / "unmapped.bed"
+    stats = lift_file(
+        converter,
+        input_file,
+        output_file,
+        unmapped_file,
+        batch_size=7,
+        processes=processes,
+    )
+    assert stats == serial_stats == LiftoverStats(converted=150, unmapped=100)
+    assert output_file.read_text() == serial_output.read_text()
+    assert unmapped_file.read_text() == serial_unmapped.read_text()
+
+    stats = lift_file(
+        converter,
+        input_file,
+        output_file,
+        unmapped_file,
+        processes=processes,
+        sort_output=True,
+        sorted_input=True,
+    )
+    assert stats == serial_stats
+    lines = output_file.read_text().splitlines()
+    assert lines[0] == "track name=test"
+    assert lines[1:] == sorted(
+        lines[1:], key=lambda line: (line.split("\t")[0], int(line.split("\t")[1]))
+    )
+    assert sorted(lines) == sorted(serial_output.read_text().splitlines())
+    assert not list(tmp_path.glob(".agct-*"))
+
+
+def test_lift_sorted_external(
+    converter, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    # runs of a few records each, so the output is merged from many run files
+    monkeypatch.setattr(agct.pipeline, "_SORT_RUN_SIZE", 100)
+    input_file = tmp_path / "in.bed.gz"
+    header, _, records = BED.partition("\n")
+    with gzip.open(input_file, "wt") as f:
+        f.write(header + "\n" + records * 20)
+    output_file = tmp_path / "out.bed"
+    serial_output = tmp_path / "serial.bed"
+
+    stats = lift_file(
+        converter, input_file, output_file, tmp_path / "unmapped.bed", sort_output=True
+    )
+    lift_file(converter, input_file, serial_output, tmp_path / "serial.unmapped.bed")
+    assert stats == LiftoverStats(converted=60, unmapped=40)
+    header, *lines = serial_output.read_text().splitlines(keepends=True)
+    lines.sort(key=lambda line: (line.split("\t")[0], int(line.split("\t")[1])))
+    assert output_file.read_text() == header + "".join(lines)
+    assert not list(tmp_path.glob(".agct-*"))
+
+
+def test_lift_gzipped_vcf_parallel(converter, tmp_path: Path):
+    input_file = tmp_path / "in.vcf.gz"
+    with gzip.open(input_file, "wt") as f:
+        f.write(VCF)
+    output_file = tmp_path / "out.vcf"
+
+    stats = lift_file(
+        converter, input_file, output_file, tmp_path / "unmapped.vcf", processes=2
+    )
+    assert stats == LiftoverStats(converted=2, unmapped=2)
+    assert output_file.read_text().count("\n") == 4
+
+
+def test_invalid_batch_size(converter, tmp_path: Path):
+    with pytest.raises(ValueError, match="`batch_size` must be positive"):
+        lift_file(
+            converter,
+            tmp_path / "in.bed",
+            tmp_path / "out.bed",
+            tmp_path / "unmapped.bed",
+            batch_size=0,
+        )
+    with pytest.raises(ValueError, match="`processes` must be positive"):
+        lift_file(
+            converter,
+            tmp_path / "in.bed",
+            tmp_path / "out.bed",
+            tmp_path / "unmapped.bed",
+            processes=0,
+        )
+
+
+def test_cli(tmp_path: Path, capsys):
+    input_file = tmp_path / "in.bed"
+    input_file.write_text(BED)
+    output_file = tmp_path / "out.bed"
+
+    assert (
+        main(
+            [
+                "lift",
+                "--from",
+                "hg19",
+                "--to",
+                "hg38",
+                str(input_file),
+                str(output_file),
+            ]
+        )
+        == 0
+    )
+    assert output_file.read_text().count("\n") == 4
+    assert (tmp_path / "out.unmapped.bed").read_text().count("\n") == 5
+    assert "Converted 3 records, 2 unmapped" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        main(["lift", str(input_file), str(output_file)])
@@ -1,7 +1,7 @@
 """Test some non-public aspects of the Rust layer."""
 
 import pytest
-from agct._core import ChainfileError, Converter
+from agct._core import ChainfileError, Converter, NoLiftoverError, compile_index
 
 
 def test_open_chainfile_errors(data_dir):
@@ -10,3 +10,35 @@ def test_open_chainfile_errors(data_dir):
         Converter(str(data_dir / "non_existent_chainfile.chain"))
     with pytest.raises(ChainfileError):
         Converter(str(data_dir / "invalid_chainfile.chain"))
+    with pytest.raises(FileNotFoundError):
+        Converter(str(data_dir / "non_existent_chainfile.chain"), lazy=True)
+
+
+def test_index_matches_chainfile(tmp_path, data_dir):
+    """Test that index-backed liftover gives the same results as the chainfile crate."""
+    for name in ["chainfile_hg19_to_hg38_.chain", "chainfile_hg38_to_hg19_.chain"]:
+        chainfile = data_dir / "ucsc-chainfile" / name
+        index_file = tmp_path / f"{name}.agctidx"
+        compile_index(str(chainfile), str(index_file))
+        from_chainfile = Converter(str(chainfile))
+        from_index = Converter.from_index(str(index_file))
+        assert from_chainfile.index_source is None
+        assert from_index.index_source[0] == chainfile.stat().st_size
+
+        for chrom, start, end, strand in [
+            ("chr7", 140439611, 140439611, "+"),
+            ("chr7", 140739811, 140739811, "+"),
+            ("chr7", 60878240, 60878245, "+"),
+            ("chr7", 140439000, 140460000, "+"),
+            ("chr7", 140460000, 140439000, "-"),
+            ("chr1", 206072707, 206072708, "+"),
+        ]:
+            try:
+                expected = from_chainfile.lift(chrom, start, end, strand)
+            except NoLiftoverError:
+                with pytest.raises(NoLiftoverError):
+                    from_index.lift(chrom, start, end, strand)
+            else:
+                assert sorted(from_index.lift(chrom, start, end, strand)) == sorted(
+                    expected
+                )
@@ -1,10 +1,16 @@
+from pathlib import Path
+
 import pytest
 
 from agct.seqref_registry import (
     Assembly,
     Chromosome,
+    SequenceInfo,
+    SequenceRegistry,
+    get_assembly_refget_ids,
     get_refget_id_from_seqinfo,
     get_seqinfo_from_refget_id,
+    get_sequence_registry,
 )
 
 
@@ -18,6 +24,7 @@ def test_assembly_enum():
 def test_assembly_enum_to_ncbi():
     assert Assembly.HG19.as_grc == "GRCh37"
     assert Assembly.HG38.as_grc == "GRCh38"
+    assert Assembly.HG18.as_grc == "NCBI36"
 
 
 def test_assembly_fetcher():
@@ -103,3 +110,61 @@ def test_invalid_input():
         match=f"refget accession ID must be in format 'SQ.ABCDEFGHIJKLMNOPQRSTUVWXYZ123456'; got {input_string}",
     ):
         get_seqinfo_from_refget_id(input_string)
+
+
+def test_aliases():
+    chr7 = "SQ.F-LrLMe1SRpfUZHkQmvkVKFEGaoDeHul"
+    for name in ("chr7", "7", "NC_000007.14"):
+        assert get_refget_id_from_seqinfo(Assembly.HG38, name) == chr7
+    assert get_refget_id_from_seqinfo(Assembly.HG19, "NC_000007.13") is not None
+    assert get_refget_id_from_seqinfo(Assembly.HG38, "NC_000007.13") is None
+
+    # sequences are registered without a digest if none is known
+    chrm = get_sequence_registry().get(Assembly.HG38, "MT")
+    assert chrm == SequenceInfo(Assembly.HG38, "chrM", None, ("NC_012920.1", "MT"))
+    assert get_refget_id_from_seqinfo(Assembly.HG38, "chrM") is None
+    assert "chrM" not in get_assembly_refget_ids(Assembly.HG38).values()
+    assert len(get_assembly_refget_ids(Assembly.HG38)) == 24
+
+
+def test_registry(tmp_path: Path):
+    registry = SequenceRegistry(include_default=False)
+    assert registry.get(Assembly.HG38, "chr7") is None
+
+    table = tmp_path / "sequences.tsv"
+    table.write_text(
+        "# assembly\tname\trefget_id\taliases\n"
+        "hg38\tchr7\tSQ.F-LrLMe1SRpfUZHkQmvkVKFEGaoDeHul\tNC_000007.14,7\n"
+        "mm39\tchr1\t\tNC_000067.7\n"
+    )
+    assert registry.load_table(table) == 2
+    assert registry.get("mm39", "NC_000067.7") == SequenceInfo(
+        "mm39", "chr1", None, ("NC_000067.7",)
+    )
+    assert registry.get_by_refget_id("SQ.F-LrLMe1SRpfUZHkQmvkVKFEGaoDeHul").name == (
+        "chr7"
+    )
+
+    report = tmp_path / "assembly_report.txt"
+    report.write_text(
+        "# Assembly name:  GRCh38.p14\n"
+        "# Sequence-Name\tSequence-Role\tAssigned-Molecule\tAssigned-Molecule-Location/Type\t"
+        "GenBank-Accn\tRelationship\tRefSeq-Accn\tAssembly-Unit\tSequence-Length\tUCSC-style-name\n"
+        "7\tassembled-molecule\t7\tChromosome\tCM000669.2\t=\tNC_000007.14\tPrimary Assembly\t159345973\tchr7\n"
+        "HSCHR7_2_CTG6\talt-scaffold\t7\tChromosome\tKI270803.1\t=\tNT_187562.1\tALT_REF_LOCI_1\t1064304\tchr7_KI270803v1_alt\n"
+        "HG2266_PATCH\tfix-patch\t7\tChromosome\tKZ208912.1\t=\tNW_018654710.1\tPATCHES\t589656\tna\n"
+    )
+    assert registry.load_assembly_report(report, Assembly.HG38) == 3
+    chr7 = registry.get(Assembly.HG38, "CM000669.2")
+    assert chr7.refget_id == "SQ.F-LrLMe1SRpfUZHkQmvkVKFEGaoDeHul"
+    assert chr7.aliases == ("NC_000007.14", "7", "CM000669.2")
+    assert registry.get(Assembly.HG38, "NT_187562.1").name == "chr7_KI270803v1_alt"
+    assert registry.get(Assembly.HG38, "KZ208912.1").name == "HG2266_PATCH"
+    assert len(registry.sequences(Assembly.HG38)) == 3
+
+    with pytest.raises(ValueError, match="already has refget accession"):
+        registry.add(Assembly.HG38, "7", "SQ.ss8r_wB0-b9r44TQTMmVTI92884QvBiB")
+    with pytest.raises(ValueError, match="already refers to hg38 chr7"):
+        registry.add(Assembly.HG38, "chr8", aliases=["NC_000007.14"])
+    with pytest.raises(ValueError, match="refget accession ID must be in format"):
+        registry.add(Assembly.HG38, "chr8", "SQ.abc")
@@ -0,0 +1,142 @@
+"""Test table liftover."""
+
+import pytest
+
+from agct import Assembly, get_converter
+
+pa = pytest.importorskip("pyarrow")
+
+from agct.tables import lift_table  # noqa: E402
+
+CHROMS = ["chr7", "chr1", None, "chr7", "chr1", "chrUnknown"]
+STARTS = [140453136, 1, 5, 140453137, 206072708, 1]
+ENDS = [140453137, 1, 5, None, 206072707, 2]
+STRANDS = ["+", "+", "+", "+", "-", "+"]
+
+
+@pytest.fixture(scope="module")
+def converter():
+    return get_converter(Assembly.HG19, Assembly.HG38)
+
+
+def test_lift_arrow(converter):
+    table = pa.table({"chr": CHROMS, "pos": STARTS, "pos_end": ENDS, "strand": STRANDS})
+    lifted = lift_table(
+        converter,
+        table,
+        chrom_col="chr",
+        start_col="pos",
+        end_col="pos_end",
+        strand_col="strand",
+    )
+    assert lifted.column_names == [
+        *table.column_names,
+        "lifted_chrom",
+        "lifted_start",
+        "lifted_end",
+        "lifted_strand",
+        "lifted_score",
+        "mapped",
+        "segment_count",
+    ]
+    assert lifted.select(table.column_names) == table
+    assert lifted.column("lifted_chrom").to_pylist() == [
+        "chr7",
+        None,
+        None,
+        None,
+        "chr1",
+        None,
+    ]
+    assert lifted.column("lifted_start").to_pylist() == [
+        140753336,
+        None,
+        None,
+        None,
+        206268643,
+        None,
+    ]
+    assert lifted.column("lifted_strand").to_pylist() == [
+        "+",
+        None,
+        None,
+        None,
+        "+",
+        None,
+    ]
+    assert lifted.column("mapped").to_pylist() == [
+        True,
+        False,
+        False,
+        False,
+        True,
+        False,
+    ]
+    assert lifted.column("segment_count").to_pylist() == [1, 0, 0, 0, 1, 0]
+
+    # sliced, chunked, and dictionary-encoded input
+    chunked = pa.concat_tables([table.slice(0, 2), table.slice(2)]).slice(1)
+    chunked = chunked.set_column(
+        0, "chr", chunked.column("chr").cast(pa.dictionary(pa.int8(), pa.string()))
+    )
+    lifted_chunked = lift_table(
+        converter,
+        chunked,
+        chrom_col="chr",
+        start_col="pos",
+        end_col="pos_end",
+        strand_col="strand",
+    )
+    expected = lifted.column("lifted_start").to_pylist()[1:]
+    assert lifted_chunked.column("lifted_start").to_pylist() == expected
+
+    empty = lift_table(converter, pa.table({"chrom": [], "start": [], "end": []}))
+    assert empty.num_rows == 0
+
+
+def test_lift_dataframes(converter):
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame(
+        {"chrom": ["chr7", "chr1"], "start": [140453136, 1], "end": [140453137, 1]},
+        index=[10, 20],
+    )
+    lifted = lift_table(converter, df)
+    assert isinstance(lifted, pd.DataFrame)
+    assert list(lifted.index) == [10, 20]
+    assert lifted["lifted_start"].iloc[0] == 140753336
+    assert lifted["mapped"].tolist() == [True, False]
+
+    pl = pytest.importorskip("polars")
+    df = pl.DataFrame(
+        {"chrom": ["chr7", "chr1"], "start": [140453136, 1], "end": [140453137, 1]}
+    )
+    lifted = lift_table(converter, df)
+    assert isinstance(lifted, pl.DataFrame)
+    assert lifted["lifted_start"].to_list() == [140753336, None]
+    assert lifted["segment_count"].to_list() == [1, 0]
+
+
+def test_lift_table_invalid_input(converter):
+    table = pa.table({"chrom": ["chr7"], "start": [140453136], "end": [140453137]})
+
+    with pytest.raises(ValueError, match="Column `pos` not found"):
+        lift_table(converter, table, start_col="pos")
+
+    with pytest.raises(ValueError, match="Output column `mapped` already exists"):
+        lift_table(converter, table.append_column("mapped", pa.array([True])))
+
+    with pytest.raises(ValueError, match="Unrecognized strand value: 'x'"):
+        lift_table(
+            converter,
+            table.append_column("strand", pa.array(["x"])),
+            strand_col="strand",
+        )
+
+    with pytest.raises(
+        ValueError,
+        match="Coordinates exceed representable bounds of a 32 bit unsigned int",
+    ):
+        lift_table(converter, pa.table({"chrom": ["chr7"], "start": [-1], "end": [1]}))
+
+    with pytest.raises(TypeError, match="Expected a PyArrow table"):
+        lift_table(converter, [("chr7", 1, 2)])